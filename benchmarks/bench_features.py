@@ -0,0 +1,155 @@
+"""
+Feature-record benchmark — per-packet ``dict`` vs. slotted ``PacketFeatures``.
+
+Run with::
+
+    python -m benchmarks.bench_features [--packets N]
+
+Reports, for the former dictionary schema and the slotted record:
+
+- retained memory per packet (the record plus, for the dictionary
+  version, the second traffic-feed dictionary the processor used to
+  build for every packet),
+- construction rate,
+- construct-and-read rate: build the record and read the four fields
+  the metrics and port-scan consumers use (subscripts for the
+  dictionary, attributes for the record).
+
+It then compares a per-host counter (as kept by ``MetricsService`` and
+the port-scan detector) keyed by dotted-quad strings against one keyed
+by integer addresses: bytes per tracked host and update rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Sequence
+
+from collections import defaultdict
+
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+Row = tuple[float, object, object, str, int, int, int]
+
+
+def _build_rows(count: int, as_int: bool = False) -> list[Row]:
+    encode = ip_to_int if as_int else str
+    return [
+        (
+            1_000_000.0 + i * 1e-5,
+            encode(f"10.{(i >> 16) & 0xFF}.{(i >> 8) & 0xFF}.{i & 0xFF}"),
+            encode("192.168.0.1"),
+            "TCP",
+            40_000 + i % 1000,
+            i % 1024,
+            60,
+        )
+        for i in range(count)
+    ]
+
+
+def _make_dict(row: Row) -> tuple[dict, dict]:
+    ts, src, dst, proto, sport, dport, length = row
+    features = dict(
+        timestamp=ts, src_ip=src, dst_ip=dst, protocol=proto,
+        src_port=sport, dst_port=dport, packet_length=length,
+    )
+    feed = {
+        "src_ip": src or "unknown",
+        "dst_ip": dst or "unknown",
+        "protocol": proto,
+        "timestamp": ts,
+    }
+    return features, feed
+
+
+def _make_slotted(row: Row) -> PacketFeatures:
+    return PacketFeatures(*row)
+
+
+def _bytes_per_packet(make: Callable[[Row], object], rows: Sequence[Row]) -> float:
+    """Return retained bytes per packet for keeping every record alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [make(row) for row in rows]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    # Subtract the list that holds the records.
+    return (after - before) / len(rows) - 8
+
+
+def _host_table(keys: Sequence[object]) -> tuple[float, float]:
+    """Return (bytes per host, updates/s) for counting *keys*.
+
+    Keys are re-created per update, as a parser does for every packet.
+    """
+    copy = (lambda k: "".join(k)) if isinstance(keys[0], str) else (lambda k: k + 0)
+    fresh = [copy(k) for k in keys]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table: dict = defaultdict(int)
+    for key in [copy(k) for k in keys]:
+        table[key] += 1
+    size = (tracemalloc.get_traced_memory()[0] - before) / len(keys)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for key in fresh:
+        table[key] += 1
+    return size, len(keys) / (time.perf_counter() - start)
+
+
+def _rate(fn: Callable[[Row], object], rows: Sequence[Row]) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def _read_dict(row: Row) -> None:
+    features = _make_dict(row)[0]
+    features["protocol"], features["src_ip"], features["dst_port"], features["timestamp"]
+
+
+def _read_slotted(row: Row) -> None:
+    features = PacketFeatures(*row)
+    features.protocol, features.src_ip, features.dst_port, features.timestamp
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--packets", type=int, default=200_000)
+    args = ap.parse_args(argv)
+
+    str_rows = _build_rows(args.packets)
+    int_rows = _build_rows(args.packets, as_int=True)
+    variants = [
+        ("dict (+ feed dict)", _make_dict, _read_dict, str_rows),
+        ("PacketFeatures", _make_slotted, _read_slotted, int_rows),
+    ]
+
+    print(f"{args.packets} packets")
+    print(f"  {'':<20} {'bytes/pkt':>10} {'construct/s':>14} {'read/s':>12}")
+    for name, make, read, rows in variants:
+        print(
+            f"  {name:<20} {_bytes_per_packet(make, rows):>10.0f}"
+            f" {_rate(make, rows):>14,.0f} {_rate(read, rows):>12,.0f}"
+        )
+
+    print(f"{args.packets} distinct hosts")
+    print(f"  {'':<20} {'bytes/host':>10} {'updates/s':>14}")
+    for name, rows in (("str keys", str_rows), ("int keys", int_rows)):
+        size, rate = _host_table([row[1] for row in rows])
+        print(f"  {name:<20} {size:>10.0f} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
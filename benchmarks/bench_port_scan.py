@@ -0,0 +1,180 @@
+"""
+Scan detector benchmark — list rebuild vs. incremental window vs. sketch.
+
+Run with::
+
+    python -m benchmarks.bench_port_scan [--sources N] [--busy-packets N]
+
+Compares the former per-source list implementation (every packet
+rebuilds the source's entry list and its port set) with
+:class:`~sentinel_dpi.detection.plugins.port_scan_detector.PortScanDetector`
+and :class:`~sentinel_dpi.detection.plugins.scan_sketch_detector.SketchScanDetector`:
+
+- *many sources*: ``--sources`` addresses, four packets each, over
+  twice the detection window — packets/s, retained bytes per source at
+  the end, and retained bytes once one more packet arrives after a
+  full idle window (the former version never forgets a source);
+- *busy source*: one address sending ``--busy-packets`` packets to
+  port 443 inside a single window — packets/s;
+- *scanner*: one address probing ``--scan-ports`` ports inside a
+  single window — retained bytes.
+
+Rates are measured in a separate run from the memory figures, since
+allocation tracing slows the allocating variants disproportionately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Sequence
+
+from sentinel_dpi.detection.base_detector import BaseDetector
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.detection.plugins.scan_sketch_detector import SketchScanDetector
+from sentinel_dpi.dpi.feature_schema import PacketFeatures
+
+
+class _ListPortScan(BaseDetector):
+    """The former implementation, kept for comparison."""
+
+    def __init__(self, threshold: int = 20, window_seconds: float = 10.0) -> None:
+        self._threshold = threshold
+        self._window_seconds = window_seconds
+        self._tracking: dict[int, list[tuple[int, float]]] = defaultdict(list)
+        self._last_alert: dict[int, float] = {}
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        src_ip = features.src_ip
+        dst_port = features.dst_port
+        timestamp = features.timestamp
+        if src_ip is None or dst_port is None:
+            return None
+        entries = self._tracking[src_ip]
+        entries.append((dst_port, timestamp))
+        cutoff = timestamp - self._window_seconds
+        entries[:] = [(p, t) for p, t in entries if t > cutoff]
+        unique_ports = {p for p, _ in entries}
+        if len(unique_ports) >= self._threshold:
+            last = self._last_alert.get(src_ip)
+            if last is not None and (timestamp - last) < self._window_seconds:
+                return None
+            self._last_alert[src_ip] = timestamp
+            return [{"type": "PORT_SCAN"}]
+        return None
+
+
+def _many_sources(count: int, window: float) -> list[PacketFeatures]:
+    """Four packets per source, spread evenly over two windows."""
+    step = 2 * window / (4 * count)
+    return [
+        PacketFeatures(
+            1_000_000.0 + i * step, 0x0A000000 + i % count, 0xC0A80001,
+            "TCP", 40_000, 1 + (i // count), 60,
+        )
+        for i in range(4 * count)
+    ]
+
+
+def _busy_source(count: int, window: float) -> list[PacketFeatures]:
+    """One source hammering port 443 inside a single window."""
+    step = window / (2 * count)
+    return [
+        PacketFeatures(
+            1_000_000.0 + i * step, 0x0A000001, 0xC0A80001, "TCP", 40_000, 443, 60,
+        )
+        for i in range(count)
+    ]
+
+
+def _scanner(ports: int, window: float) -> list[PacketFeatures]:
+    """One source probing *ports* distinct ports inside a single window."""
+    step = window / (2 * ports)
+    return [
+        PacketFeatures(
+            1_000_000.0 + i * step, 0x0A000001, 0xC0A80001, "TCP", 40_000, i, 60,
+        )
+        for i in range(ports)
+    ]
+
+
+def _rate(detector: BaseDetector, packets: Sequence[PacketFeatures]) -> float:
+    """Return packets/s for feeding *packets*."""
+    start = time.perf_counter()
+    for features in packets:
+        detector.analyze(features)
+    return len(packets) / (time.perf_counter() - start)
+
+
+def _memory(
+    detector: BaseDetector, packets: Sequence[PacketFeatures], window: float,
+) -> tuple[float, float]:
+    """Return (retained bytes, retained bytes after idling)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for features in packets:
+        detector.analyze(features)
+    retained = tracemalloc.get_traced_memory()[0] - before
+
+    last = packets[-1]
+    detector.analyze(PacketFeatures(
+        last.timestamp + window + 1.0, 0x0B000001, last.dst_ip, "TCP", 40_000, 1, 60,
+    ))
+    gc.collect()
+    idle = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, idle
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sources", type=int, default=100_000)
+    ap.add_argument("--busy-packets", type=int, default=20_000)
+    ap.add_argument("--scan-ports", type=int, default=10_000)
+    ap.add_argument("--window", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    many = _many_sources(args.sources, args.window)
+    busy = _busy_source(args.busy_packets, args.window)
+    scan = _scanner(args.scan_ports, args.window)
+    variants = [
+        ("list rebuild", lambda: _ListPortScan(window_seconds=args.window)),
+        (
+            "incremental",
+            lambda: PortScanDetector(window_seconds=args.window, max_sources=args.sources),
+        ),
+        (
+            "sketch",
+            lambda: SketchScanDetector(window_seconds=args.window, max_sources=args.sources),
+        ),
+    ]
+
+    print(f"{args.sources} sources x 4 packets over {2 * args.window:.0f}s")
+    print(f"  {'':<14} {'packets/s':>12} {'bytes/source':>14} {'MB after idle':>14}")
+    for name, make in variants:
+        rate = _rate(make(), many)
+        retained, idle = _memory(make(), many, args.window)
+        print(
+            f"  {name:<14} {rate:>12,.0f} {retained / args.sources:>14.0f}"
+            f" {idle / 1e6:>14.1f}"
+        )
+
+    print(f"1 source x {args.busy_packets} packets to port 443 in one window")
+    print(f"  {'':<14} {'packets/s':>12}")
+    for name, make in variants:
+        print(f"  {name:<14} {_rate(make(), busy):>12,.0f}")
+
+    print(f"1 source x {args.scan_ports} distinct ports in one window")
+    print(f"  {'':<14} {'bytes':>12}")
+    for name, make in variants[1:]:
+        retained, _ = _memory(make(), scan, args.window)
+        print(f"  {name:<14} {retained:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
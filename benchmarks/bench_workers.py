@@ -0,0 +1,111 @@
+"""
+Processing-mode benchmark — single thread vs. worker processes.
+
+Run with::
+
+    python -m benchmarks.bench_workers [--packets N] [--workers K ...]
+
+Pushes the same pre-built raw frames through:
+
+- a single :class:`PacketProcessor` (fast parser, port-scan detector,
+  metrics), and
+- a :class:`MultiprocessPacketProcessor` with K worker processes,
+
+and reports end-to-end packets/second (first packet dispatched to the
+last delta merged into the main-process metrics).  Worker start-up is
+excluded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Sequence
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import MultiprocessPacketProcessor
+from sentinel_dpi.core.packet_processor import PacketProcessor
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.detection.detection_manager import DetectionManager
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
+from sentinel_dpi.services.alert_manager import AlertManager
+from sentinel_dpi.services.metrics_service import MetricsService
+
+from benchmarks.bench_parser import _build_frames
+
+
+def _wait_total(metrics: MetricsService, count: int) -> None:
+    while metrics.snapshot()["total_packets"] < count:
+        time.sleep(0.005)
+
+
+def _run_single(frames: Sequence[RawFrame], settings: Settings) -> float:
+    pq = PacketQueue()
+    metrics = MetricsService()
+    processor = PacketProcessor(
+        pq,
+        settings,
+        parser=FastPacketParser(),
+        detection_manager=DetectionManager([PortScanDetector()]),
+        metrics_service=metrics,
+        alert_manager=AlertManager(),
+    )
+    processor.start()
+    start = time.perf_counter()
+    pq.put_many(frames)
+    _wait_total(metrics, len(frames))
+    elapsed = time.perf_counter() - start
+    processor.stop()
+    return len(frames) / elapsed
+
+
+def _run_processes(frames: Sequence[RawFrame], settings: Settings) -> float:
+    pq = PacketQueue()
+    metrics = MetricsService()
+    processor = MultiprocessPacketProcessor(pq, settings, metrics, AlertManager())
+    processor.start()
+    # Let the workers import and attach before timing.
+    while any(w.get_stats()["packets_processed"] == 0 for w in processor.shards):
+        pq.put_many(frames[:len(processor.shards) * 64])
+        time.sleep(0.2)
+    while any(s["queue_depth"] for s in processor.get_shard_stats()) or not pq.empty():
+        time.sleep(0.05)
+    time.sleep(2 * settings.worker_publish_interval)
+    baseline = metrics.snapshot()["total_packets"]
+
+    start = time.perf_counter()
+    pq.put_many(frames)
+    _wait_total(metrics, baseline + len(frames))
+    elapsed = time.perf_counter() - start
+    processor.stop()
+    return len(frames) / elapsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--packets", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = ap.parse_args(argv)
+
+    frames = _build_frames(args.packets)
+    base = dict(
+        queue_maxsize=0,
+        processor_timeout=0.05,
+        processor_batch_size=1024,
+        worker_publish_interval=0.1,
+        shm_ring_size=64 << 20,
+    )
+
+    print(f"{args.packets} packets")
+    single = _run_single(frames, Settings(**base))
+    print(f"  {'single PacketProcessor':<28} {single:>12,.0f} pkt/s    1.0x")
+    for k in args.workers:
+        pps = _run_processes(frames, Settings(worker_processes=k, **base))
+        print(f"  {f'{k} worker process(es)':<28} {pps:>12,.0f} pkt/s  {pps / single:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
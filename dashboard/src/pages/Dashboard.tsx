@@ -5,6 +5,7 @@ import type {
   SystemStatusData,
   TrafficFeedEntry,
   TopTalkerEntry,
+  SeriesRange,
 } from "../types/metrics";
 import type { Alert } from "../types/alerts";
 import StatCard from "../components/StatCard";
@@ -22,6 +23,7 @@ import SystemStatus from "../components/SystemStatus";
 import { useWebSocket, type ConnectionStatus } from "../hooks/useWebSocket";
 
 const WS_URL = "ws://127.0.0.1:8000/ws";
+const API_URL = "http://127.0.0.1:8000";
 const PPS_HISTORY_SIZE = 30; // 30 ticks × 1 s = 30 s
 
 // ------------------------------------------------------------------ //
@@ -82,6 +84,23 @@ export default function Dashboard() {
   const [totalAlerts, setTotalAlerts] = useState(0);
   const [ppsHistory, setPpsHistory] = useState<PPSDataPoint[]>([]);
 
+  // Seed the PPS chart with the backend's per-second history.
+  useEffect(() => {
+    fetch(`${API_URL}/series?resolution=1&limit=${PPS_HISTORY_SIZE}`)
+      .then((resp) => (resp.ok ? (resp.json() as Promise<SeriesRange>) : null))
+      .then((series) => {
+        if (!series) return;
+        const seeded = series.timestamps.map((ts, i) => ({
+          time: new Date(ts * 1000).toLocaleTimeString(),
+          pps: series.packets[i],
+        }));
+        setPpsHistory((prev) => (prev.length > 0 ? prev : seeded));
+      })
+      .catch(() => {
+        // No history yet; the chart fills from live ticks.
+      });
+  }, []);
+
   const handleMessage = useCallback((event: MessageEvent) => {
     try {
       const msg: WsMessage = JSON.parse(event.data as string);
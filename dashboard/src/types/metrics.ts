@@ -35,6 +35,19 @@ export interface TrafficFeedEntry {
 export interface TopTalkerEntry {
   ip: string;
   packets: number;
+  /** Most the count may overestimate (bounded host counters only). */
+  error?: number;
+}
+
+/** Bucketed traffic history from GET /series (one entry per bucket). */
+export interface SeriesRange {
+  resolution: number;
+  start: number;
+  timestamps: number[];
+  packets: number[];
+  bytes: number[];
+  new_sources: number[];
+  protocols: Record<string, number[]>;
 }
 
 /** Structured telemetry snapshot from the WebSocket metrics tick. */
@@ -12,9 +12,9 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal, Sequence
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from sentinel_dpi.services.alert_manager import AlertManager
@@ -22,8 +22,14 @@ from sentinel_dpi.services.metrics_service import MetricsService
 
 if TYPE_CHECKING:
     from sentinel_dpi.config.settings import Settings
+    from sentinel_dpi.core.afpacket_capture import AfPacketCaptureEngine
     from sentinel_dpi.core.capture_engine import CaptureEngine
+    from sentinel_dpi.core.fanout_capture import FanoutCaptureEngine
+    from sentinel_dpi.core.interface_pipelines import MultiInterfaceCapture
+    from sentinel_dpi.core.pcap_replay import PcapReplayEngine
     from sentinel_dpi.core.packet_processor import PacketProcessor
+    from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
+    from sentinel_dpi.services.metrics_service import MergedMetricsView
     from sentinel_dpi.detection.detection_manager import DetectionManager
 
 logger = logging.getLogger(__name__)
@@ -31,21 +37,41 @@ logger = logging.getLogger(__name__)
 
 def create_app(
     *,
-    metrics_service: MetricsService,
+    metrics_service: MetricsService | MergedMetricsView,
     alert_manager: AlertManager,
-    packet_processor: PacketProcessor | None = None,
-    capture_engine: CaptureEngine | None = None,
+    packet_processor: (
+        PacketProcessor
+        | ShardedPacketProcessor
+        | FanoutCaptureEngine
+        | MultiInterfaceCapture
+        | None
+    ) = None,
+    capture_engine: (
+        CaptureEngine
+        | AfPacketCaptureEngine
+        | PcapReplayEngine
+        | FanoutCaptureEngine
+        | MultiInterfaceCapture
+        | None
+    ) = None,
     detection_manager: DetectionManager | None = None,
+    detector_names: Sequence[str] | None = None,
     settings: Settings | None = None,
 ) -> FastAPI:
     """Build and return a configured FastAPI application.
 
     Parameters:
-        metrics_service: Shared metrics collector (read-only access).
+        metrics_service: Shared metrics collector, or the merged view of
+                         the per-shard collectors (read-only access).
         alert_manager: Shared alert store (read-only access).
         packet_processor: Optional processor for live traffic feed.
-        capture_engine: Optional engine reference for system status.
+        capture_engine: Optional packet source for system status and
+                        capture / loss counters.
         detection_manager: Optional manager for detector count.
+        detector_names: Optional names of the loaded detectors, for the
+                        detector count when they do not all run in one
+                        manager (e.g. in worker processes); takes
+                        precedence over *detection_manager*.
         settings: Optional settings for telemetry configuration.
     """
     ws_interval = settings.ws_update_interval if settings else 1.0
@@ -63,6 +89,10 @@ def create_app(
     # Helpers
     # ------------------------------------------------------------------
 
+    def _capture_stats() -> dict | None:
+        """Capture and loss counters of the packet source, if any."""
+        return capture_engine.capture_stats() if capture_engine else None
+
     def _build_system_status() -> dict:
         """Assemble system status from injected component references."""
         return {
@@ -74,10 +104,18 @@ def create_app(
             ),
             "websocket": "active",
             "detectors_loaded": (
-                len(detection_manager._detectors)
+                len(detector_names)
+                if detector_names is not None
+                else len(detection_manager.detectors)
                 if detection_manager
                 else 0
             ),
+            "packet_queue": (
+                packet_processor.get_queue_stats() if packet_processor else None
+            ),
+            "processor_shards": (
+                packet_processor.get_shard_stats() if packet_processor else []
+            ),
         }
 
     # ------------------------------------------------------------------
@@ -90,7 +128,45 @@ def create_app(
 
     @app.get("/metrics")
     def metrics() -> dict:
-        return metrics_service.snapshot()
+        return {**metrics_service.snapshot(), "capture": _capture_stats()}
+
+    @app.get("/top")
+    def top(
+        window: float | None = None,
+        dimension: Literal["src_ip", "dst_ip", "dst_port", "protocol"] = "src_ip",
+        by: Literal["packets", "bytes"] = "packets",
+        limit: int = 10,
+    ) -> dict:
+        windows = metrics_service.top_windows
+        if not windows:
+            raise HTTPException(status_code=404, detail="Windowed rankings are disabled")
+        if window is None:
+            window = windows[0]
+        elif window not in windows:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown window {window:g}; expected one of {list(windows)}",
+            )
+        return {
+            "window": window,
+            "dimension": dimension,
+            "by": by,
+            "entries": metrics_service.top(window, dimension, by, max(0, limit)),
+        }
+
+    @app.get("/series")
+    def series(
+        resolution: int = 1,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="limit must be at least 1")
+        try:
+            return metrics_service.series(resolution, start, end, limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     @app.get("/alerts")
     def alerts() -> dict:
@@ -105,6 +181,17 @@ def create_app(
     def system_status() -> dict:
         return _build_system_status()
 
+    @app.get("/detectors")
+    def detectors() -> dict:
+        shards = packet_processor.get_shard_stats() if packet_processor else []
+        return {
+            "detectors": [
+                {"shard": index, **stats}
+                for index, shard in enumerate(shards)
+                for stats in shard.get("detectors", [])
+            ],
+        }
+
     # ------------------------------------------------------------------
     # WebSocket endpoint
     # ------------------------------------------------------------------
@@ -145,8 +232,10 @@ def create_app(
                             "packets_per_source_ip": metrics_snap["packets_per_source_ip"],
                             "packets_per_destination_ip": metrics_snap["packets_per_destination_ip"],
                             "packets_per_second": metrics_snap["packets_per_second"],
+                            "bytes_per_second": metrics_snap["bytes_per_second"],
                         },
                         "top_talkers": metrics_snap.get("top_talkers", []),
+                        "capture": _capture_stats(),
                         "traffic_feed": feed,
                         "threat_level": alert_manager.get_threat_level(),
                         "system_status": _build_system_status(),
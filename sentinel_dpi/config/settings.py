@@ -11,6 +11,27 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 
+@dataclass(frozen=True)
+class InterfaceConfig:
+    """One capture interface of a multi-interface sensor.
+
+    Attributes:
+        name: Network interface to capture on.
+        bpf_filter: Berkeley Packet Filter for this interface only.
+        label: Name reported in features, metrics and the API.
+               Defaults to *name*.
+    """
+
+    name: str
+    bpf_filter: str = ""
+    label: str = ""
+
+    @property
+    def display_name(self) -> str:
+        """The label, or the interface name when no label is set."""
+        return self.label or self.name
+
+
 @dataclass(frozen=True)
 class Settings:
     """Immutable runtime configuration.
@@ -18,16 +39,164 @@ class Settings:
     Core Capture Settings:
         interface: Network interface for scapy to sniff on.
                    ``None`` lets scapy choose the default interface.
+        interfaces: Capture on several interfaces at once, each with its
+                    own BPF filter, queue (``queue_maxsize``), processor
+                    and detectors, labelled in features and metrics.
+                    Empty uses ``interface`` alone.  Takes precedence
+                    over ``capture_fanout``, ``worker_processes`` and
+                    ``processor_workers``.
         queue_maxsize: Upper bound on the packet queue.
         processor_timeout: Seconds the processor blocks on a ``get()``
                            before re-checking the stop event.
+        processor_batch_size: Maximum packets the processor drains from
+                              the queue per lock acquisition.
+        capture_batch_size: Packets the scapy capture callback buffers
+                            before flushing them to the queue in one call.
+                            ``1`` enqueues every packet immediately.
+        capture_batch_timeout: Maximum age (seconds) of a buffered batch;
+                               checked whenever a new packet arrives.
         bpf_filter: Optional Berkeley Packet Filter expression.
-        snapshot_length: Maximum bytes captured per packet.
+        snapshot_length: Maximum bytes captured per packet (applied by
+                         the ``"afpacket"`` backend).
+        capture_backend: Packet source — ``"scapy"`` (live sniffing),
+                         ``"afpacket"`` (Linux ``TPACKET_V3`` ring, raw
+                         frames) or ``"replay"`` (offline pcap/pcapng file).
+
+    Capture Backpressure Settings:
+        overload_policy: What a capture backend does when the queue
+                         cannot keep up — ``"drop_newest"`` (tail drop),
+                         ``"drop_oldest"`` (evict the oldest queued
+                         packets), ``"sample"`` (1-in-N) or
+                         ``"flow_sample"`` (1-in-N flows, both directions).
+        overload_threshold: Fraction of ``queue_maxsize`` from which the
+                            sampling policies engage.
+        overload_sample_rate: N for the sampling policies.
+        capture_log_interval: Minimum seconds between capture-loss
+                              summary log lines.
+
+    AF_PACKET Settings:
+        afpacket_block_size: Size of one ring block in bytes (multiple of
+                             the page size).
+        afpacket_block_count: Number of blocks in the ring.
+        afpacket_block_timeout_ms: Milliseconds after which the kernel
+                                   retires a partially filled block.
+        capture_fanout: Number of ``AF_PACKET`` sockets in a
+                        ``PACKET_FANOUT`` group, each captured and
+                        processed by its own worker process.  ``0``
+                        disables fan-out (Linux only; overrides the
+                        capture backend and the processor settings).
+        fanout_mode: How the kernel splits traffic between the sockets —
+                     ``"source"`` (source address; keeps per-source
+                     detector state in one worker), ``"hash"`` (flow
+                     hash), ``"cpu"`` (receiving CPU) or ``"lb"``
+                     (round robin).
+
+    Replay Settings:
+        replay_file: Path of the pcap/pcapng file to replay.
+        replay_speed: Pacing factor — ``0`` replays as fast as possible,
+                      ``1.0`` preserves the original inter-arrival timing,
+                      ``N`` replays N× faster.
+        replay_block: Wait for queue space instead of dropping packets
+                      when the queue is full (lossless replay).
+        replay_raw: Enqueue Ethernet records as undissected raw frames
+                    instead of scapy packets.
+
+    Processor Sharding Settings:
+        processor_workers: Number of processor shards.  ``1`` runs the
+                           single ``PacketProcessor``; more starts a
+                           dispatcher routing packets to N shards, each
+                           with its own queue (``queue_maxsize``),
+                           detectors and metrics.
+        shard_key: Routing key — ``"source"`` (source address; keeps
+                   per-source detector state shard-local) or ``"flow"``
+                   (unordered address pair; keeps both directions of a
+                   conversation together).
+        worker_processes: Number of worker *processes*.  ``0`` keeps all
+                          processing in this process; more runs parsing
+                          and per-source detection in separate processes
+                          fed through shared-memory rings (overrides
+                          ``processor_workers``).
+        shm_ring_size: Bytes of frame data buffered per worker ring.
+        worker_publish_interval: Seconds between metric / alert deltas
+                                 published by each worker process.
+
+    Parser Settings:
+        columnar_batches: Decode raw-frame batches with the vectorised
+                          NumPy parser and feed the columnar entry points
+                          of the metrics and detection layers.
 
     Detection Settings:
         port_scan_threshold: Number of unique destination ports that
                              triggers a port scan alert.
         port_scan_window: Sliding window duration (seconds).
+        port_scan_max_sources: Most source addresses the port-scan
+                               detector tracks; the least recently
+                               seen is evicted beyond it.
+        scan_detector: ``"exact"`` (per-source port sets) or
+                       ``"sketch"`` (linear-counting bitmaps of about
+                       1.5 KB per source, plus host-sweep detection).
+        host_sweep_threshold: Estimated distinct destination hosts that
+                              trigger a host-sweep alert (sketch only).
+        scan_sketch_bits: Bits per sketch bitmap; more bits lower the
+                          estimation error.
+        scan_sketch_buckets: Time slices per sketch window.
+
+    High-Traffic Settings:
+        high_traffic_threshold: Packets per second above which traffic
+                                is considered high.
+        high_traffic_window: Consecutive ticks above the threshold that
+                             trigger a high-traffic alert.
+        high_traffic_tick: Seconds between high-traffic evaluations.
+
+    Volumetric Settings:
+        volumetric_detector: Run the count-min-sketch flood detector on
+                             every processor shard.
+        volumetric_pps_threshold: Packets per second towards one
+                                  destination that trigger an alert
+                                  (per shard).
+        volumetric_bps_threshold: Bytes per second towards one
+                                  destination that trigger an alert
+                                  (per shard).
+        volumetric_window: Sliding window duration (seconds).
+        volumetric_sketch_width: Counters per sketch row; the
+                                 overestimate is at most ``e / width``
+                                 of the window's traffic.
+        volumetric_sketch_depth: Sketch rows; the bound holds with
+                                 probability ``1 - e**-depth``.
+        volumetric_sketch_buckets: Time slices per sketch window.
+
+    Anomaly Settings:
+        anomaly_detector: Run the per-host EWMA baseline detector on
+                          every processor shard.
+        anomaly_z_threshold: Standard deviations above a host's
+                             baseline that raise an anomaly alert.
+        anomaly_alpha: Weight of each interval in the baselines.
+        anomaly_warmup: Intervals a host is observed before scoring.
+        anomaly_interval: Seconds per scoring interval.
+        anomaly_max_hosts: Most hosts tracked per shard.
+
+    Beaconing Settings:
+        beacon_detector: Run the periodic call-out detector on every
+                         processor shard.
+        beacon_tick: Seconds between beaconing scoring passes.
+        beacon_history: Wake-up times kept per (source, destination,
+                        port) pair.
+        beacon_min_events: Wake-ups a pair needs before it is scored.
+        beacon_max_jitter: Largest median interval deviation, relative
+                           to the period, of a beacon.
+        beacon_max_pairs: Most pairs tracked per shard; the least
+                          recently seen is evicted beyond it.
+
+    Detector Budget Settings:
+        detector_budget_us: Mean microseconds per packet each detector
+                            may spend; ``0`` for no limit.
+        detector_budget_cpu: Fraction of wall time (0–1) each detector
+                             may spend; ``0`` for no limit.
+        detector_budget_window: Seconds over which budget usage is
+                                measured.
+        detector_max_sample_rate: Largest sampling factor applied to a
+                                  detector over budget before it is
+                                  disabled.
 
     Alert Settings:
         alert_cooldown: Suppression window for duplicate alerts.
@@ -35,6 +204,21 @@ class Settings:
 
     Telemetry Settings:
         top_talkers_limit: Number of top source IPs to include.
+        metrics_host_capacity: Most hosts counted per direction by each
+                               metrics collector (Space-Saving summary,
+                               counts reported with an error bound);
+                               ``0`` counts every host exactly.
+        metrics_top_windows: Trailing windows (seconds) over which hosts,
+                             destination ports and protocols are ranked
+                             by packets and bytes (``/top``), e.g.
+                             ``(60.0, 300.0, 3600.0)``; empty (the
+                             default) to disable.  Hosts per bucket are
+                             bounded by ``metrics_host_capacity``.
+        metrics_window_bucket: Time resolution (seconds) of those windows.
+        metrics_series_slots: Buckets of traffic history kept at 1 s,
+                              1 min and 1 h resolution (``/series``);
+                              the default keeps an hour, a day and a
+                              week.
         traffic_feed_size: Max entries in the live traffic feed ring buffer.
         alert_window_seconds: Rolling window for threat-level computation.
         ws_update_interval: Seconds between WebSocket telemetry ticks.
@@ -49,18 +233,89 @@ class Settings:
     interface: str | None = None
     # Network interface used for packet capture.
     # Example values: "Wi-Fi", "Ethernet", or a raw Npcap device like r"\Device\NPF_{GUID}"
+    interfaces: tuple[InterfaceConfig, ...] = ()
     queue_maxsize: int = 10_000
     processor_timeout: float = 1.0
+    processor_batch_size: int = 256
+    capture_batch_size: int = 1
+    capture_batch_timeout: float = 0.05
     bpf_filter: str = ""
     snapshot_length: int = 65_535
+    capture_backend: str = "scapy"  # "scapy" | "afpacket" | "replay"
+
+    # --- Capture Backpressure ---
+    overload_policy: str = "drop_newest"  # "drop_newest" | "drop_oldest" | "sample" | "flow_sample"
+    overload_threshold: float = 0.8
+    overload_sample_rate: int = 10
+    capture_log_interval: float = 10.0
+
+    # --- AF_PACKET Backend ---
+    afpacket_block_size: int = 1 << 20
+    afpacket_block_count: int = 64
+    afpacket_block_timeout_ms: int = 10
+    capture_fanout: int = 0
+    fanout_mode: str = "source"  # "source" | "hash" | "cpu" | "lb"
+
+    # --- Replay Source ---
+    replay_file: str = ""
+    replay_speed: float = 0.0
+    replay_block: bool = False
+    replay_raw: bool = False
+
+    # --- Processor Sharding ---
+    processor_workers: int = 1
+    shard_key: str = "source"  # "source" | "flow"
+    worker_processes: int = 0
+    shm_ring_size: int = 16 << 20
+    worker_publish_interval: float = 0.5
+
+    # --- Parser ---
+    columnar_batches: bool = False
 
     # --- Detection Layer ---
     port_scan_threshold: int = 20
     port_scan_window: float = 10.0
+    port_scan_max_sources: int = 100_000
+    scan_detector: str = "exact"  # "exact" | "sketch"
+    host_sweep_threshold: int = 20
+    scan_sketch_bits: int = 1024
+    scan_sketch_buckets: int = 4
 
     # --- High-Traffic Detection ---
     high_traffic_threshold: float = 50.0
     high_traffic_window: int = 5
+    high_traffic_tick: float = 1.0
+
+    # --- Volumetric Detection ---
+    volumetric_detector: bool = False
+    volumetric_pps_threshold: float = 10_000.0
+    volumetric_bps_threshold: float = 100_000_000.0
+    volumetric_window: float = 10.0
+    volumetric_sketch_width: int = 2048
+    volumetric_sketch_depth: int = 4
+    volumetric_sketch_buckets: int = 5
+
+    # --- Anomaly Detection ---
+    anomaly_detector: bool = False
+    anomaly_z_threshold: float = 4.0
+    anomaly_alpha: float = 0.05
+    anomaly_warmup: int = 30
+    anomaly_interval: float = 1.0
+    anomaly_max_hosts: int = 131_072
+
+    # --- Beaconing Detection ---
+    beacon_detector: bool = False
+    beacon_tick: float = 30.0
+    beacon_history: int = 32
+    beacon_min_events: int = 8
+    beacon_max_jitter: float = 0.1
+    beacon_max_pairs: int = 16_384
+
+    # --- Detector Budgets ---
+    detector_budget_us: float = 0.0
+    detector_budget_cpu: float = 0.0
+    detector_budget_window: float = 10.0
+    detector_max_sample_rate: int = 64
 
     # --- Alert Layer ---
     alert_cooldown: float = 10.0
@@ -68,6 +323,10 @@ class Settings:
 
     # --- Telemetry Layer ---
     top_talkers_limit: int = 5
+    metrics_host_capacity: int = 0
+    metrics_top_windows: tuple[float, ...] = ()
+    metrics_window_bucket: float = 10.0
+    metrics_series_slots: tuple[int, int, int] = (3600, 1440, 168)
     traffic_feed_size: int = 50
     alert_window_seconds: int = 60
     ws_update_interval: float = 1.0
@@ -0,0 +1,335 @@
+"""
+AF_PACKET capture backend — Linux ``TPACKET_V3`` memory-mapped ring.
+
+The kernel writes frames into a ring of fixed-size blocks shared with
+user space; the capture thread walks each retired block, copies out the
+frame bytes and hands the block back.  Frames are enqueued as
+:class:`~sentinel_dpi.core.raw_frame.RawFrame` tuples — no scapy
+dissection happens on the capture thread.
+
+Frames are copied out of the ring (a single slice per frame) because
+the block is returned to the kernel as soon as it has been walked; a
+memoryview into the ring would be overwritten by later traffic.
+
+Several sockets can join one ``PACKET_FANOUT`` group (see
+:func:`join_fanout`); the kernel then splits the interface's traffic
+between them, each socket keeping its own ring.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import logging
+import mmap
+import select
+import socket
+import struct
+import threading
+import time
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.backpressure import CaptureAdmission, read_kernel_drops
+from sentinel_dpi.core.capture_engine import resolve_interface
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+
+logger = logging.getLogger(__name__)
+
+# <linux/if_ether.h>, <linux/if_packet.h>
+ETH_P_ALL = 0x0003
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+PACKET_FANOUT = 18
+PACKET_FANOUT_DATA = 22
+PACKET_FANOUT_HASH = 0
+PACKET_FANOUT_LB = 1
+PACKET_FANOUT_CPU = 2
+PACKET_FANOUT_CBPF = 6
+PACKET_FANOUT_FLAG_DEFRAG = 0x8000
+
+# ``fanout_mode`` setting → kernel fan-out algorithm.  ``"source"`` runs
+# a classic BPF program (see :func:`source_fanout_program`) so that all
+# frames from one source address reach the same socket.
+FANOUT_MODES = {
+    "hash": PACKET_FANOUT_HASH | PACKET_FANOUT_FLAG_DEFRAG,
+    "lb": PACKET_FANOUT_LB,
+    "cpu": PACKET_FANOUT_CPU,
+    "source": PACKET_FANOUT_CBPF,
+}
+
+# struct tpacket_req3
+_TPACKET_REQ3 = struct.Struct("=IIIIIII")
+# struct tpacket_block_desc → tpacket_hdr_v1: block_status, num_pkts,
+# offset_to_first_pkt (the header starts 8 bytes into the block).
+_BLOCK_STATUS = struct.Struct("=I")
+_BLOCK_STATUS_OFFSET = 8
+_BLOCK_HDR = struct.Struct("=III")
+# struct tpacket3_hdr: tp_next_offset, tp_sec, tp_nsec, tp_snaplen,
+# tp_len, tp_status, tp_mac.
+_PKT_HDR = struct.Struct("=IIIIIIH")
+# struct sock_filter: code, jt, jf, k.
+_SOCK_FILTER = struct.Struct("=HBBI")
+# struct sock_fprog: len, filter pointer.
+_SOCK_FPROG = struct.Struct("HP")
+# <linux/filter.h>: special load offsets (as unsigned 32-bit k values).
+_SKF_AD_PROTOCOL = (-0x1000 + 0) & 0xFFFFFFFF
+_SKF_NET_OFF = (-0x100000) & 0xFFFFFFFF
+
+# Frame slot size reported to the kernel.  TPACKET_V3 packs frames
+# back to back inside a block, so this only has to divide the block.
+_FRAME_SIZE = 2048
+# How long the capture thread sleeps in poll() before re-checking stop.
+_POLL_TIMEOUT_MS = 100
+# Seconds between reads of the socket's kernel drop counter.
+_KERNEL_STATS_INTERVAL = 1.0
+
+
+def read_block(
+    ring: mmap.mmap,
+    block_offset: int,
+    snapshot_length: int,
+) -> list[RawFrame]:
+    """Copy every frame out of the retired block at *block_offset*.
+
+    Parameters:
+        ring: The memory-mapped RX ring.
+        block_offset: Byte offset of the block descriptor in *ring*.
+        snapshot_length: Frames are truncated to at most this many bytes.
+    """
+    num_pkts, first_offset = _BLOCK_HDR.unpack_from(
+        ring, block_offset + _BLOCK_STATUS_OFFSET,
+    )[1:]
+
+    frames: list[RawFrame] = []
+    pkt_offset = block_offset + first_offset
+    for _ in range(num_pkts):
+        next_offset, sec, nsec, snaplen, wire_len, _status, mac = (
+            _PKT_HDR.unpack_from(ring, pkt_offset)
+        )
+        start = pkt_offset + mac
+        frames.append(RawFrame(
+            ring[start:start + min(snaplen, snapshot_length)],
+            sec + nsec * 1e-9,
+            wire_len,
+        ))
+        pkt_offset += next_offset
+    return frames
+
+
+def source_fanout_program(members: int) -> bytes:
+    """Classic BPF fan-out program: socket = source address mod *members*.
+
+    Uses the IPv4 source, or the low 32 bits of the IPv6 source; other
+    frames go to socket 0.  The kernel runs fan-out programs before the
+    link-layer header is restored, so loads are relative to the network
+    header (``SKF_NET_OFF``) and the protocol comes from the skb
+    (``SKF_AD_PROTOCOL``) — which also makes VLAN-tagged traffic work.
+    """
+    return b"".join(_SOCK_FILTER.pack(*insn) for insn in (
+        (0x20, 0, 0, _SKF_AD_PROTOCOL),   # ld #proto
+        (0x15, 0, 2, 0x0800),             # jeq #IPv4, 2, 4
+        (0x20, 0, 0, _SKF_NET_OFF + 12),  # ld [net + 12]     IPv4 source
+        (0x05, 0, 0, 2),                  # ja 6
+        (0x15, 0, 3, 0x86DD),             # jeq #IPv6, 5, 8
+        (0x20, 0, 0, _SKF_NET_OFF + 20),  # ld [net + 20]     IPv6 source, low word
+        (0x94, 0, 0, members),            # mod #members
+        (0x16, 0, 0, 0),                  # ret a
+        (0x06, 0, 0, 0),                  # ret #0
+    ))
+
+
+def join_fanout(sock: socket.socket, group: int, mode: str, members: int) -> None:
+    """Add the bound socket *sock* to fan-out *group*.
+
+    Parameters:
+        sock: Bound ``AF_PACKET`` socket.
+        group: 16-bit group id shared by every member socket.
+        mode: Key of :data:`FANOUT_MODES`.
+        members: Number of sockets in the group (``"source"`` mode).
+    """
+    if mode not in FANOUT_MODES:
+        raise ValueError(f"Unknown fan-out mode: {mode!r}")
+    sock.setsockopt(SOL_PACKET, PACKET_FANOUT, (group & 0xFFFF) | (FANOUT_MODES[mode] << 16))
+    if mode == "source":
+        program = source_fanout_program(members)
+        buf = ctypes.create_string_buffer(program, len(program))
+        sock.setsockopt(SOL_PACKET, PACKET_FANOUT_DATA, _SOCK_FPROG.pack(
+            len(program) // _SOCK_FILTER.size, ctypes.addressof(buf),
+        ))
+
+
+class AfPacketCaptureEngine:
+    """Capture raw Ethernet frames from a ``TPACKET_V3`` ring.
+
+    Linux only.  Requires ``CAP_NET_RAW``.  Exposes the same lifecycle
+    API as :class:`~sentinel_dpi.core.capture_engine.CaptureEngine`.
+
+    Parameters:
+        packet_queue: Shared queue to push captured frames into.
+        settings: Application configuration.
+        fanout_group: Join this ``PACKET_FANOUT`` group (mode and size
+                      from ``fanout_mode`` / ``capture_fanout``).
+    """
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        fanout_group: int | None = None,
+    ) -> None:
+        self._packet_queue = packet_queue
+        self._settings = settings
+        self._fanout_group = fanout_group
+        self._block_size = settings.afpacket_block_size
+        self._block_count = settings.afpacket_block_count
+
+        self._sock: socket.socket | None = None
+        self._ring: mmap.mmap | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._admission = CaptureAdmission(
+            packet_queue, settings, name="AfPacketCaptureEngine",
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Open the socket, map the ring and spawn the capture thread."""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("AfPacketCaptureEngine.start() called while already running")
+            return
+
+        iface = resolve_interface(self._settings)
+        self._sock = self._open_socket(iface)
+        self._ring = mmap.mmap(
+            self._sock.fileno(),
+            self._block_size * self._block_count,
+            mmap.MAP_SHARED,
+            mmap.PROT_READ | mmap.PROT_WRITE,
+        )
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="AfPacketCapture",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "AfPacketCaptureEngine started on interface=%s (%d × %d B blocks)",
+            iface,
+            self._block_count,
+            self._block_size,
+        )
+
+    def stop(self) -> None:
+        """Stop the capture thread and release the ring and socket."""
+        if self._thread is None:
+            return
+
+        logger.info("AfPacketCaptureEngine stopping …")
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+        if self._sock is not None:
+            self._admission.count_kernel_drops(read_kernel_drops(self._sock))
+        self._admission.log_summary()
+
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        logger.info("AfPacketCaptureEngine stopped")
+
+    def is_alive(self) -> bool:
+        """Return ``True`` if the capture thread is currently running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def capture_stats(self) -> dict:
+        """Return capture and loss counters (see :meth:`CaptureAdmission.stats`)."""
+        return self._admission.stats()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _open_socket(self, iface: str) -> socket.socket:
+        """Create an ``AF_PACKET`` socket with a ``TPACKET_V3`` RX ring."""
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            if self._settings.bpf_filter:
+                # Attach before the ring exists so no unfiltered frame
+                # ever reaches it.
+                from scapy.arch.linux import attach_filter
+
+                attach_filter(sock, self._settings.bpf_filter, iface)
+
+            frame_nr = (self._block_size // _FRAME_SIZE) * self._block_count
+            sock.setsockopt(SOL_PACKET, PACKET_RX_RING, _TPACKET_REQ3.pack(
+                self._block_size,
+                self._block_count,
+                _FRAME_SIZE,
+                frame_nr,
+                self._settings.afpacket_block_timeout_ms,
+                0,  # tp_sizeof_priv
+                0,  # tp_feature_req_word
+            ))
+            sock.bind((iface, ETH_P_ALL))
+            if self._fanout_group is not None:
+                join_fanout(
+                    sock,
+                    self._fanout_group,
+                    self._settings.fanout_mode,
+                    self._settings.capture_fanout,
+                )
+
+            from scapy.arch.linux import set_promisc
+            from scapy.config import conf as scapy_conf
+
+            if scapy_conf.sniff_promisc:
+                set_promisc(sock, iface)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _run(self) -> None:
+        """Ring walk loop — runs inside a dedicated thread."""
+        assert self._sock is not None and self._ring is not None
+        ring = self._ring
+        poller = select.poll()
+        poller.register(self._sock.fileno(), select.POLLIN | select.POLLERR)
+
+        block_index = 0
+        next_kernel_stats = time.monotonic() + _KERNEL_STATS_INTERVAL
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if now >= next_kernel_stats:
+                self._admission.count_kernel_drops(read_kernel_drops(self._sock))
+                next_kernel_stats = now + _KERNEL_STATS_INTERVAL
+
+            block_offset = block_index * self._block_size
+            status_offset = block_offset + _BLOCK_STATUS_OFFSET
+            (status,) = _BLOCK_STATUS.unpack_from(ring, status_offset)
+            if not status & TP_STATUS_USER:
+                poller.poll(_POLL_TIMEOUT_MS)
+                continue
+
+            frames = read_block(ring, block_offset, self._settings.snapshot_length)
+            # Hand the block back to the kernel before enqueueing.
+            _BLOCK_STATUS.pack_into(ring, status_offset, TP_STATUS_KERNEL)
+            block_index = (block_index + 1) % self._block_count
+
+            # One retired block is a natural batch: a single admission.
+            self._admission.admit(frames)
@@ -0,0 +1,232 @@
+"""
+Capture backpressure — overload policy and loss accounting.
+
+Every capture backend hands its packets to a :class:`CaptureAdmission`
+instead of calling :meth:`PacketQueue.put_many` directly.  The admission
+applies the configured overload policy when the queue cannot keep up:
+
+- ``"drop_newest"`` — enqueue what fits, drop the rest (tail drop).
+- ``"drop_oldest"`` — always enqueue, evicting the oldest queued packets.
+- ``"sample"`` — once the queue is above ``overload_threshold``, admit
+  only every N-th packet (``overload_sample_rate``).
+- ``"flow_sample"`` — once overloaded, admit only the flows whose
+  unordered address pair hashes into 1 of N buckets, so every admitted
+  conversation stays complete in both directions.
+
+Both sampling policies fall back to tail drop when even the sample does
+not fit.  Every packet is accounted for (captured, enqueued, dropped by
+cause, dropped by the kernel), and losses are reported in one summary
+log line per ``capture_log_interval`` instead of per packet.
+"""
+
+from __future__ import annotations
+
+import logging
+import socket
+import struct
+import time
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.dpi.flow_hash import shard_index, shard_key
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+    from sentinel_dpi.core.raw_frame import RawFrame
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_POLICIES = ("drop_newest", "drop_oldest", "sample", "flow_sample")
+
+# Numeric keys of :meth:`CaptureAdmission.stats`.
+CAPTURE_COUNTERS = (
+    "captured",
+    "enqueued",
+    "dropped",
+    "dropped_queue_full",
+    "evicted",
+    "sampled_out",
+    "kernel_dropped",
+)
+
+# <linux/if_packet.h>: PACKET_STATISTICS → struct tpacket_stats{,_v3};
+# tp_packets and tp_drops lead both layouts.
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+_TPACKET_STATS = struct.Struct("=II")
+
+
+def read_kernel_drops(sock: socket.socket) -> int:
+    """Return the frames the kernel dropped on *sock* since the last call.
+
+    The kernel resets its counters on every read, so the result is a
+    delta.  Returns ``0`` where the statistics are unavailable.
+    """
+    try:
+        raw = sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 12)
+    except OSError:
+        return 0
+    return _TPACKET_STATS.unpack_from(raw)[1]
+
+
+def sum_capture_stats(parts: Iterable[dict | None], policy: str) -> dict:
+    """Add up several :meth:`CaptureAdmission.stats` results (``None`` skipped)."""
+    totals = dict.fromkeys(CAPTURE_COUNTERS, 0)
+    for stats in parts:
+        if stats:
+            for key in CAPTURE_COUNTERS:
+                totals[key] += stats[key]
+    return {"policy": policy, **totals}
+
+
+class CaptureAdmission:
+    """Apply the overload policy to captured batches and count losses.
+
+    Driven by a single capture thread; :meth:`stats` may be read from
+    any thread.
+
+    Parameters:
+        packet_queue: Queue the capture backend feeds.
+        settings: Application configuration (``overload_*`` and
+                  ``capture_log_interval``).
+        name: Label used in the summary log.
+    """
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        name: str = "capture",
+    ) -> None:
+        if settings.overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {settings.overload_policy!r}")
+
+        self._packet_queue = packet_queue
+        self._policy = settings.overload_policy
+        self._rate = max(1, settings.overload_sample_rate)
+        self._name = name
+        self._log_interval = settings.capture_log_interval
+        # Queue depth from which the sampling policies engage.
+        maxsize = packet_queue.stats()["maxsize"]
+        self._threshold = (
+            max(1, int(maxsize * settings.overload_threshold)) if maxsize > 0 else 0
+        )
+
+        self._captured: int = 0
+        self._enqueued: int = 0
+        self._dropped_queue_full: int = 0
+        self._evicted: int = 0
+        self._sampled_out: int = 0
+        self._kernel_dropped: int = 0
+        self._sample_phase: int = 0
+
+        self._logged_at = time.monotonic()
+        self._logged_losses = (0, 0, 0, 0)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def admit(self, packets: Sequence[Packet | RawFrame]) -> int:
+        """Enqueue *packets* under the overload policy.
+
+        Returns:
+            Number of packets enqueued.
+        """
+        self._captured += len(packets)
+
+        if self._policy == "drop_oldest":
+            self._evicted += self._packet_queue.put_many_evicting(packets)
+            self._enqueued += len(packets)
+            self._maybe_log()
+            return len(packets)
+
+        if self._threshold and self._policy != "drop_newest" and packets:
+            if self._packet_queue.qsize() >= self._threshold:
+                sampled = self._sample(packets)
+                self._sampled_out += len(packets) - len(sampled)
+                packets = sampled
+
+        accepted = self._packet_queue.put_many(packets)
+        self._enqueued += accepted
+        self._dropped_queue_full += len(packets) - accepted
+        self._maybe_log()
+        return accepted
+
+    def count_enqueued(self, count: int) -> None:
+        """Record *count* packets a lossless producer enqueued itself."""
+        self._captured += count
+        self._enqueued += count
+
+    def count_kernel_drops(self, count: int) -> None:
+        """Record frames the kernel dropped before they reached us."""
+        if count:
+            self._kernel_dropped += count
+            self._maybe_log()
+
+    def stats(self) -> dict:
+        """Return capture and loss counters.
+
+        Returns:
+            A dictionary with the following keys:
+
+            - ``policy`` (str)
+            - ``captured`` (int) — packets handed over by the backend
+            - ``enqueued`` (int) — packets that entered the queue
+            - ``dropped`` (int) — total user-space losses, the sum of:
+            - ``dropped_queue_full`` (int) — rejected by a full queue
+            - ``evicted`` (int) — queued, then displaced (``drop_oldest``)
+            - ``sampled_out`` (int) — skipped by a sampling policy
+            - ``kernel_dropped`` (int) — lost before reaching user space
+        """
+        return {
+            "policy": self._policy,
+            "captured": self._captured,
+            "enqueued": self._enqueued,
+            "dropped": self._dropped_queue_full + self._evicted + self._sampled_out,
+            "dropped_queue_full": self._dropped_queue_full,
+            "evicted": self._evicted,
+            "sampled_out": self._sampled_out,
+            "kernel_dropped": self._kernel_dropped,
+        }
+
+    def log_summary(self) -> None:
+        """Log losses since the previous summary (if there were any)."""
+        losses = (
+            self._dropped_queue_full,
+            self._evicted,
+            self._sampled_out,
+            self._kernel_dropped,
+        )
+        now = time.monotonic()
+        delta = [cur - prev for cur, prev in zip(losses, self._logged_losses)]
+        if any(delta):
+            logger.warning(
+                "%s overloaded (policy=%s) in the last %.1fs: "
+                "%d dropped (queue full), %d evicted, %d sampled out, "
+                "%d kernel-dropped",
+                self._name,
+                self._policy,
+                now - self._logged_at,
+                *delta,
+            )
+        self._logged_at = now
+        self._logged_losses = losses
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _sample(self, packets: Sequence[Packet | RawFrame]) -> list:
+        rate = self._rate
+        if self._policy == "flow_sample":
+            return [p for p in packets if shard_index(shard_key(p, "flow"), rate) == 0]
+        # 1-in-N, continuing the phase across batches.
+        start = (-self._sample_phase) % rate
+        self._sample_phase = (self._sample_phase + len(packets)) % rate
+        return list(packets[start::rate])
+
+    def _maybe_log(self) -> None:
+        if time.monotonic() - self._logged_at >= self._log_interval:
+            self.log_summary()
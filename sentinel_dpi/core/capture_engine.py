@@ -4,17 +4,27 @@ Capture engine — live packet acquisition.
 Uses :class:`scapy.sendrecv.AsyncSniffer` for non-blocking capture with
 proper shutdown semantics on Windows.  The engine owns **no parsing
 logic**; it only places raw packets into the shared
-:class:`~sentinel_dpi.core.packet_queue.PacketQueue`.
+:class:`~sentinel_dpi.core.packet_queue.PacketQueue`, through a
+:class:`~sentinel_dpi.core.backpressure.CaptureAdmission` that applies
+the overload policy and counts losses.  (Scapy does not expose its
+capture socket, so kernel drops are only reported by the ``"afpacket"``
+backend.)
+
+Packets are enqueued in small batches; a flusher thread hands over a
+batch that reaches ``capture_batch_timeout`` while no further packet
+arrives, so a lone packet is never held until the next one.
 """
 
 from __future__ import annotations
 
 import logging
-import queue
+import threading
+import time
 from typing import TYPE_CHECKING
 
 from scapy.sendrecv import AsyncSniffer
 
+from sentinel_dpi.core.backpressure import CaptureAdmission
 from sentinel_dpi.core.packet_queue import PacketQueue
 
 if TYPE_CHECKING:
@@ -25,42 +35,66 @@ from sentinel_dpi.config.settings import Settings
 logger = logging.getLogger(__name__)
 
 
+def resolve_interface(settings: Settings) -> str:
+    """Determine which network interface to capture on.
+
+    Priority:
+        1. ``settings.interface`` if explicitly set.
+        2. Scapy's ``conf.iface`` (auto-detected default).
+    """
+    from scapy.config import conf as scapy_conf
+
+    if settings.interface:
+        logger.info(
+            "Using manually configured interface: %s",
+            settings.interface,
+        )
+        return settings.interface
+
+    default_iface = str(scapy_conf.iface)
+    logger.info("Auto-detected network interface: %s", default_iface)
+    return default_iface
+
+
 class CaptureEngine:
     """Acquire packets from a network interface and enqueue them.
 
     Parameters:
         packet_queue: Shared queue to push captured packets into.
         settings: Application configuration.
+        fallback: Retry on scapy's default interface if the configured
+                  one cannot be opened (instead of raising).
     """
 
-    def __init__(self, packet_queue: PacketQueue, settings: Settings) -> None:
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        fallback: bool = True,
+    ) -> None:
         self._packet_queue = packet_queue
         self._settings = settings
+        self._fallback = fallback
         self._sniffer: AsyncSniffer | None = None
+        self._admission = CaptureAdmission(
+            packet_queue, settings, name=f"CaptureEngine({settings.interface or 'default'})",
+        )
+
+        # Small enqueue batch — flushed by size or age (see _on_packet and
+        # _flush_idle); the lock serialises the sniffer and flusher threads.
+        self._batch: list[Packet] = []
+        self._batch_started: float = 0.0
+        self._batch_lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._stop_event = threading.Event()
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
     def _resolve_interface(self) -> str:
-        """Determine which network interface to capture on.
-
-        Priority:
-            1. ``settings.interface`` if explicitly set.
-            2. Scapy's ``conf.iface`` (auto-detected default).
-        """
-        from scapy.config import conf as scapy_conf
-
-        if self._settings.interface:
-            logger.info(
-                "Using manually configured interface: %s",
-                self._settings.interface,
-            )
-            return self._settings.interface
-
-        default_iface = str(scapy_conf.iface)
-        logger.info("Auto-detected network interface: %s", default_iface)
-        return default_iface
+        """Determine which network interface to capture on."""
+        return resolve_interface(self._settings)
 
     def start(self) -> None:
         """Begin capturing packets.
@@ -87,6 +121,9 @@ class CaptureEngine:
             self._sniffer.start()
             logger.info("CaptureEngine started on interface=%s", iface)
         except Exception:
+            if not self._fallback:
+                self._sniffer = None
+                raise
             logger.warning(
                 "Failed to capture on '%s', falling back to default interface",
                 iface,
@@ -100,6 +137,15 @@ class CaptureEngine:
             self._sniffer.start()
             logger.info("CaptureEngine started on fallback interface=%s", fallback)
 
+        if self._settings.capture_batch_size > 1 and self._settings.capture_batch_timeout > 0:
+            self._stop_event.clear()
+            self._flusher = threading.Thread(
+                target=self._flush_idle,
+                name="CaptureFlusher",
+                daemon=True,
+            )
+            self._flusher.start()
+
     def stop(self) -> None:
         """Stop capturing and wait for the sniffer thread to finish."""
         if self._sniffer is None:
@@ -114,6 +160,13 @@ class CaptureEngine:
             logger.debug("AsyncSniffer.stop() raised during shutdown", exc_info=True)
         finally:
             self._sniffer = None
+            self._stop_event.set()
+            if self._flusher is not None:
+                self._flusher.join()
+                self._flusher = None
+            with self._batch_lock:
+                self._flush()
+            self._admission.log_summary()
         logger.info("CaptureEngine stopped")
 
     def is_alive(self) -> bool:
@@ -122,13 +175,47 @@ class CaptureEngine:
             return False
         return self._sniffer.running
 
+    def capture_stats(self) -> dict:
+        """Return capture and loss counters (see :meth:`CaptureAdmission.stats`)."""
+        return self._admission.stats()
+
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
     def _on_packet(self, packet: Packet) -> None:
-        """Callback invoked by scapy for every captured packet."""
-        try:
-            self._packet_queue.put(packet, block=False)
-        except queue.Full:
-            logger.warning("PacketQueue full — dropping packet")
+        """Callback invoked by scapy for every captured packet.
+
+        Packets are buffered and handed to the queue in one
+        :meth:`PacketQueue.put_many` call once ``capture_batch_size``
+        packets have accumulated or the oldest has waited
+        ``capture_batch_timeout`` seconds (checked here and, when no
+        packet follows, by :meth:`_flush_idle`).
+        """
+        with self._batch_lock:
+            batch = self._batch
+            if not batch:
+                self._batch_started = time.monotonic()
+            batch.append(packet)
+
+            if (
+                len(batch) >= self._settings.capture_batch_size
+                or time.monotonic() - self._batch_started
+                >= self._settings.capture_batch_timeout
+            ):
+                self._flush()
+
+    def _flush_idle(self) -> None:
+        """Flush a batch that outlives ``capture_batch_timeout`` — runs in a thread."""
+        timeout = self._settings.capture_batch_timeout
+        while not self._stop_event.wait(timeout / 2):
+            with self._batch_lock:
+                if self._batch and time.monotonic() - self._batch_started >= timeout:
+                    self._flush()
+
+    def _flush(self) -> None:
+        """Enqueue the pending batch under the overload policy (lock held)."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        self._admission.admit(batch)
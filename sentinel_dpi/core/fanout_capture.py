@@ -0,0 +1,216 @@
+"""
+Fan-out capture — one ``PACKET_FANOUT`` socket per worker process.
+
+A single capture thread cannot keep up with a busy span port.  In
+fan-out mode ``capture_fanout`` worker processes each open their own
+``TPACKET_V3`` socket on the interface and join one ``PACKET_FANOUT``
+group, so the kernel splits the traffic between them.  Each worker runs
+the full pipeline on its share — ring walk, overload policy, fast
+parser, per-worker detectors and local metrics — with no hand-off
+through the main process.
+
+The coordinator in the main process merges the workers' deltas exactly
+as :class:`~sentinel_dpi.core.multiprocess_processor.MultiprocessPacketProcessor`
+does, and serves as both the capture engine and the packet processor of
+the API layer.
+
+``fanout_mode`` picks the kernel's split:
+
+- ``"source"`` (default) — by source address, so per-source detector
+  state (port scans) stays within one worker.
+- ``"hash"`` — by flow hash; a scanner's probes spread across workers.
+- ``"cpu"`` / ``"lb"`` — by receiving CPU / round robin; no locality.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+from typing import TYPE_CHECKING, Any, Callable
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.afpacket_capture import FANOUT_MODES
+from sentinel_dpi.core.backpressure import sum_capture_stats
+from sentinel_dpi.core.multiprocess_processor import (
+    DeltaCollector,
+    WorkerPipeline,
+    WorkerProcess,
+    default_worker_detectors,
+)
+from sentinel_dpi.detection.detection_manager import DetectionManager
+
+if TYPE_CHECKING:
+    from sentinel_dpi.services.alert_manager import AlertManager
+    from sentinel_dpi.services.metrics_service import MetricsService
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutCaptureEngine:
+    """Capture and process on ``capture_fanout`` worker processes.
+
+    Exposes the capture-engine lifecycle (``start`` / ``stop`` /
+    ``is_alive`` / ``capture_stats``) and the processor read API
+    (``get_traffic_feed`` / ``get_queue_stats`` / ``get_shard_stats``).
+    Linux only; workers need ``CAP_NET_RAW``.
+
+    Parameters:
+        settings: Application configuration (``capture_fanout`` workers,
+                  ``fanout_mode``).
+        metrics_service: Main-process collector that worker deltas are
+                         merged into.
+        alert_manager: Receives alerts raised in the workers.
+        detection_manager: Optional main-process detectors evaluated
+                           once per merged delta.
+        detector_factory: Picklable callable building each worker's
+                          :class:`DetectionManager` from *settings*.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        metrics_service: MetricsService,
+        alert_manager: AlertManager,
+        detection_manager: DetectionManager | None = None,
+        detector_factory: Callable[[Settings], DetectionManager] = default_worker_detectors,
+    ) -> None:
+        if settings.fanout_mode not in FANOUT_MODES:
+            raise ValueError(f"Unknown fan-out mode: {settings.fanout_mode!r}")
+
+        self._settings = settings
+        count = max(1, settings.capture_fanout)
+        # Group ids are per network namespace; the pid keeps two sensors
+        # on one host apart.
+        self._group = os.getpid() & 0xFFFF
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        self._workers = [
+            WorkerProcess(
+                i,
+                context,
+                _fanout_worker_main,
+                (i, self._group, settings, results, detector_factory),
+            )
+            for i in range(count)
+        ]
+        self._collector = DeltaCollector(
+            results, self._workers, metrics_service, alert_manager, detection_manager,
+        )
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the collector and one capture worker per socket."""
+        if self._running:
+            logger.warning("FanoutCaptureEngine.start() called while already running")
+            return
+
+        self._collector.start()
+        for worker in self._workers:
+            worker.start()
+        self._running = True
+        logger.info(
+            "FanoutCaptureEngine started: %d socket(s), mode=%s, group=%d",
+            len(self._workers),
+            self._settings.fanout_mode,
+            self._group,
+        )
+
+    def stop(self) -> None:
+        """Stop every worker, then merge their final deltas."""
+        if not self._running:
+            return
+        for worker in self._workers:
+            worker.stop()
+        self._collector.stop()
+        self._running = False
+        logger.info("FanoutCaptureEngine stopped")
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while any capture worker is running."""
+        return any(worker.is_alive() for worker in self._workers)
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+
+    def capture_stats(self) -> dict:
+        """Return capture and loss counters summed over the workers.
+
+        Same keys as :meth:`CaptureAdmission.stats` plus ``sockets``
+        (int).  Counters lag by up to ``worker_publish_interval``.
+        """
+        return {
+            **sum_capture_stats(
+                (worker.get_capture_stats() for worker in self._workers),
+                self._settings.overload_policy,
+            ),
+            "sockets": len(self._workers),
+        }
+
+    def get_traffic_feed(self) -> list[dict]:
+        """Return the most recent packets across all workers, oldest first."""
+        feed = [entry for worker in self._workers for entry in worker.get_traffic_feed()]
+        feed.sort(key=lambda entry: entry["timestamp"])
+        return feed[-self._settings.traffic_feed_size:]
+
+    def get_queue_stats(self) -> None:
+        """There is no main-process queue in fan-out mode."""
+        return None
+
+    def get_shard_stats(self) -> list[dict]:
+        """Return per-worker queue depth, throughput and capture counters."""
+        return [
+            {"shard": i, **worker.get_stats(), "capture": worker.get_capture_stats()}
+            for i, worker in enumerate(self._workers)
+        ]
+
+
+def _fanout_worker_main(
+    index: int,
+    group: int,
+    settings: Settings,
+    results: Any,
+    detector_factory: Callable[[Settings], DetectionManager],
+    stop_event: Any,
+) -> None:
+    """Worker process entry point — capture on one fan-out socket."""
+    # Shutdown is driven by the coordinator's stop event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from sentinel_dpi.core.afpacket_capture import AfPacketCaptureEngine
+    from sentinel_dpi.core.packet_queue import PacketQueue
+
+    packet_queue = PacketQueue(maxsize=settings.queue_maxsize)
+    pipeline = WorkerPipeline(index, settings, results, detector_factory, packet_queue)
+    engine = AfPacketCaptureEngine(packet_queue, settings, fanout_group=group)
+
+    def drain() -> list:
+        if stop_event.is_set() and engine.is_alive():
+            # Stop capturing first; what is queued is still processed.
+            engine.stop()
+        try:
+            return packet_queue.get_many(settings.processor_batch_size, block=False)
+        except queue.Empty:
+            return []
+
+    try:
+        engine.start()
+    except Exception:
+        logger.exception("PacketWorker-%d could not open its fan-out socket", index)
+        return
+    try:
+        pipeline.run(
+            drain,
+            stop_event,
+            settings.worker_publish_interval,
+            extra=lambda: {"capture": engine.capture_stats()},
+        )
+    finally:
+        engine.stop()
@@ -0,0 +1,91 @@
+"""
+Global detectors — one instance over the merged metrics of every shard.
+
+Detectors such as high traffic read metrics rather than packets, so a
+single instance on the merged view serves all processor shards or
+interface pipelines; one per shard would raise the same alert once per
+shard.  :class:`GlobalDetectorRunner` owns that instance's
+:class:`~sentinel_dpi.detection.detection_manager.DetectionManager`:
+a thread moves its packet clock to the newest second any shard has
+recorded and runs the ticks that are due, as the worker collector does
+in the multiprocess modes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sentinel_dpi.detection.detection_manager import DetectionManager
+    from sentinel_dpi.services.alert_manager import AlertManager
+    from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalDetectorRunner:
+    """Tick detectors that read merged metrics, in a thread of their own.
+
+    Parameters:
+        detection_manager: The global detectors.
+        metrics_service: Merged metrics they read; its newest second is
+                         their packet clock.
+        alert_manager: Receives the alerts they raise.
+        interval: Seconds (wall time) between tick rounds.
+    """
+
+    def __init__(
+        self,
+        detection_manager: DetectionManager,
+        metrics_service: MetricsService | MergedMetricsView,
+        alert_manager: AlertManager,
+        interval: float = 0.2,
+    ) -> None:
+        self._detection_manager = detection_manager
+        self._metrics_service = metrics_service
+        self._alert_manager = alert_manager
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def detection_manager(self) -> DetectionManager:
+        """The global detectors."""
+        return self._detection_manager
+
+    def start(self) -> None:
+        """Spawn the tick thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="GlobalDetectors",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread, then run a last round (call after the shards stop)."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.tick()
+
+    def tick(self) -> None:
+        """Advance the packet clock and run the detectors that are due."""
+        latest = self._metrics_service.latest_second
+        if latest is None:
+            return
+        self._detection_manager.advance(float(latest))
+        alerts = self._detection_manager.tick()
+        if alerts:
+            self._alert_manager.process(alerts)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Error running global detector ticks")
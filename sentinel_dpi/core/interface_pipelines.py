@@ -0,0 +1,149 @@
+"""
+Multi-interface capture — one pipeline per tap in a single process.
+
+A sensor often watches several taps at once.  For every configured
+:class:`~sentinel_dpi.config.settings.InterfaceConfig` the application
+builds an :class:`InterfacePipeline`: a capture engine bound to that
+interface and its BPF filter, a queue of its own, and a
+:class:`~sentinel_dpi.core.packet_processor.PacketProcessor` that stamps
+the interface label on every packet's features.  A busy tap can
+therefore only fill (and drop from) its own queue.
+
+:class:`MultiInterfaceCapture` runs the pipelines together and serves as
+both the capture engine and the packet processor of the API layer, with
+per-interface throughput and loss counters.  Detectors that read the
+merged metrics of all interfaces (high traffic) run once, on an
+optional :class:`~sentinel_dpi.core.global_detectors.GlobalDetectorRunner`.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, NamedTuple, Sequence
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.backpressure import sum_capture_stats
+
+if TYPE_CHECKING:
+    from sentinel_dpi.core.afpacket_capture import AfPacketCaptureEngine
+    from sentinel_dpi.core.capture_engine import CaptureEngine
+    from sentinel_dpi.core.global_detectors import GlobalDetectorRunner
+    from sentinel_dpi.core.packet_processor import PacketProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class InterfacePipeline(NamedTuple):
+    """Capture engine and processor sharing one interface's queue."""
+
+    label: str
+    engine: CaptureEngine | AfPacketCaptureEngine
+    processor: PacketProcessor
+
+
+class MultiInterfaceCapture:
+    """Capture and process several interfaces concurrently.
+
+    An interface that cannot be opened is logged and skipped; the
+    others keep running.
+
+    Parameters:
+        pipelines: One pipeline per interface.
+        settings: Application configuration.
+        global_detectors: Optional detectors over the merged metrics,
+                          started and stopped with the processors.
+    """
+
+    def __init__(
+        self,
+        pipelines: Sequence[InterfacePipeline],
+        settings: Settings,
+        global_detectors: GlobalDetectorRunner | None = None,
+    ) -> None:
+        self._pipelines = list(pipelines)
+        self._settings = settings
+        self._global_detectors = global_detectors
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start every processor and the global detectors, then every capture engine."""
+        for pipeline in self._pipelines:
+            pipeline.processor.start()
+        if self._global_detectors is not None:
+            self._global_detectors.start()
+        for pipeline in self._pipelines:
+            try:
+                pipeline.engine.start()
+            except Exception:
+                logger.exception("Capture on interface %s failed to start", pipeline.label)
+        logger.info(
+            "MultiInterfaceCapture started: %s",
+            [p.label for p in self._pipelines if p.engine.is_alive()],
+        )
+
+    def stop(self) -> None:
+        """Stop capturing on every interface, then every processor and the global detectors."""
+        for pipeline in self._pipelines:
+            pipeline.engine.stop()
+        for pipeline in self._pipelines:
+            pipeline.processor.stop()
+        if self._global_detectors is not None:
+            self._global_detectors.stop()
+        logger.info("MultiInterfaceCapture stopped")
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while any interface is capturing."""
+        return any(p.engine.is_alive() for p in self._pipelines)
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+
+    @property
+    def pipelines(self) -> list[InterfacePipeline]:
+        """The per-interface pipelines, in configuration order."""
+        return list(self._pipelines)
+
+    def capture_stats(self) -> dict:
+        """Return capture and loss counters, summed and per interface.
+
+        Same keys as :meth:`CaptureAdmission.stats` plus ``interfaces``:
+        one entry per interface with its ``interface`` label,
+        ``capturing`` (bool), processed ``packets_per_second`` and its
+        own capture counters.
+        """
+        interfaces = [
+            {
+                "interface": p.label,
+                "capturing": p.engine.is_alive(),
+                "packets_per_second": p.processor.get_stats()["packets_per_second"],
+                **p.engine.capture_stats(),
+            }
+            for p in self._pipelines
+        ]
+        return {
+            **sum_capture_stats(interfaces, self._settings.overload_policy),
+            "interfaces": interfaces,
+        }
+
+    def get_traffic_feed(self) -> list[dict]:
+        """Return the most recent packets across all interfaces, oldest first."""
+        feed = [
+            entry for p in self._pipelines for entry in p.processor.get_traffic_feed()
+        ]
+        feed.sort(key=lambda entry: entry["timestamp"])
+        return feed[-self._settings.traffic_feed_size:]
+
+    def get_queue_stats(self) -> None:
+        """There is no shared queue; see :meth:`get_shard_stats` per interface."""
+        return None
+
+    def get_shard_stats(self) -> list[dict]:
+        """Return per-interface queue depth and throughput."""
+        return [
+            {"shard": i, "interface": p.label, **p.processor.get_stats()}
+            for i, p in enumerate(self._pipelines)
+        ]
@@ -0,0 +1,561 @@
+"""
+Multiprocess packet processor — worker processes fed by shared memory.
+
+Extends :class:`~sentinel_dpi.core.sharded_processor.ShardedPacketProcessor`
+so that each shard is a separate process instead of a thread, taking
+parsing and detection out from under the main interpreter's GIL:
+
+- The dispatcher thread (main process) routes packets exactly as in the
+  threaded mode, but writes them as raw frames into one
+  :class:`~sentinel_dpi.core.shm_ring.ShmRing` per worker — no pickling.
+  Scapy packets are flattened to their wire bytes first.
+- Each worker process runs an ordinary
+  :class:`~sentinel_dpi.core.packet_processor.PacketProcessor` (fast
+  parser, per-worker detectors, local metrics) over its ring.
+- Every ``worker_publish_interval`` seconds a worker sends a delta —
+  metric counters, alerts, traffic feed and throughput — through a
+  :class:`multiprocessing.Queue`.  A collector thread merges the deltas
+  into the main process's :class:`MetricsService` and
+  :class:`AlertManager`, so the API layer is unchanged.
+
+Detectors that need a global view (high traffic) run in the main
+process on an optional :class:`DetectionManager`, evaluated once per
+merged delta.
+
+The worker handle, per-worker pipeline and delta collector are shared
+with :mod:`sentinel_dpi.core.fanout_capture`, whose workers read their
+own ``PACKET_FANOUT`` socket instead of a ring.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
+from sentinel_dpi.core.shm_ring import ShmRing
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorBudget
+from sentinel_dpi.detection.detection_manager import DetectionManager
+from sentinel_dpi.detection.plugins.anomaly_detector import AnomalyDetector
+from sentinel_dpi.detection.plugins.beacon_detector import BeaconDetector
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.detection.plugins.scan_sketch_detector import SketchScanDetector
+from sentinel_dpi.detection.plugins.volumetric_detector import VolumetricDetector
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+    from sentinel_dpi.services.alert_manager import AlertManager
+    from sentinel_dpi.services.metrics_service import MetricsService
+
+logger = logging.getLogger(__name__)
+
+# Worker back-off when its ring is empty.
+_IDLE_SLEEP = 0.001
+# How long stop() waits for a worker to drain and exit.
+_JOIN_TIMEOUT = 10.0
+
+
+def scan_detector(settings: Settings) -> PortScanDetector | SketchScanDetector:
+    """Build the scan detector selected by ``settings.scan_detector``."""
+    if settings.scan_detector == "sketch":
+        return SketchScanDetector(
+            port_threshold=settings.port_scan_threshold,
+            host_threshold=settings.host_sweep_threshold,
+            window_seconds=settings.port_scan_window,
+            bitmap_bits=settings.scan_sketch_bits,
+            buckets=settings.scan_sketch_buckets,
+            max_sources=settings.port_scan_max_sources,
+        )
+    if settings.scan_detector != "exact":
+        raise ValueError(f"Unknown scan detector: {settings.scan_detector!r}")
+    return PortScanDetector(
+        threshold=settings.port_scan_threshold,
+        window_seconds=settings.port_scan_window,
+        max_sources=settings.port_scan_max_sources,
+    )
+
+
+def shard_detectors(settings: Settings) -> list[BaseDetector]:
+    """Build the detectors whose state is local to one processor shard.
+
+    The scan detector, plus the volumetric, anomaly and beaconing
+    detectors when ``settings.volumetric_detector``,
+    ``settings.anomaly_detector`` and ``settings.beacon_detector`` are
+    set (their thresholds and baselines then apply to each shard's share
+    of the traffic).
+    """
+    detectors: list[BaseDetector] = [scan_detector(settings)]
+    if settings.volumetric_detector:
+        detectors.append(VolumetricDetector(
+            pps_threshold=settings.volumetric_pps_threshold,
+            bps_threshold=settings.volumetric_bps_threshold,
+            window_seconds=settings.volumetric_window,
+            width=settings.volumetric_sketch_width,
+            depth=settings.volumetric_sketch_depth,
+            buckets=settings.volumetric_sketch_buckets,
+        ))
+    if settings.anomaly_detector:
+        detectors.append(AnomalyDetector(
+            z_threshold=settings.anomaly_z_threshold,
+            alpha=settings.anomaly_alpha,
+            warmup=settings.anomaly_warmup,
+            interval_seconds=settings.anomaly_interval,
+            max_hosts=settings.anomaly_max_hosts,
+        ))
+    if settings.beacon_detector:
+        detectors.append(BeaconDetector(
+            tick_seconds=settings.beacon_tick,
+            history=settings.beacon_history,
+            min_events=settings.beacon_min_events,
+            max_jitter=settings.beacon_max_jitter,
+            max_pairs=settings.beacon_max_pairs,
+        ))
+    return detectors
+
+
+def shard_detector_names(settings: Settings) -> list[str]:
+    """Name the detectors :func:`shard_detectors` builds, without building them.
+
+    For reporting what runs where the detectors themselves are out of
+    reach (in worker processes).
+    """
+    scan = SketchScanDetector if settings.scan_detector == "sketch" else PortScanDetector
+    optional = (
+        (settings.volumetric_detector, VolumetricDetector),
+        (settings.anomaly_detector, AnomalyDetector),
+        (settings.beacon_detector, BeaconDetector),
+    )
+    return [scan.__name__, *(cls.__name__ for enabled, cls in optional if enabled)]
+
+
+def detector_budget(settings: Settings) -> DetectorBudget | None:
+    """Build the default detector budget, or ``None`` when unlimited."""
+    if settings.detector_budget_us <= 0 and settings.detector_budget_cpu <= 0:
+        return None
+    return DetectorBudget(
+        us_per_packet=settings.detector_budget_us or None,
+        cpu_share=settings.detector_budget_cpu or None,
+        window=settings.detector_budget_window,
+        max_sample_rate=settings.detector_max_sample_rate,
+    )
+
+
+def metrics_collector(settings: Settings, export_sources: bool = False) -> MetricsService:
+    """Build a :class:`MetricsService` configured by *settings*.
+
+    *export_sources* is set for worker collectors, whose deltas list
+    their new sources (see :meth:`MetricsService.take_delta`).
+    """
+    from sentinel_dpi.services.metrics_service import MetricsService
+
+    return MetricsService(
+        top_talkers_limit=settings.top_talkers_limit,
+        host_capacity=settings.metrics_host_capacity or None,
+        top_windows=settings.metrics_top_windows,
+        window_bucket=settings.metrics_window_bucket,
+        series_slots=settings.metrics_series_slots,
+        export_sources=export_sources,
+    )
+
+
+def default_worker_detectors(settings: Settings) -> DetectionManager:
+    """Build the per-worker detectors (shard-local state only)."""
+    return DetectionManager(
+        detectors=shard_detectors(settings), budget=detector_budget(settings),
+    )
+
+
+def to_raw_frame(packet: Packet | RawFrame) -> RawFrame:
+    """Return *packet* as a :class:`RawFrame` (wire bytes of scapy packets)."""
+    if type(packet) is RawFrame:
+        return packet
+    data = packet.original or bytes(packet)
+    return RawFrame(data, float(packet.time), len(data))
+
+
+class MultiprocessPacketProcessor(ShardedPacketProcessor):
+    """Route packets to worker processes through shared-memory rings.
+
+    Same lifecycle and read API as :class:`ShardedPacketProcessor`.  The
+    rings are allocated on construction and released by :meth:`stop`.
+
+    Parameters:
+        packet_queue: Shared queue filled by the capture engine.
+        settings: Application configuration (``worker_processes`` sets
+                  the number of workers).
+        metrics_service: Main-process collector that worker deltas are
+                         merged into.
+        alert_manager: Receives alerts raised in the workers.
+        detection_manager: Optional main-process detectors evaluated
+                           once per merged delta.
+        detector_factory: Picklable callable building each worker's
+                          :class:`DetectionManager` from *settings*.
+    """
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        metrics_service: MetricsService,
+        alert_manager: AlertManager,
+        detection_manager: DetectionManager | None = None,
+        detector_factory: Callable[[Settings], DetectionManager] = default_worker_detectors,
+    ) -> None:
+        count = max(1, settings.worker_processes)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        self._rings = [ShmRing(settings.shm_ring_size) for _ in range(count)]
+        workers = [
+            WorkerProcess(
+                i,
+                context,
+                _ring_worker_main,
+                (i, ring.name, settings, results, detector_factory),
+                ring=ring,
+            )
+            for i, ring in enumerate(self._rings)
+        ]
+        super().__init__(packet_queue, settings, workers, self._rings)
+
+        self._collector = DeltaCollector(
+            results, workers, metrics_service, alert_manager, detection_manager,
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the collector, the worker processes and the dispatcher."""
+        if self.is_alive():
+            logger.warning("MultiprocessPacketProcessor.start() called while already running")
+            return
+
+        self._collector.start()
+        super().start()
+
+    def stop(self) -> None:
+        """Stop dispatching, let workers drain, merge their last deltas."""
+        super().stop()
+        self._collector.stop()
+
+        for ring in self._rings:
+            ring.close()
+            ring.unlink()
+        self._rings = []
+        logger.info("MultiprocessPacketProcessor released shared memory")
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, batch: list[Packet | RawFrame]) -> None:
+        """Flatten scapy packets to raw frames, then route as usual."""
+        super()._dispatch([to_raw_frame(p) for p in batch])
+
+
+# ---------------------------------------------------------------------------
+# Shared worker machinery
+# ---------------------------------------------------------------------------
+
+class DeltaCollector:
+    """Merge worker deltas into the main-process services.
+
+    Runs a ``WorkerCollector`` thread reading the *results* queue the
+    workers publish to.
+
+    Parameters:
+        results: :class:`multiprocessing.Queue` the workers publish to.
+        workers: Worker handles, indexed by the ``worker`` field of a delta.
+        metrics_service: Receives :meth:`MetricsService.merge` of each delta.
+        alert_manager: Receives the alerts raised in the workers.
+        detection_manager: Optional main-process detectors; its tick
+                           scheduler runs after every merged delta and
+                           while no delta arrives.
+    """
+
+    def __init__(
+        self,
+        results: Any,
+        workers: list[WorkerProcess],
+        metrics_service: MetricsService,
+        alert_manager: AlertManager,
+        detection_manager: DetectionManager | None = None,
+    ) -> None:
+        self._results = results
+        self._workers = workers
+        self._metrics_service = metrics_service
+        self._alert_manager = alert_manager
+        self._detection_manager = detection_manager
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        """Spawn the collector thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="WorkerCollector",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Merge what is still queued, then stop (call after the workers exit)."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Merge worker deltas until stopped and the queue is drained."""
+        while True:
+            try:
+                message = self._results.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return
+                self.tick()
+                continue
+            try:
+                self.apply(message)
+            except Exception:
+                logger.exception("Error merging worker delta")
+
+    def apply(self, message: dict[str, Any]) -> None:
+        """Fold one worker delta into the main-process services."""
+        worker = self._workers[message["worker"]]
+        worker.update(message)
+
+        metrics = message["metrics"]
+        self._metrics_service.merge(metrics)
+        if message["alerts"]:
+            self._alert_manager.process(message["alerts"])
+
+        if self._detection_manager is not None and metrics["series"]:
+            # Global detectors read the merged metrics themselves; they
+            # only need the packet clock moved forward (to the newest
+            # second the worker published).
+            self._detection_manager.advance(float(metrics["series"][-1][0]))
+        self.tick()
+
+    def tick(self) -> None:
+        """Run the main-process detectors that are due."""
+        if self._detection_manager is None:
+            return
+        alerts = self._detection_manager.tick()
+        if alerts:
+            self._alert_manager.process(alerts)
+
+
+class WorkerProcess:
+    """Handle for one worker process (a shard of the coordinator).
+
+    Parameters:
+        index: Worker number, echoed in every delta it publishes.
+        context: :mod:`multiprocessing` context to spawn with.
+        target: Worker entry point; called with *args* plus a stop event.
+        args: Picklable leading arguments for *target*.
+        ring: The worker's input ring, if it has one (queue depth is
+              then read from the ring rather than from the last delta).
+    """
+
+    def __init__(
+        self,
+        index: int,
+        context: Any,
+        target: Callable[..., None],
+        args: tuple,
+        ring: ShmRing | None = None,
+    ) -> None:
+        self._index = index
+        self._context = context
+        self._target = target
+        self._args = args
+        self._ring = ring
+
+        self._process: Any = None
+        self._stop_event: Any = None
+        self._stats: dict = {
+            "queue_depth": 0,
+            "packets_processed": 0,
+            "packets_per_second": 0.0,
+            "detectors": [],
+        }
+        self._feed: list[dict] = []
+        self._capture: dict | None = None
+
+    def start(self) -> None:
+        self._stop_event = self._context.Event()
+        self._process = self._context.Process(
+            target=self._target,
+            args=(*self._args, self._stop_event),
+            name=f"PacketWorker-{self._index}",
+            daemon=True,
+        )
+        self._process.start()
+        logger.info("PacketWorker-%d started (pid=%d)", self._index, self._process.pid)
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._stop_event.set()
+        self._process.join(_JOIN_TIMEOUT)
+        if self._process.is_alive():
+            logger.warning("PacketWorker-%d did not exit — terminating", self._index)
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def update(self, message: dict[str, Any]) -> None:
+        """Keep the latest stats, feed and capture counters of a delta."""
+        self._stats = message["stats"]
+        self._feed = message["feed"]
+        self._capture = message.get("capture")
+
+    def get_stats(self) -> dict:
+        if self._ring is not None:
+            depth = self._ring.depth() if self._process is not None else 0
+        else:
+            depth = self._stats["queue_depth"]
+        return {
+            "queue_depth": depth,
+            "packets_processed": self._stats["packets_processed"],
+            "packets_per_second": self._stats["packets_per_second"],
+            "detectors": self._stats["detectors"],
+        }
+
+    def get_capture_stats(self) -> dict | None:
+        """Capture counters from the last delta (fan-out workers only)."""
+        return self._capture
+
+    def get_traffic_feed(self) -> list[dict]:
+        return list(self._feed)
+
+
+class _AlertBuffer:
+    """Stands in for :class:`AlertManager` inside a worker."""
+
+    def __init__(self) -> None:
+        self._alerts: list[dict] = []
+
+    def process(self, alerts: list[dict]) -> None:
+        self._alerts.extend(alerts)
+
+    def take(self) -> list[dict]:
+        alerts, self._alerts = self._alerts, []
+        return alerts
+
+
+class WorkerPipeline:
+    """Everything a worker process runs: parser, detectors, local metrics.
+
+    Parameters:
+        index: Worker number.
+        settings: Application configuration.
+        results: Queue deltas are published to.
+        detector_factory: Builds the worker's :class:`DetectionManager`.
+        packet_queue: Local queue the worker drains, if any.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        settings: Settings,
+        results: Any,
+        detector_factory: Callable[[Settings], DetectionManager],
+        packet_queue: PacketQueue | None = None,
+    ) -> None:
+        from sentinel_dpi.core.packet_processor import PacketProcessor
+        from sentinel_dpi.dpi.batch_parser import BatchParser
+        from sentinel_dpi.dpi.fast_parser import FastPacketParser
+
+        self._index = index
+        self._results = results
+        self._metrics = metrics_collector(settings, export_sources=True)
+        self._alerts = _AlertBuffer()
+        self.processor = PacketProcessor(
+            packet_queue=packet_queue if packet_queue is not None else PacketQueue(),
+            settings=settings,
+            parser=FastPacketParser(),
+            detection_manager=detector_factory(settings),
+            metrics_service=self._metrics,
+            alert_manager=self._alerts,  # type: ignore[arg-type]
+            batch_parser=BatchParser() if settings.columnar_batches else None,
+            name=f"PacketWorker-{index}",
+        )
+
+    def publish(self, **extra: Any) -> None:
+        """Send the delta accumulated since the previous call."""
+        self._results.put({
+            "worker": self._index,
+            "metrics": self._metrics.take_delta(),
+            "alerts": self._alerts.take(),
+            "feed": self.processor.get_traffic_feed(),
+            "stats": self.processor.get_stats(),
+            **extra,
+        })
+
+    def run(
+        self,
+        drain: Callable[[], list[RawFrame]],
+        stop_event: Any,
+        interval: float,
+        extra: Callable[[], dict] = dict,
+    ) -> None:
+        """Process whatever *drain* returns and publish every *interval* seconds.
+
+        Returns once *stop_event* is set and *drain* comes back empty,
+        after publishing a final delta.
+        """
+        next_publish = time.monotonic() + interval
+        while True:
+            frames = drain()
+            if frames:
+                self.processor.process_batch(frames)
+            elif stop_event.is_set():
+                break
+            else:
+                self.processor.tick()
+                time.sleep(_IDLE_SLEEP)
+
+            now = time.monotonic()
+            if now >= next_publish:
+                self.publish(**extra())
+                next_publish = now + interval
+        self.publish(**extra())
+
+
+def _ring_worker_main(
+    index: int,
+    ring_name: str,
+    settings: Settings,
+    results: Any,
+    detector_factory: Callable[[Settings], DetectionManager],
+    stop_event: Any,
+) -> None:
+    """Worker process entry point — drain the ring, publish deltas."""
+    # Shutdown is driven by the coordinator's stop event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    ring = ShmRing.attach(ring_name)
+    pipeline = WorkerPipeline(index, settings, results, detector_factory)
+    try:
+        pipeline.run(
+            lambda: ring.get_many(settings.processor_batch_size),
+            stop_event,
+            settings.worker_publish_interval,
+        )
+    finally:
+        ring.close()
@@ -6,11 +6,19 @@ Runs in its own thread, pulls raw packets from the shared
 parsing to the injected :class:`~sentinel_dpi.dpi.parser.PacketParser`.
 
 When a :class:`~sentinel_dpi.detection.DetectionManager` is provided,
-parsed features are forwarded to the detection layer after parsing.
+the features of each drained batch are forwarded to the detection
+layer in one ``analyze_batch`` call once the batch is parsed, and the
+manager's tick scheduler runs after every batch and whenever the queue
+stays empty for ``processor_timeout``.
 When a :class:`~sentinel_dpi.services.MetricsService` is provided,
 parsed features are recorded for real-time statistics.
 When a :class:`~sentinel_dpi.services.AlertManager` is provided,
 detection alerts are forwarded for storage and deduplication.
+When a :class:`~sentinel_dpi.dpi.batch_parser.BatchParser` is provided,
+raw frames in each drained batch are decoded into columns and fed to
+the columnar entry points of the metrics and detection layers; frames
+it cannot decode (and scapy packets) follow the per-packet path after
+the columnar rows of the same batch.
 """
 
 from __future__ import annotations
@@ -18,15 +26,21 @@ from __future__ import annotations
 import logging
 import queue
 import threading
+import time
 from collections import deque
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Sequence
 
 from sentinel_dpi.config.settings import Settings
 from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.feature_schema import format_address
 
 if TYPE_CHECKING:
     from scapy.packet import Packet
     from sentinel_dpi.detection.detection_manager import DetectionManager
+    from sentinel_dpi.dpi.batch_parser import BatchParser
+    from sentinel_dpi.dpi.feature_schema import PacketFeatures
+    from sentinel_dpi.dpi.fast_parser import FastPacketParser
     from sentinel_dpi.dpi.parser import PacketParser
     from sentinel_dpi.services.alert_manager import AlertManager
     from sentinel_dpi.services.metrics_service import MetricsService
@@ -40,20 +54,29 @@ class PacketProcessor:
     Parameters:
         packet_queue: Shared queue to pull packets from.
         settings: Application configuration.
-        parser: Parser instance used to extract features from packets.
+        parser: Parser instance used to extract features from packets
+                (``PacketParser`` or ``FastPacketParser``).
         detection_manager: Optional detection layer to forward features to.
         metrics_service: Optional metrics collector for traffic statistics.
         alert_manager: Optional alert handler for storage and deduplication.
+        batch_parser: Optional vectorised parser for raw-frame batches.
+        name: Thread name (distinguishes shards of a
+              :class:`~sentinel_dpi.core.sharded_processor.ShardedPacketProcessor`).
+        interface: Label of the capture interface feeding the queue,
+                   stamped on every packet's features.
     """
 
     def __init__(
         self,
         packet_queue: PacketQueue,
         settings: Settings,
-        parser: PacketParser,
+        parser: PacketParser | FastPacketParser,
         detection_manager: DetectionManager | None = None,
         metrics_service: MetricsService | None = None,
         alert_manager: AlertManager | None = None,
+        batch_parser: BatchParser | None = None,
+        name: str = "PacketProcessor",
+        interface: str | None = None,
     ) -> None:
         self._packet_queue = packet_queue
         self._settings = settings
@@ -61,11 +84,22 @@ class PacketProcessor:
         self._detection_manager = detection_manager
         self._metrics_service = metrics_service
         self._alert_manager = alert_manager
+        self._interface = interface
+        self._batch_parser = batch_parser
+        self._name = name
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
 
+        # Throughput accounting — the rate is refreshed on read, at most
+        # once per second.
+        self._packets_processed: int = 0
+        self._rate_mark: tuple[float, int] = (time.monotonic(), 0)
+        self._rate: float = 0.0
+
         # Live traffic feed — bounded ring buffer of recent packets.
-        self._traffic_feed: deque[dict] = deque(
+        # Holds the feature records themselves; the API dictionaries are
+        # only built when the feed is read.
+        self._traffic_feed: deque[PacketFeatures] = deque(
             maxlen=settings.traffic_feed_size,
         )
         self._feed_lock = threading.Lock()
@@ -83,11 +117,11 @@ class PacketProcessor:
         self._stop_event.clear()
         self._thread = threading.Thread(
             target=self._run,
-            name="PacketProcessor",
+            name=self._name,
             daemon=False,
         )
         self._thread.start()
-        logger.info("PacketProcessor started")
+        logger.info("%s started", self._name)
 
     def stop(self) -> None:
         """Signal the processor to stop and wait for the thread to exit."""
@@ -95,7 +129,7 @@ class PacketProcessor:
         if self._thread is not None:
             self._thread.join()
             self._thread = None
-        logger.info("PacketProcessor stopped")
+        logger.info("%s stopped", self._name)
 
     def is_alive(self) -> bool:
         """Return ``True`` if the processor thread is currently running."""
@@ -104,41 +138,166 @@ class PacketProcessor:
     def get_traffic_feed(self) -> list[dict]:
         """Return the last N processed packets (thread-safe)."""
         with self._feed_lock:
-            return list(self._traffic_feed)
+            recent = list(self._traffic_feed)
+        return [
+            {
+                "src_ip": format_address(features.src_ip),
+                "dst_ip": format_address(features.dst_ip),
+                "protocol": features.protocol,
+                "timestamp": features.timestamp,
+                "interface": features.interface,
+            }
+            for features in recent
+        ]
+
+    def get_queue_stats(self) -> dict:
+        """Return depth and batch-size statistics of the input queue."""
+        return self._packet_queue.stats()
+
+    def get_stats(self) -> dict:
+        """Return queue depth and throughput of this processor.
+
+        Returns:
+            A dictionary with the following keys:
+
+            - ``queue_depth`` (int)
+            - ``packets_processed`` (int)
+            - ``packets_per_second`` (float) — averaged over the interval
+              since the previous refresh (at least one second)
+            - ``detectors`` (list[dict]) — :meth:`DetectionManager.stats`
+        """
+        processed = self._packets_processed
+        now = time.monotonic()
+        mark_time, mark_count = self._rate_mark
+        if now - mark_time >= 1.0:
+            self._rate = (processed - mark_count) / (now - mark_time)
+            self._rate_mark = (now, processed)
+        return {
+            "queue_depth": self._packet_queue.qsize(),
+            "packets_processed": processed,
+            "packets_per_second": self._rate,
+            "detectors": (
+                self._detection_manager.stats() if self._detection_manager else []
+            ),
+        }
+
+    def get_shard_stats(self) -> list[dict]:
+        """Return :meth:`get_stats` for each worker — here a single one."""
+        return [self.get_stats()]
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
+
     def _run(self) -> None:
         """Main loop — runs inside a dedicated thread."""
-        logger.info("PacketProcessor thread running")
+        logger.info("%s thread running", self._name)
 
         while not self._stop_event.is_set():
             try:
-                packet: Packet = self._packet_queue.get(
+                batch: list[Packet] = self._packet_queue.get_many(
+                    self._settings.processor_batch_size,
                     block=True,
                     timeout=self._settings.processor_timeout,
                 )
             except queue.Empty:
+                self.tick()
                 continue
+            self.process_batch(batch)
+
+    def process_batch(self, batch: list[Packet | RawFrame]) -> None:
+        """Run *batch* through parsing, metrics and detection.
+
+        Called by the processor thread for every drained batch; also
+        usable directly by a caller that owns its own input loop.
+        """
+        if self._batch_parser is not None:
+            self._process_columnar(batch)
+        else:
+            self._process_packets(batch)
+        self._packets_processed += len(batch)
+        self.tick()
 
+    def tick(self) -> None:
+        """Run the detectors that are due on the detection manager's scheduler.
+
+        Called after every batch and while idle; callers with their own
+        input loop should call it when they have nothing to process.
+        """
+        if self._detection_manager is None:
+            return
+        try:
+            alerts = self._detection_manager.tick()
+        except Exception:
+            logger.exception("Error running detector ticks")
+            return
+        if alerts and self._alert_manager is not None:
+            self._alert_manager.process(alerts)
+
+    def _process_packets(self, packets: Sequence[Packet | RawFrame]) -> None:
+        """Parse and record *packets* one by one, then detect on the batch."""
+        parsed: list[PacketFeatures] = []
+        for packet in packets:
             try:
                 features = self._parser.parse(packet)
+                if self._interface is not None:
+                    features.interface = self._interface
+                if self._metrics_service is not None:
+                    self._metrics_service.update(features)
+            except Exception:
+                logger.exception("Error processing packet")
+                continue
+            parsed.append(features)
+
+        if not parsed:
+            return
+        with self._feed_lock:
+            self._traffic_feed.extend(parsed)
+        if self._detection_manager is not None:
+            try:
+                alerts = self._detection_manager.analyze_batch(parsed)
+            except Exception:
+                logger.exception("Error analysing packet batch")
+                return
+            if alerts and self._alert_manager is not None:
+                self._alert_manager.process(alerts)
+
+    def _process_columnar(self, batch: list[Packet | RawFrame]) -> None:
+        """Decode raw frames as one columnar batch; the rest per packet."""
+        from sentinel_dpi.dpi.batch_parser import iter_features
+
+        assert self._batch_parser is not None
+        frames = [p for p in batch if type(p) is RawFrame]
+        leftovers = [p for p in batch if type(p) is not RawFrame]
 
-                # Record in traffic feed ring buffer.
-                with self._feed_lock:
-                    self._traffic_feed.append({
-                        "src_ip": features["src_ip"] or "unknown",
-                        "dst_ip": features["dst_ip"] or "unknown",
-                        "protocol": features["protocol"],
-                        "timestamp": features["timestamp"],
-                    })
+        try:
+            columns, fallback = self._batch_parser.parse_batch(frames)
+            leftovers.extend(frames[i] for i in fallback.tolist())
 
+            if len(columns):
+                self._record_feed(
+                    iter_features(columns[-self._settings.traffic_feed_size:]),
+                )
                 if self._metrics_service is not None:
-                    self._metrics_service.update(features)
+                    self._metrics_service.update_columns(columns, self._interface)
                 if self._detection_manager is not None:
-                    alerts = self._detection_manager.analyze(features)
+                    alerts = self._detection_manager.analyze_columns(columns)
                     if alerts and self._alert_manager is not None:
                         self._alert_manager.process(alerts)
-            except Exception:
-                logger.exception("Error processing packet")
+        except Exception:
+            logger.exception("Error processing packet batch")
+
+        if leftovers:
+            self._process_packets(leftovers)
+
+    def _record_feed(self, features_seq: Iterable[PacketFeatures]) -> None:
+        """Append processed packets to the traffic feed ring buffer."""
+        interface = self._interface
+        with self._feed_lock:
+            if interface is None:
+                self._traffic_feed.extend(features_seq)
+                return
+            for features in features_seq:
+                features.interface = interface
+                self._traffic_feed.append(features)
+
@@ -1,16 +1,21 @@
 """
 Thread-safe packet queue.
 
-Thin wrapper around :class:`queue.Queue` that type-hints its contents
-as scapy packets and exposes only the methods the rest of the system
-needs.  No business logic lives here.
+Bounded FIFO with the same blocking semantics as :class:`queue.Queue`
+(raising :class:`queue.Full` / :class:`queue.Empty`), plus batch
+operations that move many items per lock acquisition.  Items are
+scapy packets (or undissected
+:class:`~sentinel_dpi.core.raw_frame.RawFrame` tuples from raw capture
+backends).  No business logic lives here.
 """
 
 from __future__ import annotations
 
 import logging
 import queue
-from typing import TYPE_CHECKING
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Iterable
 
 if TYPE_CHECKING:
     from scapy.packet import Packet
@@ -27,7 +32,22 @@ class PacketQueue:
     """
 
     def __init__(self, maxsize: int = 0) -> None:
-        self._queue: queue.Queue[Packet] = queue.Queue(maxsize=maxsize)
+        self._maxsize = maxsize
+        self._items: deque[Packet] = deque()
+
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+        # Statistics (guarded by ``_mutex``).
+        self._enqueued: int = 0
+        self._dequeued: int = 0
+        self._evicted: int = 0
+        self._high_watermark: int = 0
+        self._put_batches: int = 0
+        self._get_batches: int = 0
+        self._get_batch_items: int = 0
+        self._max_get_batch: int = 0
 
     # ------------------------------------------------------------------
     # Public API
@@ -45,7 +65,79 @@ class PacketQueue:
             queue.Full: If the queue is full and *block* is ``False``
                         (or *timeout* expires).
         """
-        self._queue.put(packet, block=block, timeout=timeout)
+        with self._not_full:
+            if self._maxsize > 0 and len(self._items) >= self._maxsize:
+                if not block or not self._wait(self._not_full, self._has_space, timeout):
+                    raise queue.Full
+            self._items.append(packet)
+            self._record_put(1)
+            self._not_empty.notify()
+
+    def put_many(
+        self,
+        packets: Iterable[Packet],
+        block: bool = False,
+        timeout: float | None = None,
+    ) -> int:
+        """Enqueue several packets under a single lock acquisition.
+
+        Unlike :meth:`put` this never raises :class:`queue.Full`: items
+        that do not fit are left to the caller.  With *block* set the
+        call waits (up to *timeout*) for space to free up; otherwise it
+        stops at the first item that does not fit.
+
+        Returns:
+            Number of leading items from *packets* that were enqueued.
+        """
+        packets = list(packets)
+        accepted = 0
+        with self._not_full:
+            while accepted < len(packets):
+                space = (
+                    self._maxsize - len(self._items)
+                    if self._maxsize > 0
+                    else len(packets)
+                )
+                if space <= 0:
+                    if not block or not self._wait(self._not_full, self._has_space, timeout):
+                        break
+                    continue
+                chunk = packets[accepted:accepted + space]
+                self._items.extend(chunk)
+                accepted += len(chunk)
+                self._not_empty.notify(len(chunk))
+
+            if accepted:
+                self._record_put(accepted)
+                self._put_batches += 1
+        return accepted
+
+    def put_many_evicting(self, packets: Iterable[Packet]) -> int:
+        """Enqueue every packet, discarding the oldest items to make room.
+
+        Never blocks.  If *packets* alone exceeds ``maxsize`` only its
+        newest ``maxsize`` items remain queued.
+
+        Returns:
+            Number of items discarded to stay within ``maxsize``.
+        """
+        packets = list(packets)
+        if not packets:
+            return 0
+        with self._not_empty:
+            items = self._items
+            items.extend(packets)
+            evicted = 0
+            if self._maxsize > 0 and len(items) > self._maxsize:
+                evicted = len(items) - self._maxsize
+                popleft = items.popleft
+                for _ in range(evicted):
+                    popleft()
+                self._evicted += evicted
+            self._record_put(len(packets))
+            self._put_batches += 1
+            self._not_empty.notify(len(packets))
+        return evicted
 
     def get(
         self,
@@ -58,7 +150,45 @@ class PacketQueue:
             queue.Empty: If the queue is empty and *block* is ``False``
                          (or *timeout* expires).
         """
-        return self._queue.get(block=block, timeout=timeout)
+        with self._not_empty:
+            if not self._items:
+                if not block or not self._wait(self._not_empty, self._has_items, timeout):
+                    raise queue.Empty
+            packet = self._items.popleft()
+            self._dequeued += 1
+            self._not_full.notify()
+            return packet
+
+    def get_many(
+        self,
+        max_items: int,
+        block: bool = True,
+        timeout: float | None = None,
+    ) -> list[Packet]:
+        """Dequeue up to *max_items* packets under a single lock acquisition.
+
+        Waits (like :meth:`get`) until at least one packet is available,
+        then drains whatever is queued, capped at *max_items*.
+
+        Raises:
+            queue.Empty: If the queue is empty and *block* is ``False``
+                         (or *timeout* expires).
+        """
+        with self._not_empty:
+            if not self._items:
+                if not block or not self._wait(self._not_empty, self._has_items, timeout):
+                    raise queue.Empty
+            count = min(max_items, len(self._items))
+            popleft = self._items.popleft
+            batch = [popleft() for _ in range(count)]
+
+            self._dequeued += count
+            self._get_batches += 1
+            self._get_batch_items += count
+            if count > self._max_get_batch:
+                self._max_get_batch = count
+            self._not_full.notify(count)
+            return batch
 
     def empty(self) -> bool:
         """Return ``True`` if the queue is empty at the time of the call.
@@ -66,8 +196,70 @@ class PacketQueue:
         .. note:: This is only a snapshot — the result may be stale by
            the time you act on it.
         """
-        return self._queue.empty()
+        with self._mutex:
+            return not self._items
 
     def qsize(self) -> int:
         """Return the approximate number of items in the queue."""
-        return self._queue.qsize()
+        with self._mutex:
+            return len(self._items)
+
+    def stats(self) -> dict:
+        """Return depth and batching statistics (thread-safe).
+
+        Returns:
+            A dictionary with the following keys:
+
+            - ``depth`` (int) — items currently queued
+            - ``maxsize`` (int)
+            - ``high_watermark`` (int) — deepest the queue has been
+            - ``enqueued`` / ``dequeued`` (int) — lifetime totals
+            - ``evicted`` (int) — items discarded by
+              :meth:`put_many_evicting`
+            - ``put_batches`` / ``get_batches`` (int) — batch calls
+            - ``avg_get_batch`` (float) — mean items per ``get_many``
+            - ``max_get_batch`` (int)
+        """
+        with self._mutex:
+            return {
+                "depth": len(self._items),
+                "maxsize": self._maxsize,
+                "high_watermark": self._high_watermark,
+                "enqueued": self._enqueued,
+                "dequeued": self._dequeued,
+                "evicted": self._evicted,
+                "put_batches": self._put_batches,
+                "get_batches": self._get_batches,
+                "avg_get_batch": (
+                    self._get_batch_items / self._get_batches
+                    if self._get_batches
+                    else 0.0
+                ),
+                "max_get_batch": self._max_get_batch,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal (lock must already be held by caller)
+    # ------------------------------------------------------------------
+
+    def _has_items(self) -> bool:
+        return bool(self._items)
+
+    def _has_space(self) -> bool:
+        return len(self._items) < self._maxsize
+
+    def _record_put(self, count: int) -> None:
+        self._enqueued += count
+        if len(self._items) > self._high_watermark:
+            self._high_watermark = len(self._items)
+
+    @staticmethod
+    def _wait(
+        condition: threading.Condition,
+        predicate: Callable[[], bool],
+        timeout: float | None,
+    ) -> bool:
+        """Wait on *condition* until *predicate* holds or *timeout* expires."""
+        if timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        return condition.wait_for(predicate, timeout)
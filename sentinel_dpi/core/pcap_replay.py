@@ -0,0 +1,263 @@
+"""
+Offline replay source — feeds a pcap/pcapng file into the packet queue.
+
+Drop-in alternative to :class:`~sentinel_dpi.core.capture_engine.CaptureEngine`
+for load-testing the processing pipeline without a live interface.
+Packets keep their original capture timestamps, so detector behaviour is
+reproducible from run to run.
+
+Pacing is controlled by a single *speed* factor:
+
+- ``speed <= 0`` — as fast as possible (no sleeping between packets).
+- ``speed == 1`` — preserve the original inter-arrival timing.
+- ``speed == N`` — replay N× faster than the original capture.
+
+With ``replay_raw`` enabled, Ethernet records are enqueued undissected
+as :class:`~sentinel_dpi.core.raw_frame.RawFrame` tuples — the same
+shape the AF_PACKET backend produces — so the fast and batch parsers
+are exercised.  Other link types are still dissected by scapy.
+
+Without ``replay_block`` a full queue is handled by the configured
+overload policy, exactly as for live capture.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator
+
+from scapy.utils import PcapReader, RawPcapReader
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.backpressure import CaptureAdmission
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+
+logger = logging.getLogger(__name__)
+
+_DLT_EN10MB = 1
+
+
+class PcapReplayEngine:
+    """Read packets from a capture file and enqueue them.
+
+    Exposes the same lifecycle API as ``CaptureEngine`` (``start`` /
+    ``stop`` / ``is_alive``) so it can be wired in its place.  The
+    replay thread exits on its own once the file is exhausted and
+    :meth:`stats` then reports the achieved rate and drop count.
+
+    Parameters:
+        packet_queue: Shared queue to push replayed packets into.
+        settings: Application configuration.
+        path: Capture file to replay.  Defaults to ``settings.replay_file``.
+        speed: Pacing factor (see module docstring).  Defaults to
+               ``settings.replay_speed``.
+    """
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        path: str | None = None,
+        speed: float | None = None,
+    ) -> None:
+        self._packet_queue = packet_queue
+        self._settings = settings
+        self._path = path if path is not None else settings.replay_file
+        self._speed = speed if speed is not None else settings.replay_speed
+        self._block = settings.replay_block
+        self._raw = settings.replay_raw
+
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._packets_read: int = 0
+        self._admission = CaptureAdmission(packet_queue, settings, name="PcapReplayEngine")
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Spawn the replay thread."""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("PcapReplayEngine.start() called while already running")
+            return
+        if not self._path:
+            raise ValueError("No capture file configured for replay")
+
+        self._stop_event.clear()
+        self._packets_read = 0
+        self._admission = CaptureAdmission(
+            self._packet_queue, self._settings, name="PcapReplayEngine",
+        )
+        self._started_at = None
+        self._finished_at = None
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="PcapReplay",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "PcapReplayEngine started: file=%s speed=%s",
+            self._path,
+            self._speed if self._speed > 0 else "max",
+        )
+
+    def stop(self) -> None:
+        """Abort the replay (if still running) and wait for the thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info("PcapReplayEngine stopped")
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the replay thread is still feeding packets."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the replay finishes.
+
+        Returns:
+            ``True`` if the replay is complete, ``False`` on timeout.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_alive()
+
+    def stats(self) -> dict:
+        """Return replay counters and the achieved packet rate.
+
+        Returns:
+            A dictionary with the following keys:
+
+            - ``packets_read`` (int)
+            - ``packets_enqueued`` (int)
+            - ``packets_dropped`` (int)
+            - ``elapsed_seconds`` (float)
+            - ``achieved_pps`` (float)
+            - ``finished`` (bool)
+        """
+        elapsed = 0.0
+        if self._started_at is not None:
+            end = self._finished_at if self._finished_at is not None else time.perf_counter()
+            elapsed = end - self._started_at
+
+        admission = self._admission.stats()
+        return {
+            "packets_read": self._packets_read,
+            "packets_enqueued": admission["enqueued"],
+            "packets_dropped": admission["dropped"],
+            "elapsed_seconds": elapsed,
+            "achieved_pps": self._packets_read / elapsed if elapsed > 0 else 0.0,
+            "finished": self._finished_at is not None,
+        }
+
+    def capture_stats(self) -> dict:
+        """Return capture and loss counters (see :meth:`CaptureAdmission.stats`)."""
+        return self._admission.stats()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        """Replay loop — runs inside a dedicated thread."""
+        self._started_at = time.perf_counter()
+        try:
+            if self._raw:
+                self._replay(_iter_raw(self._path))
+            else:
+                with PcapReader(self._path) as reader:
+                    self._replay((pkt, float(pkt.time)) for pkt in reader)
+        except Exception:
+            logger.exception("Replay of '%s' failed", self._path)
+        finally:
+            self._finished_at = time.perf_counter()
+            self._admission.log_summary()
+
+        stats = self.stats()
+        logger.info(
+            "Replay finished: read=%d enqueued=%d dropped=%d "
+            "elapsed=%.3fs achieved_pps=%.1f",
+            stats["packets_read"],
+            stats["packets_enqueued"],
+            stats["packets_dropped"],
+            stats["elapsed_seconds"],
+            stats["achieved_pps"],
+        )
+
+    def _replay(self, records: Iterator[tuple[Packet | RawFrame, float]]) -> None:
+        """Pace and enqueue every ``(packet, timestamp)`` in *records*."""
+        paced = self._speed > 0
+        first_ts: float | None = None
+        wall_start = 0.0
+
+        for packet, pkt_ts in records:
+            if self._stop_event.is_set():
+                return
+
+            if paced:
+                if first_ts is None:
+                    first_ts = pkt_ts
+                    wall_start = time.perf_counter()
+                delay = (
+                    wall_start + (pkt_ts - first_ts) / self._speed
+                    - time.perf_counter()
+                )
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+
+            self._packets_read += 1
+            self._enqueue(packet)
+
+    def _enqueue(self, packet: Packet | RawFrame) -> None:
+        """Push one packet, waiting for space or applying the overload policy."""
+        if not self._block:
+            self._admission.admit((packet,))
+            return
+        # Lossless mode: wait for space but stay responsive to stop().
+        while not self._stop_event.is_set():
+            try:
+                self._packet_queue.put(packet, timeout=0.1)
+            except queue.Full:
+                continue
+            self._admission.count_enqueued(1)
+            return
+
+
+def _iter_raw(path: str) -> Iterator[tuple[Packet | RawFrame, float]]:
+    """Yield undissected records from a pcap/pcapng file.
+
+    Ethernet records become :class:`RawFrame`; records of any other link
+    type are dissected by scapy.
+    """
+    from scapy.config import conf as scapy_conf
+
+    with RawPcapReader(path) as reader:
+        nano = getattr(reader, "nano", False)
+        for data, meta in reader:
+            if hasattr(meta, "tsresol"):  # pcapng
+                timestamp = ((meta.tshigh << 32) | meta.tslow) / meta.tsresol
+                linktype = meta.linktype
+            else:
+                timestamp = meta.sec + meta.usec / (1e9 if nano else 1e6)
+                linktype = reader.linktype
+
+            if linktype == _DLT_EN10MB:
+                yield RawFrame(data, timestamp, meta.wirelen), timestamp
+            else:
+                packet = scapy_conf.l2types.num2layer[linktype](data)
+                packet.time = timestamp
+                yield packet, timestamp
@@ -0,0 +1,28 @@
+"""
+Raw frame container for capture backends that bypass scapy.
+
+High-rate backends hand the processor undissected link-layer bytes
+instead of scapy :class:`~scapy.packet.Packet` objects.  Dissection is
+deferred to the parser so no per-packet object graph is built on the
+capture thread.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class RawFrame(NamedTuple):
+    """One captured Ethernet frame.
+
+    Attributes:
+        data: Captured bytes, starting at the Ethernet header.  May be
+              shorter than the frame on the wire when truncated to the
+              snapshot length.
+        timestamp: Kernel receive time (seconds since the epoch).
+        wire_length: Original frame length on the wire.
+    """
+
+    data: bytes
+    timestamp: float
+    wire_length: int
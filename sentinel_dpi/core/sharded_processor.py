@@ -0,0 +1,200 @@
+"""
+Sharded packet processor — N worker pipelines behind one dispatcher.
+
+A dispatcher thread drains the shared capture queue, computes a routing
+key per packet (see :mod:`sentinel_dpi.dpi.flow_hash`) and hands each
+packet to one of N :class:`~sentinel_dpi.core.packet_processor.PacketProcessor`
+shards through that shard's own queue.  Each shard owns its parser,
+detectors and metrics collector, so per-source detector state (port-scan
+tracking) never has to be shared; the metrics layer is merged on read by
+:class:`~sentinel_dpi.services.metrics_service.MergedMetricsView`.
+
+Packets with the same key always reach the same shard and shard queues
+are FIFO, so ordering is preserved per source (or per conversation in
+``"flow"`` mode).  A full shard queue drops the packet and counts it,
+matching the capture engines' behaviour on a full input queue.
+
+Detectors that read the merged metrics (high traffic) run once, beside
+the shards, on an optional
+:class:`~sentinel_dpi.core.global_detectors.GlobalDetectorRunner`.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Sequence
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.dpi.flow_hash import SHARD_KEYS, shard_index, shard_key
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+    from sentinel_dpi.core.global_detectors import GlobalDetectorRunner
+    from sentinel_dpi.core.packet_processor import PacketProcessor
+    from sentinel_dpi.core.raw_frame import RawFrame
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedPacketProcessor:
+    """Route packets from one queue to several processor shards.
+
+    Exposes the same lifecycle and read API as
+    :class:`~sentinel_dpi.core.packet_processor.PacketProcessor`
+    (``start`` / ``stop`` / ``is_alive`` / ``get_traffic_feed`` /
+    ``get_queue_stats`` / ``get_shard_stats``), so it can be wired in
+    its place.
+
+    Parameters:
+        packet_queue: Shared queue filled by the capture engine.
+        settings: Application configuration.
+        shards: One processor per worker, each reading its own queue.
+        shard_queues: The queue each shard in *shards* consumes.
+        global_detectors: Optional detectors over the merged metrics,
+                          started and stopped with the shards.
+    """
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        shards: Sequence[PacketProcessor],
+        shard_queues: Sequence[PacketQueue],
+        global_detectors: GlobalDetectorRunner | None = None,
+    ) -> None:
+        if not shards or len(shards) != len(shard_queues):
+            raise ValueError("Need one queue per shard and at least one shard")
+        if settings.shard_key not in SHARD_KEYS:
+            raise ValueError(f"Unknown shard key: {settings.shard_key!r}")
+
+        self._packet_queue = packet_queue
+        self._settings = settings
+        self._shards = list(shards)
+        self._shard_queues = list(shard_queues)
+        self._key_mode = settings.shard_key
+        self._global_detectors = global_detectors
+
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._dispatched = [0] * len(self._shards)
+        self._dropped = [0] * len(self._shards)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start every shard and the global detectors, then the dispatcher thread."""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("ShardedPacketProcessor.start() called while already running")
+            return
+
+        for shard in self._shards:
+            shard.start()
+        if self._global_detectors is not None:
+            self._global_detectors.start()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="ShardDispatcher",
+            daemon=False,
+        )
+        self._thread.start()
+        logger.info(
+            "ShardedPacketProcessor started: %d shard(s), key=%s",
+            len(self._shards),
+            self._key_mode,
+        )
+
+    def stop(self) -> None:
+        """Stop the dispatcher, then every shard, then the global detectors."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for shard in self._shards:
+            shard.stop()
+        if self._global_detectors is not None:
+            self._global_detectors.stop()
+        logger.info("ShardedPacketProcessor stopped")
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the dispatcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+
+    @property
+    def shards(self) -> list[PacketProcessor]:
+        """The worker processors, in shard order."""
+        return list(self._shards)
+
+    def get_traffic_feed(self) -> list[dict]:
+        """Return the most recent packets across all shards, oldest first."""
+        feed = [entry for shard in self._shards for entry in shard.get_traffic_feed()]
+        feed.sort(key=lambda entry: entry["timestamp"])
+        return feed[-self._settings.traffic_feed_size:]
+
+    def get_queue_stats(self) -> dict:
+        """Return depth and batch-size statistics of the dispatcher's input queue."""
+        return self._packet_queue.stats()
+
+    def get_shard_stats(self) -> list[dict]:
+        """Return per-shard queue depth, throughput and routing counters.
+
+        Each entry extends :meth:`PacketProcessor.get_stats` with
+        ``shard`` (int), ``packets_dispatched`` (int) and
+        ``packets_dropped`` (int — shard queue full).
+        """
+        return [
+            {
+                "shard": i,
+                **shard.get_stats(),
+                "packets_dispatched": self._dispatched[i],
+                "packets_dropped": self._dropped[i],
+            }
+            for i, shard in enumerate(self._shards)
+        ]
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        """Dispatch loop — runs inside a dedicated thread."""
+        while not self._stop_event.is_set():
+            try:
+                batch = self._packet_queue.get_many(
+                    self._settings.processor_batch_size,
+                    block=True,
+                    timeout=self._settings.processor_timeout,
+                )
+            except queue.Empty:
+                continue
+            try:
+                self._dispatch(batch)
+            except Exception:
+                logger.exception("Error dispatching packet batch")
+
+    def _dispatch(self, batch: list[Packet | RawFrame]) -> None:
+        """Split *batch* by shard and enqueue each part with one call."""
+        count = len(self._shards)
+        mode = self._key_mode
+        parts: list[list[Packet | RawFrame]] = [[] for _ in range(count)]
+        for packet in batch:
+            parts[shard_index(shard_key(packet, mode), count)].append(packet)
+
+        for i, part in enumerate(parts):
+            if not part:
+                continue
+            accepted = self._shard_queues[i].put_many(part)
+            self._dispatched[i] += accepted
+            if accepted < len(part):
+                self._dropped[i] += len(part) - accepted
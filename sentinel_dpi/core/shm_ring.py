@@ -0,0 +1,194 @@
+"""
+Single-producer / single-consumer frame ring in shared memory.
+
+Moves :class:`~sentinel_dpi.core.raw_frame.RawFrame` records between
+processes through a :class:`multiprocessing.shared_memory.SharedMemory`
+segment — frame bytes are copied once into the ring and once out of it,
+with no pickling and no per-frame system call.
+
+Layout (native byte order)::
+
+    0     head      u64  bytes written (monotonic)
+    8     written   u64  records written
+    16    capacity  u64  size of the data area
+    64    tail      u64  bytes consumed (monotonic)
+    72    read      u64  records consumed
+    128   data[capacity]
+
+Each record is a 16-byte header (``length`` u32, ``wire_length`` u32,
+``timestamp`` f64) followed by the frame bytes, padded to 8 bytes.  A
+record never straddles the end of the data area: the producer writes a
+wrap marker (or leaves a gap too short to hold a header) and continues
+at offset 0.
+
+The producer only advances ``head`` / ``written`` and the consumer only
+``tail`` / ``read``; each index is published after the payload it
+covers, and batches publish once.  Both sides must therefore each be a
+single thread.
+"""
+
+from __future__ import annotations
+
+import struct
+from multiprocessing import shared_memory
+from typing import Sequence
+
+from sentinel_dpi.core.raw_frame import RawFrame
+
+_U64 = struct.Struct("=Q")
+_RECORD = struct.Struct("=IId")
+
+_HEAD = 0
+_WRITTEN = 8
+_CAPACITY = 16
+_TAIL = 64
+_READ = 72
+_DATA = 128
+
+_WRAP = 0xFFFFFFFF
+_ALIGN = 8
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) & ~(_ALIGN - 1)
+
+
+class ShmRing:
+    """Bounded frame ring backed by a named shared-memory segment.
+
+    Create the ring in one process and :meth:`attach` to it by name in
+    the other.  The creator is responsible for :meth:`unlink`.
+
+    Parameters:
+        capacity: Size of the data area in bytes (rounded up to 8).
+        name: Attach to an existing segment instead of creating one.
+    """
+
+    def __init__(self, capacity: int = 0, name: str | None = None) -> None:
+        if name is None:
+            capacity = _aligned(capacity)
+            if capacity < 2 * _RECORD.size:
+                raise ValueError("Ring capacity too small")
+            self._shm = shared_memory.SharedMemory(create=True, size=_DATA + capacity)
+            self._shm.buf[:_DATA] = bytes(_DATA)
+            _U64.pack_into(self._shm.buf, _CAPACITY, capacity)
+        else:
+            # The segment may be page-rounded; trust the header.
+            self._shm = shared_memory.SharedMemory(name=name)
+            capacity = _U64.unpack_from(self._shm.buf, _CAPACITY)[0]
+        self._capacity = capacity
+        self._buf = self._shm.buf
+
+    @classmethod
+    def attach(cls, name: str) -> ShmRing:
+        """Open the ring created elsewhere under *name*."""
+        return cls(name=name)
+
+    @property
+    def name(self) -> str:
+        """Segment name to pass to :meth:`attach`."""
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        """Size of the data area in bytes."""
+        return self._capacity
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def put_many(self, frames: Sequence[RawFrame]) -> int:
+        """Copy as many of *frames* as fit into the ring.
+
+        Returns:
+            Number of frames written (a prefix of *frames*).
+        """
+        buf = self._buf
+        capacity = self._capacity
+        head = _U64.unpack_from(buf, _HEAD)[0]
+        tail = _U64.unpack_from(buf, _TAIL)[0]
+
+        written = 0
+        for data, timestamp, wire_length in frames:
+            length = len(data)
+            size = _aligned(_RECORD.size + length)
+            pos = head % capacity
+            pad = capacity - pos if capacity - pos < size else 0
+            if (head + pad + size) - tail > capacity:
+                break
+            if pad:
+                if pad >= _RECORD.size:
+                    _RECORD.pack_into(buf, _DATA + pos, _WRAP, 0, 0.0)
+                head += pad
+                pos = 0
+            start = _DATA + pos
+            _RECORD.pack_into(buf, start, length, wire_length, timestamp)
+            buf[start + _RECORD.size:start + _RECORD.size + length] = data
+            head += size
+            written += 1
+
+        if written:
+            count = _U64.unpack_from(buf, _WRITTEN)[0]
+            _U64.pack_into(buf, _WRITTEN, count + written)
+            _U64.pack_into(buf, _HEAD, head)
+        return written
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def get_many(self, max_items: int) -> list[RawFrame]:
+        """Remove up to *max_items* frames (copied out of the ring)."""
+        buf = self._buf
+        capacity = self._capacity
+        head = _U64.unpack_from(buf, _HEAD)[0]
+        tail = _U64.unpack_from(buf, _TAIL)[0]
+
+        frames: list[RawFrame] = []
+        while tail < head and len(frames) < max_items:
+            pos = tail % capacity
+            if capacity - pos < _RECORD.size:
+                # Too short for a marker: an implicit wrap.
+                tail += capacity - pos
+                continue
+            length, wire_length, timestamp = _RECORD.unpack_from(buf, _DATA + pos)
+            if length == _WRAP:
+                tail += capacity - pos
+                continue
+            start = _DATA + pos + _RECORD.size
+            frames.append(RawFrame(bytes(buf[start:start + length]), timestamp, wire_length))
+            tail += _aligned(_RECORD.size + length)
+
+        if frames or tail != _U64.unpack_from(buf, _TAIL)[0]:
+            count = _U64.unpack_from(buf, _READ)[0]
+            _U64.pack_into(buf, _READ, count + len(frames))
+            _U64.pack_into(buf, _TAIL, tail)
+        return frames
+
+    # ------------------------------------------------------------------
+    # Introspection / lifecycle
+    # ------------------------------------------------------------------
+
+    def depth(self) -> int:
+        """Frames currently queued (approximate while both sides run)."""
+        return (
+            _U64.unpack_from(self._buf, _WRITTEN)[0]
+            - _U64.unpack_from(self._buf, _READ)[0]
+        )
+
+    def bytes_used(self) -> int:
+        """Bytes of the data area currently occupied."""
+        return (
+            _U64.unpack_from(self._buf, _HEAD)[0]
+            - _U64.unpack_from(self._buf, _TAIL)[0]
+        )
+
+    def close(self) -> None:
+        """Detach from the segment in this process."""
+        self._buf = None  # type: ignore[assignment]
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the segment (creator only, after every side closed)."""
+        self._shm.unlink()
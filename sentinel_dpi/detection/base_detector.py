@@ -4,14 +4,84 @@ Abstract base class for all detection plugins.
 Every detector must subclass :class:`BaseDetector` and implement the
 :meth:`analyze` method.  The detection manager iterates through
 registered detectors and delegates feature analysis to each one.
+
+A detector narrows the packets it is handed by declaring a
+:class:`DetectorInterest`; the manager builds its dispatch table from
+these declarations so irrelevant packets never reach the detector.
+
+Detectors that evaluate aggregate state, or need periodic expiry, set
+:attr:`BaseDetector.tick_interval`; the manager's scheduler then calls
+:meth:`BaseDetector.on_tick` every that many seconds.
+
+A :class:`DetectorBudget` caps the time a detector may take; the
+manager samples it down, then disables it, when it overruns.
 """
 
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Sequence
 
 from sentinel_dpi.dpi.feature_schema import PacketFeatures
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class DetectorInterest:
+    """Which packets a detector wants to see.
+
+    Every condition must hold for a packet to be dispatched; the
+    default is interested in everything.
+
+    Attributes:
+        protocols: Protocol names (``PacketFeatures.protocol``) to
+                   receive; ``None`` for all.
+        requires: Feature fields that must not be ``None``
+                  (e.g. ``("src_ip", "dst_port")``).
+        ports: Receive only packets whose source or destination port
+               is in this set; ``None`` for any.
+        sample_rate: Receive every N-th packet that passes the other
+                     conditions.
+        per_packet: ``False`` for detectors that only evaluate
+                    aggregate state; they are never fed packets and
+                    run from :meth:`BaseDetector.on_tick` instead.
+    """
+
+    protocols: frozenset[str] | None = None
+    requires: tuple[str, ...] = ()
+    ports: frozenset[int] | None = None
+    sample_rate: int = 1
+    per_packet: bool = True
+
+
+@dataclass(frozen=True)
+class DetectorBudget:
+    """Execution budget of a detector, enforced by the manager.
+
+    Usage is measured over *window* seconds.  A detector over budget has
+    its sampling rate doubled (tick-only detectors: its tick interval),
+    up to *max_sample_rate*, and is disabled beyond that.  A sampled
+    detector using less than half its budget is sampled up again.
+
+    Attributes:
+        us_per_packet: Mean microseconds the detector may spend per
+                       packet handled by the manager; ``None`` for no
+                       limit.
+        cpu_share: Fraction of wall time (0–1) the detector may spend;
+                   ``None`` for no limit.
+        window: Measurement window in seconds.
+        max_sample_rate: Largest sampling factor before the detector is
+                         disabled.
+    """
+
+    us_per_packet: float | None = None
+    cpu_share: float | None = None
+    window: float = 10.0
+    max_sample_rate: int = 64
+
 
 class BaseDetector(ABC):
     """Contract that every detection plugin must satisfy.
@@ -19,8 +89,18 @@ class BaseDetector(ABC):
     Implementations may maintain internal state (e.g. sliding-window
     counters) but must **not** perform logging or produce side effects
     beyond returning alerts.
+
+    Subclasses override :attr:`interest` to declare the packets they
+    need; :meth:`analyze` is then only called for matching packets.
+    Subclasses set :attr:`tick_interval` (seconds; ``None`` for never)
+    to have :meth:`on_tick` called periodically, and :attr:`budget` to
+    override the manager's default :class:`DetectorBudget`.
     """
 
+    interest: DetectorInterest = DetectorInterest()
+    tick_interval: float | None = None
+    budget: DetectorBudget | None = None
+
     @abstractmethod
     def analyze(self, features: PacketFeatures) -> list[dict] | None:
         """Inspect *features* and return alerts, if any.
@@ -29,3 +109,49 @@ class BaseDetector(ABC):
             A list of alert dictionaries when suspicious activity is
             detected, or ``None`` (/ empty list) otherwise.
         """
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Inspect a batch of packets, oldest first.
+
+        Optional hook for detectors that can update their state once
+        per batch instead of once per packet.  The default
+        implementation delegates to :meth:`analyze` for each packet.
+
+        Returns:
+            Alerts raised anywhere in the batch, or ``None``.
+        """
+        alerts: list[dict] = []
+        for features in features_batch:
+            result = self.analyze(features)
+            if result:
+                alerts.extend(result)
+        return alerts or None
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict] | None:
+        """Inspect a columnar batch produced by :class:`BatchParser`.
+
+        Optional hook for vectorised detectors.  The default
+        implementation converts the rows to :class:`PacketFeatures` and
+        delegates to :meth:`analyze_batch`.
+
+        Returns:
+            Alerts raised anywhere in the batch, or ``None``.
+        """
+        from sentinel_dpi.dpi.batch_parser import iter_features
+
+        return self.analyze_batch(list(iter_features(columns)))
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Evaluate aggregate state and expire old entries.
+
+        Called by the manager's scheduler every :attr:`tick_interval`
+        seconds of packet time, off the per-packet path.  The default
+        implementation does nothing.
+
+        Parameters:
+            now: Current time on the packet clock (epoch seconds).
+
+        Returns:
+            Alerts raised by the evaluation, or ``None``.
+        """
+        return None
@@ -4,35 +4,515 @@ Detection manager — orchestrates all registered detectors.
 Receives a list of :class:`BaseDetector` instances via dependency
 injection and delegates :meth:`analyze` to each one, aggregating the
 results into a flat list of alert dictionaries.
+
+Packets are dispatched from a table built out of each detector's
+:class:`~sentinel_dpi.detection.base_detector.DetectorInterest`: per
+protocol, the manager keeps only the detectors that want it, then checks
+the remaining conditions (required fields, ports, sampling).  Per
+detector it counts the packets delivered and skipped and the alerts
+raised.
+
+:meth:`DetectionManager.tick` is the scheduler for detectors with a
+``tick_interval``: the owner of the manager (the processor loop, a
+worker process, the delta collector) calls it regularly — also when
+idle — and each detector's :meth:`~BaseDetector.on_tick` runs once it is
+due.  Time is measured on a packet clock: the newest packet timestamp
+seen, advanced by the wall time elapsed since, so replayed captures
+tick at their own pace and idle periods still expire state.  The
+runtime of every tick is recorded per detector.
+
+Every detector call is timed: the manager keeps each detector's
+cumulative time and a window of recent per-packet latencies for
+percentiles.  With a :class:`~sentinel_dpi.detection.base_detector.DetectorBudget`
+(the detector's own, or the manager's default) a detector that overruns
+is sampled down, then disabled, and a ``DETECTOR_BUDGET`` system alert
+is raised for each step.
 """
 
 from __future__ import annotations
 
-from sentinel_dpi.detection.base_detector import BaseDetector
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, NamedTuple, Sequence
+
+import numpy as np
+
+from sentinel_dpi.detection.base_detector import (
+    BaseDetector,
+    DetectorBudget,
+    DetectorInterest,
+)
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP, PROTOCOL_NAMES
 from sentinel_dpi.dpi.feature_schema import PacketFeatures
 
+if TYPE_CHECKING:
+    from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Per-packet latency samples kept per detector for percentiles.
+_LATENCY_SAMPLES = 1024
+
+
+class _Route(NamedTuple):
+    """One detector's entry in a protocol's dispatch list."""
+
+    index: int
+    detector: BaseDetector
+    requires: tuple[str, ...]
+    ports: frozenset[int] | None
+    sample_rate: int
+    protocols: frozenset[str] | None
+
 
 class DetectionManager:
     """Fan-out analyser that delegates to pluggable detectors.
 
     Parameters:
-        detectors: Ordered sequence of detector plugins to invoke on
-                   every packet's feature set.
+        detectors: Ordered sequence of detector plugins; each receives
+                   the packets its ``interest`` declares.
+        budget: Default execution budget for detectors that do not
+                declare their own; ``None`` enforces none.
     """
 
-    def __init__(self, detectors: list[BaseDetector]) -> None:
+    def __init__(
+        self,
+        detectors: list[BaseDetector],
+        budget: DetectorBudget | None = None,
+    ) -> None:
         self._detectors = list(detectors)
+        self._routes = [
+            _Route(
+                i,
+                d,
+                d.interest.requires,
+                d.interest.ports,
+                max(1, d.interest.sample_rate),
+                d.interest.protocols,
+            )
+            for i, d in enumerate(self._detectors)
+            if d.interest.per_packet
+        ]
+        # protocol -> routes interested in it, filled on first sight.
+        self._dispatch: dict[str, tuple[_Route, ...]] = {}
+
+        self._packets: int = 0
+        self._invocations = [0] * len(self._detectors)
+        self._matched = [0] * len(self._detectors)
+        self._alerts = [0] * len(self._detectors)
+
+        # Scheduler — indices of ticked detectors and when each is due.
+        self._tickers = [
+            i for i, d in enumerate(self._detectors) if d.tick_interval is not None
+        ]
+        self._next_due: list[float | None] = [None] * len(self._detectors)
+        self._ticks = [0] * len(self._detectors)
+        self._tick_last = [0.0] * len(self._detectors)
+        self._tick_max = [0.0] * len(self._detectors)
+        self._tick_total = [0.0] * len(self._detectors)
+
+        # Packet clock — newest timestamp seen, and the timestamp and
+        # monotonic time of the last clock reading.
+        self._latest: float | None = None
+        self._clock_mark: tuple[float, float] | None = None
+
+        # Accounting — seconds spent in each detector (packets and
+        # ticks) and recent per-packet latencies in microseconds.
+        self._busy = [0.0] * len(self._detectors)
+        self._latency: list[deque[float]] = [
+            deque(maxlen=_LATENCY_SAMPLES) for _ in self._detectors
+        ]
+
+        # Budgets — per detector, its sampling factor (0 once disabled)
+        # and the packet count, busy time and monotonic time at the
+        # start of the current measurement window.
+        self._budgets = [d.budget or budget for d in self._detectors]
+        self._factor = [1] * len(self._detectors)
+        self._window_mark = [
+            (0, 0.0, time.monotonic()) for _ in self._detectors
+        ]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def detectors(self) -> list[BaseDetector]:
+        """The registered detectors, in invocation order."""
+        return list(self._detectors)
 
     def analyze(self, features: PacketFeatures) -> list[dict]:
-        """Run *features* through every registered detector.
+        """Run *features* through every interested detector.
 
         Returns:
             Aggregated list of alert dicts from all detectors.
             Empty list when nothing is detected.
         """
+        self._packets += 1
+        self.advance(features.timestamp)
+        routes = self._dispatch.get(features.protocol)
+        if routes is None:
+            routes = self._route(features.protocol)
+
         alerts: list[dict] = []
-        for detector in self._detectors:
+        for index, detector, requires, ports, rate, _ in routes:
+            factor = self._factor[index]
+            if not factor:
+                continue
+            if requires and _missing(features, requires):
+                continue
+            if ports is not None and (
+                features.dst_port not in ports and features.src_port not in ports
+            ):
+                continue
+            rate *= factor
+            if rate > 1:
+                self._matched[index] += 1
+                if (self._matched[index] - 1) % rate:
+                    continue
+            self._invocations[index] += 1
+            start = time.perf_counter()
             result = detector.analyze(features)
+            elapsed = time.perf_counter() - start
+            self._busy[index] += elapsed
+            self._latency[index].append(elapsed * 1e6)
+            if result:
+                self._alerts[index] += len(result)
+                alerts.extend(result)
+        return alerts
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict]:
+        """Run a batch of packets through every interested detector.
+
+        Each detector receives the packets its interest selects in one
+        :meth:`BaseDetector.analyze_batch` call.
+
+        Returns:
+            Aggregated list of alert dicts from all detectors.
+        """
+        self._packets += len(features_batch)
+        if features_batch:
+            self.advance(features_batch[-1].timestamp)
+        alerts: list[dict] = []
+        for index, detector, requires, ports, rate, protocols in self._routes:
+            factor = self._factor[index]
+            if not factor:
+                continue
+            rate *= factor
+            selected = [
+                f for f in features_batch
+                if (protocols is None or f.protocol in protocols)
+                and not (requires and _missing(f, requires))
+                and (ports is None or f.dst_port in ports or f.src_port in ports)
+            ]
+            if rate > 1:
+                start = (-self._matched[index]) % rate
+                self._matched[index] += len(selected)
+                selected = selected[start::rate]
+            if not selected:
+                continue
+            self._invocations[index] += len(selected)
+            start = time.perf_counter()
+            result = detector.analyze_batch(selected)
+            self._account(index, time.perf_counter() - start, len(selected))
+            if result:
+                self._alerts[index] += len(result)
+                alerts.extend(result)
+        return alerts
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict]:
+        """Run a columnar batch through every interested detector.
+
+        Each detector receives only the rows its interest selects.
+
+        Returns:
+            Aggregated list of alert dicts from all detectors.
+        """
+        self._packets += len(columns)
+        if len(columns):
+            self.advance(float(columns["timestamp"][-1]))
+        alerts: list[dict] = []
+        for index, detector, _, _, rate, _ in self._routes:
+            factor = self._factor[index]
+            if not factor:
+                continue
+            rate *= factor
+            rows = np.flatnonzero(_column_mask(detector.interest, columns))
+            if rate > 1:
+                start = (-self._matched[index]) % rate
+                self._matched[index] += len(rows)
+                rows = rows[start::rate]
+            if len(rows) == 0:
+                continue
+            self._invocations[index] += len(rows)
+            start = time.perf_counter()
+            result = detector.analyze_columns(
+                columns if len(rows) == len(columns) else columns[rows],
+            )
+            self._account(index, time.perf_counter() - start, len(rows))
+            if result:
+                self._alerts[index] += len(result)
+                alerts.extend(result)
+        return alerts
+
+    def advance(self, timestamp: float) -> None:
+        """Move the packet clock to *timestamp* if it is newer.
+
+        The ``analyze*`` methods call this themselves; owners that only
+        tick (e.g. main-process detectors fed by worker deltas) call it
+        with the newest timestamp they know of.
+        """
+        if self._latest is None or timestamp > self._latest:
+            self._latest = timestamp
+
+    def clock(self) -> float | None:
+        """Return the current packet-clock time, or ``None`` before any packet."""
+        latest = self._latest
+        if latest is None:
+            return None
+        mono = time.monotonic()
+        mark = self._clock_mark
+        if mark is None or mark[0] != latest:
+            self._clock_mark = (latest, mono)
+            return latest
+        return latest + (mono - mark[1])
+
+    def tick(self, now: float | None = None) -> list[dict]:
+        """Run the :meth:`~BaseDetector.on_tick` of every detector that is due.
+
+        Cheap when nothing is due, so it can be called after every
+        batch.  A detector that raises is logged and rescheduled; the
+        others still run.  Budgets are enforced here too, once per
+        budget window.
+
+        Parameters:
+            now: Time to tick at; defaults to :meth:`clock`.  Nothing
+                 runs before the clock has seen a packet.
+
+        Returns:
+            Aggregated list of alert dicts raised by the ticks, and
+            ``DETECTOR_BUDGET`` system alerts.
+        """
+        if now is None:
+            now = self.clock()
+            if now is None:
+                return []
+
+        alerts: list[dict] = []
+        for index in self._tickers:
+            factor = self._factor[index]
+            if not factor:
+                continue
+            due = self._next_due[index]
+            if due is not None and now < due:
+                continue
+            detector = self._detectors[index]
+            self._next_due[index] = now + detector.tick_interval * factor
+            start = time.perf_counter()
+            try:
+                result = detector.on_tick(now)
+            except Exception:
+                logger.exception("%s.on_tick failed", type(detector).__name__)
+                result = None
+            elapsed = time.perf_counter() - start
+
+            self._ticks[index] += 1
+            self._busy[index] += elapsed
+            self._tick_last[index] = elapsed
+            self._tick_total[index] += elapsed
+            if elapsed > self._tick_max[index]:
+                self._tick_max[index] = elapsed
             if result:
+                self._alerts[index] += len(result)
                 alerts.extend(result)
+
+        mono = time.monotonic()
+        for index, budget in enumerate(self._budgets):
+            if (
+                budget is not None
+                and self._factor[index]
+                and mono - self._window_mark[index][2] >= budget.window
+            ):
+                alert = self._enforce(index, budget, now, mono)
+                if alert is not None:
+                    alerts.append(alert)
         return alerts
+
+    def stats(self) -> list[dict]:
+        """Return per-detector dispatch, timing and tick counters.
+
+        Returns:
+            One dictionary per detector with the following keys:
+
+            - ``detector`` (str) — class name
+            - ``per_packet`` (bool)
+            - ``invocations`` (int) — packets delivered to the detector
+            - ``skipped`` (int) — packets filtered out by its interest
+            - ``alerts`` (int) — alerts it raised
+            - ``tick_interval`` (float | None) — seconds between ticks
+            - ``ticks`` (int) — :meth:`~BaseDetector.on_tick` calls
+            - ``tick_last_ms`` / ``tick_max_ms`` / ``tick_total_ms``
+              (float) — runtime of the latest, slowest and all ticks
+            - ``time_total_ms`` (float) — all time spent in the
+              detector, packets and ticks
+            - ``us_per_packet`` (float) — ``time_total_ms`` per packet
+              handled by the manager, in microseconds
+            - ``latency_p50_us`` / ``latency_p95_us`` / ``latency_p99_us``
+              (float) — per-packet latency percentiles over the most
+              recent calls
+            - ``sample_factor`` (int) — budget sampling factor, ``1``
+              when unthrottled
+            - ``disabled`` (bool) — disabled by its budget
+        """
+        stats: list[dict] = []
+        for i, detector in enumerate(self._detectors):
+            p50, p95, p99 = _percentiles(self._latency[i], (0.50, 0.95, 0.99))
+            stats.append({
+                "detector": type(detector).__name__,
+                "per_packet": detector.interest.per_packet,
+                "invocations": self._invocations[i],
+                "skipped": self._packets - self._invocations[i],
+                "alerts": self._alerts[i],
+                "tick_interval": detector.tick_interval,
+                "ticks": self._ticks[i],
+                "tick_last_ms": self._tick_last[i] * 1e3,
+                "tick_max_ms": self._tick_max[i] * 1e3,
+                "tick_total_ms": self._tick_total[i] * 1e3,
+                "time_total_ms": self._busy[i] * 1e3,
+                "us_per_packet": (
+                    self._busy[i] / self._packets * 1e6 if self._packets else 0.0
+                ),
+                "latency_p50_us": p50,
+                "latency_p95_us": p95,
+                "latency_p99_us": p99,
+                "sample_factor": max(1, self._factor[i]),
+                "disabled": self._factor[i] == 0,
+            })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _account(self, index: int, elapsed: float, packets: int) -> None:
+        """Record a call of *elapsed* seconds covering *packets* packets."""
+        self._busy[index] += elapsed
+        self._latency[index].append(elapsed / packets * 1e6)
+
+    def _enforce(
+        self, index: int, budget: DetectorBudget, now: float, mono: float,
+    ) -> dict | None:
+        """Close *index*'s budget window; throttle it if it overran.
+
+        Returns:
+            A ``DETECTOR_BUDGET`` alert when the detector was sampled
+            down or disabled, else ``None``.
+        """
+        packets_mark, busy_mark, mono_mark = self._window_mark[index]
+        self._window_mark[index] = (self._packets, self._busy[index], mono)
+        busy = self._busy[index] - busy_mark
+        packets = self._packets - packets_mark
+        us_per_packet = busy / packets * 1e6 if packets else 0.0
+        cpu_share = busy / (mono - mono_mark)
+
+        limits = [
+            (used, limit)
+            for used, limit in (
+                (us_per_packet, budget.us_per_packet),
+                (cpu_share, budget.cpu_share),
+            )
+            if limit is not None
+        ]
+        factor = self._factor[index]
+        name = type(self._detectors[index]).__name__
+        if not any(used > limit for used, limit in limits):
+            if factor > 1 and all(used < limit / 2 for used, limit in limits):
+                self._factor[index] = factor // 2
+                logger.info("%s back within budget — sample factor %d", name, factor // 2)
+            return None
+
+        if factor * 2 <= budget.max_sample_rate:
+            self._factor[index] = factor * 2
+            action = "sampled"
+            logger.warning(
+                "%s over budget (%.1f us/packet, %.1f%% CPU) — sample factor %d",
+                name, us_per_packet, cpu_share * 100, factor * 2,
+            )
+        else:
+            self._factor[index] = 0
+            action = "disabled"
+            logger.warning(
+                "%s over budget (%.1f us/packet, %.1f%% CPU) — disabled",
+                name, us_per_packet, cpu_share * 100,
+            )
+        return {
+            "type": "DETECTOR_BUDGET",
+            "detector": name,
+            "action": action,
+            "sample_factor": self._factor[index],
+            "us_per_packet": us_per_packet,
+            "cpu_share": cpu_share,
+            "timestamp": now,
+        }
+
+    def _route(self, protocol: str) -> tuple[_Route, ...]:
+        """Build (and cache) the dispatch list for *protocol*."""
+        routes = tuple(
+            route for route in self._routes
+            if route.protocols is None or protocol in route.protocols
+        )
+        self._dispatch[protocol] = routes
+        return routes
+
+
+def _missing(features: PacketFeatures, fields: tuple[str, ...]) -> bool:
+    """Return ``True`` if any of *fields* is ``None`` in *features*."""
+    for name in fields:
+        if getattr(features, name) is None:
+            return True
+    return False
+
+
+def _percentiles(samples: Sequence[float], quantiles: Sequence[float]) -> list[float]:
+    """Return the nearest-rank *quantiles* of *samples* (``0.0`` if empty)."""
+    if not samples:
+        return [0.0] * len(quantiles)
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return [ordered[min(last, int(q * len(ordered)))] for q in quantiles]
+
+
+def _has_ports(columns: np.ndarray) -> np.ndarray:
+    protocol = columns["protocol"]
+    return (protocol == PROTO_TCP) | (protocol == PROTO_UDP)
+
+
+# Presence of a feature field in a columnar batch (rows where
+# :func:`iter_features` would yield a non-``None`` value).
+_COLUMN_PRESENCE: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "src_ip": lambda columns: columns["has_ip"],
+    "dst_ip": lambda columns: columns["has_ip"],
+    "src_port": _has_ports,
+    "dst_port": _has_ports,
+}
+
+
+def _column_mask(interest: DetectorInterest, columns: np.ndarray) -> np.ndarray:
+    """Return a boolean mask of the rows *interest* selects."""
+    mask = np.ones(len(columns), dtype=bool)
+    if interest.protocols is not None:
+        codes = [i for i, name in enumerate(PROTOCOL_NAMES) if name in interest.protocols]
+        mask &= np.isin(columns["protocol"], codes)
+    for name in interest.requires:
+        if name in _COLUMN_PRESENCE:
+            mask &= _COLUMN_PRESENCE[name](columns)
+        elif name not in columns.dtype.names:
+            # Not carried by columnar batches, so always None.
+            mask[:] = False
+    if interest.ports is not None:
+        ports = list(interest.ports)
+        mask &= _has_ports(columns) & (
+            np.isin(columns["dst_port"], ports) | np.isin(columns["src_port"], ports)
+        )
+    return mask
@@ -1,6 +1,17 @@
 """Detection plugins — concrete detector implementations."""
 
+from sentinel_dpi.detection.plugins.anomaly_detector import AnomalyDetector
+from sentinel_dpi.detection.plugins.beacon_detector import BeaconDetector
 from sentinel_dpi.detection.plugins.high_traffic_detector import HighTrafficDetector
 from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.detection.plugins.scan_sketch_detector import SketchScanDetector
+from sentinel_dpi.detection.plugins.volumetric_detector import VolumetricDetector
 
-__all__ = ["HighTrafficDetector", "PortScanDetector"]
+__all__ = [
+    "AnomalyDetector",
+    "BeaconDetector",
+    "HighTrafficDetector",
+    "PortScanDetector",
+    "SketchScanDetector",
+    "VolumetricDetector",
+]
@@ -0,0 +1,322 @@
+"""
+Per-host statistical anomaly detection plugin.
+
+Learns a baseline of each source host's behaviour — packets per second,
+bytes per second, distinct peers and distinct destination ports per
+interval — as an exponentially weighted mean and variance, and raises
+an alert when an interval's value lies more than *z_threshold* standard
+deviations above the host's baseline.
+
+State lives in preallocated NumPy arrays indexed by a slot table
+(``{address: slot}``), so a host costs a few dozen bytes and no Python
+object of its own.  Packets only accumulate into the current interval's
+counters; every *interval_seconds* the manager's tick scores all hosts
+in one vectorised pass, folds the interval into the baselines and
+resets the counters.  Distinct peers and ports are estimated per
+interval with 64-bit linear-counting bitmaps, which are exact for small
+counts and saturate around 250.
+
+Hosts silent for *idle_ticks* intervals release their slot; when
+*max_hosts* slots are in use, new hosts are ignored until one frees.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+import numpy as np
+
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorInterest
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_str
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_ONE = np.uint64(1)
+
+METRICS: tuple[str, ...] = ("pps", "bytes_per_second", "peers", "ports")
+_PPS, _BPS, _PEERS, _PORTS = range(len(METRICS))
+
+_HOST_ARRAYS = (
+    "_hosts", "_used", "_age", "_idle", "_mean", "_var",
+    "_packets", "_bytes", "_peer_bits", "_port_bits",
+)
+
+# Saturated 64-bit bitmap: report the count at one remaining zero bit.
+_SATURATED = 64 * math.log(64)
+
+
+def _bitmap_count(bitmaps: np.ndarray) -> np.ndarray:
+    """Linear-counting estimate of the values set in each 64-bit bitmap."""
+    zeros = 64 - np.bitwise_count(bitmaps).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        estimate = -64.0 * np.log(zeros / 64.0)
+    return np.minimum(estimate, _SATURATED)
+
+
+def _bits(values: np.ndarray) -> np.ndarray:
+    """Map ``uint64`` values to one pseudo-random bit of a 64-bit word."""
+    return _ONE << ((values * _GOLDEN) >> np.uint64(58))
+
+
+def _fold(value: int) -> int:
+    """Fold an IPv6 (tagged, up to 129-bit) address into 64 bits."""
+    return (value ^ (value >> 64) ^ (value >> 128)) & _MASK64
+
+
+class AnomalyDetector(BaseDetector):
+    """Detect hosts deviating from their own EWMA baseline.
+
+    Parameters:
+        z_threshold: Standard deviations above the baseline mean at
+                     which a metric is anomalous.
+        alpha: Weight of each new interval in the moving averages
+               (``0.05`` gives a half-life of about 14 intervals).
+        warmup: Intervals a host must be tracked before it is scored.
+        interval_seconds: Length of one scoring interval, in packet time.
+        max_hosts: Most hosts tracked at once.
+        idle_ticks: Silent intervals after which a host is forgotten.
+    """
+
+    interest = DetectorInterest(requires=("src_ip",))
+
+    def __init__(
+        self,
+        z_threshold: float = 4.0,
+        alpha: float = 0.05,
+        warmup: int = 30,
+        interval_seconds: float = 1.0,
+        max_hosts: int = 131_072,
+        idle_ticks: int = 300,
+    ) -> None:
+        self._z_threshold = z_threshold
+        self._alpha = alpha
+        self._warmup = warmup
+        self._max_hosts = max_hosts
+        self._idle_ticks = idle_ticks
+        self.tick_interval = interval_seconds
+        self._last_tick: float | None = None
+
+        self._slots: dict[int, int] = {}
+        self._free: list[int] = []
+        self._capacity = 0
+        self._hosts = np.zeros(0, dtype=object)     # slot -> address
+        self._used = np.zeros(0, dtype=np.bool_)
+        self._age = np.zeros(0, dtype=np.int32)     # intervals tracked
+        self._idle = np.zeros(0, dtype=np.int32)    # silent intervals
+        # Baselines, one column per METRICS entry.
+        self._mean = np.zeros((0, len(METRICS)))
+        self._var = np.zeros((0, len(METRICS)))
+        # Current interval.
+        self._packets = np.zeros(0)
+        self._bytes = np.zeros(0)
+        self._peer_bits = np.zeros(0, dtype=np.uint64)
+        self._port_bits = np.zeros(0, dtype=np.uint64)
+        self._alloc(min(1024, max_hosts))
+        self.dropped_hosts: int = 0
+
+    # ------------------------------------------------------------------
+    # BaseDetector interface
+    # ------------------------------------------------------------------
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        """Count one packet (prefer :meth:`analyze_batch`)."""
+        return self.analyze_batch([features])
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Accumulate a batch into the current interval's counters."""
+        rows = [f for f in features_batch if f.src_ip is not None]
+        if not rows:
+            return None
+        slots = self._lookup([f.src_ip for f in rows])
+        keep = slots >= 0
+        peers = np.fromiter(
+            (_fold(f.dst_ip) if f.dst_ip is not None else 0 for f in rows),
+            np.uint64, len(rows),
+        )
+        ports = np.fromiter(
+            (f.dst_port if f.dst_port is not None else -1 for f in rows),
+            np.int64, len(rows),
+        )
+        lengths = np.fromiter((f.packet_length for f in rows), np.float64, len(rows))
+        self._accumulate(slots[keep], lengths[keep], peers[keep], ports[keep])
+        return None
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict] | None:
+        """Accumulate a columnar batch without building per-packet records."""
+        columns = columns[columns["has_ip"]]
+        if len(columns) == 0:
+            return None
+        hosts, inverse = np.unique(columns["src_ip"], return_inverse=True)
+        slots = self._lookup(hosts.tolist())[inverse]
+        keep = slots >= 0
+        protocol = columns["protocol"]
+        ports = np.where(
+            (protocol == PROTO_TCP) | (protocol == PROTO_UDP),
+            columns["dst_port"].astype(np.int64), -1,
+        )
+        self._accumulate(
+            slots[keep],
+            columns["packet_length"][keep].astype(np.float64),
+            columns["dst_ip"][keep].astype(np.uint64),
+            ports[keep],
+        )
+        return None
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Score every host on the elapsed interval, then learn from it."""
+        elapsed = self.tick_interval if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        if not self._slots or elapsed <= 0:
+            return None
+
+        used = self._used
+        values = np.empty((self._capacity, len(METRICS)))
+        values[:, _PPS] = self._packets / elapsed
+        values[:, _BPS] = self._bytes / elapsed
+        values[:, _PEERS] = _bitmap_count(self._peer_bits)
+        values[:, _PORTS] = _bitmap_count(self._port_bits)
+
+        # Score against the baseline before the interval is folded in.
+        # The variance recurrence starts at zero with the host's second
+        # interval; dividing by its total weight removes that bias.
+        age = self._age
+        decay = 1.0 - self._alpha
+        weight = np.maximum(1.0 - decay ** (age - 1.0), self._alpha)
+        diff = values - self._mean
+        # A floor keeps near-constant baselines from flagging tiny changes.
+        scale = np.sqrt(self._var / weight[:, None]) + 0.1 * self._mean + 1.0
+        z = diff / scale
+        scored = used & (age >= self._warmup)
+        outliers = np.flatnonzero(scored & (z.max(axis=1) > self._z_threshold))
+        alerts = [self._alert(slot, values[slot], z[slot], now) for slot in outliers.tolist()]
+
+        # Exponentially weighted mean and variance; a host's first
+        # interval seeds its mean.
+        learn = (used & (age > 0))[:, None]
+        first = (used & (age == 0))[:, None]
+        increment = self._alpha * diff
+        self._var = np.where(learn, decay * (self._var + diff * increment), self._var)
+        self._mean = np.where(
+            learn, self._mean + increment, np.where(first, values, self._mean),
+        )
+        age[used] += 1
+        active = self._packets > 0
+        self._idle[active] = 0
+        self._idle[used & ~active] += 1
+
+        self._packets[:] = 0
+        self._bytes[:] = 0
+        self._peer_bits[:] = 0
+        self._port_bits[:] = 0
+        self._release(np.flatnonzero(used & (self._idle >= self._idle_ticks)))
+        return alerts or None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def tracked_hosts(self) -> int:
+        """Number of hosts currently holding a slot."""
+        return len(self._slots)
+
+    def baseline(self, host: int) -> dict[str, tuple[float, float]] | None:
+        """Return ``{metric: (mean, standard deviation)}`` of *host*."""
+        slot = self._slots.get(host)
+        if slot is None:
+            return None
+        weight = max(1.0 - (1.0 - self._alpha) ** (int(self._age[slot]) - 1), self._alpha)
+        return {
+            name: (
+                float(self._mean[slot, i]),
+                math.sqrt(float(self._var[slot, i]) / weight),
+            )
+            for i, name in enumerate(METRICS)
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _alloc(self, capacity: int) -> None:
+        """Grow the per-host arrays to *capacity* slots."""
+        grow = capacity - self._capacity
+        for name in _HOST_ARRAYS:
+            array = getattr(self, name)
+            fresh = np.zeros((grow, *array.shape[1:]), dtype=array.dtype)
+            setattr(self, name, np.concatenate([array, fresh]))
+        # Lowest slots are handed out first.
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+
+    def _lookup(self, hosts: Sequence[int]) -> np.ndarray:
+        """Return the slot of each host, assigning new ones (-1 if full)."""
+        slots = self._slots
+        result = np.empty(len(hosts), dtype=np.intp)
+        for i, host in enumerate(hosts):
+            slot = slots.get(host)
+            if slot is None:
+                slot = self._assign(host)
+            result[i] = slot
+        return result
+
+    def _assign(self, host: int) -> int:
+        """Give *host* a fresh slot, growing the arrays when needed."""
+        if not self._free:
+            if self._capacity >= self._max_hosts:
+                self.dropped_hosts += 1
+                return -1
+            self._alloc(min(self._capacity * 2, self._max_hosts))
+        slot = self._free.pop()
+        self._slots[host] = slot
+        self._hosts[slot] = host
+        self._used[slot] = True
+        self._mean[slot] = 0.0
+        self._var[slot] = 0.0
+        self._age[slot] = 0
+        self._idle[slot] = 0
+        return slot
+
+    def _release(self, slots: np.ndarray) -> None:
+        """Forget the hosts in *slots*."""
+        if len(slots) == 0:
+            return
+        self._used[slots] = False
+        for slot in slots.tolist():
+            del self._slots[self._hosts[slot]]
+            self._hosts[slot] = 0
+            self._free.append(slot)
+
+    def _accumulate(
+        self,
+        slots: np.ndarray,
+        lengths: np.ndarray,
+        peers: np.ndarray,
+        ports: np.ndarray,
+    ) -> None:
+        """Add packets to the current interval's per-host counters."""
+        if len(slots) == 0:
+            return
+        capacity = self._capacity
+        self._packets += np.bincount(slots, minlength=capacity)
+        self._bytes += np.bincount(slots, weights=lengths, minlength=capacity)
+        np.bitwise_or.at(self._peer_bits, slots, _bits(peers))
+        ported = ports >= 0
+        np.bitwise_or.at(
+            self._port_bits, slots[ported], _bits(ports[ported].astype(np.uint64)),
+        )
+
+    def _alert(self, slot: int, values: np.ndarray, z: np.ndarray, now: float) -> dict:
+        """Build the alert of host *slot*, naming its most deviant metric."""
+        worst = int(z.argmax())
+        return {
+            "type": "ANOMALY",
+            "source_ip": ip_to_str(self._hosts[slot]),
+            "metric": METRICS[worst],
+            "value": float(values[worst]),
+            "baseline": float(self._mean[slot, worst]),
+            "z_score": float(z[worst]),
+            "timestamp": now,
+        }
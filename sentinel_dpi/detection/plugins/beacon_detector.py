@@ -0,0 +1,283 @@
+"""
+Beaconing (periodic command-and-control) detection plugin.
+
+Tracks each ``(source, destination, destination port)`` pair and the
+times at which it *wakes up* — a packet preceded by at least *min_gap*
+seconds of silence on the pair, so one request/response exchange counts
+once.  The last *history* wake-up times of every pair are kept in a
+ring buffer row of one preallocated ``(max_pairs, history)`` array.
+
+On each manager tick every pair with enough history is scored at once:
+its inter-arrival intervals are sorted into a matrix, and the median
+interval (the period), the median absolute deviation relative to it
+(the *jitter*) and the share of intervals within *tolerance* of the
+period (the *score*) are computed with NumPy over all rows.  Pairs that
+call out regularly — low jitter, high score — and are still doing so
+raise a ``BEACONING`` alert, at most once per *cooldown*.
+
+Pairs are held least recently seen first; beyond *max_pairs* the
+coldest is evicted, and pairs silent for *idle_seconds* are dropped on
+tick.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Sequence
+
+import numpy as np
+
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorInterest
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_str
+
+# (src_ip, dst_ip, dst_port); port 0 for port-less protocols.
+_Pair = tuple[int, int, int]
+
+
+class BeaconDetector(BaseDetector):
+    """Detect hosts contacting a destination at regular intervals.
+
+    Parameters:
+        tick_seconds: Interval between scoring passes, in packet time.
+        min_gap: Silence on a pair (seconds) after which a packet counts
+                 as a new wake-up.
+        history: Wake-up times kept per pair.
+        min_events: Wake-ups a pair needs before it is scored.
+        max_jitter: Largest median deviation of the intervals, relative
+                    to the period, of a beacon.
+        min_score: Smallest share of intervals within *tolerance* of the
+                   period of a beacon.
+        tolerance: Relative distance from the period that counts as
+                   on time.
+        cooldown: Seconds before a pair can alert again.
+        max_pairs: Most pairs tracked at once; the least recently seen
+                   is evicted beyond it.
+        idle_seconds: Silence after which a pair is forgotten.
+    """
+
+    interest = DetectorInterest(requires=("src_ip", "dst_ip"))
+
+    def __init__(
+        self,
+        tick_seconds: float = 30.0,
+        min_gap: float = 1.0,
+        history: int = 32,
+        min_events: int = 8,
+        max_jitter: float = 0.1,
+        min_score: float = 0.8,
+        tolerance: float = 0.1,
+        cooldown: float = 600.0,
+        max_pairs: int = 16_384,
+        idle_seconds: float = 7_200.0,
+    ) -> None:
+        self.tick_interval = tick_seconds
+        self._min_gap = min_gap
+        self._history = max(2, history)
+        self._min_events = max(3, min_events)
+        self._max_jitter = max_jitter
+        self._min_score = min_score
+        self._tolerance = tolerance
+        self._cooldown = cooldown
+        self._max_pairs = max(1, max_pairs)
+        self._idle_seconds = idle_seconds
+
+        # {pair: slot}, least recently seen first.
+        self._pairs: OrderedDict[_Pair, int] = OrderedDict()
+        self._keys: list[_Pair | None] = [None] * self._max_pairs
+        self._free: list[int] = list(range(self._max_pairs - 1, -1, -1))
+        # Per-slot state.
+        self._times = np.zeros((self._max_pairs, self._history))  # wake-up ring
+        self._count = np.zeros(self._max_pairs, dtype=np.int64)   # wake-ups seen
+        self._last = np.full(self._max_pairs, -math.inf)          # last packet
+        self._alerted = np.full(self._max_pairs, -math.inf)       # last alert
+        self.evicted_idle: int = 0
+        self.evicted_lru: int = 0
+
+    # ------------------------------------------------------------------
+    # BaseDetector interface
+    # ------------------------------------------------------------------
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        """Record one packet (prefer :meth:`analyze_batch`)."""
+        return self.analyze_batch([features])
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Record the wake-ups in a batch; scoring happens on tick."""
+        rows = [
+            f for f in features_batch if f.src_ip is not None and f.dst_ip is not None
+        ]
+        if not rows:
+            return None
+        slots = self._lookup([(f.src_ip, f.dst_ip, f.dst_port or 0) for f in rows])
+        timestamps = np.fromiter((f.timestamp for f in rows), np.float64, len(rows))
+        self._record(slots, timestamps)
+        return None
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict] | None:
+        """Record the wake-ups in a columnar batch."""
+        columns = columns[columns["has_ip"]]
+        if len(columns) == 0:
+            return None
+        protocol = columns["protocol"]
+        ports = np.where(
+            (protocol == PROTO_TCP) | (protocol == PROTO_UDP), columns["dst_port"], 0,
+        )
+        keys = np.empty(len(columns), dtype=[("s", "u4"), ("d", "u4"), ("p", "u2")])
+        keys["s"] = columns["src_ip"]
+        keys["d"] = columns["dst_ip"]
+        keys["p"] = ports
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        slots = self._lookup(pairs.tolist())
+        self._record(slots[inverse], columns["timestamp"])
+        return None
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Drop idle pairs and score every pair with enough history."""
+        self._evict_idle(now - self._idle_seconds)
+        candidates = np.flatnonzero(
+            (self._count >= self._min_events) & (now - self._alerted >= self._cooldown)
+        )
+        if len(candidates) == 0:
+            return None
+
+        period, jitter, score = self._score(candidates)
+        regular = (
+            (jitter <= self._max_jitter)
+            & (score >= self._min_score)
+            # Still beaconing: the next wake-up is not long overdue.
+            & (now - self._last[candidates] <= 2.0 * period + self._min_gap)
+        )
+        alerts: list[dict] = []
+        for i in np.flatnonzero(regular).tolist():
+            slot = int(candidates[i])
+            self._alerted[slot] = now
+            src_ip, dst_ip, dst_port = self._keys[slot]
+            alerts.append({
+                "type": "BEACONING",
+                "source_ip": ip_to_str(src_ip),
+                "target_ip": ip_to_str(dst_ip),
+                "dst_port": dst_port or None,
+                "period_seconds": float(period[i]),
+                "jitter": float(jitter[i]),
+                "score": float(score[i]),
+                "events": int(min(self._count[slot], self._history)),
+                "timestamp": now,
+            })
+        return alerts or None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def tracked_pairs(self) -> int:
+        """Number of pairs currently held in memory."""
+        return len(self._pairs)
+
+    def periodicity(self, src_ip: int, dst_ip: int, dst_port: int = 0) -> dict | None:
+        """Return the current ``period``/``jitter``/``score``/``events`` of a pair."""
+        slot = self._pairs.get((src_ip, dst_ip, dst_port))
+        if slot is None or self._count[slot] < 3:
+            return None
+        period, jitter, score = self._score(np.array([slot]))
+        return {
+            "period": float(period[0]),
+            "jitter": float(jitter[0]),
+            "score": float(score[0]),
+            "events": int(min(self._count[slot], self._history)),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _lookup(self, pairs: Sequence[_Pair]) -> np.ndarray:
+        """Return the slot of each pair, assigning and evicting as needed.
+
+        *pairs* are touched in order, so a batch's pairs are the most
+        recently seen; only a batch with more distinct pairs than
+        *max_pairs* could evict a pair it still records into.
+        """
+        known = self._pairs
+        result = np.empty(len(pairs), dtype=np.intp)
+        for i, pair in enumerate(pairs):
+            slot = known.get(pair)
+            if slot is None:
+                if not self._free:
+                    _, cold = known.popitem(last=False)
+                    self._release(cold)
+                    self.evicted_lru += 1
+                slot = known[pair] = self._free.pop()
+                self._keys[slot] = pair
+            else:
+                known.move_to_end(pair)
+            result[i] = slot
+        return result
+
+    def _record(self, slots: np.ndarray, timestamps: np.ndarray) -> None:
+        """Append the wake-ups among *slots*/*timestamps* to the rings."""
+        order = np.lexsort((timestamps, slots))
+        slots = slots[order]
+        timestamps = timestamps[order]
+
+        # Previous packet of the same pair: in the batch, or from before.
+        starts = np.ones(len(slots), dtype=np.bool_)
+        starts[1:] = slots[1:] != slots[:-1]
+        previous = np.empty_like(timestamps)
+        previous[1:] = timestamps[:-1]
+        previous[starts] = self._last[slots[starts]]
+        ends = np.ones(len(slots), dtype=np.bool_)
+        ends[:-1] = starts[1:]
+        self._last[slots[ends]] = np.maximum(self._last[slots[ends]], timestamps[ends])
+
+        wake = timestamps - previous >= self._min_gap
+        if not wake.any():
+            return
+        slots = slots[wake]
+        timestamps = timestamps[wake]
+        # Position of each wake-up among its pair's wake-ups in the batch.
+        group = np.ones(len(slots), dtype=np.bool_)
+        group[1:] = slots[1:] != slots[:-1]
+        first = np.flatnonzero(group)
+        rank = np.arange(len(slots)) - np.repeat(first, np.diff(np.append(first, len(slots))))
+        index = (self._count[slots] + rank) % self._history
+        self._times[slots, index] = timestamps
+        np.add.at(self._count, slots, 1)
+
+    def _score(self, slots: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the period, jitter and on-time score of each pair in *slots*."""
+        history = self._history
+        times = self._times[slots]
+        filled = np.minimum(self._count[slots], history)
+        # Unused ring entries become NaN, which sorts last.
+        times[np.arange(history) >= filled[:, None]] = np.nan
+        times.sort(axis=1)
+        intervals = np.diff(times, axis=1)
+
+        period = np.nanmedian(intervals, axis=1)
+        deviation = np.abs(intervals - period[:, None])
+        jitter = np.nanmedian(deviation, axis=1) / period
+        on_time = deviation <= self._tolerance * period[:, None]
+        score = on_time.sum(axis=1) / (filled - 1)
+        return period, jitter, score
+
+    def _release(self, slot: int) -> None:
+        """Clear *slot* and return it to the free list."""
+        self._keys[slot] = None
+        self._count[slot] = 0
+        self._last[slot] = -math.inf
+        self._alerted[slot] = -math.inf
+        self._free.append(slot)
+
+    def _evict_idle(self, cutoff: float) -> None:
+        """Drop pairs whose last packet is older than *cutoff*."""
+        pairs = self._pairs
+        while pairs:
+            pair, slot = next(iter(pairs.items()))
+            if self._last[slot] >= cutoff:
+                break
+            del pairs[pair]
+            self._release(slot)
+            self.evicted_idle += 1
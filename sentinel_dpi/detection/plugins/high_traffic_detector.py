@@ -3,37 +3,58 @@ High-traffic detection plugin.
 
 Monitors packets-per-second (PPS) via :class:`MetricsService` and raises
 an alert when PPS exceeds a configurable threshold for a sustained number
-of consecutive invocations (the *window*).
+of consecutive ticks (the *window*).
+
+The rate is read once per *tick_seconds* of packet time, with the O(1)
+:meth:`MetricsService.current_pps`, so the detector's cost does not grow
+with traffic volume or with the number of hosts.  Under a
+:class:`~sentinel_dpi.detection.detection_manager.DetectionManager` the
+detector receives no packets at all and is driven by the tick
+scheduler; called directly, packets between ticks only compare a
+timestamp.
 
 No coupling to ``CaptureEngine`` — all data comes from ``MetricsService``.
 """
 
 from __future__ import annotations
 
-from sentinel_dpi.detection.base_detector import BaseDetector
+from typing import TYPE_CHECKING, Sequence
+
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorInterest
 from sentinel_dpi.dpi.feature_schema import PacketFeatures
-from sentinel_dpi.services.metrics_service import MetricsService
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class HighTrafficDetector(BaseDetector):
-    """Detect sustained high traffic using a consecutive-count window.
+    """Detect sustained high traffic using a consecutive-tick window.
 
     Parameters:
-        metrics_service: Injected service providing live PPS snapshots.
+        metrics_service: Injected service (or merged shard view) providing
+                         the live PPS.
         threshold: PPS value above which traffic is considered "high".
-        window: Number of consecutive ``analyze`` invocations where PPS
-                must exceed *threshold* before an alert is emitted.
+        window: Number of consecutive ticks at which PPS exceeds
+                *threshold* before an alert is emitted.
+        tick_seconds: Interval between evaluations, in packet time.
     """
 
+    # Only reads aggregate metrics.
+    interest = DetectorInterest(per_packet=False)
+
     def __init__(
         self,
-        metrics_service: MetricsService,
+        metrics_service: MetricsService | MergedMetricsView,
         threshold: float = 50.0,
         window: int = 5,
+        tick_seconds: float = 1.0,
     ) -> None:
         self._metrics_service = metrics_service
         self._threshold = threshold
         self._window = window
+        self.tick_interval = tick_seconds
+        self._next_tick: float | None = None
         self._consecutive_count: int = 0
 
     # ------------------------------------------------------------------
@@ -41,9 +62,25 @@ class HighTrafficDetector(BaseDetector):
     # ------------------------------------------------------------------
 
     def analyze(self, features: PacketFeatures) -> list[dict] | None:
-        """Check whether sustained high traffic warrants an alert."""
-        snapshot = self._metrics_service.snapshot()
-        current_pps: float = snapshot["packets_per_second"]
+        """Evaluate the rate if *features* reaches the next tick."""
+        return self._maybe_tick(features.timestamp)
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Evaluate the rate at most once, at the batch's last timestamp."""
+        if not features_batch:
+            return None
+        return self._maybe_tick(features_batch[-1].timestamp)
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict] | None:
+        """Evaluate the rate at most once for a columnar batch."""
+        if len(columns) == 0:
+            return None
+        return self._maybe_tick(float(columns["timestamp"][-1]))
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Read the current PPS and count one tick; alert at the window."""
+        self._next_tick = now + self.tick_interval
+        current_pps = self._metrics_service.current_pps()
 
         if current_pps > self._threshold:
             self._consecutive_count += 1
@@ -56,9 +93,19 @@ class HighTrafficDetector(BaseDetector):
             return [
                 {
                     "type": "HIGH_TRAFFIC",
-                    "timestamp": features["timestamp"],
+                    "timestamp": now,
                     "current_pps": current_pps,
                 }
             ]
 
         return None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _maybe_tick(self, timestamp: float) -> list[dict] | None:
+        """Run :meth:`on_tick` once *timestamp* reaches the next tick."""
+        if self._next_tick is not None and timestamp < self._next_tick:
+            return None
+        return self.on_tick(timestamp)
@@ -6,14 +6,37 @@ time window. When a single source IP contacts more than *threshold*
 distinct destination ports within *window_seconds*, an alert is raised.
 
 Includes cooldown logic to prevent alert flooding.
+
+Each source keeps its ports ordered by the time they were last seen,
+so a packet costs O(1): the port moves to the back, and expired ports
+fall off the front.  A source that repeatedly hits one port occupies
+one entry, not one per packet.  Sources idle for a whole window are
+evicted — on arrival of later packets and on every scheduler tick, so
+memory is released during quiet periods too — and at most
+*max_sources* are tracked, evicting the least recently seen.
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import OrderedDict
+from typing import Sequence
+
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorInterest
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_str
+
 
-from sentinel_dpi.detection.base_detector import BaseDetector
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+class _SourceWindow:
+    """Sliding-window state of one source address."""
+
+    __slots__ = ("ports", "last_seen", "last_alert")
+
+    def __init__(self) -> None:
+        # {dst_port: last timestamp}, oldest first — a plain dict in
+        # insertion order (re-inserted on refresh) is half the size of an
+        # OrderedDict.
+        self.ports: dict[int, float] = {}
+        self.last_seen: float = 0.0
+        self.last_alert: float | None = None
 
 
 class PortScanDetector(BaseDetector):
@@ -23,18 +46,33 @@ class PortScanDetector(BaseDetector):
         threshold: Number of distinct destination ports that triggers
                    an alert.
         window_seconds: Length of the sliding window in seconds.
+        max_sources: Upper bound on tracked source addresses; the least
+                     recently seen source is evicted beyond it.
     """
 
-    def __init__(self, threshold: int = 20, window_seconds: float = 10.0) -> None:
+    # Only TCP/UDP packets from an IP source carry a destination port.
+    interest = DetectorInterest(
+        protocols=frozenset({"TCP", "UDP"}),
+        requires=("src_ip", "dst_port"),
+    )
+    tick_interval = 1.0
+
+    def __init__(
+        self,
+        threshold: int = 20,
+        window_seconds: float = 10.0,
+        max_sources: int = 100_000,
+    ) -> None:
         self._threshold = threshold
         self._window_seconds = window_seconds
+        self._max_sources = max(1, max_sources)
 
-        # {src_ip: [(dst_port, timestamp), ...]}
-        self._tracking: dict[str, list[tuple[int, float]]] = defaultdict(list)
-
-        # Cooldown tracking to prevent repeated alerts
-        # {src_ip: last_alert_timestamp}
-        self._last_alert: dict[str, float] = {}
+        # {src_ip: window}, least recently seen first — keyed by integer
+        # address.  A source idle for a full window has no ports left and
+        # is past its alert cooldown, so it can be dropped.
+        self._sources: OrderedDict[int, _SourceWindow] = OrderedDict()
+        self.evicted_idle: int = 0
+        self.evicted_lru: int = 0
 
     # ------------------------------------------------------------------
     # BaseDetector interface
@@ -42,45 +80,114 @@ class PortScanDetector(BaseDetector):
 
     def analyze(self, features: PacketFeatures) -> list[dict] | None:
         """Check whether *features* contributes to a port-scan pattern."""
-        src_ip = features["src_ip"]
-        dst_port = features["dst_port"]
-        timestamp = features["timestamp"]
+        src_ip = features.src_ip
+        dst_port = features.dst_port
 
         if src_ip is None or dst_port is None:
             return None
 
-        entries = self._tracking[src_ip]
+        window = self._observe(src_ip, dst_port, features.timestamp)
+        alert = self._evaluate(src_ip, window)
+        return [alert] if alert else None
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Record a whole batch, then evaluate each source it touched once.
+
+        Sources are checked against the window ending at their last
+        packet in the batch, so a source raises at most one alert per
+        batch.
+        """
+        touched: dict[int, _SourceWindow] = {}
+        for features in features_batch:
+            src_ip = features.src_ip
+            dst_port = features.dst_port
+            if src_ip is None or dst_port is None:
+                continue
+            touched[src_ip] = self._observe(src_ip, dst_port, features.timestamp)
+
+        alerts = [
+            alert
+            for src_ip, window in touched.items()
+            if (alert := self._evaluate(src_ip, window))
+        ]
+        return alerts or None
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Evict sources idle for a whole window."""
+        self._evict_idle(now - self._window_seconds)
+        return None
+
+    @property
+    def tracked_sources(self) -> int:
+        """Number of source addresses currently held in memory."""
+        return len(self._sources)
 
-        # Append the new observation
-        entries.append((dst_port, timestamp))
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
 
-        # Prune entries outside the sliding window
-        cutoff = timestamp - self._window_seconds
-        entries[:] = [(p, t) for p, t in entries if t > cutoff]
+    def _observe(self, src_ip: int, dst_port: int, timestamp: float) -> _SourceWindow:
+        """Record one packet and return its source's (pruned) window."""
+        sources = self._sources
+        window = sources.get(src_ip)
+        if window is None:
+            window = sources[src_ip] = _SourceWindow()
+            if len(sources) > self._max_sources:
+                sources.popitem(last=False)
+                self.evicted_lru += 1
+        else:
+            sources.move_to_end(src_ip)
+        # Keep both orders monotonic if timestamps arrive slightly out
+        # of order.
+        if timestamp > window.last_seen:
+            window.last_seen = timestamp
+
+        ports = window.ports
+        ports.pop(dst_port, None)
+        ports[dst_port] = window.last_seen
 
-        # Count distinct destination ports in the window
-        unique_ports = {p for p, _ in entries}
+        # Prune entries outside the sliding window
+        cutoff = window.last_seen - self._window_seconds
+        while ports:
+            port, seen = next(iter(ports.items()))
+            if seen > cutoff:
+                break
+            del ports[port]
+
+        self._evict_idle(cutoff)
+        return window
+
+    def _evict_idle(self, cutoff: float) -> None:
+        """Drop sources whose last packet is older than *cutoff*."""
+        sources = self._sources
+        while sources:
+            window = next(iter(sources.values()))
+            if window.last_seen > cutoff:
+                break
+            sources.popitem(last=False)
+            self.evicted_idle += 1
+
+    def _evaluate(self, src_ip: int, window: _SourceWindow) -> dict | None:
+        """Check *window* against the threshold and the alert cooldown."""
+        unique_ports = len(window.ports)
 
         # Check threshold (>= for intuitive behavior)
-        if len(unique_ports) >= self._threshold:
-
-            # Cooldown check — prevent alert spam
-            last_alert_time = self._last_alert.get(src_ip)
-            if last_alert_time is not None:
-                if (timestamp - last_alert_time) < self._window_seconds:
-                    return None
-
-            # Record alert time
-            self._last_alert[src_ip] = timestamp
-
-            return [
-                {
-                    "type": "PORT_SCAN",
-                    "source_ip": src_ip,
-                    "unique_ports": len(unique_ports),
-                    "window_seconds": self._window_seconds,
-                    "timestamp": timestamp,
-                }
-            ]
-
-        return None
\ No newline at end of file
+        if unique_ports < self._threshold:
+            return None
+
+        # Cooldown check — prevent alert spam
+        timestamp = window.last_seen
+        if window.last_alert is not None:
+            if (timestamp - window.last_alert) < self._window_seconds:
+                return None
+
+        # Record alert time
+        window.last_alert = timestamp
+
+        return {
+            "type": "PORT_SCAN",
+            "source_ip": ip_to_str(src_ip),
+            "unique_ports": unique_ports,
+            "window_seconds": self._window_seconds,
+            "timestamp": timestamp,
+        }
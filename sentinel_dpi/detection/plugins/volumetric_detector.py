@@ -0,0 +1,444 @@
+"""
+Volumetric (flood / DDoS) detection plugin.
+
+Counts packets and bytes per destination address, per source address
+and per destination port in time-windowed count-min sketches, keeps a
+small heavy-hitter list for each, and alerts when a destination's rate
+over the window exceeds a packets-per-second or bytes-per-second
+threshold.  Memory is fixed by the sketch dimensions, however many
+hosts appear.
+
+A count-min sketch of *depth* rows by *width* counters never
+underestimates; with probability ``1 - e**-depth`` it overestimates a
+key by at most ``e / width`` of the window's total.  For the defaults
+(4 × 2048) that is 0.13 % of the traffic with 98 % confidence.  Each
+window is split into *buckets* time slices; a slice's counters are
+subtracted from the running total when it expires, so the effective
+window lies between ``(buckets - 1) / buckets`` and one full
+``window_seconds``.
+
+Sources and ports are also counted per destination, in sketches keyed
+by the ``(destination, source)`` and ``(destination, port)`` pairs; each
+destination on the heavy-hitter list keeps its own busiest sources and
+ports, so an alert names the ones driving traffic to that victim.
+
+Updates are vectorised with NumPy per batch.  Thresholds are checked,
+heavy hitters refreshed and expired slices rotated out on the manager's
+tick, so quiet periods decay without packets.  Emits ``VOLUMETRIC``
+alerts naming the victim (``target_ip``) with the busiest sources and
+destination ports sending to it in the window.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from sentinel_dpi.detection.base_detector import BaseDetector, DetectorInterest
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_str
+
+_MASK64 = (1 << 64) - 1
+# Mixes the destination into a (destination, key) pair's hash key.
+_PAIR_MIX = np.uint64(0x9E3779B97F4A7C15)
+# One seed per sketch row (decimal digits of pi, odd).
+_SEEDS = (
+    0x243F6A8885A308D3, 0x13198A2E03707345, 0xA4093822299F31D1,
+    0x082EFA98EC4E6C89, 0x452821E638D01377, 0xBE5466CF34E90C6D,
+    0xC0AC29B7C97C50DD, 0x3F84D5B5B5470917,
+)
+
+
+def _fold(value: int) -> int:
+    """Fold an IPv6 (tagged, up to 129-bit) address into 64 bits."""
+    return (value ^ (value >> 64) ^ (value >> 128)) & _MASK64
+
+
+class _WindowedSketch:
+    """Count-min sketches of packets and bytes over time slices.
+
+    Counters of all rows are stored flat (``row * width + column``) so a
+    batch updates with one ``np.bincount`` per metric.
+    """
+
+    __slots__ = (
+        "_seeds", "_width", "_shift", "_cells", "_rows",
+        "packets", "bytes", "total_packets", "total_bytes",
+    )
+
+    def __init__(self, depth: int, width: int, buckets: int) -> None:
+        self._seeds = np.array(_SEEDS[:depth], dtype=np.uint64)[:, None]
+        self._width = width
+        self._shift = np.uint64(64 - (width.bit_length() - 1))
+        self._cells = depth * width
+        self._rows = (np.arange(depth, dtype=np.intp) * width)[:, None]
+        self.packets = np.zeros((buckets, self._cells), dtype=np.int64)
+        self.bytes = np.zeros((buckets, self._cells), dtype=np.int64)
+        self.total_packets = np.zeros(self._cells, dtype=np.int64)
+        self.total_bytes = np.zeros(self._cells, dtype=np.int64)
+
+    def cells(self, keys: np.ndarray) -> np.ndarray:
+        """Return the flat counter index of every key in every row."""
+        # MurmurHash3 fmix64, seeded per row.
+        x = keys[None, :] ^ self._seeds
+        x ^= x >> np.uint64(33)
+        x *= np.uint64(0xFF51AFD7ED558CCD)
+        x ^= x >> np.uint64(33)
+        x *= np.uint64(0xC4CEB9FE1A85EC53)
+        x ^= x >> np.uint64(33)
+        return (x >> self._shift).astype(np.intp) + self._rows
+
+    def add(self, slot: int, keys: np.ndarray, lengths: np.ndarray) -> None:
+        """Count one packet of *lengths* bytes per key into *slot*."""
+        if len(keys) == 0:
+            return
+        flat = self.cells(keys).ravel()
+        packets = np.bincount(flat, minlength=self._cells)
+        byte_counts = np.bincount(
+            flat, weights=np.tile(lengths, len(self._seeds)), minlength=self._cells,
+        ).astype(np.int64)
+        self.packets[slot] += packets
+        self.bytes[slot] += byte_counts
+        self.total_packets += packets
+        self.total_bytes += byte_counts
+
+    def query(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the (packets, bytes) estimate of every key."""
+        cells = self.cells(keys)
+        return (
+            self.total_packets[cells].min(axis=0),
+            self.total_bytes[cells].min(axis=0),
+        )
+
+    def clear(self, slot: int) -> None:
+        """Drop *slot*'s counts from the window."""
+        self.total_packets -= self.packets[slot]
+        self.total_bytes -= self.bytes[slot]
+        self.packets[slot] = 0
+        self.bytes[slot] = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the counters."""
+        return (
+            self.packets.nbytes + self.bytes.nbytes
+            + self.total_packets.nbytes + self.total_bytes.nbytes
+        )
+
+
+class VolumetricDetector(BaseDetector):
+    """Detect floods towards one destination with count-min sketches.
+
+    Parameters:
+        pps_threshold: Packets per second towards one destination that
+                       trigger a ``VOLUMETRIC`` alert.
+        bps_threshold: Bytes per second towards one destination that
+                       trigger a ``VOLUMETRIC`` alert.
+        window_seconds: Length of the sliding window in seconds.
+        width: Counters per sketch row; rounded up to a power of two.
+        depth: Sketch rows (independent hashes), at most 8.
+        buckets: Time slices per window.
+        top_k: Heavy hitters kept per key (destination, source, port),
+               and sources and ports kept per heavy destination.
+    """
+
+    interest = DetectorInterest(requires=("src_ip", "dst_ip"))
+    tick_interval = 1.0
+
+    def __init__(
+        self,
+        pps_threshold: float = 10_000.0,
+        bps_threshold: float = 100_000_000.0,
+        window_seconds: float = 10.0,
+        width: int = 2048,
+        depth: int = 4,
+        buckets: int = 5,
+        top_k: int = 10,
+    ) -> None:
+        self._pps_threshold = pps_threshold
+        self._bps_threshold = bps_threshold
+        self._window_seconds = window_seconds
+        width = 1 << max(1, (width - 1).bit_length())
+        depth = min(max(1, depth), len(_SEEDS))
+        self._buckets = max(1, buckets)
+        self._bucket_seconds = window_seconds / self._buckets
+        self._top_k = top_k
+        self._epoch: int | None = None
+
+        self._dst = _WindowedSketch(depth, width, self._buckets)
+        self._src = _WindowedSketch(depth, width, self._buckets)
+        self._port = _WindowedSketch(depth, width, self._buckets)
+        self._dst_src = _WindowedSketch(depth, width, self._buckets)
+        self._dst_port = _WindowedSketch(depth, width, self._buckets)
+        self._sketches = (self._dst, self._src, self._port, self._dst_src, self._dst_port)
+        # Heavy hitters: {key: estimated packets in the window}.
+        self._dst_top: dict[int, int] = {}
+        self._src_top: dict[int, int] = {}
+        self._port_top: dict[int, int] = {}
+        # Per heavy destination: {dst_ip: {source or port: packets}}.
+        self._victim_src_top: dict[int, dict[int, int]] = {}
+        self._victim_port_top: dict[int, dict[int, int]] = {}
+        # {dst_ip: timestamp of its last alert}
+        self._last_alert: dict[int, float] = {}
+
+    # ------------------------------------------------------------------
+    # BaseDetector interface
+    # ------------------------------------------------------------------
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        """Count one packet (prefer :meth:`analyze_batch`)."""
+        return self.analyze_batch([features])
+
+    def analyze_batch(self, features_batch: Sequence[PacketFeatures]) -> list[dict] | None:
+        """Count a batch into the sketches of its last packet's time slice."""
+        rows = [
+            f for f in features_batch if f.src_ip is not None and f.dst_ip is not None
+        ]
+        if not rows:
+            return None
+        ported = [f for f in rows if f.dst_port is not None]
+        self._record(
+            rows[-1].timestamp,
+            [f.dst_ip for f in rows],
+            [f.src_ip for f in rows],
+            np.fromiter((f.packet_length for f in rows), np.int64, len(rows)),
+            [f.dst_port for f in ported],
+            np.fromiter((f.packet_length for f in ported), np.int64, len(ported)),
+            [f.dst_ip for f in ported],
+        )
+        return None
+
+    def analyze_columns(self, columns: np.ndarray) -> list[dict] | None:
+        """Count a columnar batch without building per-packet records."""
+        columns = columns[columns["has_ip"]]
+        if len(columns) == 0:
+            return None
+        protocol = columns["protocol"]
+        ported = columns[(protocol == PROTO_TCP) | (protocol == PROTO_UDP)]
+        self._record(
+            float(columns["timestamp"][-1]),
+            columns["dst_ip"].astype(np.uint64),
+            columns["src_ip"].astype(np.uint64),
+            columns["packet_length"].astype(np.int64),
+            ported["dst_port"].astype(np.uint64),
+            ported["packet_length"].astype(np.int64),
+            ported["dst_ip"].astype(np.uint64),
+        )
+        return None
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        """Expire old slices, refresh heavy hitters and check the victims."""
+        self._advance(now)
+        for sketch, top in (
+            (self._dst, self._dst_top),
+            (self._src, self._src_top),
+            (self._port, self._port_top),
+        ):
+            _refresh(sketch, top)
+        for sketch, tops in (
+            (self._dst_src, self._victim_src_top),
+            (self._dst_port, self._victim_port_top),
+        ):
+            for dst_ip in [d for d in tops if d not in self._dst_top]:
+                del tops[dst_ip]
+            for dst_ip, top in tops.items():
+                _refresh(sketch, top, dst_ip)
+
+        cutoff = now - self._window_seconds
+        self._last_alert = {
+            ip: ts for ip, ts in self._last_alert.items() if ts > cutoff
+        }
+        if not self._dst_top:
+            return None
+
+        victims = list(self._dst_top)
+        packets, byte_counts = self._dst.query(_keys(victims))
+        alerts: list[dict] = []
+        for dst_ip, count, volume in zip(victims, packets.tolist(), byte_counts.tolist()):
+            pps = count / self._window_seconds
+            bps = volume / self._window_seconds
+            if pps <= self._pps_threshold and bps <= self._bps_threshold:
+                continue
+            if dst_ip in self._last_alert:
+                continue
+            self._last_alert[dst_ip] = now
+            alerts.append({
+                "type": "VOLUMETRIC",
+                "target_ip": ip_to_str(dst_ip),
+                "packets_per_second": pps,
+                "bytes_per_second": bps,
+                "top_sources": [
+                    ip_to_str(ip) for ip in _ranked(self._victim_src_top.get(dst_ip, {}), 5)
+                ],
+                "top_ports": _ranked(self._victim_port_top.get(dst_ip, {}), 5),
+                "window_seconds": self._window_seconds,
+                "timestamp": now,
+            })
+        return alerts or None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def estimate(self, dst_ip: int) -> tuple[int, int]:
+        """Return the (packets, bytes) estimate towards *dst_ip* in the window."""
+        packets, byte_counts = self._dst.query(_keys([dst_ip]))
+        return int(packets[0]), int(byte_counts[0])
+
+    def heavy_hitters(self) -> dict[str, list[dict]]:
+        """Return the heavy hitters per key, busiest first.
+
+        Returns:
+            ``{"destinations": [...], "sources": [...], "ports": [...]}``
+            — lists of ``{"key": str | int, "packets": int}``.
+        """
+        return {
+            name: [
+                {"key": render(key), "packets": top[key]}
+                for key in _ranked(top, self._top_k)
+            ]
+            for name, top, render in (
+                ("destinations", self._dst_top, ip_to_str),
+                ("sources", self._src_top, ip_to_str),
+                ("ports", self._port_top, int),
+            )
+        }
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the sketch counters (independent of traffic)."""
+        return sum(sketch.nbytes for sketch in self._sketches)
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _record(
+        self,
+        timestamp: float,
+        dst_ips: Sequence[int] | np.ndarray,
+        src_ips: Sequence[int] | np.ndarray,
+        lengths: np.ndarray,
+        dst_ports: Sequence[int] | np.ndarray,
+        port_lengths: np.ndarray,
+        port_dst_ips: Sequence[int] | np.ndarray,
+    ) -> None:
+        """Count one batch and offer its keys to the heavy-hitter lists."""
+        slot = self._advance(timestamp)
+        for sketch, top, keys, weights in (
+            (self._dst, self._dst_top, dst_ips, lengths),
+            (self._src, self._src_top, src_ips, lengths),
+            (self._port, self._port_top, dst_ports, port_lengths),
+        ):
+            if len(keys) == 0:
+                continue
+            sketch.add(slot, _keys(keys), weights)
+            unique = np.unique(keys).tolist() if isinstance(keys, np.ndarray) else list(set(keys))
+            packets, _ = sketch.query(_keys(unique))
+            top.update(zip(unique, packets.tolist()))
+            if len(top) > self._top_k:
+                keep = heapq.nlargest(self._top_k, top.items(), key=_second)
+                top.clear()
+                top.update(keep)
+
+        for sketch, tops, dsts, keys, weights in (
+            (self._dst_src, self._victim_src_top, dst_ips, src_ips, lengths),
+            (self._dst_port, self._victim_port_top, port_dst_ips, dst_ports, port_lengths),
+        ):
+            if len(keys):
+                hashed = _pair_keys(dsts, keys)
+                sketch.add(slot, hashed, weights)
+                self._offer_pairs(sketch, tops, dsts, keys, hashed)
+
+    def _offer_pairs(
+        self,
+        sketch: _WindowedSketch,
+        tops: dict[int, dict[int, int]],
+        dst_ips: Sequence[int] | np.ndarray,
+        keys: Sequence[int] | np.ndarray,
+        hashed: np.ndarray,
+    ) -> None:
+        """Offer the batch's keys to the lists of the heavy destinations.
+
+        *hashed* holds the pair hash keys of *dst_ips* and *keys*.
+        """
+        victims = self._dst_top
+        if isinstance(keys, np.ndarray):
+            heavy = np.fromiter(victims, np.uint64, len(victims))
+            rows = np.flatnonzero(np.isin(dst_ips, heavy))
+            # One row per distinct pair (its hash key stands for it).
+            _, first = np.unique(hashed[rows], return_index=True)
+            rows = rows[first]
+            dsts, values = dst_ips[rows].tolist(), keys[rows].tolist()
+        else:
+            pairs = {
+                (d, k): h for d, k, h in zip(dst_ips, keys, hashed.tolist()) if d in victims
+            }
+            rows = np.fromiter(pairs.values(), np.uint64, len(pairs))
+            dsts, values = [d for d, _ in pairs], [k for _, k in pairs]
+        if not dsts:
+            return
+        packets, _ = sketch.query(rows if not isinstance(keys, np.ndarray) else hashed[rows])
+        for dst_ip, key, count in zip(dsts, values, packets.tolist()):
+            tops.setdefault(dst_ip, {})[key] = count
+        for dst_ip in set(dsts):
+            top = tops[dst_ip]
+            # Trimmed in bulk: at most 2 * top_k keys per destination.
+            if len(top) > 2 * self._top_k:
+                keep = heapq.nlargest(self._top_k, top.items(), key=_second)
+                top.clear()
+                top.update(keep)
+
+    def _advance(self, timestamp: float) -> int:
+        """Rotate the sketches to *timestamp*'s slice and return its index."""
+        epoch = int(timestamp // self._bucket_seconds)
+        if self._epoch is None:
+            self._epoch = epoch
+        elif epoch > self._epoch:
+            buckets = self._buckets
+            for stale in range(self._epoch + 1, min(epoch, self._epoch + buckets) + 1):
+                for sketch in self._sketches:
+                    sketch.clear(stale % buckets)
+            self._epoch = epoch
+        return self._epoch % self._buckets
+
+
+def _keys(values: Iterable[int] | np.ndarray) -> np.ndarray:
+    """Return *values* as a ``uint64`` hash-key array."""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.uint64, copy=False)
+    return np.array([_fold(v) for v in values], dtype=np.uint64)
+
+
+def _pair_keys(
+    dst_ips: Iterable[int] | np.ndarray, keys: Iterable[int] | np.ndarray,
+) -> np.ndarray:
+    """Return the hash keys of the ``(destination, key)`` pairs."""
+    return (_keys(dst_ips) * _PAIR_MIX) ^ _keys(keys)
+
+
+def _refresh(sketch: _WindowedSketch, top: dict[int, int], dst_ip: int | None = None) -> None:
+    """Re-estimate the heavy hitters in *top*; drop the ones gone quiet.
+
+    With *dst_ip*, *top* holds keys paired with that destination.
+    """
+    if not top:
+        return
+    keys = list(top)
+    hashed = _keys(keys)
+    if dst_ip is not None:
+        hashed = _pair_keys(np.full(len(keys), _fold(dst_ip), dtype=np.uint64), hashed)
+    packets, _ = sketch.query(hashed)
+    top.clear()
+    top.update((key, count) for key, count in zip(keys, packets.tolist()) if count)
+
+
+def _second(item: tuple[int, int]) -> int:
+    return item[1]
+
+
+def _ranked(top: dict[int, int], limit: int) -> list[int]:
+    """Return up to *limit* keys of *top*, largest count first."""
+    return [key for key, _ in heapq.nlargest(limit, top.items(), key=_second)]
@@ -0,0 +1,168 @@
+"""
+Vectorised batch parser — many raw frames to columnar features at once.
+
+Concatenates a batch of :class:`~sentinel_dpi.core.raw_frame.RawFrame`
+payloads into one NumPy buffer, gathers a fixed-size header window per
+frame and decodes Ethernet / 802.1Q / IPv4 / TCP / UDP / ICMP fields with
+vectorised offset arithmetic.  A 10k-frame batch costs a handful of
+NumPy calls instead of 10k :meth:`PacketParser.parse` invocations.
+
+The result is a structured array with :data:`FEATURE_DTYPE`.  Frames the
+vectorised path does not cover (IPv6, IP tunnels, malformed or
+truncated headers, unknown link payloads) are reported by index so the
+caller can run them through the per-packet parser.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.feature_schema import PacketFeatures
+
+logger = logging.getLogger(__name__)
+
+# Protocol codes stored in the ``protocol`` column.
+PROTO_OTHER = 0
+PROTO_TCP = 1
+PROTO_UDP = 2
+PROTO_ICMP = 3
+PROTOCOL_NAMES: tuple[str, ...] = ("Other", "TCP", "UDP", "ICMP")
+
+FEATURE_DTYPE = np.dtype([
+    ("timestamp", np.float64),
+    ("src_ip", np.uint32),       # ip_to_int() value; 0 when has_ip is False
+    ("dst_ip", np.uint32),
+    ("has_ip", np.bool_),
+    ("protocol", np.uint8),      # index into PROTOCOL_NAMES
+    ("src_port", np.uint16),     # 0 unless protocol is TCP or UDP
+    ("dst_port", np.uint16),
+    ("packet_length", np.uint32),
+])
+
+# Header bytes examined per frame: two VLAN tags + a maximal IPv4
+# header (60 bytes) + the transport port pair, rounded up.
+_WINDOW = 96
+_COLUMNS = np.arange(_WINDOW, dtype=np.int64)
+
+_ETHERTYPE_IPV4 = 0x0800
+_VLAN_ETHERTYPES = np.array([0x8100, 0x88A8, 0x9100])
+_NON_IP_ETHERTYPES = np.array([0x0806, 0x8035, 0x88CC, 0x888E])
+_ETH_MAX_LENGTH = 1500
+_TUNNEL_PROTOCOLS = np.array([4, 41, 47])
+
+
+class BatchParser:
+    """Parse a batch of raw Ethernet frames into columnar features.
+
+    Usage::
+
+        columns, fallback = BatchParser().parse_batch(frames)
+        for i in fallback:
+            features = fast_parser.parse(frames[i])
+    """
+
+    def parse_batch(
+        self, frames: Sequence[RawFrame],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Decode *frames* with vectorised header arithmetic.
+
+        Returns:
+            ``(columns, fallback)`` — a :data:`FEATURE_DTYPE` array with
+            one row per decoded frame (in input order) and the indices
+            of frames in *frames* that must be parsed individually.
+        """
+        n = len(frames)
+        if n == 0:
+            return np.empty(0, dtype=FEATURE_DTYPE), np.empty(0, dtype=np.intp)
+
+        datas, timestamps, wire_lengths = list(zip(*frames))[:3]
+        caplen = np.fromiter(map(len, datas), dtype=np.int64, count=n)
+        starts = np.zeros(n, dtype=np.int64)
+        np.cumsum(caplen[:-1], out=starts[1:])
+
+        # One copy of all payloads plus a zero pad so every window fits.
+        buf = np.frombuffer(b"".join(datas) + bytes(_WINDOW), dtype=np.uint8)
+        hdr = buf[starts[:, None] + _COLUMNS]
+        rows = np.arange(n)
+
+        def u8(col: np.ndarray) -> np.ndarray:
+            return hdr[rows, np.minimum(col, _WINDOW - 1)].astype(np.int64)
+
+        def u16(col: np.ndarray) -> np.ndarray:
+            return (u8(col) << 8) | u8(col + 1)
+
+        def u32(col: np.ndarray) -> np.ndarray:
+            return (u16(col) << 16) | u16(col + 2)
+
+        # ----- Link layer -----------------------------------------------
+        l3 = np.full(n, 14, dtype=np.int64)
+        ethertype = u16(np.full(n, 12, dtype=np.int64))
+        for _ in range(2):
+            tagged = np.isin(ethertype, _VLAN_ETHERTYPES)
+            ethertype = np.where(tagged, u16(l3 + 2), ethertype)
+            l3 += tagged * 4
+
+        # ----- Network layer --------------------------------------------
+        ver_ihl = u8(l3)
+        ihl = (ver_ihl & 0x0F) * 4
+        ipv4 = (
+            (ethertype == _ETHERTYPE_IPV4) & (ver_ihl >> 4 == 4) & (ihl >= 20)
+        )
+        first_fragment = (u16(l3 + 6) & 0x1FFF) == 0
+        ip_proto = u8(l3 + 9)
+        l4 = l3 + ihl
+
+        # ----- Transport / protocol -------------------------------------
+        tcp = ipv4 & first_fragment & (ip_proto == 6)
+        udp = ipv4 & first_fragment & (ip_proto == 17)
+        icmp = ipv4 & first_fragment & (ip_proto == 1)
+        has_ports = tcp | udp
+
+        non_ip = (ethertype <= _ETH_MAX_LENGTH) | np.isin(ethertype, _NON_IP_ETHERTYPES)
+        needed = np.where(has_ports, l4 + 4, l3 + 20)
+        ok = (
+            (ipv4 & ~(first_fragment & np.isin(ip_proto, _TUNNEL_PROTOCOLS))
+             & (caplen >= needed))
+            | (non_ip & (caplen >= 14))
+        )
+
+        # ----- Assemble -------------------------------------------------
+        keep = np.flatnonzero(ok)
+        columns = np.empty(len(keep), dtype=FEATURE_DTYPE)
+        columns["timestamp"] = np.asarray(timestamps, dtype=np.float64)[keep]
+        columns["has_ip"] = ipv4[keep]
+        columns["src_ip"] = np.where(ipv4, u32(l3 + 12), 0)[keep]
+        columns["dst_ip"] = np.where(ipv4, u32(l3 + 16), 0)[keep]
+        protocol = np.full(n, PROTO_OTHER, dtype=np.uint8)
+        protocol[tcp] = PROTO_TCP
+        protocol[udp] = PROTO_UDP
+        protocol[icmp] = PROTO_ICMP
+        columns["protocol"] = protocol[keep]
+        columns["src_port"] = np.where(has_ports, u16(l4), 0)[keep]
+        columns["dst_port"] = np.where(has_ports, u16(l4 + 2), 0)[keep]
+        columns["packet_length"] = np.asarray(wire_lengths, dtype=np.int64)[keep]
+
+        return columns, np.flatnonzero(~ok)
+
+
+def iter_features(columns: np.ndarray) -> Iterator[PacketFeatures]:
+    """Yield one :class:`PacketFeatures` per row of *columns*.
+
+    Bridges the columnar representation to per-packet consumers.
+    """
+    names = PROTOCOL_NAMES
+    for ts, src, dst, has_ip, proto, sport, dport, length in columns.tolist():
+        has_ports = proto == PROTO_TCP or proto == PROTO_UDP
+        yield PacketFeatures(
+            ts,
+            src if has_ip else None,
+            dst if has_ip else None,
+            names[proto],
+            sport if has_ports else None,
+            dport if has_ports else None,
+            length,
+        )
@@ -0,0 +1,189 @@
+"""
+Fast-path DPI parser over raw frame bytes.
+
+Decodes Ethernet (with 802.1Q / 802.1ad tags), IPv4, IPv6 and the
+TCP / UDP / ICMP headers directly from a :class:`bytes` or
+:class:`memoryview` using precompiled :mod:`struct` formats and fixed
+offsets — no scapy layer objects are built.  Produces exactly the same
+:class:`~sentinel_dpi.dpi.feature_schema.PacketFeatures` as
+:class:`~sentinel_dpi.dpi.parser.PacketParser`.
+
+Anything the fast path does not understand (non-Ethernet payloads it
+cannot classify, IP tunnels, truncated or
+malformed headers) and every already-dissected scapy packet is handed
+to the scapy parser.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+from typing import TYPE_CHECKING
+
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.feature_schema import IPV6_TAG, PacketFeatures
+from sentinel_dpi.dpi.parser import PacketParser
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+
+logger = logging.getLogger(__name__)
+
+_ETHERTYPE = struct.Struct("!H")
+# version/IHL, flags/fragment offset, protocol, source, destination.
+_IPV4 = struct.Struct("!B5xHxB2xII")
+# version/traffic class, next header, source, destination.
+_IPV6 = struct.Struct("!B5xBx16s16s")
+_PORTS = struct.Struct("!HH")
+# IPv6 extension header: next header, length (8-octet units, minus one).
+_EXT_HDR = struct.Struct("!BB")
+# IPv6 fragment header: next header, fragment offset/flags.
+_FRAG_HDR = struct.Struct("!BxH")
+
+_ETH_HLEN = 14
+# EtherType values up to this are 802.3 length fields (LLC frames).
+_ETH_MAX_LENGTH = 1500
+_ETHERTYPE_IPV4 = 0x0800
+_ETHERTYPE_IPV6 = 0x86DD
+_VLAN_ETHERTYPES = frozenset({0x8100, 0x88A8, 0x9100})
+# Link-layer payloads that scapy leaves without an IP layer.
+_NON_IP_ETHERTYPES = frozenset({0x0806, 0x8035, 0x88CC, 0x888E})
+
+_IPPROTO_ICMP = 1
+_IPPROTO_TCP = 6
+_IPPROTO_UDP = 17
+_IPPROTO_ICMPV6 = 58
+_IPPROTO_FRAGMENT = 44
+# IP-in-IP, IPv6-in-IP and GRE: scapy dissects the inner packet, so the
+# inner transport header decides the protocol.
+_TUNNEL_PROTOCOLS = frozenset({4, 41, 47})
+# Hop-by-hop, routing, destination options.
+_IPV6_EXT_HEADERS = frozenset({0, 43, 60})
+
+_from_bytes = int.from_bytes
+
+
+class FastPacketParser:
+    """Header-offset parser with scapy fallback.
+
+    Usage::
+
+        parser = FastPacketParser()
+        features = parser.parse(raw_frame)   # RawFrame or scapy Packet
+
+    Parameters:
+        fallback: Parser used for frames the fast path cannot decode.
+                  Defaults to a fresh :class:`PacketParser`.
+    """
+
+    def __init__(self, fallback: PacketParser | None = None) -> None:
+        self._fallback = fallback if fallback is not None else PacketParser()
+        self.fallback_count: int = 0
+
+    def parse(self, packet: Packet | RawFrame) -> PacketFeatures:
+        """Extract structured metadata from *packet*.
+
+        Returns:
+            A :class:`PacketFeatures` record identical to what
+            :meth:`PacketParser.parse` would return.
+        """
+        if type(packet) is RawFrame:
+            features = self.parse_bytes(
+                packet.data, packet.timestamp, packet.wire_length,
+            )
+            if features is not None:
+                return features
+        self.fallback_count += 1
+        return self._fallback.parse(packet)
+
+    def parse_bytes(
+        self,
+        data: bytes | memoryview,
+        timestamp: float,
+        wire_length: int,
+    ) -> PacketFeatures | None:
+        """Decode an Ethernet frame held in *data*.
+
+        Returns:
+            The extracted features, or ``None`` when the frame needs the
+            scapy fallback.
+        """
+        try:
+            return self._decode(data, timestamp, wire_length)
+        except struct.error:
+            # Header cut short by the snapshot length.
+            return None
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _decode(
+        data: bytes | memoryview,
+        timestamp: float,
+        wire_length: int,
+    ) -> PacketFeatures | None:
+        (ethertype,) = _ETHERTYPE.unpack_from(data, 12)
+        offset = _ETH_HLEN
+        while ethertype in _VLAN_ETHERTYPES:
+            (ethertype,) = _ETHERTYPE.unpack_from(data, offset + 2)
+            offset += 4
+
+        # ----- Network layer --------------------------------------------
+        if ethertype == _ETHERTYPE_IPV4:
+            ver_ihl, frag, proto, src_ip, dst_ip = _IPV4.unpack_from(data, offset)
+            ihl = (ver_ihl & 0x0F) * 4
+            if ver_ihl >> 4 != 4 or ihl < 20:
+                return None
+            offset += ihl
+            first_fragment = not frag & 0x1FFF
+            icmp_proto = _IPPROTO_ICMP
+        elif ethertype == _ETHERTYPE_IPV6:
+            ver, proto, src, dst = _IPV6.unpack_from(data, offset)
+            if ver >> 4 != 6:
+                return None
+            src_ip = _from_bytes(src, "big") | IPV6_TAG
+            dst_ip = _from_bytes(dst, "big") | IPV6_TAG
+            offset += 40
+            while proto in _IPV6_EXT_HEADERS:
+                proto, ext_len = _EXT_HDR.unpack_from(data, offset)
+                offset += (ext_len + 1) * 8
+            first_fragment = True
+            if proto == _IPPROTO_FRAGMENT:
+                proto, frag = _FRAG_HDR.unpack_from(data, offset)
+                offset += 8
+                first_fragment = not frag & 0xFFF8
+            icmp_proto = _IPPROTO_ICMPV6
+        elif ethertype <= _ETH_MAX_LENGTH or ethertype in _NON_IP_ETHERTYPES:
+            return PacketFeatures(
+                timestamp, None, None, "Other", None, None, wire_length,
+            )
+        else:
+            return None
+
+        # ----- Transport / protocol -------------------------------------
+        src_port: int | None = None
+        dst_port: int | None = None
+
+        if not first_fragment:
+            # Non-first fragment — no transport header to read.
+            protocol = "Other"
+        elif proto == _IPPROTO_TCP:
+            protocol = "TCP"
+            src_port, dst_port = _PORTS.unpack_from(data, offset)
+        elif proto == _IPPROTO_UDP:
+            protocol = "UDP"
+            src_port, dst_port = _PORTS.unpack_from(data, offset)
+        elif proto == icmp_proto:
+            protocol = "ICMP"
+        elif proto in _TUNNEL_PROTOCOLS:
+            # Encapsulated traffic — scapy resolves the inner headers.
+            return None
+        else:
+            protocol = "Other"
+
+        # ----- Assemble (positional: see PacketFeatures) ----------------
+        return PacketFeatures(
+            timestamp, src_ip, dst_ip, protocol, src_port, dst_port, wire_length,
+        )
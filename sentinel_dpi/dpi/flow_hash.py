@@ -0,0 +1,94 @@
+"""
+Shard routing keys for the multi-worker processor.
+
+Computes a cheap integer key per packet — without building a
+:class:`~sentinel_dpi.dpi.feature_schema.PacketFeatures` record — so a
+dispatcher can spread packets across worker pipelines before parsing.
+
+Two key modes are supported:
+
+- ``"source"`` — the source address.  Every packet from one host lands
+  on the same shard, which keeps per-source detector state (port-scan
+  tracking) shard-local.
+- ``"flow"`` — the unordered address pair.  Both directions of every
+  conversation land on the same shard.  Ports are deliberately left
+  out so non-first IP fragments follow their first fragment.
+
+Frames without an IP layer map to key ``0``.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING
+
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.feature_schema import IPV6_TAG, ip_to_int
+
+if TYPE_CHECKING:
+    from scapy.packet import Packet
+
+SHARD_KEYS = ("source", "flow")
+
+_ETHERTYPE = struct.Struct("!H")
+_IPV4_ADDRS = struct.Struct("!II")
+_IPV6_ADDRS = struct.Struct("!QQQQ")
+
+_ETHERTYPE_IPV4 = 0x0800
+_ETHERTYPE_IPV6 = 0x86DD
+_VLAN_ETHERTYPES = frozenset({0x8100, 0x88A8, 0x9100})
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+
+def addresses(packet: Packet | RawFrame) -> tuple[int, int] | None:
+    """Return ``(src, dst)`` as :func:`ip_to_int` values, or ``None``."""
+    if type(packet) is RawFrame:
+        return _raw_addresses(packet.data)
+
+    from scapy.layers.inet import IP
+    from scapy.layers.inet6 import IPv6
+
+    layer = packet.getlayer(IP) or packet.getlayer(IPv6)
+    if layer is None:
+        return None
+    return ip_to_int(layer.src), ip_to_int(layer.dst)
+
+
+def shard_key(packet: Packet | RawFrame, mode: str = "source") -> int:
+    """Return the routing key of *packet* for the given key *mode*."""
+    pair = addresses(packet)
+    if pair is None:
+        return 0
+    if mode == "source":
+        return pair[0]
+    src, dst = pair
+    return src ^ dst ^ (min(src, dst) << 1)
+
+
+def shard_index(key: int, shards: int) -> int:
+    """Map a routing *key* onto ``[0, shards)`` with a multiplicative mix."""
+    folded = (key ^ (key >> 64) ^ (key >> 128)) & _MASK64
+    return (((folded * _GOLDEN64) & _MASK64) >> 32) % shards
+
+
+def _raw_addresses(data: bytes | memoryview) -> tuple[int, int] | None:
+    try:
+        (ethertype,) = _ETHERTYPE.unpack_from(data, 12)
+        offset = 14
+        while ethertype in _VLAN_ETHERTYPES:
+            (ethertype,) = _ETHERTYPE.unpack_from(data, offset + 2)
+            offset += 4
+
+        if ethertype == _ETHERTYPE_IPV4:
+            return _IPV4_ADDRS.unpack_from(data, offset + 12)
+        if ethertype == _ETHERTYPE_IPV6:
+            s_hi, s_lo, d_hi, d_lo = _IPV6_ADDRS.unpack_from(data, offset + 8)
+            return (
+                (s_hi << 64 | s_lo) | IPV6_TAG,
+                (d_hi << 64 | d_lo) | IPV6_TAG,
+            )
+    except struct.error:
+        pass
+    return None
@@ -2,9 +2,12 @@
 DPI protocol parser.
 
 Extracts structured metadata from raw scapy packets and returns a
-:class:`~sentinel_dpi.dpi.feature_schema.PacketFeatures` dictionary.
+:class:`~sentinel_dpi.dpi.feature_schema.PacketFeatures` record.
 All layer access is defensive — missing layers produce ``None`` values
 instead of exceptions.
+
+Undissected :class:`~sentinel_dpi.core.raw_frame.RawFrame` objects from
+raw capture backends are dissected here, on the processor thread.
 """
 
 from __future__ import annotations
@@ -13,8 +16,11 @@ import logging
 from typing import TYPE_CHECKING
 
 from scapy.layers.inet import IP, TCP, UDP, ICMP
+from scapy.layers.inet6 import IPv6, _ICMPv6
+from scapy.layers.l2 import Ether
 
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
 
 if TYPE_CHECKING:
     from scapy.packet import Packet
@@ -31,22 +37,34 @@ class PacketParser:
         features = parser.parse(packet)
     """
 
-    def parse(self, packet: Packet) -> PacketFeatures:
+    def parse(self, packet: Packet | RawFrame) -> PacketFeatures:
         """Extract structured metadata from *packet*.
 
         Returns:
-            A :class:`PacketFeatures` dictionary with all fields
+            A :class:`PacketFeatures` record with all fields
             populated.  Fields whose protocol layer is absent are set
             to ``None``.
         """
+        if isinstance(packet, RawFrame):
+            frame = packet
+            packet = Ether(frame.data)
+            packet.time = frame.timestamp
+            packet_length = frame.wire_length
+        else:
+            packet_length = len(packet)
+
         # ----- IP layer -------------------------------------------------
-        src_ip: str | None = None
-        dst_ip: str | None = None
+        src_ip: int | None = None
+        dst_ip: int | None = None
 
         if packet.haslayer(IP):
             ip_layer = packet[IP]
-            src_ip = ip_layer.src
-            dst_ip = ip_layer.dst
+            src_ip = ip_to_int(ip_layer.src)
+            dst_ip = ip_to_int(ip_layer.dst)
+        elif packet.haslayer(IPv6):
+            ip6_layer = packet[IPv6]
+            src_ip = ip_to_int(ip6_layer.src)
+            dst_ip = ip_to_int(ip6_layer.dst)
 
         # ----- Transport / protocol -------------------------------------
         protocol: str = "Other"
@@ -63,7 +81,7 @@ class PacketParser:
             udp_layer = packet[UDP]
             src_port = udp_layer.sport
             dst_port = udp_layer.dport
-        elif packet.haslayer(ICMP):
+        elif packet.haslayer(ICMP) or packet.haslayer(_ICMPv6, _subclass=True):
             protocol = "ICMP"
 
         # ----- Assemble -------------------------------------------------
@@ -74,5 +92,5 @@ class PacketParser:
             protocol=protocol,
             src_port=src_port,
             dst_port=dst_port,
-            packet_length=len(packet),
+            packet_length=packet_length,
         )
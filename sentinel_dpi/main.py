@@ -8,21 +8,35 @@ shutdown.
 
 from __future__ import annotations
 
+import dataclasses
 import logging
 import threading
 import time
 
 from sentinel_dpi.api.app import create_app
 from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.afpacket_capture import AfPacketCaptureEngine
 from sentinel_dpi.core.capture_engine import CaptureEngine
+from sentinel_dpi.core.fanout_capture import FanoutCaptureEngine
+from sentinel_dpi.core.global_detectors import GlobalDetectorRunner
+from sentinel_dpi.core.interface_pipelines import InterfacePipeline, MultiInterfaceCapture
+from sentinel_dpi.core.multiprocess_processor import (
+    MultiprocessPacketProcessor,
+    detector_budget,
+    metrics_collector,
+    shard_detector_names,
+    shard_detectors,
+)
 from sentinel_dpi.core.packet_processor import PacketProcessor
 from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.pcap_replay import PcapReplayEngine
+from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
 from sentinel_dpi.detection.detection_manager import DetectionManager
 from sentinel_dpi.detection.plugins.high_traffic_detector import HighTrafficDetector
-from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
-from sentinel_dpi.dpi.parser import PacketParser
+from sentinel_dpi.dpi.batch_parser import BatchParser
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
 from sentinel_dpi.services.alert_manager import AlertManager
-from sentinel_dpi.services.metrics_service import MetricsService
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
 
 logger = logging.getLogger(__name__)
 
@@ -48,40 +62,226 @@ def _configure_logging() -> None:
     logging.root.setLevel(logging.INFO)
 
 
-def main() -> None:
-    """Bootstrap and run SentinelDPI."""
-    _configure_logging()
+def _build_capture_engine(
+    packet_queue: PacketQueue, settings: Settings,
+) -> CaptureEngine | AfPacketCaptureEngine | PcapReplayEngine:
+    """Instantiate the packet source selected by ``settings.capture_backend``."""
+    if settings.capture_backend == "replay":
+        return PcapReplayEngine(packet_queue=packet_queue, settings=settings)
+    if settings.capture_backend == "afpacket":
+        return AfPacketCaptureEngine(packet_queue=packet_queue, settings=settings)
+    if settings.capture_backend != "scapy":
+        raise ValueError(f"Unknown capture backend: {settings.capture_backend!r}")
+    return CaptureEngine(packet_queue=packet_queue, settings=settings)
 
-    # --- Dependency injection -------------------------------------------
-    settings = Settings()
-    packet_queue = PacketQueue(maxsize=settings.queue_maxsize)
-    parser = PacketParser()
 
-    # Detection layer
-    port_scan_detector = PortScanDetector(
-        threshold=settings.port_scan_threshold,
-        window_seconds=settings.port_scan_window,
-    )
-    # Metrics layer
-    metrics_service = MetricsService(
-        top_talkers_limit=settings.top_talkers_limit,
+def _detector_names(*managers: DetectionManager) -> list[str]:
+    """Class names of the detectors *managers* run."""
+    return [type(d).__name__ for manager in managers for d in manager.detectors]
+
+
+def _global_detectors(
+    metrics: MergedMetricsView, settings: Settings, alert_manager: AlertManager,
+) -> GlobalDetectorRunner:
+    """Run one high-traffic detector on the merged metrics of all shards."""
+    return GlobalDetectorRunner(
+        DetectionManager(
+            detectors=[_high_traffic_detector(metrics, settings)],
+            budget=detector_budget(settings),
+        ),
+        metrics,
+        alert_manager,
     )
 
-    # High-traffic detector
-    high_traffic_detector = HighTrafficDetector(
-        metrics_service=metrics_service,
+
+def _high_traffic_detector(
+    metrics: MetricsService | MergedMetricsView, settings: Settings,
+) -> HighTrafficDetector:
+    """Build the high-traffic detector; one per process, on *metrics*."""
+    return HighTrafficDetector(
+        metrics_service=metrics,
         threshold=settings.high_traffic_threshold,
         window=settings.high_traffic_window,
+        tick_seconds=settings.high_traffic_tick,
     )
 
-    detection_manager = DetectionManager(
-        detectors=[port_scan_detector, high_traffic_detector]
-    )
-    logger.info(
-        "Detection layer loaded — %d detector(s): %s",
-        len(detection_manager._detectors),
-        [type(d).__name__ for d in detection_manager._detectors],
+
+def _build_interface_pipelines(
+    settings: Settings,
+    alert_manager: AlertManager,
+) -> tuple[MultiInterfaceCapture, MergedMetricsView, list[str]]:
+    """Build one capture engine, queue and processor per ``settings.interfaces``.
+
+    Each interface gets its own metrics collector and detectors; a
+    single high-traffic detector reads the merged rate of all
+    interfaces.
+    An interface that cannot be opened is not replaced by the default
+    one — it is logged and the others keep capturing.
+    """
+    if settings.capture_backend not in ("scapy", "afpacket"):
+        raise ValueError(
+            f"Multi-interface capture needs a live backend, not {settings.capture_backend!r}"
+        )
+
+    services = [metrics_collector(settings) for _ in settings.interfaces]
+    metrics = MergedMetricsView(services, top_talkers_limit=settings.top_talkers_limit)
+    global_detectors = _global_detectors(metrics, settings, alert_manager)
+
+    pipelines: list[InterfacePipeline] = []
+    managers: list[DetectionManager] = []
+    for config, service in zip(settings.interfaces, services):
+        iface_settings = dataclasses.replace(
+            settings, interface=config.name, bpf_filter=config.bpf_filter,
+        )
+        iface_queue = PacketQueue(maxsize=settings.queue_maxsize)
+        engine: CaptureEngine | AfPacketCaptureEngine
+        if settings.capture_backend == "afpacket":
+            engine = AfPacketCaptureEngine(packet_queue=iface_queue, settings=iface_settings)
+        else:
+            engine = CaptureEngine(
+                packet_queue=iface_queue, settings=iface_settings, fallback=False,
+            )
+        detection_manager = DetectionManager(
+            detectors=shard_detectors(settings), budget=detector_budget(settings),
+        )
+        managers.append(detection_manager)
+        processor = PacketProcessor(
+            packet_queue=iface_queue,
+            settings=iface_settings,
+            parser=FastPacketParser(),
+            detection_manager=detection_manager,
+            metrics_service=service,
+            alert_manager=alert_manager,
+            batch_parser=BatchParser() if settings.columnar_batches else None,
+            name=f"PacketProcessor({config.display_name})",
+            interface=config.display_name,
+        )
+        pipelines.append(InterfacePipeline(config.display_name, engine, processor))
+
+    capture = MultiInterfaceCapture(pipelines, settings, global_detectors=global_detectors)
+    detectors = _detector_names(managers[0], global_detectors.detection_manager)
+    return capture, metrics, detectors
+
+
+def _build_processor(
+    packet_queue: PacketQueue,
+    settings: Settings,
+    alert_manager: AlertManager,
+) -> tuple[
+    PacketProcessor
+    | ShardedPacketProcessor
+    | FanoutCaptureEngine
+    | MultiInterfaceCapture,
+    MetricsService | MergedMetricsView,
+    list[str],
+]:
+    """Build the processing layer for the configured execution mode.
+
+    - ``interfaces`` set — a :class:`MultiInterfaceCapture` (see
+      :func:`_build_interface_pipelines`), which is also the capture
+      engine.
+    - ``capture_fanout > 0`` — a :class:`FanoutCaptureEngine`, which is
+      also the capture engine; worker deltas are merged as below.
+    - ``worker_processes > 0`` — a :class:`MultiprocessPacketProcessor`;
+      worker deltas are merged into one main-process
+      :class:`MetricsService` and high-traffic detection runs here.
+    - ``processor_workers == 1`` — a plain :class:`PacketProcessor` on
+      *packet_queue*.
+    - ``processor_workers > 1`` — a :class:`ShardedPacketProcessor`
+      whose shards each own a queue, parser, detectors and metrics
+      collector; the returned metrics object is then the merged view,
+      read by one high-traffic detector beside the shards.
+
+    Returns:
+        ``(processor, metrics, detectors)`` — *detectors* names the
+        detectors each packet passes through.
+    """
+    if settings.interfaces:
+        return _build_interface_pipelines(settings, alert_manager)
+
+    if settings.capture_fanout > 0 or settings.worker_processes > 0:
+        metrics_service = metrics_collector(settings)
+        high_traffic = _high_traffic_detector(metrics_service, settings)
+        processor: MultiprocessPacketProcessor | FanoutCaptureEngine
+        if settings.capture_fanout > 0:
+            processor = FanoutCaptureEngine(
+                settings=settings,
+                metrics_service=metrics_service,
+                alert_manager=alert_manager,
+                detection_manager=DetectionManager(
+                    detectors=[high_traffic], budget=detector_budget(settings),
+                ),
+            )
+        else:
+            processor = MultiprocessPacketProcessor(
+                packet_queue=packet_queue,
+                settings=settings,
+                metrics_service=metrics_service,
+                alert_manager=alert_manager,
+                detection_manager=DetectionManager(
+                    detectors=[high_traffic], budget=detector_budget(settings),
+                ),
+            )
+        # Worker detectors are built in the workers; name them from the
+        # settings rather than building a set here.
+        detectors = [*shard_detector_names(settings), type(high_traffic).__name__]
+        return processor, metrics_service, detectors
+
+    workers = max(1, settings.processor_workers)
+    services = [metrics_collector(settings) for _ in range(workers)]
+    if workers == 1:
+        metrics: MetricsService | MergedMetricsView = services[0]
+        queues = [packet_queue]
+    else:
+        metrics = MergedMetricsView(
+            services, top_talkers_limit=settings.top_talkers_limit,
+        )
+        queues = [PacketQueue(maxsize=settings.queue_maxsize) for _ in range(workers)]
+
+    processors: list[PacketProcessor] = []
+    managers: list[DetectionManager] = []
+    for i, (service, shard_queue) in enumerate(zip(services, queues)):
+        # Detection layer — state is per shard.
+        detectors = shard_detectors(settings)
+        if workers == 1:
+            detectors.append(_high_traffic_detector(metrics, settings))
+        detection_manager = DetectionManager(
+            detectors=detectors, budget=detector_budget(settings),
+        )
+        managers.append(detection_manager)
+        processors.append(PacketProcessor(
+            packet_queue=shard_queue,
+            settings=settings,
+            # Struct fast path for raw frames; scapy packets use the fallback.
+            parser=FastPacketParser(),
+            detection_manager=detection_manager,
+            metrics_service=service,
+            alert_manager=alert_manager,
+            batch_parser=BatchParser() if settings.columnar_batches else None,
+            name="PacketProcessor" if workers == 1 else f"PacketProcessor-{i}",
+        ))
+
+    if workers == 1:
+        return processors[0], metrics, _detector_names(managers[0])
+    # High traffic reads the merged rate: one detector beside the shards.
+    global_detectors = _global_detectors(metrics, settings, alert_manager)
+    sharded = ShardedPacketProcessor(
+        packet_queue=packet_queue,
+        settings=settings,
+        shards=processors,
+        shard_queues=queues,
+        global_detectors=global_detectors,
     )
+    return sharded, metrics, _detector_names(managers[0], global_detectors.detection_manager)
+
+
+def main() -> None:
+    """Bootstrap and run SentinelDPI."""
+    _configure_logging()
+
+    # --- Dependency injection -------------------------------------------
+    settings = Settings()
+    packet_queue = PacketQueue(maxsize=settings.queue_maxsize)
 
     # Alert layer
     alert_manager = AlertManager(
@@ -90,20 +290,24 @@ def main() -> None:
         alert_window_seconds=settings.alert_window_seconds,
     )
 
-    engine = CaptureEngine(packet_queue=packet_queue, settings=settings)
-    processor = PacketProcessor(
-        packet_queue=packet_queue,
-        settings=settings,
-        parser=parser,
-        detection_manager=detection_manager,
-        metrics_service=metrics_service,
-        alert_manager=alert_manager,
+    # Processing, metrics and detection layers
+    processor, metrics_service, detectors = _build_processor(
+        packet_queue, settings, alert_manager,
+    )
+    logger.info("Detection layer loaded — %d detector(s): %s", len(detectors), detectors)
+
+    # Fan-out workers and per-interface pipelines capture for themselves.
+    engine = (
+        processor
+        if isinstance(processor, (FanoutCaptureEngine, MultiInterfaceCapture))
+        else _build_capture_engine(packet_queue, settings)
     )
 
     # --- Start core components ------------------------------------------
     logger.info("SentinelDPI starting …")
     engine.start()
-    processor.start()
+    if processor is not engine:
+        processor.start()
     logger.info("SentinelDPI running — press Ctrl+C to stop")
 
     # --- API layer ------------------------------------------------------
@@ -113,7 +317,7 @@ def main() -> None:
             alert_manager=alert_manager,
             packet_processor=processor,
             capture_engine=engine,
-            detection_manager=detection_manager,
+            detector_names=detectors,
             settings=settings,
         )
 
@@ -143,12 +347,20 @@ def main() -> None:
     try:
         while engine.is_alive():
             time.sleep(1.0)
+        # A finished replay leaves packets queued — let the processor
+        # (and every shard) drain them so the run is measured end to end.
+        while processor.is_alive() and (
+            not packet_queue.empty()
+            or any(s["queue_depth"] for s in processor.get_shard_stats())
+        ):
+            time.sleep(0.1)
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received — shutting down …")
 
     # --- Graceful shutdown ----------------------------------------------
     engine.stop()
-    processor.stop()
+    if processor is not engine:
+        processor.stop()
     logger.info("SentinelDPI shut down complete")
 
 
@@ -1,6 +1,16 @@
 """Services layer — cross-cutting application services."""
 
 from sentinel_dpi.services.alert_manager import AlertManager
-from sentinel_dpi.services.metrics_service import MetricsService
+from sentinel_dpi.services.heavy_hitters import SpaceSaving
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+from sentinel_dpi.services.time_series import TimeSeries
+from sentinel_dpi.services.windowed_rankings import WindowedRankings
 
-__all__ = ["AlertManager", "MetricsService"]
+__all__ = [
+    "AlertManager",
+    "MergedMetricsView",
+    "MetricsService",
+    "SpaceSaving",
+    "TimeSeries",
+    "WindowedRankings",
+]
@@ -23,8 +23,14 @@ logger = logging.getLogger(__name__)
 _SEVERITY_MAP: dict[str, str] = {
     "PORT_SCAN": "HIGH",
     "HIGH_TRAFFIC": "HIGH",
+    "VOLUMETRIC": "HIGH",
+    "BEACONING": "HIGH",
 }
 _DEFAULT_SEVERITY = "MEDIUM"
+# Optional alert fields that are kept on the stored alert and that tell
+# apart alerts of one type and source (the detector of a system alert,
+# the victim of a volumetric alert, the destination of a beacon).
+_CONTEXT_FIELDS = ("detector", "target_ip")
 
 
 class AlertManager:
@@ -32,7 +38,8 @@ class AlertManager:
 
     Parameters:
         cooldown: Seconds within which a duplicate ``(type, source_ip)``
-                  alert is suppressed.
+                  alert is suppressed (alerts naming a ``detector`` or
+                  a ``target_ip`` are keyed by it as well).
         max_history: Maximum number of alerts retained in memory.
         alert_window_seconds: Rolling window (seconds) for threat-level
                               computation.  Defaults to 60.
@@ -50,8 +57,8 @@ class AlertManager:
         self._total_alerts: int = 0
         self._alerts_by_type: dict[str, int] = defaultdict(int)
 
-        # Dedup tracking: {(type, source_ip): last_timestamp}
-        self._recent_keys: dict[tuple[str, str | None], float] = {}
+        # Dedup tracking: {(type, source_ip, *context): last_timestamp}
+        self._recent_keys: dict[tuple, float] = {}
 
         # Listeners notified synchronously on each new stored alert.
         self._listeners: list[Callable[[dict], None]] = []
@@ -88,6 +95,7 @@ class AlertManager:
             for raw_alert in alerts:
                 alert_type = raw_alert.get("type", "UNKNOWN")
                 source_ip = raw_alert.get("source_ip")
+                context = tuple(raw_alert.get(field) for field in _CONTEXT_FIELDS)
                 timestamp = raw_alert.get("timestamp", 0.0)
 
                 # --- Prune expired dedup keys ---------------------------
@@ -100,7 +108,7 @@ class AlertManager:
                     del self._recent_keys[key]
 
                 # --- Deduplication --------------------------------------
-                key = (alert_type, source_ip)
+                key = (alert_type, source_ip, *context)
                 last_seen = self._recent_keys.get(key)
                 if last_seen is not None and (timestamp - last_seen) < self._cooldown:
                     continue
@@ -115,6 +123,9 @@ class AlertManager:
                     "severity": _SEVERITY_MAP.get(alert_type, _DEFAULT_SEVERITY),
                     "timestamp": timestamp,
                 }
+                for field, value in zip(_CONTEXT_FIELDS, context):
+                    if value is not None:
+                        enriched[field] = value
 
                 # --- Store ----------------------------------------------
                 self._alerts.append(enriched)
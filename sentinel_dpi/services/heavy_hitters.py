@@ -0,0 +1,235 @@
+"""
+Per-key packet counters for :class:`~sentinel_dpi.services.MetricsService`.
+
+:class:`ExactCounts` counts every key it sees and never forgets one.
+:class:`SpaceSaving` keeps at most *capacity* keys (Metwally et al.'s
+Space-Saving summary): a new key arriving when the summary is full
+replaces the key with the smallest count and inherits that count as its
+*error*.  For every monitored key::
+
+    count - error <= true count <= count
+
+and the error never exceeds ``N / capacity`` for a stream of ``N``
+packets, so every key whose true share of the stream is above
+``1 / capacity`` is monitored.
+
+Both expose the same ``add`` / ``items`` / ``errors`` / ``top`` / ``clear``
+interface, so the metrics collector is written once for either.
+
+Which sources have ever been seen is kept apart from the counters, which
+are reset by every worker delta and forget evicted keys:
+:class:`SeenSet` remembers every key, :class:`SeenFilter` one hashed bit
+per key in a fixed bitmap.  Both report a key as new at most once.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import defaultdict
+from operator import itemgetter
+from typing import Hashable, ItemsView, Iterator, Sequence
+
+import numpy as np
+
+_by_count = itemgetter(1)
+
+
+class ExactCounts(defaultdict):
+    """Unbounded exact counter — a ``defaultdict(int)`` of ``{key: count}``."""
+
+    def __init__(self) -> None:
+        super().__init__(int)
+
+    def add(self, key: Hashable, count: int = 1, error: int = 0) -> None:
+        """Add *count* to *key*; *error* is ignored (always exact)."""
+        self[key] += count
+
+    def errors(self) -> dict:
+        """Return the non-zero overestimation bounds — never any."""
+        return {}
+
+    def top(self, limit: int) -> list[tuple[Hashable, int, int]]:
+        """Return the *limit* largest ``(key, count, error)`` entries."""
+        return [
+            (key, count, 0)
+            for key, count in heapq.nlargest(limit, self.items(), key=_by_count)
+        ]
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary of at most *capacity* keys.
+
+    Adding to a monitored key is O(1).  Replacing the minimum uses a
+    lazily maintained min-heap: entries are only re-sorted when they
+    surface at the top with a stale count, so each increment is paid
+    for at most once — O(log capacity) amortised per replacement.
+
+    Counters are deliberately not kept in count order (the paper's
+    stream-summary bucket list), so :meth:`top` scans all of them —
+    O(capacity · log k).  Most adds here are weighted (bytes, batch
+    counts, merged deltas), and a bucket list must then walk past every
+    count a key overtakes.  In measurements it made unit adds 1.3–2.6×
+    and weighted adds 6–10× slower, while saving under a millisecond
+    per ``top(10)`` at 10 000 keys.  Adds run per packet; tops run once
+    per snapshot.
+
+    Parameters:
+        capacity: Most keys monitored at once.
+    """
+
+    __slots__ = ("_capacity", "_counts", "_errors", "_heap", "_seq", "total")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._counts: dict[Hashable, int] = {}
+        self._errors: dict[Hashable, int] = {}
+        # (count when pushed, tie-breaker, key); one entry per monitored
+        # key, its count never above the key's current count.
+        self._heap: list[tuple[int, int, Hashable]] = []
+        self._seq = itertools.count()
+        self.total: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """Most keys monitored at once."""
+        return self._capacity
+
+    def add(self, key: Hashable, count: int = 1, error: int = 0) -> None:
+        """Add *count* occurrences of *key*.
+
+        *error* is the overestimation already carried by *count* (when
+        merging another summary's entry).
+        """
+        self.total += count
+        counts = self._counts
+        current = counts.get(key)
+        if current is not None:
+            counts[key] = current + count
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + error
+            return
+
+        if len(counts) < self._capacity:
+            counts[key] = count
+            if error:
+                self._errors[key] = error
+            heapq.heappush(self._heap, (count, next(self._seq), key))
+            return
+
+        # Replace the true minimum, refreshing stale heap entries on the way.
+        heap = self._heap
+        while True:
+            pushed, _, victim = heap[0]
+            floor = counts[victim]
+            if pushed == floor:
+                break
+            heapq.heapreplace(heap, (floor, next(self._seq), victim))
+        del counts[victim]
+        self._errors.pop(victim, None)
+        counts[key] = floor + count
+        self._errors[key] = floor + error
+        heapq.heapreplace(heap, (floor + count, next(self._seq), key))
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._counts
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._counts)
+
+    def get(self, key: Hashable, default: int = 0) -> int:
+        """Return the (over)estimated count of *key*, *default* if unmonitored."""
+        return self._counts.get(key, default)
+
+    def items(self) -> ItemsView[Hashable, int]:
+        """Return a view of the monitored ``(key, count)`` pairs."""
+        return self._counts.items()
+
+    def errors(self) -> dict:
+        """Return ``{key: error}`` for monitored keys with a non-zero error."""
+        return dict(self._errors)
+
+    def top(self, limit: int) -> list[tuple[Hashable, int, int]]:
+        """Return the *limit* largest ``(key, count, error)`` entries.
+
+        Scans every monitored key (see the class notes on ordering).
+        """
+        errors = self._errors
+        return [
+            (key, count, errors.get(key, 0))
+            for key, count in heapq.nlargest(limit, self._counts.items(), key=_by_count)
+        ]
+
+    def clear(self) -> None:
+        """Forget every key."""
+        self._counts.clear()
+        self._errors.clear()
+        self._heap.clear()
+        self.total = 0
+
+
+class SeenSet(set):
+    """Exact record of the keys seen so far — a ``set`` that never forgets."""
+
+    def first(self, key: Hashable) -> bool:
+        """Record *key*; return ``True`` if it was not seen before."""
+        if key in self:
+            return False
+        self.add(key)
+        return True
+
+    def firsts(self, keys: Sequence[Hashable]) -> list[bool]:
+        """:meth:`first` for each of the distinct *keys*."""
+        return [self.first(key) for key in keys]
+
+
+class SeenFilter:
+    """Fixed-size record of the integer keys seen so far.
+
+    One bit per key, chosen by a multiplicative hash (a Bloom filter
+    with a single hash function).  A key is reported new at most once;
+    a new key whose bit another key already set is missed, with a
+    probability equal to the fraction of bits set — about ``n / bits``
+    after ``n`` distinct keys.
+
+    Parameters:
+        bits: Size of the bitmap, a power of two.
+    """
+
+    __slots__ = ("_bits", "_shift")
+
+    _MULTIPLIER = 0x9E3779B97F4A7C15
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, bits: int = 1 << 22) -> None:
+        if bits < 2 or bits & (bits - 1):
+            raise ValueError(f"bits must be a power of two, got {bits}")
+        self._bits = np.zeros(bits, dtype=bool)
+        self._shift = 64 - (bits.bit_length() - 1)
+
+    def first(self, key: int) -> bool:
+        """Record *key*; return ``True`` if its bit was not set before."""
+        slot = ((key * self._MULTIPLIER) & self._MASK) >> self._shift
+        if self._bits[slot]:
+            return False
+        self._bits[slot] = True
+        return True
+
+    def firsts(self, keys: Sequence[int]) -> list[bool]:
+        """:meth:`first` for each of the distinct *keys*, vectorised."""
+        if not len(keys):
+            return []
+        slots = (
+            np.asarray(keys, dtype=np.uint64) * np.uint64(self._MULTIPLIER)
+        ) >> np.uint64(self._shift)
+        # Distinct keys may share a bit; only the first of them is new.
+        _, leading = np.unique(slots, return_index=True)
+        new = np.zeros(len(slots), dtype=bool)
+        new[leading] = ~self._bits[slots[leading]]
+        self._bits[slots] = True
+        return new.tolist()
@@ -5,16 +5,61 @@ Maintains lightweight, bounded statistics derived exclusively from
 :class:`~sentinel_dpi.dpi.feature_schema.PacketFeatures`.  Has no
 knowledge of scapy, detectors, or threading.
 
+Per-host counters are keyed by the integer addresses carried in the
+features (``None`` for packets without an IP layer); they are rendered
+as strings only when a snapshot or top-talker list is produced.
+Packets are also counted per capture-interface label.
+
+By default per-host counts are exact and the host tables grow with
+every address seen.  With *host_capacity* set they are bounded
+:class:`~sentinel_dpi.services.heavy_hitters.SpaceSaving` summaries
+instead: at most that many hosts each, counts that may overestimate by
+the reported ``error``, and top talkers read from the summary.
+
+With *top_windows* set, packets and bytes per source, destination,
+destination port and protocol are also ranked over trailing windows
+(:class:`~sentinel_dpi.services.windowed_rankings.WindowedRankings`),
+so current activity is visible next to the cumulative counters.
+
+Packets, bytes, protocols and newly seen sources are also counted per
+second, with one-minute and one-hour rollups, in a fixed-size
+:class:`~sentinel_dpi.services.time_series.TimeSeries`.  Seen sources
+are remembered apart from the host counters (exactly, or in a
+:class:`~sentinel_dpi.services.heavy_hitters.SeenFilter` bitmap when
+bounded), so a delta or an evicted host never makes a source new again;
+a collector merging worker deltas decides which of their new sources
+are new to it.
+:meth:`MetricsService.current_pps` and
+:meth:`MetricsService.current_bytes_per_second` read its running window
+sums in O(1) — the cheap path for detectors that poll the rate — and
+:meth:`MetricsService.series` returns its history.
+
 Thread safety is guaranteed by an internal lock for all public methods.
+
+:class:`MergedMetricsView` presents several collectors (one per
+processor shard) as a single read-only service; counters are summed
+when a snapshot is taken.
 """
 
 from __future__ import annotations
 
 import heapq
 import threading
-from collections import defaultdict, deque
+from collections import Counter, defaultdict
+from typing import Iterable, Sequence
+
+import numpy as np
 
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+from sentinel_dpi.dpi.batch_parser import PROTOCOL_NAMES
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, format_address
+from sentinel_dpi.services.heavy_hitters import (
+    ExactCounts,
+    SeenFilter,
+    SeenSet,
+    SpaceSaving,
+)
+from sentinel_dpi.services.time_series import TimeSeries
+from sentinel_dpi.services.windowed_rankings import RANK_BY, WindowedRankings
 
 
 class MetricsService:
@@ -22,26 +67,60 @@ class MetricsService:
 
     Parameters:
         pps_window: Length (in seconds) of the rolling window used to
-                    compute packets-per-second.  Defaults to 10 s.
+                    compute packets-per-second, rounded up to whole
+                    seconds and capped at ``series_slots[0]`` (see
+                    :attr:`rate_window`).  Defaults to 10 s.
         top_talkers_limit: Number of top source IPs to return.
                            Defaults to 5.
+        host_capacity: Most hosts counted per direction (Space-Saving
+                       summaries); ``None`` counts every host exactly.
+        top_windows: Lengths (seconds) of the trailing windows to rank
+                     traffic over; empty to disable.  Their host tables
+                     are bounded by *host_capacity* too.
+        window_bucket: Time resolution (seconds) of those windows.
+        series_slots: Buckets of the time series kept at 1 s, 1 min and
+                      1 h resolution.
+        export_sources: Keep each new source and its first timestamp for
+                        :meth:`take_delta` (worker collectors), so the
+                        merging collector can tell which are new to it.
     """
 
     def __init__(
         self,
         pps_window: float = 10.0,
         top_talkers_limit: int = 5,
+        host_capacity: int | None = None,
+        top_windows: Sequence[float] = (),
+        window_bucket: float = 10.0,
+        series_slots: Sequence[int] = (3600, 1440, 168),
+        export_sources: bool = False,
     ) -> None:
-        self._pps_window = pps_window
         self._top_talkers_limit = top_talkers_limit
+        self._bounded = bool(host_capacity)
+        self._rankings = (
+            WindowedRankings(top_windows, window_bucket, host_capacity)
+            if top_windows
+            else None
+        )
 
         self._total_packets: int = 0
         self._per_protocol: dict[str, int] = defaultdict(int)
-        self._per_src_ip: dict[str, int] = defaultdict(int)
-        self._per_dst_ip: dict[str, int] = defaultdict(int)
+        self._per_src_ip: ExactCounts | SpaceSaving
+        self._per_dst_ip: ExactCounts | SpaceSaving
+        if host_capacity:
+            self._per_src_ip = SpaceSaving(host_capacity)
+            self._per_dst_ip = SpaceSaving(host_capacity)
+        else:
+            self._per_src_ip = ExactCounts()
+            self._per_dst_ip = ExactCounts()
+        self._per_interface: dict[str | None, int] = defaultdict(int)
+        # Sources seen so far; never reset, unlike the host counters.
+        self._seen: SeenSet | SeenFilter = SeenFilter() if host_capacity else SeenSet()
+        # (timestamp, source) of each new source since the last delta.
+        self._new_sources: list[tuple[float, int]] | None = [] if export_sources else None
 
-        # Timestamps for the rolling PPS calculation (sorted by arrival).
-        self._timestamps: deque[float] = deque()
+        # Per-second history; its window sums give the rolling rates.
+        self._series = TimeSeries(series_slots, window=pps_window)
 
         self._lock = threading.Lock()
 
@@ -49,32 +128,254 @@ class MetricsService:
     # Public API
     # ------------------------------------------------------------------
 
+    @property
+    def bounded(self) -> bool:
+        """Whether per-host counts are Space-Saving summaries."""
+        return self._bounded
+
+    @property
+    def top_windows(self) -> tuple[float, ...]:
+        """Lengths of the ranked trailing windows (empty when disabled)."""
+        return self._rankings.windows if self._rankings is not None else ()
+
     def update(self, features: PacketFeatures) -> None:
         """Record one packet's features into all counters (thread-safe)."""
         with self._lock:
             self._total_packets += 1
-            self._per_protocol[features["protocol"]] += 1
+            self._per_protocol[features.protocol] += 1
+            src_ip = features.src_ip
+            new = src_ip is not None and self._seen.first(src_ip)
+            self._series.add(
+                features.timestamp, features.packet_length, features.protocol, new,
+            )
+            if new and self._new_sources is not None:
+                self._new_sources.append((features.timestamp, src_ip))
+
+            if self._bounded:
+                self._per_src_ip.add(features.src_ip)
+                self._per_dst_ip.add(features.dst_ip)
+            else:
+                # Exact counters are dicts; skip the method call.
+                self._per_src_ip[features.src_ip] += 1
+                self._per_dst_ip[features.dst_ip] += 1
+            self._per_interface[features.interface] += 1
+            if self._rankings is not None:
+                self._rankings.add(
+                    features.timestamp, features.src_ip, features.dst_ip,
+                    features.dst_port, features.protocol, features.packet_length,
+                )
+
+    def update_columns(self, columns: np.ndarray, interface: str | None = None) -> None:
+        """Record a columnar batch from :class:`BatchParser` (thread-safe).
+
+        Counters are aggregated with ``np.bincount`` / ``np.unique`` so
+        the Python-level work scales with the number of distinct hosts
+        in the batch, not the number of packets.  Every row is counted
+        against the capture interface *interface*.
+        """
+        if len(columns) == 0:
+            return
+
+        protocol_counts = np.bincount(
+            columns["protocol"], minlength=len(PROTOCOL_NAMES),
+        ).tolist()
+        has_ip = columns["has_ip"]
+        unknown = int(len(columns) - np.count_nonzero(has_ip))
+        src_ips, src_first, src_counts = np.unique(
+            columns["src_ip"][has_ip], return_index=True, return_counts=True,
+        )
+        dst_ips, dst_counts = np.unique(columns["dst_ip"][has_ip], return_counts=True)
+        src_ips = src_ips.tolist()
+
+        with self._lock:
+            self._total_packets += len(columns)
+            self._per_interface[interface] += len(columns)
+            for name, count in zip(PROTOCOL_NAMES, protocol_counts):
+                if count:
+                    self._per_protocol[name] += count
+
+            new_rows = [
+                row for row, new in zip(src_first.tolist(), self._seen.firsts(src_ips)) if new
+            ]
+            new_times = columns["timestamp"][has_ip][new_rows]
+            self._series.add_batch(
+                columns["timestamp"], columns["packet_length"], columns["protocol"],
+                new_times,
+            )
+            if new_rows and self._new_sources is not None:
+                new_ips = columns["src_ip"][has_ip][new_rows]
+                self._new_sources.extend(zip(new_times.tolist(), new_ips.tolist()))
+
+            add_src = self._per_src_ip.add
+            for ip, count in zip(src_ips, src_counts.tolist()):
+                add_src(ip, count)
+            add_dst = self._per_dst_ip.add
+            for ip, count in zip(dst_ips.tolist(), dst_counts.tolist()):
+                add_dst(ip, count)
+            if unknown:
+                add_src(None, unknown)
+                add_dst(None, unknown)
+
+            if self._rankings is not None:
+                self._rankings.add_columns(columns)
+
+    def take_delta(self) -> dict:
+        """Return everything recorded since the last call and reset (thread-safe).
+
+        Used by worker processes to publish their counters to the main
+        process, which applies them with :meth:`merge`.
+
+        Returns:
+            A dictionary with the following keys:
+
+            - ``total_packets`` (int)
+            - ``per_protocol`` (dict[str, int])
+            - ``per_src_ip`` / ``per_dst_ip`` (dict[int | None, int])
+            - ``src_errors`` / ``dst_errors`` (dict[int | None, int]) —
+              overestimation of the bounded counts (empty when exact)
+            - ``per_interface`` (dict[str | None, int])
+            - ``series`` (list) — per-second buckets for
+              :meth:`TimeSeries.merge`
+            - ``windows`` (list) — ranking buckets for
+              :meth:`WindowedRankings.merge` (empty when disabled)
+            - ``new_sources`` (list) — ``(timestamp, source)`` of each
+              source new to this collector (only with *export_sources*)
+        """
+        with self._lock:
+            delta = {
+                "total_packets": self._total_packets,
+                "per_protocol": dict(self._per_protocol),
+                "per_src_ip": dict(self._per_src_ip.items()),
+                "per_dst_ip": dict(self._per_dst_ip.items()),
+                "src_errors": self._per_src_ip.errors(),
+                "dst_errors": self._per_dst_ip.errors(),
+                "per_interface": dict(self._per_interface),
+                "series": self._series.take(),
+                "windows": self._rankings.take() if self._rankings is not None else [],
+            }
+            if self._new_sources is not None:
+                delta["new_sources"], self._new_sources = self._new_sources, []
+            self._total_packets = 0
+            self._per_protocol.clear()
+            self._per_src_ip.clear()
+            self._per_dst_ip.clear()
+            self._per_interface.clear()
+        return delta
 
-            src_ip = features["src_ip"]
-            dst_ip = features["dst_ip"]
-            self._per_src_ip[src_ip if src_ip is not None else "unknown"] += 1
-            self._per_dst_ip[dst_ip if dst_ip is not None else "unknown"] += 1
+    def merge(self, delta: dict) -> None:
+        """Add a :meth:`take_delta` result into this collector (thread-safe).
 
-            self._timestamps.append(features["timestamp"])
-            self._prune_timestamps(features["timestamp"])
+        Per-second buckets are added to the seconds they belong to, so
+        workers may publish overlapping intervals in any order.  When the
+        delta lists its ``new_sources``, only those this collector has
+        not seen yet are counted as new.
+        """
+        with self._lock:
+            exported = delta.get("new_sources")
+            if exported is None:
+                self._series.merge(delta["series"])
+            else:
+                self._merge_series(delta["series"], exported)
+            if self._rankings is not None:
+                self._rankings.merge(delta.get("windows", []))
+            self._total_packets += delta["total_packets"]
+            for name, count in delta["per_protocol"].items():
+                self._per_protocol[name] += count
+            for counts, errors, table in (
+                (delta["per_src_ip"], delta.get("src_errors", {}), self._per_src_ip),
+                (delta["per_dst_ip"], delta.get("dst_errors", {}), self._per_dst_ip),
+            ):
+                for ip, count in counts.items():
+                    table.add(ip, count, errors.get(ip, 0))
+            for label, count in delta["per_interface"].items():
+                self._per_interface[label] += count
 
     def get_top_talkers(self) -> list[dict]:
         """Return top N source IPs by packet count (thread-safe).
 
-        Uses ``heapq.nlargest`` for O(n log k) efficiency.
+        Uses ``heapq.nlargest`` over the host table — at most
+        *host_capacity* entries when bounded.  Bounded entries carry an
+        ``error`` key: the most the count may overestimate.
         """
         with self._lock:
-            top = heapq.nlargest(
-                self._top_talkers_limit,
-                self._per_src_ip.items(),
-                key=lambda x: x[1],
-            )
-            return [{"ip": ip, "packets": count} for ip, count in top]
+            return self._top_talkers()
+
+    def top(
+        self,
+        window: float,
+        dimension: str = "src_ip",
+        by: str = "packets",
+        limit: int = 10,
+    ) -> list[dict]:
+        """Return the busiest keys of *dimension* over a trailing window (thread-safe).
+
+        Parameters:
+            window: One of :attr:`top_windows`.
+            dimension: ``"src_ip"``, ``"dst_ip"``, ``"dst_port"`` or
+                       ``"protocol"``.
+            by: Rank by ``"packets"`` or ``"bytes"``.
+            limit: Entries to return.
+
+        Returns:
+            ``[{"key": str | int, "packets": int, "bytes": int}, ...]``,
+            largest first.
+
+        Raises:
+            ValueError: If rankings are disabled or an argument is unknown.
+        """
+        with self._lock:
+            ranked = self._require_rankings().rank(window, dimension, by, limit)
+        return _render_ranked(dimension, ranked)
+
+    def window_table(self, window: float, dimension: str) -> dict:
+        """Return ``{key: (packets, bytes)}`` of a trailing window (thread-safe).
+
+        Used by :class:`MergedMetricsView` to rank across shards.
+        """
+        with self._lock:
+            return self._require_rankings().table(window, dimension)
+
+    @property
+    def rate_window(self) -> int:
+        """Seconds the rolling rates are averaged over."""
+        return self._series.window
+
+    def current_pps(self) -> float:
+        """Return packets per second over the rolling window (thread-safe).
+
+        O(1): reads the time series' running window sum, no counter is
+        copied.
+        """
+        with self._lock:
+            return self._series.window_packets() / self._series.window
+
+    def current_bytes_per_second(self) -> float:
+        """Return bytes per second over the rolling window (thread-safe).
+
+        O(1), like :meth:`current_pps`.
+        """
+        with self._lock:
+            return self._series.window_bytes() / self._series.window
+
+    @property
+    def latest_second(self) -> int | None:
+        """Newest second (packet time) recorded, ``None`` before any packet."""
+        with self._lock:
+            return self._series.latest
+
+    def series(
+        self,
+        resolution: int = 1,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Return per-bucket history at *resolution* seconds (thread-safe).
+
+        See :meth:`TimeSeries.range` for the parameters and the result.
+        """
+        with self._lock:
+            return self._series.range(resolution, start, end, limit)
 
     def snapshot(self) -> dict:
         """Return a point-in-time summary of collected metrics.
@@ -86,44 +387,268 @@ class MetricsService:
             - ``packets_per_protocol`` (dict[str, int])
             - ``packets_per_source_ip`` (dict[str, int])
             - ``packets_per_destination_ip`` (dict[str, int])
+            - ``packets_per_interface`` (dict[str, int]) — ``"default"``
+              for the single-interface capture
             - ``packets_per_second`` (float)
+            - ``bytes_per_second`` (float)
             - ``top_talkers`` (list[dict])
         """
         with self._lock:
-            # Prune based on the most recent timestamp (if any).
-            if self._timestamps:
-                self._prune_timestamps(self._timestamps[-1])
-
-            pps = (
-                len(self._timestamps) / self._pps_window
-                if self._timestamps
-                else 0.0
-            )
+            return {
+                "total_packets": self._total_packets,
+                "packets_per_protocol": dict(self._per_protocol),
+                "packets_per_source_ip": _render(self._per_src_ip),
+                "packets_per_destination_ip": _render(self._per_dst_ip),
+                "packets_per_interface": _render_interfaces(self._per_interface),
+                "packets_per_second": self._series.window_packets() / self._series.window,
+                "bytes_per_second": self._series.window_bytes() / self._series.window,
+                "top_talkers": self._top_talkers(),
+            }
 
-            top = heapq.nlargest(
-                self._top_talkers_limit,
-                self._per_src_ip.items(),
-                key=lambda x: x[1],
-            )
-            top_talkers = [
-                {"ip": ip, "packets": count} for ip, count in top
-            ]
+    def counters(self) -> dict:
+        """Return a copy of the raw counters for merging (thread-safe).
+
+        Returns:
+            A dictionary with the following keys:
 
+            - ``total_packets`` (int)
+            - ``per_protocol`` (dict[str, int])
+            - ``per_src_ip`` / ``per_dst_ip`` (dict[int | None, int]) —
+              keyed by integer address, ``None`` for non-IP packets
+            - ``src_errors`` / ``dst_errors`` (dict[int | None, int]) —
+              overestimation of the bounded counts (empty when exact)
+            - ``per_interface`` (dict[str | None, int])
+            - ``window_packets`` (int) — packets inside the PPS window
+            - ``window_bytes`` (int) — bytes inside the PPS window
+            - ``window_seconds`` (int) — length of that window
+        """
+        with self._lock:
             return {
                 "total_packets": self._total_packets,
-                "packets_per_protocol": dict(self._per_protocol),
-                "packets_per_source_ip": dict(self._per_src_ip),
-                "packets_per_destination_ip": dict(self._per_dst_ip),
-                "packets_per_second": pps,
-                "top_talkers": top_talkers,
+                "per_protocol": dict(self._per_protocol),
+                "per_src_ip": dict(self._per_src_ip.items()),
+                "per_dst_ip": dict(self._per_dst_ip.items()),
+                "src_errors": self._per_src_ip.errors(),
+                "dst_errors": self._per_dst_ip.errors(),
+                "per_interface": dict(self._per_interface),
+                "window_packets": self._series.window_packets(),
+                "window_bytes": self._series.window_bytes(),
+                "window_seconds": self._series.window,
             }
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
-    def _prune_timestamps(self, now: float) -> None:
-        """Remove timestamps older than the PPS window."""
-        cutoff = now - self._pps_window
-        while self._timestamps and self._timestamps[0] <= cutoff:
-            self._timestamps.popleft()
+    def _merge_series(self, buckets: list, new_sources: list[tuple[float, int]]) -> None:
+        """Merge *buckets*, counting the *new_sources* unseen here as new."""
+        firsts = self._seen.firsts([ip for _, ip in new_sources])
+        new = Counter(int(ts) for (ts, _), first in zip(new_sources, firsts) if first)
+        # Each source's first packet lies in one of the delta's buckets.
+        self._series.merge(
+            (second, packets, size, protocols, new[second])
+            for second, packets, size, protocols, _ in buckets
+        )
+
+    def _require_rankings(self) -> WindowedRankings:
+        """Return the windowed rankings, or raise if disabled."""
+        if self._rankings is None:
+            raise ValueError("Windowed rankings are disabled")
+        return self._rankings
+
+    def _top_talkers(self) -> list[dict]:
+        """Return the top N source IPs; caller must hold the lock."""
+        return _render_top(
+            self._per_src_ip.top(self._top_talkers_limit), self._bounded,
+        )
+
+
+def _render(counts: ExactCounts | SpaceSaving | dict[int | None, int]) -> dict[str, int]:
+    """Convert a per-host counter to string keys for the API."""
+    return {format_address(ip): count for ip, count in counts.items()}
+
+
+def _render_interfaces(counts: dict[str | None, int]) -> dict[str, int]:
+    """Convert a per-interface counter to labels for the API."""
+    return {label or "default": count for label, count in counts.items()}
+
+
+def _top_talkers(
+    per_src_ip: dict[int | None, int],
+    limit: int,
+    errors: dict[int | None, int] | None = None,
+) -> list[dict]:
+    """Return the *limit* busiest sources (``heapq.nlargest``).
+
+    With *errors* (bounded counters) each entry reports its ``error``.
+    """
+    top = heapq.nlargest(limit, per_src_ip.items(), key=lambda x: x[1])
+    return _render_top(
+        [(ip, count, errors.get(ip, 0) if errors else 0) for ip, count in top],
+        errors is not None,
+    )
+
+
+def _render_top(top: list[tuple], with_error: bool) -> list[dict]:
+    """Render ``(ip, count, error)`` entries as top-talker dictionaries."""
+    if with_error:
+        return [
+            {"ip": format_address(ip), "packets": count, "error": error}
+            for ip, count, error in top
+        ]
+    return [{"ip": format_address(ip), "packets": count} for ip, count, _ in top]
+
+
+def _render_ranked(dimension: str, ranked: list[tuple]) -> list[dict]:
+    """Render ``(key, packets, bytes)`` ranking entries for the API."""
+    render = format_address if dimension in ("src_ip", "dst_ip") else _identity
+    return [
+        {"key": render(key), "packets": packets, "bytes": size}
+        for key, packets, size in ranked
+    ]
+
+
+def _identity(value: object) -> object:
+    return value
+
+
+def _window_rate(parts: list[dict], key: str) -> float:
+    """Sum a windowed count over shards and divide by each shard's window."""
+    per_window: dict[int, int] = defaultdict(int)
+    for part in parts:
+        per_window[part["window_seconds"]] += part[key]
+    return sum(total / window for window, total in per_window.items())
+
+
+def _merge(counts: Iterable[dict]) -> dict:
+    """Sum a sequence of counter dictionaries."""
+    merged: Counter = Counter()
+    for part in counts:
+        merged.update(part)
+    return merged
+
+
+class MergedMetricsView:
+    """Read-only union of several :class:`MetricsService` shards.
+
+    Exposes the same read API as :class:`MetricsService`, so it can be
+    handed to the API layer and to detectors that only read metrics.
+    Shards never see each other's hosts when routed by source address,
+    so per-host counts are exact.
+
+    Parameters:
+        services: Per-shard collectors to merge.
+        top_talkers_limit: Number of top source IPs to return.
+    """
+
+    def __init__(
+        self,
+        services: Sequence[MetricsService],
+        top_talkers_limit: int = 5,
+    ) -> None:
+        self._services = list(services)
+        self._top_talkers_limit = top_talkers_limit
+
+    @property
+    def services(self) -> list[MetricsService]:
+        """The underlying per-shard collectors."""
+        return list(self._services)
+
+    def current_pps(self) -> float:
+        """Return packets per second summed over all shards."""
+        return sum(s.current_pps() for s in self._services)
+
+    def current_bytes_per_second(self) -> float:
+        """Return bytes per second summed over all shards."""
+        return sum(s.current_bytes_per_second() for s in self._services)
+
+    @property
+    def latest_second(self) -> int | None:
+        """Newest second any shard has recorded, ``None`` before any packet."""
+        seen = [s.latest_second for s in self._services]
+        return max((second for second in seen if second is not None), default=None)
+
+    def series(
+        self,
+        resolution: int = 1,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Return :meth:`MetricsService.series` summed over all shards.
+
+        Every shard is read over the same buckets, ending at the newest
+        second any shard has seen unless *end* is given.
+        """
+        if end is None:
+            end = self.latest_second
+        parts = [s.series(resolution, start, end, limit) for s in self._services]
+        merged = parts[0]
+        for part in parts[1:]:
+            for name in ("packets", "bytes", "new_sources"):
+                merged[name] = [a + b for a, b in zip(merged[name], part[name])]
+            merged["protocols"] = {
+                name: [a + b for a, b in zip(values, part["protocols"][name])]
+                for name, values in merged["protocols"].items()
+            }
+        return merged
+
+    def get_top_talkers(self) -> list[dict]:
+        """Return top N source IPs across all shards."""
+        parts = [s.counters() for s in self._services]
+        return self._top_talkers(parts, _merge(p["per_src_ip"] for p in parts))
+
+    @property
+    def top_windows(self) -> tuple[float, ...]:
+        """Lengths of the ranked trailing windows (empty when disabled)."""
+        return self._services[0].top_windows if self._services else ()
+
+    def top(
+        self,
+        window: float,
+        dimension: str = "src_ip",
+        by: str = "packets",
+        limit: int = 10,
+    ) -> list[dict]:
+        """Return :meth:`MetricsService.top` ranked across all shards."""
+        if by not in RANK_BY:
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {RANK_BY}")
+        merged: dict = defaultdict(lambda: [0, 0])
+        for service in self._services:
+            for key, (packets, size) in service.window_table(window, dimension).items():
+                entry = merged[key]
+                entry[0] += packets
+                entry[1] += size
+        column = RANK_BY.index(by)
+        ranked = heapq.nlargest(limit, merged.items(), key=lambda item: item[1][column])
+        return _render_ranked(
+            dimension, [(key, packets, size) for key, (packets, size) in ranked],
+        )
+
+    def snapshot(self) -> dict:
+        """Return a merged :meth:`MetricsService.snapshot`."""
+        parts = [s.counters() for s in self._services]
+        per_src = _merge(p["per_src_ip"] for p in parts)
+        return {
+            "total_packets": sum(p["total_packets"] for p in parts),
+            "packets_per_protocol": dict(_merge(p["per_protocol"] for p in parts)),
+            "packets_per_source_ip": _render(per_src),
+            "packets_per_destination_ip": _render(
+                _merge(p["per_dst_ip"] for p in parts),
+            ),
+            "packets_per_interface": _render_interfaces(
+                _merge(p["per_interface"] for p in parts),
+            ),
+            "packets_per_second": _window_rate(parts, "window_packets"),
+            "bytes_per_second": _window_rate(parts, "window_bytes"),
+            "top_talkers": self._top_talkers(parts, per_src),
+        }
+
+    def _top_talkers(self, parts: list[dict], per_src: dict) -> list[dict]:
+        """Return the top N of the merged *per_src* counts."""
+        errors = (
+            _merge(p["src_errors"] for p in parts)
+            if any(s.bounded for s in self._services)
+            else None
+        )
+        return _top_talkers(per_src, self._top_talkers_limit, errors)
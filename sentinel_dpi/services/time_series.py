@@ -0,0 +1,343 @@
+"""
+Per-second traffic time series for :class:`~sentinel_dpi.services.MetricsService`.
+
+Packets, bytes, packets per protocol and newly seen sources are counted
+in one-second buckets and rolled up to one-minute and one-hour buckets.
+Each resolution is a preallocated NumPy ring indexed by
+``bucket % slots``; a slot also records which bucket it holds, so a
+stale slot reads as empty and is reset when its bucket comes round
+again.  Memory is fixed by the slot counts, however fast packets
+arrive.
+
+The current second is counted in plain Python integers and written to
+every resolution when packet time moves past it.  The packets and bytes
+of the last *window* seconds are kept as running sums, so current-rate
+reads are O(1), and range queries slice the stored buckets without
+recomputing anything.  Time is packet time, as for the other metrics.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from sentinel_dpi.dpi.batch_parser import PROTO_OTHER, PROTOCOL_NAMES
+
+RESOLUTIONS: tuple[int, ...] = (1, 60, 3600)
+
+_PROTOCOL_INDEX = {name: code for code, name in enumerate(PROTOCOL_NAMES)}
+_FIELDS = ("packets", "bytes", "new_sources")
+
+
+class _Ring:
+    """Fixed-size ring of buckets at one resolution."""
+
+    __slots__ = ("resolution", "slots", "index", "packets", "bytes", "new_sources", "protocols")
+
+    def __init__(self, resolution: int, slots: int) -> None:
+        self.resolution = resolution
+        self.slots = slots
+        # Bucket number (time // resolution) held by each slot; -1 if none.
+        self.index = np.full(slots, -1, dtype=np.int64)
+        self.packets = np.zeros(slots, dtype=np.int64)
+        self.bytes = np.zeros(slots, dtype=np.int64)
+        self.new_sources = np.zeros(slots, dtype=np.int64)
+        self.protocols = np.zeros((slots, len(PROTOCOL_NAMES)), dtype=np.int64)
+
+    def add(
+        self, second: int, packets: int, size: int, protocols: Sequence[int], new: int,
+    ) -> None:
+        """Add one second's counts to the bucket containing *second*."""
+        bucket = second // self.resolution
+        slot = bucket % self.slots
+        held = self.index[slot]
+        if held > bucket:
+            return  # Older than this ring's history.
+        if held < bucket:
+            self.index[slot] = bucket
+            self.packets[slot] = 0
+            self.bytes[slot] = 0
+            self.new_sources[slot] = 0
+            self.protocols[slot] = 0
+        self.packets[slot] += packets
+        self.bytes[slot] += size
+        self.new_sources[slot] += new
+        self.protocols[slot] += protocols
+
+    def get(self, second: int) -> tuple[int, int]:
+        """Return ``(packets, bytes)`` of the bucket containing *second*."""
+        bucket = second // self.resolution
+        slot = bucket % self.slots
+        if self.index[slot] != bucket:
+            return 0, 0
+        return int(self.packets[slot]), int(self.bytes[slot])
+
+    def clear(self) -> None:
+        self.index.fill(-1)
+
+
+class TimeSeries:
+    """Per-second packet, byte, protocol and new-source counts with rollups.
+
+    Not thread-safe — the owning collector serialises access.
+
+    Parameters:
+        slots: Buckets kept at 1 s, 1 min and 1 h resolution.
+        window: Seconds covered by :meth:`window_packets` /
+                :meth:`window_bytes` (at most ``slots[0]``).
+    """
+
+    def __init__(
+        self, slots: Sequence[int] = (3600, 1440, 168), window: float = 10.0,
+    ) -> None:
+        if len(slots) != len(RESOLUTIONS) or min(slots) < 1:
+            raise ValueError(f"slots needs {len(RESOLUTIONS)} positive counts, got {slots!r}")
+        self._rings = {
+            resolution: _Ring(resolution, count)
+            for resolution, count in zip(RESOLUTIONS, slots)
+        }
+        self._window = min(max(1, math.ceil(window)), slots[0])
+        self._reset_open(None)
+        # Closed seconds inside the window (the open one is added on read).
+        self._closed_packets = 0
+        self._closed_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def add(
+        self, timestamp: float, length: int, protocol: str, new_source: bool = False,
+    ) -> None:
+        """Count one packet of *length* bytes."""
+        second = int(timestamp)  # Packet times are positive: truncation floors.
+        if second != self._second:
+            if self._second is None or second > self._second:
+                self._advance(second)
+            else:
+                protocols = [0] * len(PROTOCOL_NAMES)
+                protocols[_PROTOCOL_INDEX.get(protocol, PROTO_OTHER)] = 1
+                self._add_closed(second, 1, length, protocols, int(new_source))
+                return
+        self._packets += 1
+        self._bytes += length
+        self._protocols[_PROTOCOL_INDEX.get(protocol, PROTO_OTHER)] += 1
+        self._new += new_source
+
+    def add_batch(
+        self,
+        timestamps: np.ndarray,
+        lengths: np.ndarray,
+        protocols: np.ndarray,
+        new_source_times: Sequence[float] = (),
+    ) -> None:
+        """Count a columnar batch.
+
+        Parameters:
+            timestamps: Packet timestamps.
+            lengths: Packet lengths.
+            protocols: Protocol codes (indices into ``PROTOCOL_NAMES``).
+            new_source_times: Timestamp of each newly seen source's first
+                              packet in the batch.
+        """
+        if len(timestamps) == 0:
+            return
+        kinds = len(PROTOCOL_NAMES)
+        first, last = int(timestamps.min() // 1), int(timestamps.max() // 1)
+        if first == last:
+            # Usual case: the whole batch falls within one second.
+            self.merge([(
+                first, len(timestamps), int(lengths.sum()),
+                np.bincount(protocols, minlength=kinds).tolist(), len(new_source_times),
+            )])
+            return
+        seconds, inverse = np.unique(
+            np.floor(timestamps).astype(np.int64), return_inverse=True,
+        )
+        count = len(seconds)
+        packets = np.bincount(inverse, minlength=count)
+        volume = np.bincount(inverse, weights=lengths, minlength=count)
+        per_protocol = np.bincount(
+            inverse * kinds + protocols, minlength=count * kinds,
+        ).reshape(count, kinds)
+        new = np.zeros(count, dtype=np.int64)
+        if len(new_source_times):
+            firsts = np.floor(np.asarray(new_source_times)).astype(np.int64)
+            np.add.at(new, np.searchsorted(seconds, firsts), 1)
+        self.merge(zip(
+            seconds.tolist(), packets.tolist(), volume.astype(np.int64).tolist(),
+            per_protocol.tolist(), new.tolist(),
+        ))
+
+    def merge(self, buckets: Iterable[tuple[int, int, int, Sequence[int], int]]) -> None:
+        """Add ``(second, packets, bytes, protocols, new_sources)`` buckets.
+
+        Accepts :meth:`take` output; seconds may arrive in any order.
+        """
+        for second, packets, size, protocols, new in buckets:
+            if self._second is None or second > self._second:
+                self._advance(second)
+            if second == self._second:
+                self._packets += packets
+                self._bytes += size
+                self._new += new
+                for code, n in enumerate(protocols):
+                    self._protocols[code] += n
+            else:
+                self._add_closed(second, packets, size, protocols, new)
+
+    def take(self) -> list[tuple[int, int, int, list[int], int]]:
+        """Export every held one-second bucket, oldest first, and reset."""
+        ring = self._rings[1]
+        held = np.flatnonzero(ring.index >= 0)
+        held = held[np.argsort(ring.index[held])]
+        buckets = list(zip(
+            ring.index[held].tolist(), ring.packets[held].tolist(),
+            ring.bytes[held].tolist(), ring.protocols[held].tolist(),
+            ring.new_sources[held].tolist(),
+        ))
+        if self._second is not None and self._packets:
+            buckets.append(
+                (self._second, self._packets, self._bytes, list(self._protocols), self._new),
+            )
+        for each in self._rings.values():
+            each.clear()
+        self._reset_open(None)
+        self._closed_packets = 0
+        self._closed_bytes = 0
+        return buckets
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def window(self) -> int:
+        """Seconds summed by :meth:`window_packets` / :meth:`window_bytes`."""
+        return self._window
+
+    @property
+    def latest(self) -> int | None:
+        """The newest second seen, ``None`` before any packet."""
+        return self._second
+
+    def window_packets(self) -> int:
+        """Packets in the last *window* seconds, the current one included."""
+        return self._closed_packets + self._packets
+
+    def window_bytes(self) -> int:
+        """Bytes in the last *window* seconds, the current one included."""
+        return self._closed_bytes + self._bytes
+
+    def range(
+        self,
+        resolution: int = 1,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """Return the buckets of *resolution* between *start* and *end*.
+
+        Buckets outside the retained history, or without traffic, read
+        as zero.  The current second is included in the bucket holding
+        it.
+
+        Parameters:
+            resolution: Bucket length in seconds, one of ``RESOLUTIONS``.
+            start: First second (defaults to, and never before, the
+                   oldest bucket the ring can hold before *end*).
+            end: Last second (defaults to the newest second seen).
+            limit: Most buckets returned, newest kept.
+
+        Returns:
+            ``{"resolution", "start", "timestamps", "packets", "bytes",
+            "new_sources", "protocols": {name: [...]}}``, one list entry
+            per bucket; ``timestamps`` are bucket start times.
+
+        Raises:
+            ValueError: If *resolution* is not one of ``RESOLUTIONS`` or
+                        *start* is after *end*.
+        """
+        ring = self._rings.get(resolution)
+        if ring is None:
+            raise ValueError(
+                f"Unknown resolution {resolution!r}; expected one of {RESOLUTIONS}",
+            )
+        if start is not None and end is not None and start > end:
+            raise ValueError(f"start {start:g} is after end {end:g}")
+        newest = self._second if self._second is not None else 0
+        last = int((newest if end is None else end) // resolution)
+        # At most one ring's worth of buckets, however wide the request.
+        first = last - ring.slots + 1
+        if start is not None:
+            first = max(first, int(start // resolution))
+        if limit is not None:
+            first = max(first, last - limit + 1)
+        buckets = np.arange(first, max(first, last + 1), dtype=np.int64)
+        slots = buckets % ring.slots
+        held = ring.index[slots] == buckets
+        columns = {
+            name: np.where(held, getattr(ring, name)[slots], 0) for name in _FIELDS
+        }
+        protocols = np.where(held[:, None], ring.protocols[slots], 0)
+
+        if self._second is not None and self._packets:
+            at = self._second // resolution - first
+            if 0 <= at < len(buckets):
+                columns["packets"][at] += self._packets
+                columns["bytes"][at] += self._bytes
+                columns["new_sources"][at] += self._new
+                protocols[at] += self._protocols
+
+        series = {name: values.tolist() for name, values in columns.items()}
+        return {
+            "resolution": resolution,
+            "start": int(first * resolution),
+            "timestamps": (buckets * resolution).tolist(),
+            **series,
+            "protocols": {
+                name: protocols[:, code].tolist() for code, name in enumerate(PROTOCOL_NAMES)
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _reset_open(self, second: int | None) -> None:
+        self._second = second
+        self._packets = 0
+        self._bytes = 0
+        self._new = 0
+        self._protocols = [0] * len(PROTOCOL_NAMES)
+
+    def _add_closed(
+        self, second: int, packets: int, size: int, protocols: Sequence[int], new: int,
+    ) -> None:
+        """Add counts for a second before the current one."""
+        for ring in self._rings.values():
+            ring.add(second, packets, size, protocols, new)
+        if second > self._second - self._window:
+            self._closed_packets += packets
+            self._closed_bytes += size
+
+    def _advance(self, second: int) -> None:
+        """Write the current second to every ring and open *second*."""
+        previous = self._second
+        if previous is not None and self._packets:
+            for ring in self._rings.values():
+                ring.add(previous, self._packets, self._bytes, self._protocols, self._new)
+        self._reset_open(second)
+        if previous is None:
+            return
+
+        # Re-sum the closed seconds still inside the window.
+        ring = self._rings[1]
+        self._closed_packets = 0
+        self._closed_bytes = 0
+        for past in range(second - self._window + 1, second):
+            packets, size = ring.get(past)
+            self._closed_packets += packets
+            self._closed_bytes += size
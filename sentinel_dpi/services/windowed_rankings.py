@@ -0,0 +1,346 @@
+"""
+Sliding-window traffic rankings for :class:`~sentinel_dpi.services.MetricsService`.
+
+Counts packets and bytes per source address, destination address,
+destination port and protocol over several trailing windows (for
+example the last minute, five minutes and hour) and ranks them.
+
+Packets are added to the *open* time bucket only; columnar batches
+are held as they are and aggregated with NumPy when the bucket closes
+or is read.  When packet time moves past it, the bucket is folded into
+one running total per window and kept in a ring; a bucket leaving a
+window is subtracted from that window's total.  Work is therefore per
+packet for the open bucket and per distinct key for each closed bucket
+— history is never rescanned — and a ranking reads a window's total
+plus the open bucket.
+
+A window of *w* seconds covers the open bucket and the ``w / bucket``
+- 1 closed buckets before it, so it spans between ``w - bucket`` and
+*w* seconds of traffic.  Time is packet time, as for the PPS window.
+
+With *host_capacity* set, the open bucket counts source and
+destination addresses in :class:`~sentinel_dpi.services.heavy_hitters.SpaceSaving`
+summaries, so each bucket keeps at most that many hosts per direction
+(per shard, for buckets merged after they closed) and a window at most
+that many per bucket it spans.  Host counts may then overestimate, as
+for the bounded per-host counters.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+from collections import defaultdict
+from itertools import chain
+from typing import Hashable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP, PROTOCOL_NAMES
+from sentinel_dpi.services.heavy_hitters import SpaceSaving
+
+DIMENSIONS: tuple[str, ...] = ("src_ip", "dst_ip", "dst_port", "protocol")
+RANK_BY: tuple[str, ...] = ("packets", "bytes")
+
+# A bucket (or window total) holds two counters per dimension:
+# packets at index 2 * dimension, bytes at 2 * dimension + 1.
+_SRC_P, _SRC_B, _DST_P, _DST_B, _PORT_P, _PORT_B, _PROTO_P, _PROTO_B = range(8)
+_HOST_TABLES = (_SRC_P, _SRC_B, _DST_P, _DST_B)
+_Tables = list
+
+# Held columnar rows aggregated at once, bounding the memory they use.
+_PENDING_ROWS = 1 << 16
+
+
+def _new_bucket() -> _Tables:
+    return [defaultdict(int) for _ in range(2 * len(DIMENSIONS))]
+
+
+def _fold(target: _Tables, source: Sequence[dict], sign: int = 1) -> None:
+    """Add (or, with ``sign=-1``, subtract) *source* into *target*."""
+    for into, counts in zip(target, source):
+        if isinstance(into, SpaceSaving):
+            add = into.add
+            for key, value in counts.items():
+                add(key, value)
+            continue
+        get = into.get
+        if sign > 0:
+            # Counts are positive, so a sum never reaches zero.
+            for key, value in counts.items():
+                into[key] = get(key, 0) + value
+            continue
+        for key, value in counts.items():
+            total = get(key, 0) - value
+            if total:
+                into[key] = total
+            else:
+                del into[key]
+
+
+class WindowedRankings:
+    """Packet and byte counts per key over trailing time windows.
+
+    Not thread-safe — the owning collector serialises access.
+
+    Parameters:
+        windows: Window lengths in seconds.
+        bucket_seconds: Time resolution of the windows.
+        host_capacity: Most source / destination addresses counted per
+                       bucket; ``None`` counts every host exactly.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[float],
+        bucket_seconds: float = 10.0,
+        host_capacity: int | None = None,
+    ) -> None:
+        if not windows:
+            raise ValueError("at least one window is required")
+        self._bucket_seconds = bucket_seconds
+        self._host_capacity = host_capacity
+        self._windows = tuple(sorted(windows))
+        # Buckets per window, open bucket included.
+        self._spans = {w: max(1, math.ceil(w / bucket_seconds)) for w in self._windows}
+        self._totals: dict[float, _Tables] = {w: _new_bucket() for w in self._windows}
+        # Oldest closed bucket folded into each window's total.
+        self._edges: dict[float, int] = {w: 0 for w in self._windows}
+        # {epoch: bucket} of closed buckets, and their epochs in order.
+        self._ring: dict[int, _Tables] = {}
+        self._epochs: list[int] = []
+        self._epoch: int | None = None
+        self._open: _Tables = self._new_open()
+        # Columnar batches of the open bucket not yet aggregated.
+        self._pending: list[np.ndarray] = []
+        self._pending_rows = 0
+
+    @property
+    def windows(self) -> tuple[float, ...]:
+        """Configured window lengths, shortest first."""
+        return self._windows
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        timestamp: float,
+        src_ip: Hashable,
+        dst_ip: Hashable,
+        dst_port: int | None,
+        protocol: str,
+        length: int,
+    ) -> None:
+        """Count one packet."""
+        epoch = int(timestamp // self._bucket_seconds)
+        if self._epoch is None or epoch > self._epoch:
+            self._advance(epoch)
+        bucket = self._open
+        if self._host_capacity:
+            bucket[_SRC_P].add(src_ip)
+            bucket[_SRC_B].add(src_ip, length)
+            bucket[_DST_P].add(dst_ip)
+            bucket[_DST_B].add(dst_ip, length)
+        else:
+            # Exact tables are dicts; skip the method call.
+            bucket[_SRC_P][src_ip] += 1
+            bucket[_SRC_B][src_ip] += length
+            bucket[_DST_P][dst_ip] += 1
+            bucket[_DST_B][dst_ip] += length
+        if dst_port is not None:
+            bucket[_PORT_P][dst_port] += 1
+            bucket[_PORT_B][dst_port] += length
+        bucket[_PROTO_P][protocol] += 1
+        bucket[_PROTO_B][protocol] += length
+
+    def add_columns(self, columns: np.ndarray) -> None:
+        """Count a columnar batch from :class:`BatchParser`.
+
+        The batch is kept (not copied) until aggregated and must not be
+        modified afterwards.
+        """
+        if len(columns) == 0:
+            return
+        epochs = (columns["timestamp"] // self._bucket_seconds).astype(np.int64)
+        first, last = int(epochs.min()), int(epochs.max())
+        if first == last:
+            parts = [(first, columns)]
+        else:
+            parts = [(int(e), columns[epochs == e]) for e in np.unique(epochs)]
+        for epoch, rows in parts:
+            if self._epoch is None or epoch > self._epoch:
+                self._advance(epoch)
+            if epoch < self._epoch:
+                self.merge([(epoch, _aggregate(rows))])
+                continue
+            self._pending.append(rows)
+            self._pending_rows += len(rows)
+            if self._pending_rows >= _PENDING_ROWS:
+                self._flush()
+
+    def merge(self, buckets: Iterable[tuple[int, Sequence[dict]]]) -> None:
+        """Add ``(epoch, counts)`` buckets exported by :meth:`take`.
+
+        Buckets older than the open one are folded into the ring and the
+        windows still covering them; older than every window, dropped.
+        """
+        for epoch, counts in sorted(buckets, key=lambda item: item[0]):
+            if self._epoch is None or epoch > self._epoch:
+                self._advance(epoch)
+            if epoch == self._epoch:
+                _fold(self._open, counts)
+                continue
+            if epoch <= self._epoch - self._spans[self._windows[-1]]:
+                continue
+            closed = self._ring.get(epoch)
+            if closed is None:
+                closed = self._ring[epoch] = _new_bucket()
+                bisect.insort(self._epochs, epoch)
+            _fold(closed, counts)
+            for window, total in self._totals.items():
+                if epoch >= self._edges[window]:
+                    _fold(total, counts)
+
+    def take(self) -> list[tuple[int, list[dict]]]:
+        """Export every held bucket as ``(epoch, counts)`` and reset."""
+        self._flush()
+        held = [(epoch, [dict(c) for c in self._ring[epoch]]) for epoch in self._epochs]
+        if self._epoch is not None and any(self._open):
+            held.append((self._epoch, [dict(c.items()) for c in self._open]))
+        self._ring.clear()
+        self._epochs.clear()
+        self._open = self._new_open()
+        self._totals = {w: _new_bucket() for w in self._windows}
+        self._epoch = None
+        return held
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def table(self, window: float, dimension: str) -> dict[Hashable, tuple[int, int]]:
+        """Return ``{key: (packets, bytes)}`` of *dimension* over *window*."""
+        packets, volume = self._counters(window, dimension)
+        return {key: (count, volume.get(key, 0)) for key, count in packets}
+
+    def rank(
+        self, window: float, dimension: str, by: str = "packets", limit: int = 10,
+    ) -> list[tuple[Hashable, int, int]]:
+        """Return the *limit* largest ``(key, packets, bytes)`` of a window."""
+        packets, volume = self._counters(window, dimension)
+        if by == "packets":
+            top = heapq.nlargest(limit, packets, key=_by_value)
+            return [(key, count, volume.get(key, 0)) for key, count in top]
+        if by != "bytes":
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {RANK_BY}")
+        counts = dict(packets)
+        top = heapq.nlargest(limit, volume.items(), key=_by_value)
+        return [(key, counts.get(key, 0), size) for key, size in top]
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _counters(
+        self, window: float, dimension: str,
+    ) -> tuple[Iterator[tuple[Hashable, int]], dict[Hashable, int]]:
+        """Return a window's packet items and byte totals, open bucket included."""
+        total = self._totals.get(window)
+        if total is None:
+            raise ValueError(f"Unknown window {window!r}; expected one of {self._windows}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dimension!r}; expected one of {DIMENSIONS}")
+        self._flush()
+        index = 2 * DIMENSIONS.index(dimension)
+        closed_p, closed_b = total[index], total[index + 1]
+        open_p, open_b = self._open[index], self._open[index + 1]
+        packets = chain(
+            ((key, count + open_p.get(key, 0)) for key, count in closed_p.items()),
+            ((key, count) for key, count in open_p.items() if key not in closed_p),
+        )
+        volume = dict(closed_b)
+        for key, size in open_b.items():
+            volume[key] = volume.get(key, 0) + size
+        return packets, volume
+
+    def _advance(self, epoch: int) -> None:
+        """Close the open bucket and make *epoch* the open one."""
+        self._flush()
+        if self._epoch is not None and any(self._open):
+            closed = [dict(c.items()) for c in self._open]
+            self._ring[self._epoch] = closed
+            self._epochs.append(self._epoch)
+            for total in self._totals.values():
+                _fold(total, closed)
+        self._open = self._new_open()
+        self._epoch = epoch
+
+        ring, epochs = self._ring, self._epochs
+        for window, total in self._totals.items():
+            edge = epoch - self._spans[window] + 1
+            for old in epochs:
+                if old >= edge:
+                    break
+                if old >= self._edges[window]:
+                    _fold(total, ring[old], -1)
+            self._edges[window] = edge
+        expired = bisect.bisect_left(epochs, epoch - self._spans[self._windows[-1]] + 1)
+        for old in epochs[:expired]:
+            del ring[old]
+        del epochs[:expired]
+
+    def _new_open(self) -> _Tables:
+        """Return an empty open bucket, host tables bounded if configured."""
+        bucket = _new_bucket()
+        if self._host_capacity:
+            for index in _HOST_TABLES:
+                bucket[index] = SpaceSaving(self._host_capacity)
+        return bucket
+
+    def _flush(self) -> None:
+        """Aggregate the held columnar batches into the open bucket."""
+        if not self._pending:
+            return
+        rows = self._pending[0] if len(self._pending) == 1 else np.concatenate(self._pending)
+        self._pending = []
+        self._pending_rows = 0
+        _fold(self._open, _aggregate(rows))
+
+
+def _aggregate(columns: np.ndarray) -> list[dict]:
+    """Aggregate columnar rows into one bucket.
+
+    Hosts of non-IP rows count as ``None``, as in the per-host counters
+    of :class:`~sentinel_dpi.services.MetricsService`; only TCP and UDP
+    rows have a destination port.
+    """
+    lengths = columns["packet_length"].astype(np.int64)
+    has_ip = columns["has_ip"]
+    protocol = columns["protocol"]
+    ported = has_ip & ((protocol == PROTO_TCP) | (protocol == PROTO_UDP))
+    non_ip = len(columns) - int(np.count_nonzero(has_ip))
+    counts: list[dict] = []
+    for name, rows in (
+        ("src_ip", has_ip), ("dst_ip", has_ip), ("dst_port", ported), ("protocol", None),
+    ):
+        keys = columns[name] if rows is None else columns[name][rows]
+        weights = lengths if rows is None else lengths[rows]
+        values, inverse, packets = np.unique(keys, return_inverse=True, return_counts=True)
+        volume = np.bincount(inverse, weights=weights, minlength=len(values))
+        labels = values.tolist()
+        if name == "protocol":
+            labels = [PROTOCOL_NAMES[code] for code in labels]
+        packet_counts = dict(zip(labels, packets.tolist()))
+        byte_counts = dict(zip(labels, volume.astype(np.int64).tolist()))
+        if non_ip and rows is has_ip:
+            packet_counts[None] = non_ip
+            byte_counts[None] = int(lengths[~has_ip].sum())
+        counts += [packet_counts, byte_counts]
+    return counts
+
+
+def _by_value(item: tuple[Hashable, int]) -> int:
+    return item[1]
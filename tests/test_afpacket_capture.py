@@ -0,0 +1,133 @@
+"""Unit tests for :mod:`sentinel_dpi.core.afpacket_capture`."""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from unittest.mock import MagicMock
+
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.afpacket_capture import (
+    PACKET_FANOUT,
+    PACKET_FANOUT_DATA,
+    SOL_PACKET,
+    AfPacketCaptureEngine,
+    join_fanout,
+    read_block,
+    source_fanout_program,
+)
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+_BLOCK_SIZE = 4096
+_FIRST_PKT_OFFSET = 48  # sizeof(struct tpacket_block_desc), aligned
+_MAC_OFFSET = 32        # frame data offset inside each packet header
+
+
+def _make_ring(frames: list[tuple[bytes, int, int, int]]) -> mmap.mmap:
+    """Lay out one retired TPACKET_V3 block holding *frames*.
+
+    Each frame is ``(data, sec, nsec, wire_len)``.
+    """
+    ring = mmap.mmap(-1, _BLOCK_SIZE)
+    # block_status, num_pkts, offset_to_first_pkt
+    struct.pack_into("=III", ring, 8, 1, len(frames), _FIRST_PKT_OFFSET)
+
+    offset = _FIRST_PKT_OFFSET
+    for i, (data, sec, nsec, wire_len) in enumerate(frames):
+        slot = _MAC_OFFSET + len(data)
+        slot += -slot % 16
+        next_offset = slot if i < len(frames) - 1 else 0
+        struct.pack_into(
+            "=IIIIIIH", ring, offset,
+            next_offset, sec, nsec, len(data), wire_len, 1, _MAC_OFFSET,
+        )
+        ring[offset + _MAC_OFFSET:offset + _MAC_OFFSET + len(data)] = data
+        offset += slot
+    return ring
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestReadBlock:
+    """Walking a retired ring block."""
+
+    def test_extracts_all_frames(self) -> None:
+        ring = _make_ring([
+            (b"\x01" * 60, 100, 500_000_000, 60),
+            (b"\x02" * 90, 101, 0, 1500),
+        ])
+        frames = read_block(ring, 0, snapshot_length=65_535)
+
+        assert len(frames) == 2
+        assert frames[0] == RawFrame(b"\x01" * 60, 100.5, 60)
+        assert frames[1].data == b"\x02" * 90
+        assert frames[1].timestamp == 101.0
+        assert frames[1].wire_length == 1500
+
+    def test_snapshot_length_truncates(self) -> None:
+        ring = _make_ring([(b"\xab" * 200, 1, 0, 200)])
+        (frame,) = read_block(ring, 0, snapshot_length=64)
+
+        assert frame.data == b"\xab" * 64
+        # Wire length still reports the original size.
+        assert frame.wire_length == 200
+
+    def test_empty_block(self) -> None:
+        ring = _make_ring([])
+        assert read_block(ring, 0, snapshot_length=65_535) == []
+
+
+class TestAfPacketCaptureEngineLifecycle:
+    """Lifecycle without opening a socket."""
+
+    def test_is_alive_false_when_not_started(self) -> None:
+        engine = AfPacketCaptureEngine(PacketQueue(), Settings())
+        assert engine.is_alive() is False
+
+    def test_stop_before_start_is_safe(self) -> None:
+        engine = AfPacketCaptureEngine(PacketQueue(), Settings())
+        engine.stop()
+        stats = engine.capture_stats()
+        assert stats["captured"] == 0
+        assert stats["dropped"] == stats["kernel_dropped"] == 0
+
+
+class TestFanout:
+    """``PACKET_FANOUT`` group membership."""
+
+    def test_hash_mode_joins_group_only(self) -> None:
+        sock = MagicMock()
+        join_fanout(sock, 0x1234, "hash", 4)
+        sock.setsockopt.assert_called_once_with(SOL_PACKET, PACKET_FANOUT, 0x80001234)
+
+    def test_source_mode_installs_program(self) -> None:
+        sock = MagicMock()
+        join_fanout(sock, 7, "source", 4)
+
+        join, data = sock.setsockopt.call_args_list
+        assert join.args == (SOL_PACKET, PACKET_FANOUT, 7 | (6 << 16))
+        assert data.args[:2] == (SOL_PACKET, PACKET_FANOUT_DATA)
+        length = struct.unpack_from("H", data.args[2])[0]
+        assert length * 8 == len(source_fanout_program(4))
+
+    def test_program_divides_by_member_count(self) -> None:
+        program = source_fanout_program(3)
+        mods = [
+            struct.unpack_from("=HBBI", program, i)
+            for i in range(0, len(program), 8)
+        ]
+        assert (0x94, 0, 0, 3) in mods
+
+    def test_rejects_unknown_mode(self) -> None:
+        with pytest.raises(ValueError):
+            join_fanout(MagicMock(), 1, "random", 2)
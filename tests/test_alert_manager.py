@@ -77,6 +77,28 @@ class TestAlertManagerDedup:
         assert mgr.snapshot()["total_alerts"] == 2
 
 
+    def test_system_alerts_keyed_by_detector(self) -> None:
+        mgr = AlertManager(cooldown=10.0)
+        for name in ("PortScanDetector", "HighTrafficDetector", "PortScanDetector"):
+            mgr.process([_make_alert(
+                alert_type="DETECTOR_BUDGET", source_ip=None, timestamp=100.0,
+                detector=name,
+            )])
+        stored = mgr.snapshot()["recent_alerts"]
+        assert [a["detector"] for a in stored] == ["PortScanDetector", "HighTrafficDetector"]
+
+    def test_volumetric_alerts_keyed_by_target(self) -> None:
+        mgr = AlertManager(cooldown=10.0)
+        for target in ("192.168.1.10", "192.168.1.20", "192.168.1.10"):
+            mgr.process([_make_alert(
+                alert_type="VOLUMETRIC", source_ip=None, timestamp=100.0,
+                target_ip=target,
+            )])
+        stored = mgr.snapshot()["recent_alerts"]
+        assert [a["target_ip"] for a in stored] == ["192.168.1.10", "192.168.1.20"]
+        assert stored[0]["severity"] == "HIGH"
+
+
 class TestAlertManagerBounded:
     """Memory bounds enforcement."""
 
@@ -0,0 +1,176 @@
+"""Unit tests for :class:`sentinel_dpi.detection.plugins.anomaly_detector.AnomalyDetector`."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import shard_detectors
+from sentinel_dpi.detection.plugins.anomaly_detector import AnomalyDetector
+from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_TCP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_features(
+    src_ip: str = "10.0.0.1",
+    dst_ip: str | int = "10.0.0.2",
+    dst_port: int | None = 443,
+    timestamp: float = 1_000.0,
+    packet_length: int = 100,
+) -> PacketFeatures:
+    return PacketFeatures(
+        timestamp=timestamp,
+        src_ip=ip_to_int(src_ip),
+        dst_ip=dst_ip if isinstance(dst_ip, int) else ip_to_int(dst_ip),
+        protocol="TCP" if dst_port is not None else "ICMP",
+        src_port=40_000 if dst_port is not None else None,
+        dst_port=dst_port,
+        packet_length=packet_length,
+    )
+
+
+def _steady(
+    detector: AnomalyDetector,
+    intervals: int,
+    src_ip: str = "10.0.0.1",
+    start: float = 1_000.0,
+) -> list[dict]:
+    """Feed *intervals* one-second intervals of 9–11 packets; return alerts."""
+    alerts: list[dict] = []
+    for i in range(intervals):
+        now = start + i
+        count = 10 + (i % 3) - 1
+        detector.analyze_batch([
+            _make_features(src_ip=src_ip, timestamp=now) for _ in range(count)
+        ])
+        alerts.extend(detector.on_tick(now + 1.0) or [])
+    return alerts
+
+
+def _make_detector(**kwargs: object) -> AnomalyDetector:
+    params: dict = {"warmup": 10, "z_threshold": 4.0}
+    params.update(kwargs)
+    return AnomalyDetector(**params)
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestAnomalyBaseline:
+    """Baselines follow the observed intervals."""
+
+    def test_steady_host_learns_its_rate(self) -> None:
+        detector = _make_detector()
+        assert _steady(detector, 40) == []
+        baseline = detector.baseline(ip_to_int("10.0.0.1"))
+        assert baseline is not None
+        mean, std = baseline["pps"]
+        assert mean == pytest.approx(10.0, abs=0.5)
+        assert 0.3 < std < 1.5
+        assert baseline["peers"][0] == pytest.approx(1.0, abs=0.1)
+        assert baseline["ports"][0] == pytest.approx(1.0, abs=0.1)
+
+    def test_unknown_host_has_no_baseline(self) -> None:
+        assert _make_detector().baseline(ip_to_int("10.9.9.9")) is None
+
+
+class TestAnomalyAlerts:
+    """Outliers against the learned baseline raise ANOMALY alerts."""
+
+    def test_rate_spike(self) -> None:
+        detector = _make_detector()
+        _steady(detector, 20)
+        detector.analyze_batch([_make_features(timestamp=1_020.0) for _ in range(200)])
+        alerts = detector.on_tick(1_021.0)
+        assert alerts is not None and len(alerts) == 1
+        assert alerts[0]["type"] == "ANOMALY"
+        assert alerts[0]["source_ip"] == "10.0.0.1"
+        assert alerts[0]["metric"] in ("pps", "bytes_per_second")
+        assert alerts[0]["z_score"] > 4.0
+
+    def test_port_fan_out(self) -> None:
+        detector = _make_detector()
+        _steady(detector, 20)
+        detector.analyze_batch([
+            _make_features(dst_port=port, timestamp=1_020.0) for port in range(1, 11)
+        ])
+        alerts = detector.on_tick(1_021.0)
+        assert alerts is not None
+        assert alerts[0]["metric"] == "ports"
+
+    def test_no_scoring_during_warmup(self) -> None:
+        detector = _make_detector(warmup=30)
+        _steady(detector, 5)
+        detector.analyze_batch([_make_features(timestamp=1_005.0) for _ in range(500)])
+        assert detector.on_tick(1_006.0) is None
+
+    def test_hosts_scored_independently(self) -> None:
+        detector = _make_detector()
+        for i in range(20):
+            now = 1_000.0 + i
+            detector.analyze_batch(
+                [_make_features(src_ip="10.0.0.1", timestamp=now)] * 10
+                + [_make_features(src_ip="10.0.0.2", timestamp=now)] * 100
+            )
+            detector.on_tick(now + 1.0)
+        # 100 pkt/s is normal for .2 but not for .1.
+        detector.analyze_batch([_make_features(src_ip=ip, timestamp=1_020.0)
+                                for ip in ("10.0.0.1", "10.0.0.2") for _ in range(100)])
+        alerts = detector.on_tick(1_021.0)
+        assert alerts is not None
+        assert [a["source_ip"] for a in alerts] == ["10.0.0.1"]
+
+
+class TestAnomalySlots:
+    """Hosts occupy array slots, released when idle."""
+
+    def test_idle_host_released(self) -> None:
+        detector = _make_detector(idle_ticks=3)
+        detector.analyze_batch([_make_features()])
+        for i in range(3):
+            detector.on_tick(1_001.0 + i)
+        assert detector.tracked_hosts == 1
+        detector.on_tick(1_004.0)  # third silent interval
+        assert detector.tracked_hosts == 0
+
+    def test_max_hosts_bounds_tracking(self) -> None:
+        detector = _make_detector(max_hosts=4)
+        detector.analyze_batch([
+            _make_features(src_ip=f"10.0.0.{i}") for i in range(1, 11)
+        ])
+        assert detector.tracked_hosts == 4
+        assert detector.dropped_hosts == 6
+
+    def test_arrays_grow_past_initial_capacity(self) -> None:
+        detector = _make_detector()
+        columns = np.zeros(5_000, dtype=FEATURE_DTYPE)
+        columns["timestamp"] = 1_000.0
+        columns["has_ip"] = True
+        columns["protocol"] = PROTO_TCP
+        columns["src_ip"] = np.arange(1, 5_001)
+        columns["dst_ip"] = ip_to_int("10.0.0.2")
+        columns["dst_port"] = 443
+        columns["packet_length"] = 100
+        detector.analyze_columns(columns)
+        detector.on_tick(1_001.0)
+        assert detector.tracked_hosts == 5_000
+        assert detector.baseline(4_321)["pps"][0] == pytest.approx(1.0)
+
+
+class TestAnomalySetting:
+    """``settings.anomaly_detector`` adds the detector to every shard."""
+
+    def test_disabled_by_default(self) -> None:
+        assert not any(
+            isinstance(d, AnomalyDetector) for d in shard_detectors(Settings())
+        )
+
+    def test_enabled(self) -> None:
+        detectors = shard_detectors(Settings(anomaly_detector=True))
+        assert any(isinstance(d, AnomalyDetector) for d in detectors)
@@ -56,6 +56,92 @@ class TestMetricsEndpoint:
         assert "packets_per_source_ip" in data
         assert "packets_per_destination_ip" in data
         assert "packets_per_second" in data
+        assert data["capture"] is None
+
+    def test_metrics_include_capture_counters(self) -> None:
+        from sentinel_dpi.config.settings import Settings
+        from sentinel_dpi.core.capture_engine import CaptureEngine
+        from sentinel_dpi.core.packet_queue import PacketQueue
+
+        engine = CaptureEngine(PacketQueue(maxsize=1), Settings())
+        engine._on_packet(object())
+        engine._on_packet(object())
+        app = create_app(
+            metrics_service=MetricsService(),
+            alert_manager=AlertManager(),
+            capture_engine=engine,
+        )
+
+        capture = TestClient(app).get("/metrics").json()["capture"]
+        assert capture["policy"] == "drop_newest"
+        assert capture["captured"] == 2
+        assert capture["enqueued"] == 1
+        assert capture["dropped"] == 1
+        assert capture["kernel_dropped"] == 0
+
+
+class TestTopEndpoint:
+    """GET /top."""
+
+    def test_ranks_shortest_window_by_default(self) -> None:
+        from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+        metrics = MetricsService(top_windows=(60.0, 300.0))
+        metrics.update(PacketFeatures(
+            timestamp=1_000.0, src_ip=ip_to_int("10.0.0.1"), dst_ip=ip_to_int("10.0.0.2"),
+            protocol="UDP", src_port=5353, dst_port=53, packet_length=80,
+        ))
+        client = TestClient(create_app(metrics_service=metrics, alert_manager=AlertManager()))
+
+        data = client.get("/top", params={"dimension": "dst_port", "by": "bytes"}).json()
+        assert data == {
+            "window": 60.0,
+            "dimension": "dst_port",
+            "by": "bytes",
+            "entries": [{"key": 53, "packets": 1, "bytes": 80}],
+        }
+
+    def test_unknown_window(self) -> None:
+        metrics = MetricsService(top_windows=(60.0,))
+        client = TestClient(create_app(metrics_service=metrics, alert_manager=AlertManager()))
+        assert client.get("/top", params={"window": 90}).status_code == 400
+        assert client.get("/top", params={"dimension": "ttl"}).status_code == 422
+
+    def test_disabled(self) -> None:
+        assert _make_client().get("/top").status_code == 404
+
+
+class TestSeriesEndpoint:
+    """GET /series."""
+
+    def test_returns_range(self) -> None:
+        from sentinel_dpi.dpi.feature_schema import PacketFeatures
+
+        client, metrics, _ = _make_app()
+        for ts in (100.0, 100.5, 102.0):
+            metrics.update(PacketFeatures(
+                timestamp=ts, src_ip=1, dst_ip=2, protocol="TCP",
+                src_port=1, dst_port=80, packet_length=100,
+            ))
+        data = client.get("/series", params={"resolution": 1, "limit": 3}).json()
+        assert data["timestamps"] == [100, 101, 102]
+        assert data["packets"] == [2, 0, 1]
+        assert data["protocols"]["TCP"] == [2, 0, 1]
+
+    def test_huge_span_is_bounded(self) -> None:
+        metrics = MetricsService(series_slots=(60, 60, 24))
+        client = TestClient(create_app(metrics_service=metrics, alert_manager=AlertManager()))
+        resp = client.get("/series", params={"start": 0, "end": 10_000_000})
+        assert resp.status_code == 200
+        assert len(resp.json()["timestamps"]) <= 60
+
+    def test_rejects_start_after_end(self) -> None:
+        resp = _make_client().get("/series", params={"start": 200, "end": 100})
+        assert resp.status_code == 400
+
+    def test_rejects_unknown_resolution(self) -> None:
+        assert _make_client().get("/series", params={"resolution": 10}).status_code == 400
+        assert _make_client().get("/series", params={"limit": 0}).status_code == 400
 
 
 class TestAlertsEndpoint:
@@ -71,6 +157,87 @@ class TestAlertsEndpoint:
         assert "alerts_by_type" in data
 
 
+class TestSystemStatusEndpoint:
+    """GET /system-status."""
+
+    def test_reports_processor_shards(self) -> None:
+        from sentinel_dpi.config.settings import Settings
+        from sentinel_dpi.core.packet_processor import PacketProcessor
+        from sentinel_dpi.core.packet_queue import PacketQueue
+        from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
+        from sentinel_dpi.dpi.fast_parser import FastPacketParser
+
+        settings = Settings()
+        queues = [PacketQueue(), PacketQueue()]
+        shards = [PacketProcessor(q, settings, parser=FastPacketParser()) for q in queues]
+        processor = ShardedPacketProcessor(PacketQueue(), settings, shards, queues)
+        app = create_app(
+            metrics_service=MetricsService(),
+            alert_manager=AlertManager(),
+            packet_processor=processor,
+        )
+
+        data = TestClient(app).get("/system-status").json()
+        assert [s["shard"] for s in data["processor_shards"]] == [0, 1]
+        assert data["processor_shards"][0]["queue_depth"] == 0
+        assert "packets_per_second" in data["processor_shards"][0]
+        assert data["processor_shards"][0]["detectors"] == []
+
+    def test_no_processor_reports_no_shards(self) -> None:
+        client = _make_client()
+        assert client.get("/system-status").json()["processor_shards"] == []
+
+    def test_counts_named_detectors(self) -> None:
+        app = create_app(
+            metrics_service=MetricsService(),
+            alert_manager=AlertManager(),
+            detector_names=["PortScanDetector", "HighTrafficDetector"],
+        )
+        assert TestClient(app).get("/system-status").json()["detectors_loaded"] == 2
+
+    def test_counts_manager_detectors(self) -> None:
+        from sentinel_dpi.detection.detection_manager import DetectionManager
+        from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+
+        app = create_app(
+            metrics_service=MetricsService(),
+            alert_manager=AlertManager(),
+            detection_manager=DetectionManager([PortScanDetector()]),
+        )
+        assert TestClient(app).get("/system-status").json()["detectors_loaded"] == 1
+
+
+class TestDetectorsEndpoint:
+    """GET /detectors."""
+
+    def test_lists_detector_stats(self) -> None:
+        from sentinel_dpi.config.settings import Settings
+        from sentinel_dpi.core.packet_processor import PacketProcessor
+        from sentinel_dpi.core.packet_queue import PacketQueue
+        from sentinel_dpi.detection.detection_manager import DetectionManager
+        from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+        from sentinel_dpi.dpi.fast_parser import FastPacketParser
+
+        processor = PacketProcessor(
+            PacketQueue(), Settings(), parser=FastPacketParser(),
+            detection_manager=DetectionManager([PortScanDetector()]),
+        )
+        app = create_app(
+            metrics_service=MetricsService(),
+            alert_manager=AlertManager(),
+            packet_processor=processor,
+        )
+
+        (entry,) = TestClient(app).get("/detectors").json()["detectors"]
+        assert entry["shard"] == 0
+        assert entry["detector"] == "PortScanDetector"
+        assert entry["latency_p99_us"] == 0.0
+        assert entry["disabled"] is False
+
+    def test_no_processor_lists_nothing(self) -> None:
+        assert _make_client().get("/detectors").json() == {"detectors": []}
+
+
 # --------------------------------------------------------------------------- #
 # WebSocket Tests
 # --------------------------------------------------------------------------- #
@@ -90,6 +257,7 @@ class TestWebSocketMetrics:
             assert "packets_per_second" in msg["data"]["metrics"]
             # Top-level telemetry fields.
             assert "top_talkers" in msg["data"]
+            assert "capture" in msg["data"]
             assert "threat_level" in msg["data"]
             assert "system_status" in msg["data"]
             assert "alert_activity" in msg["data"]
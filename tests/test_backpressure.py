@@ -0,0 +1,147 @@
+"""Unit tests for :mod:`sentinel_dpi.core.backpressure`."""
+
+from __future__ import annotations
+
+import logging
+import socket
+import struct
+from unittest.mock import MagicMock
+
+import pytest
+from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.backpressure import CaptureAdmission, read_kernel_drops
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.flow_hash import shard_index, shard_key
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_admission(
+    maxsize: int = 10, **settings_overrides: object,
+) -> tuple[CaptureAdmission, PacketQueue]:
+    pq = PacketQueue(maxsize=maxsize)
+    return CaptureAdmission(pq, Settings(**settings_overrides)), pq
+
+
+def _frame(src: str, dst: str = "10.9.9.9") -> RawFrame:
+    data = bytes(Ether() / IP(src=src, dst=dst) / TCP())
+    return RawFrame(data, 0.0, len(data))
+
+
+# --------------------------------------------------------------------------- #
+# Overload policies
+# --------------------------------------------------------------------------- #
+
+class TestOverloadPolicies:
+    """Admission under each policy."""
+
+    def test_drop_newest_keeps_head_of_batch(self) -> None:
+        admission, pq = _make_admission(maxsize=3)
+        assert admission.admit(list(range(5))) == 3
+
+        assert pq.get_many(10, block=False) == [0, 1, 2]
+        stats = admission.stats()
+        assert stats["captured"] == 5
+        assert stats["enqueued"] == 3
+        assert stats["dropped_queue_full"] == 2
+        assert stats["dropped"] == 2
+
+    def test_drop_oldest_keeps_newest_packets(self) -> None:
+        admission, pq = _make_admission(maxsize=3, overload_policy="drop_oldest")
+        admission.admit([0, 1])
+        admission.admit([2, 3, 4])
+
+        assert pq.get_many(10, block=False) == [2, 3, 4]
+        stats = admission.stats()
+        assert stats["enqueued"] == 5
+        assert stats["evicted"] == 2
+        assert stats["dropped"] == 2
+        assert pq.stats()["evicted"] == 2
+
+    def test_sample_admits_one_in_n_only_when_overloaded(self) -> None:
+        admission, pq = _make_admission(
+            maxsize=100, overload_policy="sample",
+            overload_sample_rate=4, overload_threshold=0.5,
+        )
+        admission.admit(list(range(50)))
+        assert pq.qsize() == 50  # below the threshold: everything admitted
+
+        # Phase carries across batches: items 0, 4, 8, ... of the stream.
+        admission.admit(list(range(6)))
+        admission.admit(list(range(6, 12)))
+        assert pq.get_many(100, block=False)[50:] == [0, 4, 8]
+        assert admission.stats()["sampled_out"] == 9
+
+    def test_flow_sample_keeps_whole_flows(self) -> None:
+        admission, pq = _make_admission(
+            maxsize=100, overload_policy="flow_sample",
+            overload_sample_rate=4, overload_threshold=0.01,
+        )
+        pq.put(_frame("10.0.0.250"))  # push the queue over the threshold
+
+        flows = [(f"10.0.0.{i}", f"10.1.0.{i}") for i in range(40)]
+        batch = [_frame(a, b) for a, b in flows] + [_frame(b, a) for a, b in flows]
+        admission.admit(batch)
+
+        kept = set(pq.get_many(1000, block=False)[1:])
+        assert kept
+        assert all(shard_index(shard_key(f, "flow"), 4) == 0 for f in kept)
+        # Both directions of every flow are either admitted or skipped.
+        for a, b in flows:
+            assert (_frame(a, b) in kept) == (_frame(b, a) in kept)
+        assert admission.stats()["sampled_out"] == len(batch) - len(kept)
+
+    def test_sampling_never_engages_on_unbounded_queue(self) -> None:
+        admission, pq = _make_admission(maxsize=0, overload_policy="sample")
+        admission.admit(list(range(1000)))
+        assert pq.qsize() == 1000
+
+    def test_rejects_unknown_policy(self) -> None:
+        with pytest.raises(ValueError):
+            _make_admission(overload_policy="random_early_detection")
+
+
+# --------------------------------------------------------------------------- #
+# Accounting and logging
+# --------------------------------------------------------------------------- #
+
+class TestLossAccounting:
+    """Kernel drops and rate-limited summaries."""
+
+    def test_kernel_drops_and_lossless_counts(self) -> None:
+        admission, _ = _make_admission()
+        admission.count_enqueued(4)
+        admission.count_kernel_drops(7)
+
+        stats = admission.stats()
+        assert stats["captured"] == stats["enqueued"] == 4
+        assert stats["kernel_dropped"] == 7
+        assert stats["dropped"] == 0
+
+    def test_summary_is_rate_limited(self, caplog: pytest.LogCaptureFixture) -> None:
+        admission, _ = _make_admission(maxsize=1, capture_log_interval=3600.0)
+        with caplog.at_level(logging.WARNING, logger="sentinel_dpi.core.backpressure"):
+            for _ in range(100):
+                admission.admit([0, 1])
+            assert caplog.records == []
+
+            admission.log_summary()
+            admission.log_summary()  # nothing new since the last summary
+
+        assert len(caplog.records) == 1
+        assert "199 dropped (queue full)" in caplog.records[0].getMessage()
+
+    def test_read_kernel_drops_without_packet_socket(self) -> None:
+        sock = MagicMock(spec=socket.socket)
+        sock.getsockopt.side_effect = OSError
+        assert read_kernel_drops(sock) == 0
+
+        sock.getsockopt.side_effect = None
+        sock.getsockopt.return_value = struct.pack("=III", 5, 3, 0)
+        assert read_kernel_drops(sock) == 3
@@ -0,0 +1,182 @@
+"""Unit tests for :class:`sentinel_dpi.detection.plugins.beacon_detector.BeaconDetector`."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import shard_detectors
+from sentinel_dpi.detection.plugins.beacon_detector import BeaconDetector
+from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_TCP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+SRC = "10.0.0.5"
+DST = "203.0.113.9"
+
+
+def _make_features(
+    src_ip: str = SRC,
+    dst_ip: str = DST,
+    dst_port: int | None = 8443,
+    timestamp: float = 1_000.0,
+) -> PacketFeatures:
+    return PacketFeatures(
+        timestamp=timestamp,
+        src_ip=ip_to_int(src_ip),
+        dst_ip=ip_to_int(dst_ip),
+        protocol="TCP" if dst_port is not None else "ICMP",
+        src_port=40_000 if dst_port is not None else None,
+        dst_port=dst_port,
+        packet_length=200,
+    )
+
+
+def _callbacks(
+    times: list[float], src_ip: str = SRC, dst_ip: str = DST,
+) -> list[PacketFeatures]:
+    """One short exchange (three packets within 50 ms) at each time."""
+    return [
+        _make_features(src_ip=src_ip, dst_ip=dst_ip, timestamp=t + offset)
+        for t in times for offset in (0.0, 0.02, 0.05)
+    ]
+
+
+def _make_detector(**kwargs: object) -> BeaconDetector:
+    params: dict = {"min_events": 8, "cooldown": 600.0}
+    params.update(kwargs)
+    return BeaconDetector(**params)
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestBeaconScoring:
+    """Period, jitter and score of a pair's wake-ups."""
+
+    def test_exchange_counts_once(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks([1_000.0, 1_060.0, 1_120.0]))
+        stats = detector.periodicity(ip_to_int(SRC), ip_to_int(DST), 8443)
+        assert stats is not None
+        assert stats["events"] == 3
+        assert stats["period"] == pytest.approx(60.0)
+
+    def test_jittered_beacon(self) -> None:
+        rng = np.random.default_rng(1)
+        times = (1_000.0 + 60.0 * np.arange(20) + rng.normal(0.0, 1.0, 20)).tolist()
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks(times))
+        stats = detector.periodicity(ip_to_int(SRC), ip_to_int(DST), 8443)
+        assert stats["period"] == pytest.approx(60.0, abs=2.0)
+        assert stats["jitter"] < 0.05
+        assert stats["score"] > 0.9
+
+    def test_history_is_bounded(self) -> None:
+        detector = _make_detector(history=8)
+        detector.analyze_batch(_callbacks([1_000.0 + 10.0 * i for i in range(50)]))
+        assert detector.periodicity(ip_to_int(SRC), ip_to_int(DST), 8443)["events"] == 8
+
+
+class TestBeaconAlerts:
+    """Regular pairs raise BEACONING alerts on tick."""
+
+    def test_regular_pair_alerts(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks([1_000.0 + 30.0 * i for i in range(10)]))
+        alerts = detector.on_tick(1_280.0)
+        assert alerts is not None and len(alerts) == 1
+        alert = alerts[0]
+        assert alert["type"] == "BEACONING"
+        assert alert["source_ip"] == SRC
+        assert alert["target_ip"] == DST
+        assert alert["dst_port"] == 8443
+        assert alert["period_seconds"] == pytest.approx(30.0)
+
+    def test_irregular_pair_ignored(self) -> None:
+        rng = np.random.default_rng(2)
+        times = np.cumsum(rng.exponential(30.0, 20)) + 1_000.0
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks(times.tolist()))
+        assert detector.on_tick(float(times[-1]) + 1.0) is None
+
+    def test_too_few_events(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks([1_000.0 + 30.0 * i for i in range(5)]))
+        assert detector.on_tick(1_130.0) is None
+
+    def test_stopped_beacon_ignored(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_callbacks([1_000.0 + 30.0 * i for i in range(10)]))
+        assert detector.on_tick(1_500.0) is None
+
+    def test_cooldown(self) -> None:
+        detector = _make_detector(cooldown=600.0)
+        times = [1_000.0 + 30.0 * i for i in range(10)]
+        detector.analyze_batch(_callbacks(times))
+        assert detector.on_tick(1_280.0) is not None
+        detector.analyze_batch(_callbacks([1_300.0]))
+        assert detector.on_tick(1_310.0) is None
+
+    def test_columns_match_records(self) -> None:
+        times = [1_000.0 + 30.0 * i for i in range(10)]
+        columns = np.zeros(len(times), dtype=FEATURE_DTYPE)
+        columns["timestamp"] = times
+        columns["src_ip"] = ip_to_int(SRC)
+        columns["dst_ip"] = ip_to_int(DST)
+        columns["has_ip"] = True
+        columns["protocol"] = PROTO_TCP
+        columns["dst_port"] = 8443
+        columns["packet_length"] = 200
+        detector = _make_detector()
+        detector.analyze_columns(columns)
+        alerts = detector.on_tick(1_280.0)
+        assert alerts is not None
+        assert alerts[0]["period_seconds"] == pytest.approx(30.0)
+
+
+class TestBeaconEviction:
+    """Pair state is bounded."""
+
+    def test_lru_eviction(self) -> None:
+        detector = _make_detector(max_pairs=3)
+        for i in range(5):
+            detector.analyze(_make_features(dst_port=1_000 + i, timestamp=1_000.0 + i))
+        assert detector.tracked_pairs == 3
+        assert detector.evicted_lru == 2
+        assert detector.periodicity(ip_to_int(SRC), ip_to_int(DST), 1_000) is None
+
+    def test_evicted_slot_starts_clean(self) -> None:
+        detector = _make_detector(max_pairs=1)
+        detector.analyze_batch(_callbacks([1_000.0 + 30.0 * i for i in range(10)]))
+        detector.analyze(_make_features(dst_port=22, timestamp=1_400.0))
+        assert detector.on_tick(1_401.0) is None
+        assert detector.tracked_pairs == 1
+
+    def test_idle_pairs_dropped_on_tick(self) -> None:
+        detector = _make_detector(idle_seconds=100.0)
+        detector.analyze(_make_features(timestamp=1_000.0))
+        detector.analyze(_make_features(dst_port=22, timestamp=1_050.0))
+        detector.on_tick(1_120.0)
+        assert detector.tracked_pairs == 1
+        assert detector.evicted_idle == 1
+
+
+class TestBeaconSetting:
+    """``settings.beacon_detector`` adds the detector to every shard."""
+
+    def test_disabled_by_default(self) -> None:
+        assert not any(
+            isinstance(d, BeaconDetector) for d in shard_detectors(Settings())
+        )
+
+    def test_enabled(self) -> None:
+        detectors = shard_detectors(Settings(beacon_detector=True, beacon_tick=15.0))
+        beacon = next(d for d in detectors if isinstance(d, BeaconDetector))
+        assert beacon.tick_interval == 15.0
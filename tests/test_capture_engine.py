@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import queue
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -43,6 +44,64 @@ class TestCaptureEngineCallback:
         engine._on_packet(pkt2)  # should be silently dropped
 
         assert pq.qsize() == 1  # only the first packet remains
+        stats = engine.capture_stats()
+        assert stats["captured"] == 2
+        assert stats["enqueued"] == 1
+        assert stats["dropped"] == 1
+
+    def test_on_packet_drop_oldest_keeps_latest(self) -> None:
+        settings = Settings(overload_policy="drop_oldest")
+        pq = PacketQueue(maxsize=1)
+        engine = CaptureEngine(packet_queue=pq, settings=settings)
+
+        pkt1 = _make_fake_packet()
+        pkt2 = _make_fake_packet()
+        engine._on_packet(pkt1)
+        engine._on_packet(pkt2)
+
+        assert pq.get(block=False) is pkt2
+        assert engine.capture_stats()["evicted"] == 1
+
+    def test_on_packet_buffers_until_batch_size(self) -> None:
+        settings = Settings(capture_batch_size=3, capture_batch_timeout=60.0)
+        pq = PacketQueue(maxsize=10)
+        engine = CaptureEngine(packet_queue=pq, settings=settings)
+
+        engine._on_packet(_make_fake_packet())
+        engine._on_packet(_make_fake_packet())
+        assert pq.qsize() == 0  # still buffered
+
+        engine._on_packet(_make_fake_packet())
+        assert pq.qsize() == 3
+        assert pq.stats()["put_batches"] == 1
+
+    @patch("sentinel_dpi.core.capture_engine.AsyncSniffer")
+    def test_stop_flushes_pending_batch(self, mock_sniffer_cls: MagicMock) -> None:
+        settings = Settings(capture_batch_size=100, capture_batch_timeout=60.0)
+        pq = PacketQueue()
+        engine = CaptureEngine(packet_queue=pq, settings=settings)
+        engine.start()
+        engine._on_packet(_make_fake_packet())
+        engine.stop()
+
+        assert pq.qsize() == 1
+
+    @patch("sentinel_dpi.core.capture_engine.AsyncSniffer")
+    def test_lone_packet_flushed_after_timeout(self, mock_sniffer_cls: MagicMock) -> None:
+        settings = Settings(capture_batch_size=100, capture_batch_timeout=0.05)
+        pq = PacketQueue()
+        engine = CaptureEngine(packet_queue=pq, settings=settings)
+        engine.start()
+        try:
+            engine._on_packet(_make_fake_packet())
+            deadline = time.monotonic() + 5.0
+            while pq.qsize() == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Queued with no further packet and before stop().
+            assert pq.qsize() == 1
+        finally:
+            engine.stop()
+        assert pq.qsize() == 1
 
 
 class TestCaptureEngineLifecycle:
@@ -119,3 +178,15 @@ class TestCaptureEngineLifecycle:
 
         # AsyncSniffer constructor called only once
         assert mock_sniffer_cls.call_count == 1
+
+    @patch("sentinel_dpi.core.capture_engine.AsyncSniffer")
+    def test_start_raises_without_fallback(self, mock_sniffer_cls: MagicMock) -> None:
+        mock_sniffer_cls.return_value.start.side_effect = OSError("No such device")
+
+        settings = Settings(interface="missing0")
+        engine = CaptureEngine(packet_queue=PacketQueue(), settings=settings, fallback=False)
+        with pytest.raises(OSError):
+            engine.start()
+
+        mock_sniffer_cls.assert_called_once()
+        assert engine.is_alive() is False
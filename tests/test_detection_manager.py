@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
-from sentinel_dpi.detection.base_detector import BaseDetector
+import time
+
+from sentinel_dpi.detection.base_detector import (
+    BaseDetector,
+    DetectorBudget,
+    DetectorInterest,
+)
 from sentinel_dpi.detection.detection_manager import DetectionManager
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
 
 
 # --------------------------------------------------------------------------- #
@@ -15,8 +22,8 @@ def _make_features(**overrides: object) -> PacketFeatures:
     """Return a minimal ``PacketFeatures`` dict with sensible defaults."""
     base: dict = {
         "timestamp": 1_000_000.0,
-        "src_ip": "10.0.0.1",
-        "dst_ip": "10.0.0.2",
+        "src_ip": ip_to_int("10.0.0.1"),
+        "dst_ip": ip_to_int("10.0.0.2"),
         "protocol": "TCP",
         "src_port": 12345,
         "dst_port": 80,
@@ -91,3 +98,363 @@ class TestDetectionManagerMultiple:
         assert len(alerts) == 2
         types = {a["type"] for a in alerts}
         assert types == {"TEST_ALERT", "UDP_DETECTED"}
+
+
+class TestDetectionManagerColumns:
+    """Columnar batches reach detectors through the default row loop."""
+
+    def test_analyze_columns_default_loops_rows(self) -> None:
+        import numpy as np
+
+        from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_TCP, PROTO_UDP
+
+        columns = np.zeros(3, dtype=FEATURE_DTYPE)
+        columns["has_ip"] = True
+        columns["protocol"] = [PROTO_UDP, PROTO_TCP, PROTO_UDP]
+
+        manager = DetectionManager(detectors=[_ConditionalDetector()])
+        alerts = manager.analyze_columns(columns)
+        assert [a["type"] for a in alerts] == ["UDP_DETECTED", "UDP_DETECTED"]
+
+
+class _CountingDetector(BaseDetector):
+    """Records every packet it receives."""
+
+    def __init__(self, interest: DetectorInterest) -> None:
+        self.interest = interest
+        self.seen: list[PacketFeatures] = []
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        self.seen.append(features)
+        return None
+
+
+class TestDetectionManagerDispatch:
+    """Packets reach only the detectors whose interest they match."""
+
+    def test_protocol_interest(self) -> None:
+        udp_only = _CountingDetector(DetectorInterest(protocols=frozenset({"UDP"})))
+        manager = DetectionManager(detectors=[udp_only])
+        manager.analyze(_make_features(protocol="TCP"))
+        manager.analyze(_make_features(protocol="UDP"))
+        assert [f.protocol for f in udp_only.seen] == ["UDP"]
+
+    def test_required_fields(self) -> None:
+        detector = _CountingDetector(DetectorInterest(requires=("src_ip", "dst_port")))
+        manager = DetectionManager(detectors=[detector])
+        manager.analyze(_make_features(dst_port=None))
+        manager.analyze(_make_features(src_ip=None))
+        manager.analyze(_make_features())
+        assert len(detector.seen) == 1
+
+    def test_port_interest_matches_either_side(self) -> None:
+        dns = _CountingDetector(DetectorInterest(ports=frozenset({53})))
+        manager = DetectionManager(detectors=[dns])
+        manager.analyze(_make_features(dst_port=53))
+        manager.analyze(_make_features(src_port=53, dst_port=40000))
+        manager.analyze(_make_features(dst_port=80))
+        assert len(dns.seen) == 2
+
+    def test_sample_rate(self) -> None:
+        sampled = _CountingDetector(DetectorInterest(sample_rate=3))
+        manager = DetectionManager(detectors=[sampled])
+        for i in range(7):
+            manager.analyze(_make_features(timestamp=float(i)))
+        assert [f.timestamp for f in sampled.seen] == [0.0, 3.0, 6.0]
+
+    def test_tick_only_detector_gets_no_packets(self) -> None:
+        periodic = _CountingDetector(DetectorInterest(per_packet=False))
+        manager = DetectionManager(detectors=[periodic])
+        manager.analyze(_make_features())
+        assert periodic.seen == []
+
+    def test_stats_report_invocations(self) -> None:
+        manager = DetectionManager(detectors=[
+            _AlwaysAlertDetector(), PortScanDetector(threshold=100),
+        ])
+        manager.analyze(_make_features(protocol="ICMP", src_port=None, dst_port=None))
+        manager.analyze(_make_features())
+
+        always, port_scan = manager.stats()
+        counters = {
+            "detector": "_AlwaysAlertDetector",
+            "per_packet": True,
+            "invocations": 2,
+            "skipped": 0,
+            "alerts": 2,
+            "tick_interval": None,
+            "ticks": 0,
+            "tick_last_ms": 0.0,
+            "tick_max_ms": 0.0,
+            "tick_total_ms": 0.0,
+            "sample_factor": 1,
+            "disabled": False,
+        }
+        assert {key: always[key] for key in counters} == counters
+        assert always["time_total_ms"] > 0.0
+        assert port_scan["invocations"] == 1
+        assert port_scan["skipped"] == 1
+
+    def test_columns_are_filtered_by_interest(self) -> None:
+        import numpy as np
+
+        from sentinel_dpi.dpi.batch_parser import (
+            FEATURE_DTYPE, PROTO_ICMP, PROTO_TCP, PROTO_UDP,
+        )
+
+        columns = np.zeros(4, dtype=FEATURE_DTYPE)
+        columns["has_ip"] = [True, True, False, True]
+        columns["protocol"] = [PROTO_TCP, PROTO_ICMP, PROTO_UDP, PROTO_UDP]
+        columns["dst_port"] = [80, 0, 53, 53]
+
+        detector = _CountingDetector(
+            DetectorInterest(protocols=frozenset({"TCP", "UDP"}), requires=("src_ip",)),
+        )
+        manager = DetectionManager(detectors=[detector])
+        manager.analyze_columns(columns)
+        assert [f.dst_port for f in detector.seen] == [80, 53]
+        assert manager.stats()[0]["skipped"] == 2
+
+
+class _BatchRecordingDetector(BaseDetector):
+    """Records the batches it receives."""
+
+    interest = DetectorInterest(requires=("dst_port",))
+
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        raise AssertionError("batches must not fall back to analyze()")
+
+    def analyze_batch(self, features_batch) -> list[dict] | None:
+        self.batches.append(len(features_batch))
+        return [{"type": "BATCH", "size": len(features_batch)}]
+
+
+class TestDetectionManagerBatch:
+    """Batches reach each detector in a single call."""
+
+    def test_default_analyze_batch_loops(self) -> None:
+        manager = DetectionManager(detectors=[_ConditionalDetector()])
+        alerts = manager.analyze_batch([
+            _make_features(protocol="UDP"),
+            _make_features(protocol="TCP"),
+            _make_features(protocol="UDP"),
+        ])
+        assert [a["type"] for a in alerts] == ["UDP_DETECTED", "UDP_DETECTED"]
+
+    def test_batch_filtered_once_per_detector(self) -> None:
+        detector = _BatchRecordingDetector()
+        manager = DetectionManager(detectors=[detector])
+        alerts = manager.analyze_batch([
+            _make_features(),
+            _make_features(dst_port=None),
+            _make_features(),
+        ])
+        assert detector.batches == [2]
+        assert alerts == [{"type": "BATCH", "size": 2}]
+        assert manager.stats()[0]["invocations"] == 2
+        assert manager.stats()[0]["skipped"] == 1
+
+    def test_empty_selection_skips_detector(self) -> None:
+        detector = _BatchRecordingDetector()
+        manager = DetectionManager(detectors=[detector])
+        assert manager.analyze_batch([_make_features(dst_port=None)]) == []
+        assert detector.batches == []
+
+
+class _TickingDetector(BaseDetector):
+    """Records its ticks; optionally alerts or fails on each."""
+
+    def __init__(
+        self, interval: float, per_packet: bool = True, fail: bool = False,
+    ) -> None:
+        self.interest = DetectorInterest(per_packet=per_packet)
+        self.tick_interval = interval
+        self.fail = fail
+        self.ticks: list[float] = []
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        return None
+
+    def on_tick(self, now: float) -> list[dict] | None:
+        self.ticks.append(now)
+        if self.fail:
+            raise RuntimeError("boom")
+        return [{"type": "TICK", "now": now}]
+
+
+class TestDetectionManagerTick:
+    """The scheduler calls on_tick at each detector's interval."""
+
+    def test_ticks_at_interval(self) -> None:
+        detector = _TickingDetector(interval=5.0)
+        manager = DetectionManager(detectors=[detector])
+        for now in (100.0, 102.0, 104.9, 105.0, 109.0, 110.0):
+            manager.tick(now)
+        assert detector.ticks == [100.0, 105.0, 110.0]
+
+    def test_detectors_without_interval_are_not_ticked(self) -> None:
+        manager = DetectionManager(detectors=[_NeverAlertDetector()])
+        assert manager.tick(100.0) == []
+        assert manager.stats()[0]["ticks"] == 0
+
+    def test_no_tick_before_first_packet(self) -> None:
+        detector = _TickingDetector(interval=1.0)
+        manager = DetectionManager(detectors=[detector])
+        assert manager.tick() == []
+        manager.analyze(_make_features(timestamp=50.0))
+        assert manager.tick() == [{"type": "TICK", "now": 50.0}]
+
+    def test_clock_follows_packets_and_idle_time(self, monkeypatch) -> None:
+        import sentinel_dpi.detection.detection_manager as module
+
+        mono = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: mono[0])
+        manager = DetectionManager(detectors=[])
+        assert manager.clock() is None
+
+        manager.analyze_batch([_make_features(timestamp=50.0)])
+        assert manager.clock() == 50.0
+        mono[0] += 3.0  # idle: packet time keeps running
+        assert manager.clock() == 53.0
+        manager.advance(40.0)  # older timestamps never move it back
+        assert manager.clock() == 53.0
+        manager.advance(60.0)
+        assert manager.clock() == 60.0
+
+    def test_tick_only_detector_is_driven(self) -> None:
+        detector = _TickingDetector(interval=1.0, per_packet=False)
+        manager = DetectionManager(detectors=[detector])
+        manager.analyze(_make_features(timestamp=7.0))
+        assert manager.tick() == [{"type": "TICK", "now": 7.0}]
+        assert manager.stats()[0]["invocations"] == 0
+
+    def test_failing_tick_does_not_stop_others(self) -> None:
+        failing = _TickingDetector(interval=1.0, fail=True)
+        healthy = _TickingDetector(interval=1.0)
+        manager = DetectionManager(detectors=[failing, healthy])
+        assert manager.tick(1.0) == [{"type": "TICK", "now": 1.0}]
+        assert manager.tick(2.0) == [{"type": "TICK", "now": 2.0}]
+        assert failing.ticks == [1.0, 2.0]
+
+    def test_stats_report_tick_runtime(self) -> None:
+        manager = DetectionManager(detectors=[_TickingDetector(interval=1.0)])
+        manager.tick(1.0)
+        manager.tick(2.0)
+        stats = manager.stats()[0]
+        assert stats["tick_interval"] == 1.0
+        assert stats["ticks"] == 2
+        assert stats["alerts"] == 2
+        assert 0.0 <= stats["tick_last_ms"] <= stats["tick_max_ms"] <= stats["tick_total_ms"]
+
+    def test_tick_expires_idle_port_scan_sources(self) -> None:
+        detector = PortScanDetector(window_seconds=10.0)
+        manager = DetectionManager(detectors=[detector])
+        manager.analyze(_make_features(timestamp=100.0))
+        manager.tick(105.0)
+        assert detector.tracked_sources == 1
+        manager.tick(111.0)
+        assert detector.tracked_sources == 0
+
+
+class _SlowDetector(BaseDetector):
+    """Burns a fixed amount of time per packet."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.seen = 0
+
+    def analyze(self, features: PacketFeatures) -> list[dict] | None:
+        self.seen += 1
+        deadline = time.perf_counter() + self.seconds
+        while time.perf_counter() < deadline:
+            pass
+        return None
+
+
+class TestDetectionManagerBudget:
+    """Detectors over budget are sampled down, then disabled."""
+
+    @staticmethod
+    def _window(manager: DetectionManager, packets: int, mono: list[float]) -> list[dict]:
+        """Feed *packets* packets, then close one budget window."""
+        manager.analyze_batch([_make_features(timestamp=1.0)] * packets)
+        mono[0] += 1.0
+        return manager.tick()
+
+    def test_over_budget_samples_then_disables(self, monkeypatch) -> None:
+        import sentinel_dpi.detection.detection_manager as module
+
+        mono = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: mono[0])
+        slow = _SlowDetector(seconds=50e-6)
+        budget = DetectorBudget(us_per_packet=10.0, window=1.0, max_sample_rate=4)
+        manager = DetectionManager([slow], budget=budget)
+
+        (alert,) = self._window(manager, 20, mono)
+        assert alert["type"] == "DETECTOR_BUDGET"
+        assert alert["detector"] == "_SlowDetector"
+        assert (alert["action"], alert["sample_factor"]) == ("sampled", 2)
+        assert alert["us_per_packet"] > 10.0
+
+        slow.seen = 0
+        (alert,) = self._window(manager, 20, mono)
+        assert slow.seen == 10
+        assert (alert["action"], alert["sample_factor"]) == ("sampled", 4)
+
+        (alert,) = self._window(manager, 20, mono)
+        assert alert["action"] == "disabled"
+        assert manager.stats()[0]["disabled"] is True
+
+        slow.seen = 0
+        assert self._window(manager, 20, mono) == []
+        assert slow.seen == 0
+
+    def test_sampled_detector_recovers_under_budget(self, monkeypatch) -> None:
+        import sentinel_dpi.detection.detection_manager as module
+
+        mono = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: mono[0])
+        slow = _SlowDetector(seconds=50e-6)
+        budget = DetectorBudget(us_per_packet=10.0, window=1.0)
+        manager = DetectionManager([slow], budget=budget)
+        self._window(manager, 20, mono)
+        assert manager.stats()[0]["sample_factor"] == 2
+
+        slow.seconds = 0.0
+        assert self._window(manager, 20, mono) == []
+        assert manager.stats()[0]["sample_factor"] == 1
+
+    def test_detector_budget_overrides_default(self, monkeypatch) -> None:
+        import sentinel_dpi.detection.detection_manager as module
+
+        mono = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: mono[0])
+        limited, unlimited = _SlowDetector(seconds=50e-6), _SlowDetector(seconds=50e-6)
+        limited.budget = DetectorBudget(us_per_packet=10.0, window=1.0)
+        manager = DetectionManager([limited, unlimited])
+
+        (alert,) = self._window(manager, 20, mono)
+        assert [s["sample_factor"] for s in manager.stats()] == [2, 1]
+
+    def test_within_budget_no_alert(self, monkeypatch) -> None:
+        import sentinel_dpi.detection.detection_manager as module
+
+        mono = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: mono[0])
+        manager = DetectionManager(
+            [_NeverAlertDetector()], budget=DetectorBudget(us_per_packet=1e6, window=1.0),
+        )
+        assert self._window(manager, 20, mono) == []
+        assert manager.stats()[0]["sample_factor"] == 1
+
+    def test_stats_report_latency_percentiles(self) -> None:
+        manager = DetectionManager([_SlowDetector(seconds=20e-6)])
+        for _ in range(10):
+            manager.analyze(_make_features())
+        stats = manager.stats()[0]
+        assert 20.0 <= stats["latency_p50_us"] <= stats["latency_p95_us"] <= stats["latency_p99_us"]
+        assert stats["time_total_ms"] >= 10 * 20e-3
+        assert stats["us_per_packet"] >= 20.0
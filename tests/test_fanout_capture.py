@@ -0,0 +1,116 @@
+"""Unit tests for :class:`sentinel_dpi.core.fanout_capture.FanoutCaptureEngine`."""
+
+from __future__ import annotations
+
+import socket
+import time
+
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.afpacket_capture import ETH_P_ALL
+from sentinel_dpi.core.fanout_capture import FanoutCaptureEngine
+from sentinel_dpi.services.alert_manager import AlertManager
+from sentinel_dpi.services.metrics_service import MetricsService
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _can_capture() -> bool:
+    try:
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+    except (AttributeError, OSError):
+        return False
+    sock.close()
+    return True
+
+
+def _make_fanout(**settings_overrides: object) -> tuple[
+    FanoutCaptureEngine, MetricsService, AlertManager,
+]:
+    settings = Settings(
+        interface="lo",
+        capture_fanout=2,
+        afpacket_block_size=1 << 16,
+        afpacket_block_count=8,
+        worker_publish_interval=0.05,
+        **settings_overrides,
+    )
+    metrics = MetricsService(pps_window=1e9)
+    alerts = AlertManager()
+    return FanoutCaptureEngine(settings, metrics, alerts), metrics, alerts
+
+
+def _send_udp(src: str, dport: int) -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((src, 0))
+        sock.sendto(b"probe", ("127.0.0.1", dport))
+
+
+def _wait_for(predicate, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestFanoutCaptureEngine:
+    """Coordinator API without starting workers."""
+
+    def test_rejects_unknown_mode(self) -> None:
+        with pytest.raises(ValueError):
+            _make_fanout(fanout_mode="random")
+
+    def test_idle_read_api(self) -> None:
+        engine, _, _ = _make_fanout()
+        assert engine.is_alive() is False
+        assert engine.get_traffic_feed() == []
+        assert engine.get_queue_stats() is None
+        assert [s["shard"] for s in engine.get_shard_stats()] == [0, 1]
+
+        stats = engine.capture_stats()
+        assert stats["sockets"] == 2
+        assert stats["captured"] == 0
+        engine.stop()  # never started: no-op
+
+
+@pytest.mark.skipif(not _can_capture(), reason="needs AF_PACKET and CAP_NET_RAW")
+class TestFanoutCaptureLive:
+    """Two fan-out sockets on the loopback interface."""
+
+    def test_source_mode_keeps_scanner_on_one_worker(self) -> None:
+        engine, metrics, alerts = _make_fanout(port_scan_threshold=10)
+        engine.start()
+        try:
+            _wait_for(lambda: all(s["capture"] for s in engine.get_shard_stats()))
+            for port in range(40_000, 40_012):
+                _send_udp("127.0.0.66", port)
+            for i in range(1, 21):
+                _send_udp(f"127.0.1.{i}", 9)
+            _wait_for(
+                lambda: len(metrics.snapshot()["packets_per_source_ip"]) >= 21
+                and alerts.snapshot()["total_alerts"] >= 1,
+            )
+        finally:
+            engine.stop()
+
+        per_source = metrics.snapshot()["packets_per_source_ip"]
+        assert per_source["127.0.0.66"] >= 12
+        assert all(per_source[f"127.0.1.{i}"] >= 1 for i in range(1, 21))
+        scans = [a for a in alerts.snapshot()["recent_alerts"] if a["type"] == "PORT_SCAN"]
+        assert [a["source_ip"] for a in scans] == ["127.0.0.66"]
+
+        shards = engine.get_shard_stats()
+        assert all(s["packets_processed"] > 0 for s in shards)
+        assert engine.capture_stats()["captured"] == sum(
+            s["capture"]["captured"] for s in shards
+        )
+        assert engine.is_alive() is False
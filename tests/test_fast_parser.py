@@ -0,0 +1,121 @@
+"""Unit tests for :class:`sentinel_dpi.dpi.fast_parser.FastPacketParser`."""
+
+from __future__ import annotations
+
+import pytest
+from scapy.layers.inet import GRE, ICMP, IP, TCP, UDP
+from scapy.layers.inet6 import (
+    ICMPv6EchoRequest,
+    IPv6,
+    IPv6ExtHdrDestOpt,
+    IPv6ExtHdrFragment,
+    IPv6ExtHdrHopByHop,
+)
+from scapy.layers.l2 import ARP, Dot1AD, Dot1Q, Ether
+
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
+from sentinel_dpi.dpi.parser import PacketParser
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _eth() -> Ether:
+    # Explicit MACs keep scapy from resolving the destination.
+    return Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")
+
+
+def _frame(pkt, snaplen: int = 65_535) -> RawFrame:
+    data = bytes(pkt)
+    return RawFrame(data[:snaplen], 1_000_000.5, len(data))
+
+
+_SAME_AS_SCAPY = {
+    "ipv4_tcp": _eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1234, dport=80),
+    "ipv4_udp": _eth() / IP(src="192.168.1.1", dst="8.8.8.8") / UDP(sport=5353, dport=53),
+    "ipv4_icmp": _eth() / IP(src="10.1.1.1", dst="10.1.1.2") / ICMP(),
+    "ipv4_options": _eth() / IP(src="10.0.0.1", dst="10.0.0.2", options=b"\x01" * 8) / TCP(dport=22),
+    "ipv4_other_proto": _eth() / IP(src="10.0.0.1", dst="10.0.0.2", proto=89),
+    "ipv4_first_fragment": _eth() / IP(src="10.0.0.1", dst="10.0.0.2", flags="MF") / UDP(dport=123),
+    "ipv4_later_fragment": _eth() / IP(src="10.0.0.1", dst="10.0.0.2", frag=5) / TCP(dport=80),
+    "vlan": _eth() / Dot1Q(vlan=10) / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=443),
+    "qinq": _eth() / Dot1AD(vlan=5) / Dot1Q(vlan=10) / IP(src="1.1.1.1", dst="2.2.2.2") / UDP(dport=9),
+    "ipv6_tcp": _eth() / IPv6(src="2001:db8::1", dst="2001:db8::2") / TCP(sport=40000, dport=443),
+    "ipv6_icmp": _eth() / IPv6(src="fe80::1", dst="ff02::1") / ICMPv6EchoRequest(),
+    "ipv6_ext_headers": (
+        _eth() / IPv6(src="2001:db8::1", dst="2001:db8::2")
+        / IPv6ExtHdrHopByHop() / IPv6ExtHdrDestOpt() / UDP(dport=5000)
+    ),
+    "ipv6_fragment": (
+        _eth() / IPv6(src="2001:db8::1", dst="2001:db8::2")
+        / IPv6ExtHdrFragment(offset=0, m=1) / TCP(dport=80)
+    ),
+    "ipv6_later_fragment": (
+        _eth() / IPv6(src="2001:db8::1", dst="2001:db8::2")
+        / IPv6ExtHdrFragment(offset=8) / TCP(dport=80)
+    ),
+    "arp": _eth() / ARP(),
+}
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestFastParserMatchesScapy:
+    """Fast-path output must be identical to the scapy parser."""
+
+    @pytest.mark.parametrize("name", sorted(_SAME_AS_SCAPY))
+    def test_same_features(self, name: str) -> None:
+        frame = _frame(_SAME_AS_SCAPY[name])
+        parser = FastPacketParser()
+
+        assert parser.parse(frame) == PacketParser().parse(frame)
+        assert parser.fallback_count == 0
+
+
+class TestFastParserFallback:
+    """Frames the fast path cannot decode go through scapy."""
+
+    def test_tunnel_falls_back(self) -> None:
+        pkt = (
+            _eth() / IP(src="1.1.1.1", dst="2.2.2.2") / GRE()
+            / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=22)
+        )
+        parser = FastPacketParser()
+        result = parser.parse(_frame(pkt))
+
+        assert parser.fallback_count == 1
+        assert result["protocol"] == "TCP"
+        assert result["dst_port"] == 22
+
+    def test_truncated_header_falls_back(self) -> None:
+        pkt = _eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=80)
+        frame = _frame(pkt, snaplen=30)
+        parser = FastPacketParser()
+
+        assert parser.parse(frame) == PacketParser().parse(frame)
+        assert parser.fallback_count == 1
+
+    def test_scapy_packet_uses_fallback(self) -> None:
+        pkt = _eth() / IP(src="10.0.0.1", dst="10.0.0.2") / UDP(dport=53)
+        parser = FastPacketParser()
+        result = parser.parse(pkt)
+
+        assert result["protocol"] == "UDP"
+        assert parser.fallback_count == 1
+
+
+class TestFastParserBytes:
+    """``parse_bytes`` accepts memoryviews."""
+
+    def test_parse_memoryview(self) -> None:
+        data = bytes(_eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=8080))
+        result = FastPacketParser().parse_bytes(memoryview(data), 5.0, len(data))
+
+        assert result is not None
+        assert result["src_ip"] == "10.0.0.1"
+        assert result["dst_port"] == 8080
+        assert result["timestamp"] == 5.0
@@ -0,0 +1,125 @@
+"""Unit tests for :class:`sentinel_dpi.dpi.feature_schema.PacketFeatures`."""
+
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from sentinel_dpi.dpi.feature_schema import (
+    FIELDS,
+    IPV6_TAG,
+    PacketFeatures,
+    format_address,
+    ip_to_int,
+    ip_to_str,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_features(**overrides: object) -> PacketFeatures:
+    base: dict = {
+        "timestamp": 1_000_000.0,
+        "src_ip": ip_to_int("10.0.0.1"),
+        "dst_ip": ip_to_int("10.0.0.2"),
+        "protocol": "TCP",
+        "src_port": 40000,
+        "dst_port": 443,
+        "packet_length": 60,
+    }
+    base.update(overrides)
+    return PacketFeatures(**base)
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestPacketFeaturesRecord:
+    """Slotted record behaviour."""
+
+    def test_attribute_access(self) -> None:
+        f = _make_features()
+        assert f.src_ip == 0x0A000001
+        assert f.dst_port == 443
+
+    def test_positional_matches_keyword(self) -> None:
+        positional = PacketFeatures(
+            1_000_000.0, 0x0A000001, 0x0A000002, "TCP", 40000, 443, 60,
+        )
+        assert positional == _make_features()
+
+    def test_has_no_instance_dict(self) -> None:
+        f = _make_features()
+        assert not hasattr(f, "__dict__")
+        with pytest.raises(AttributeError):
+            f.extra = 1  # type: ignore[attr-defined]
+
+    def test_annotations_list_schema_fields(self) -> None:
+        assert tuple(PacketFeatures.__annotations__) == FIELDS
+
+    def test_pickle_roundtrip(self) -> None:
+        f = _make_features(src_port=None, dst_port=None, protocol="ICMP")
+        assert pickle.loads(pickle.dumps(f)) == f
+
+
+class TestPacketFeaturesMapping:
+    """Dictionary-compatible view for third-party detectors."""
+
+    def test_subscript_and_get(self) -> None:
+        f = _make_features()
+        assert f["protocol"] == "TCP"
+        assert f["src_ip"] == "10.0.0.1"
+        assert f.get("src_port") == 40000
+        assert f.get("missing", "default") == "default"
+
+    def test_unknown_key_raises_key_error(self) -> None:
+        with pytest.raises(KeyError):
+            _make_features()["nope"]
+
+    def test_keys_and_len(self) -> None:
+        f = _make_features()
+        assert list(f) == list(FIELDS)
+        assert len(f) == len(FIELDS)
+        assert "dst_ip" in f
+        assert "nope" not in f
+
+    def test_converts_to_and_compares_with_dict(self) -> None:
+        f = _make_features()
+        as_dict = dict(f)
+        assert as_dict["dst_ip"] == "10.0.0.2"
+        assert f == as_dict
+        assert {**f, "dst_port": 80} != f
+
+
+class TestAddressEncoding:
+    """Integer address codec."""
+
+    def test_ipv4_roundtrip(self) -> None:
+        assert ip_to_int("192.168.1.10") == 0xC0A8010A
+        assert ip_to_str(0xC0A8010A) == "192.168.1.10"
+
+    def test_ipv6_roundtrip(self) -> None:
+        ip = ip_to_int("2001:db8::1")
+        assert ip & IPV6_TAG
+        assert ip_to_str(ip) == "2001:db8::1"
+
+    def test_families_do_not_collide(self) -> None:
+        assert ip_to_int("::1") != ip_to_int("0.0.0.1")
+        assert ip_to_int("::ffff:10.0.0.1") != ip_to_int("10.0.0.1")
+
+    def test_invalid_address_raises(self) -> None:
+        with pytest.raises(OSError):
+            ip_to_int("10.0.0")
+
+    def test_format_address_unknown(self) -> None:
+        assert format_address(None) == "unknown"
+        assert format_address(ip_to_int("10.0.0.1")) == "10.0.0.1"
+
+    def test_mapping_view_keeps_none_addresses(self) -> None:
+        f = _make_features(src_ip=None, dst_ip=None)
+        assert f["src_ip"] is None
+        assert dict(f)["dst_ip"] is None
@@ -0,0 +1,89 @@
+"""Unit tests for :class:`sentinel_dpi.core.global_detectors.GlobalDetectorRunner`."""
+
+from __future__ import annotations
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.global_detectors import GlobalDetectorRunner
+from sentinel_dpi.core.packet_processor import PacketProcessor
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
+from sentinel_dpi.detection.detection_manager import DetectionManager
+from sentinel_dpi.detection.plugins.high_traffic_detector import HighTrafficDetector
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+from sentinel_dpi.services.alert_manager import AlertManager
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_features(timestamp: float, src_ip: str) -> PacketFeatures:
+    return PacketFeatures(
+        timestamp=timestamp,
+        src_ip=ip_to_int(src_ip),
+        dst_ip=ip_to_int("10.0.0.2"),
+        protocol="UDP",
+        src_port=5000,
+        dst_port=53,
+        packet_length=64,
+    )
+
+
+def _make_runner(
+    shards: int = 2,
+) -> tuple[GlobalDetectorRunner, list[MetricsService], AlertManager]:
+    """Runner with one high-traffic detector (10 pps, 1 tick) on *shards*."""
+    services = [MetricsService(pps_window=1.0) for _ in range(shards)]
+    alerts = AlertManager()
+    detector = HighTrafficDetector(MergedMetricsView(services), threshold=10.0, window=1)
+    runner = GlobalDetectorRunner(
+        DetectionManager([detector]), MergedMetricsView(services), alerts,
+    )
+    return runner, services, alerts
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestGlobalDetectorRunner:
+    """One detector instance over every shard's metrics."""
+
+    def test_one_alert_for_all_shards(self) -> None:
+        runner, services, alerts = _make_runner(shards=3)
+        for index, service in enumerate(services):
+            for i in range(8):
+                service.update(_make_features(1e6 + i / 10, f"10.0.{index}.1"))
+        # Over the threshold in total, under it on every single shard.
+        assert MergedMetricsView(services).current_pps() == 24.0
+        runner.tick()
+        (alert,) = alerts.snapshot()["recent_alerts"]
+        assert alert["type"] == "HIGH_TRAFFIC"
+
+    def test_idle_before_any_packet(self) -> None:
+        runner, _services, alerts = _make_runner()
+        runner.tick()
+        assert runner.detection_manager.clock() is None
+        assert alerts.snapshot()["recent_alerts"] == []
+
+    def test_runs_with_sharded_processor(self) -> None:
+        runner, services, alerts = _make_runner()
+        settings = Settings()
+        queues = [PacketQueue(), PacketQueue()]
+        shards = [
+            PacketProcessor(
+                queue, settings, parser=FastPacketParser(), metrics_service=service,
+            )
+            for queue, service in zip(queues, services)
+        ]
+        sharded = ShardedPacketProcessor(
+            PacketQueue(), settings, shards, queues, global_detectors=runner,
+        )
+        sharded.start()
+        for i in range(20):
+            services[i % 2].update(_make_features(1e6 + i / 20, "10.0.0.1"))
+        sharded.stop()  # Runs a last round after the shards stop.
+        (alert,) = alerts.snapshot()["recent_alerts"]
+        assert alert["type"] == "HIGH_TRAFFIC"
@@ -0,0 +1,149 @@
+"""Unit tests for :mod:`sentinel_dpi.services.heavy_hitters`."""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import pytest
+
+from sentinel_dpi.services.heavy_hitters import (
+    ExactCounts,
+    SeenFilter,
+    SeenSet,
+    SpaceSaving,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _skewed_stream(length: int, heavy: int = 10, seed: int = 1) -> list[int]:
+    """Half the stream from *heavy* keys, half from a long unique tail."""
+    rng = random.Random(seed)
+    return [
+        rng.randrange(heavy) if rng.random() < 0.5 else rng.randrange(1_000, 10**9)
+        for _ in range(length)
+    ]
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestSpaceSavingExactBelowCapacity:
+    """Until it is full the summary counts exactly."""
+
+    def test_counts_and_errors(self) -> None:
+        summary = SpaceSaving(capacity=10)
+        for key in "abcabca":
+            summary.add(key)
+        assert dict(summary.items()) == {"a": 3, "b": 2, "c": 2}
+        assert summary.errors() == {}
+        assert summary.top(1) == [("a", 3, 0)]
+        assert summary.total == 7
+
+    def test_weighted_add(self) -> None:
+        summary = SpaceSaving(capacity=2)
+        summary.add("a", 5)
+        summary.add("a", 2)
+        assert summary.get("a") == 7
+
+
+class TestSpaceSavingBounds:
+    """Full summaries keep the Space-Saving guarantees."""
+
+    def test_replacement_inherits_minimum(self) -> None:
+        summary = SpaceSaving(capacity=2)
+        for key, count in (("a", 5), ("b", 2)):
+            summary.add(key, count)
+        summary.add("c")
+        assert "b" not in summary
+        assert summary.get("c") == 3
+        assert summary.errors() == {"c": 2}
+
+    def test_capacity_is_respected(self) -> None:
+        summary = SpaceSaving(capacity=50)
+        for key in _skewed_stream(20_000):
+            summary.add(key)
+        assert len(summary) == 50
+
+    def test_guarantees_hold(self) -> None:
+        stream = _skewed_stream(20_000)
+        truth = Counter(stream)
+        summary = SpaceSaving(capacity=100)
+        for key in stream:
+            summary.add(key)
+
+        errors = summary.errors()
+        for key, count in summary.items():
+            error = errors.get(key, 0)
+            assert count - error <= truth[key] <= count
+            assert error <= len(stream) / 100
+        # Every key above total / capacity is monitored.
+        for key, count in truth.items():
+            if count > len(stream) / 100:
+                assert key in summary
+
+    def test_top_matches_exact_heavy_hitters(self) -> None:
+        stream = _skewed_stream(20_000)
+        summary = SpaceSaving(capacity=100)
+        for key in stream:
+            summary.add(key)
+        expected = {key for key, _ in Counter(stream).most_common(10)}
+        assert {key for key, _, _ in summary.top(10)} == expected
+
+    def test_merge_carries_errors(self) -> None:
+        summary = SpaceSaving(capacity=4)
+        summary.add("a", 10, error=3)
+        summary.add("a", 5, error=1)
+        assert summary.get("a") == 15
+        assert summary.errors() == {"a": 4}
+
+    def test_clear(self) -> None:
+        summary = SpaceSaving(capacity=2)
+        for key in "abc":
+            summary.add(key)
+        summary.clear()
+        assert len(summary) == 0 and summary.errors() == {} and summary.total == 0
+        summary.add("d")
+        assert summary.top(5) == [("d", 1, 0)]
+
+    def test_rejects_zero_capacity(self) -> None:
+        with pytest.raises(ValueError):
+            SpaceSaving(capacity=0)
+
+
+class TestExactCounts:
+    """The unbounded counter offers the same interface."""
+
+    def test_interface(self) -> None:
+        counts = ExactCounts()
+        counts.add("a", 2)
+        counts.add("b")
+        counts["a"] += 1
+        assert counts.top(1) == [("a", 3, 0)]
+        assert counts.errors() == {}
+
+
+class TestSeenSources:
+    """Seen-source records report each key as new once."""
+
+    @pytest.mark.parametrize("seen", [SeenSet(), SeenFilter(1 << 12)])
+    def test_first_and_firsts_agree(self, seen: SeenSet | SeenFilter) -> None:
+        assert seen.first(7) is True
+        assert seen.first(7) is False
+        assert seen.firsts([7, 8, 9]) == [False, True, True]
+        assert seen.firsts([]) == []
+
+    def test_filter_never_repeats_and_rarely_misses(self) -> None:
+        seen = SeenFilter(1 << 16)
+        keys = random.Random(3).sample(range(2**32), 1_000)
+        new = seen.firsts(keys[:500]) + [seen.first(key) for key in keys[500:]]
+        assert sum(new) > 980  # Collisions are about n / bits.
+        assert not any(seen.firsts(keys))
+
+    def test_filter_needs_power_of_two(self) -> None:
+        with pytest.raises(ValueError):
+            SeenFilter(1_000)
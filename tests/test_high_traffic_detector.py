@@ -5,7 +5,7 @@ from __future__ import annotations
 from unittest.mock import MagicMock
 
 from sentinel_dpi.detection.plugins.high_traffic_detector import HighTrafficDetector
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
 
 
 # --------------------------------------------------------------------------- #
@@ -16,8 +16,8 @@ def _make_features(timestamp: float = 1_000_000.0) -> PacketFeatures:
     """Return a minimal ``PacketFeatures`` dict."""
     return PacketFeatures(
         timestamp=timestamp,
-        src_ip="10.0.0.1",
-        dst_ip="10.0.0.2",
+        src_ip=ip_to_int("10.0.0.1"),
+        dst_ip=ip_to_int("10.0.0.2"),
         protocol="TCP",
         src_port=12345,
         dst_port=80,
@@ -26,12 +26,22 @@ def _make_features(timestamp: float = 1_000_000.0) -> PacketFeatures:
 
 
 def _make_metrics_service(pps: float) -> MagicMock:
-    """Return a mock ``MetricsService`` whose snapshot reports a fixed PPS."""
+    """Return a mock ``MetricsService`` reporting a fixed PPS."""
     mock = MagicMock()
-    mock.snapshot.return_value = {"packets_per_second": pps}
+    mock.current_pps.return_value = pps
     return mock
 
 
+def _tick(
+    detector: HighTrafficDetector, count: int, start: float = 1_000_000.0,
+) -> list[dict] | None:
+    """Feed one packet per second for *count* seconds; return the last result."""
+    result = None
+    for i in range(count):
+        result = detector.analyze(_make_features(timestamp=start + i))
+    return result
+
+
 # --------------------------------------------------------------------------- #
 # Tests
 # --------------------------------------------------------------------------- #
@@ -42,41 +52,61 @@ class TestHighTrafficBelowThreshold:
     def test_below_threshold_no_alert(self) -> None:
         ms = _make_metrics_service(pps=30.0)
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=3)
-
-        for _ in range(10):
-            result = detector.analyze(_make_features())
-
-        assert result is None
+        assert _tick(detector, 10) is None
 
     def test_exactly_at_threshold_no_alert(self) -> None:
         ms = _make_metrics_service(pps=50.0)
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=3)
-
-        for _ in range(10):
-            result = detector.analyze(_make_features())
-
-        assert result is None
+        assert _tick(detector, 10) is None
 
 
 class TestHighTrafficAboveThreshold:
-    """Alert when PPS exceeds threshold for the full window."""
+    """Alert when PPS exceeds threshold for the full window of ticks."""
 
     def test_sustained_high_pps_triggers_alert(self) -> None:
         ms = _make_metrics_service(pps=100.0)
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=5)
 
-        # First 4 calls should not alert (count < window).
-        for _ in range(4):
-            result = detector.analyze(_make_features())
-            assert result is None
+        # First 4 ticks should not alert (count < window).
+        assert _tick(detector, 4) is None
 
-        # 5th call hits the window → alert.
-        result = detector.analyze(_make_features())
+        # 5th tick hits the window → alert.
+        result = detector.analyze(_make_features(timestamp=1_000_004.0))
         assert result is not None
         assert len(result) == 1
         assert result[0]["type"] == "HIGH_TRAFFIC"
 
 
+class TestHighTrafficTick:
+    """The rate is read once per tick, not once per packet."""
+
+    def test_packets_within_tick_read_rate_once(self) -> None:
+        ms = _make_metrics_service(pps=100.0)
+        detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=2)
+
+        for i in range(1000):
+            assert detector.analyze(_make_features(timestamp=1_000.0 + i / 2000)) is None
+        assert ms.current_pps.call_count == 1
+        ms.snapshot.assert_not_called()
+
+    def test_next_tick_after_interval(self) -> None:
+        ms = _make_metrics_service(pps=100.0)
+        detector = HighTrafficDetector(
+            metrics_service=ms, threshold=50.0, window=2, tick_seconds=5.0,
+        )
+        assert detector.analyze(_make_features(timestamp=0.0)) is None
+        assert detector.analyze(_make_features(timestamp=4.9)) is None
+        assert detector.analyze(_make_features(timestamp=5.0)) is not None
+        assert ms.current_pps.call_count == 2
+
+    def test_on_tick_evaluates_immediately(self) -> None:
+        ms = _make_metrics_service(pps=100.0)
+        detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=2)
+        assert detector.on_tick(10.0) is None
+        result = detector.on_tick(10.5)
+        assert result is not None and result[0]["timestamp"] == 10.5
+
+
 class TestHighTrafficResetOnDrop:
     """Counter resets when PPS drops below threshold."""
 
@@ -84,21 +114,17 @@ class TestHighTrafficResetOnDrop:
         ms = MagicMock()
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=5)
 
-        # 3 calls above threshold.
-        ms.snapshot.return_value = {"packets_per_second": 80.0}
-        for _ in range(3):
-            detector.analyze(_make_features())
+        # 3 ticks above threshold.
+        ms.current_pps.return_value = 80.0
+        _tick(detector, 3, start=0.0)
 
         # PPS drops below threshold → counter resets.
-        ms.snapshot.return_value = {"packets_per_second": 20.0}
-        detector.analyze(_make_features())
-
-        # 4 more calls above threshold (not enough to reach window=5 again).
-        ms.snapshot.return_value = {"packets_per_second": 80.0}
-        for _ in range(4):
-            result = detector.analyze(_make_features())
+        ms.current_pps.return_value = 20.0
+        _tick(detector, 1, start=3.0)
 
-        assert result is None  # only 4 consecutive, not 5
+        # 4 more ticks above threshold (not enough to reach window=5 again).
+        ms.current_pps.return_value = 80.0
+        assert _tick(detector, 4, start=4.0) is None  # only 4 consecutive, not 5
 
 
 class TestHighTrafficAlertPayload:
@@ -109,16 +135,15 @@ class TestHighTrafficAlertPayload:
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=3)
 
         ts = 1_700_000.0
-        for _ in range(2):
-            detector.analyze(_make_features(timestamp=ts))
+        _tick(detector, 2, start=ts)
 
-        result = detector.analyze(_make_features(timestamp=ts))
+        result = detector.analyze(_make_features(timestamp=ts + 2))
         assert result is not None
 
         alert = result[0]
         assert alert == {
             "type": "HIGH_TRAFFIC",
-            "timestamp": ts,
+            "timestamp": ts + 2,
             "current_pps": 120.5,
         }
 
@@ -130,30 +155,41 @@ class TestHighTrafficCounterResetsAfterAlert:
         ms = _make_metrics_service(pps=80.0)
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=3)
 
-        # Trigger first alert (calls 1-3).
-        for _ in range(3):
-            result = detector.analyze(_make_features())
-        assert result is not None  # first alert fired
+        # Trigger first alert (ticks 1-3).
+        assert _tick(detector, 3, start=0.0) is not None
 
-        # Next 2 calls should NOT alert (counter was reset, need 3 again).
-        for _ in range(2):
-            result = detector.analyze(_make_features())
-        assert result is None
+        # Next 2 ticks should NOT alert (counter was reset, need 3 again).
+        assert _tick(detector, 2, start=3.0) is None
 
-        # 3rd call after reset → second alert.
-        result = detector.analyze(_make_features())
+        # 3rd tick after reset → second alert.
+        result = _tick(detector, 1, start=5.0)
         assert result is not None
         assert result[0]["type"] == "HIGH_TRAFFIC"
 
 
 class TestHighTrafficPartialWindow:
-    """PPS exceeds threshold for fewer than window calls → no alert."""
+    """PPS exceeds threshold for fewer than window ticks → no alert."""
 
     def test_partial_window_no_alert(self) -> None:
         ms = _make_metrics_service(pps=80.0)
         detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=10)
+        assert _tick(detector, 9) is None
 
-        for _ in range(9):
-            result = detector.analyze(_make_features())
 
-        assert result is None
+class TestHighTrafficBatch:
+    """A batch is evaluated at most once, at its last timestamp."""
+
+    def test_batch_is_one_tick(self) -> None:
+        ms = _make_metrics_service(pps=100.0)
+        detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=2)
+
+        assert detector.analyze_batch([_make_features(timestamp=1.0)] * 4) is None
+        result = detector.analyze_batch([_make_features(timestamp=2.0)])
+        assert result is not None and result[0]["timestamp"] == 2.0
+        assert ms.current_pps.call_count == 2
+
+    def test_large_batch_raises_single_alert(self) -> None:
+        ms = _make_metrics_service(pps=100.0)
+        detector = HighTrafficDetector(metrics_service=ms, threshold=50.0, window=1)
+        result = detector.analyze_batch([_make_features()] * 50)
+        assert result is not None and len(result) == 1
@@ -0,0 +1,167 @@
+"""Unit tests for :class:`sentinel_dpi.core.interface_pipelines.MultiInterfaceCapture`."""
+
+from __future__ import annotations
+
+import time
+
+from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+
+from sentinel_dpi.config.settings import InterfaceConfig, Settings
+from sentinel_dpi.core.backpressure import CaptureAdmission
+from sentinel_dpi.core.interface_pipelines import InterfacePipeline, MultiInterfaceCapture
+from sentinel_dpi.core.packet_processor import PacketProcessor
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _raw(src: str, timestamp: float) -> RawFrame:
+    data = bytes(Ether() / IP(src=src, dst="10.0.0.254") / TCP(dport=80))
+    return RawFrame(data, timestamp, len(data))
+
+
+class _FakeEngine:
+    """Capture engine that enqueues a fixed batch of frames on start."""
+
+    def __init__(
+        self,
+        packet_queue: PacketQueue,
+        settings: Settings,
+        frames: list[RawFrame],
+        fail: bool = False,
+    ) -> None:
+        self._admission = CaptureAdmission(packet_queue, settings)
+        self._frames = frames
+        self._fail = fail
+        self._running = False
+
+    def start(self) -> None:
+        if self._fail:
+            raise OSError("No such device")
+        self._running = True
+        self._admission.admit(self._frames)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def is_alive(self) -> bool:
+        return self._running
+
+    def capture_stats(self) -> dict:
+        return self._admission.stats()
+
+
+def _make_capture(
+    frames: dict[str, list[RawFrame]],
+    failing: tuple[str, ...] = (),
+    queue_maxsize: int = 100,
+) -> tuple[MultiInterfaceCapture, MergedMetricsView]:
+    settings = Settings(processor_timeout=0.05)
+    services = []
+    pipelines = []
+    for label, batch in frames.items():
+        packet_queue = PacketQueue(maxsize=queue_maxsize)
+        service = MetricsService(pps_window=1e9)
+        services.append(service)
+        pipelines.append(InterfacePipeline(
+            label,
+            _FakeEngine(packet_queue, settings, batch, fail=label in failing),
+            PacketProcessor(
+                packet_queue=packet_queue,
+                settings=settings,
+                parser=FastPacketParser(),
+                metrics_service=service,
+                name=f"PacketProcessor({label})",
+                interface=label,
+            ),
+        ))
+    return MultiInterfaceCapture(pipelines, settings), MergedMetricsView(services)
+
+
+def _wait_processed(capture: MultiInterfaceCapture, count: int) -> None:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        if sum(s["packets_processed"] for s in capture.get_shard_stats()) >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("interfaces did not process all packets in time")
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestInterfaceConfig:
+    """Label defaults."""
+
+    def test_display_name_defaults_to_interface(self) -> None:
+        assert InterfaceConfig("eth1").display_name == "eth1"
+        assert InterfaceConfig("eth1", label="dmz").display_name == "dmz"
+
+
+class TestMultiInterfaceCapture:
+    """Several interfaces feeding their own processors."""
+
+    def test_packets_are_labelled_per_interface(self) -> None:
+        capture, metrics = _make_capture({
+            "tap0": [_raw("10.0.0.1", 1.0 + i) for i in range(3)],
+            "tap1": [_raw("10.0.1.1", 10.0 + i) for i in range(5)],
+        })
+        capture.start()
+        try:
+            _wait_processed(capture, 8)
+        finally:
+            capture.stop()
+
+        assert metrics.snapshot()["packets_per_interface"] == {"tap0": 3, "tap1": 5}
+        feed = capture.get_traffic_feed()
+        assert [e["timestamp"] for e in feed] == sorted(e["timestamp"] for e in feed)
+        assert {e["src_ip"]: e["interface"] for e in feed} == {
+            "10.0.0.1": "tap0", "10.0.1.1": "tap1",
+        }
+
+    def test_capture_stats_per_interface(self) -> None:
+        capture, _ = _make_capture(
+            {
+                "tap0": [_raw("10.0.0.1", 1.0) for _ in range(4)],
+                "tap1": [_raw("10.0.1.1", 1.0) for _ in range(2)],
+            },
+            queue_maxsize=3,
+        )
+        # Engines only: the queues stay full, so tap0 overflows.
+        for pipeline in capture.pipelines:
+            pipeline.engine.start()
+
+        stats = capture.capture_stats()
+        assert stats["captured"] == 6
+        assert stats["dropped"] == 1
+        by_label = {s["interface"]: s for s in stats["interfaces"]}
+        assert by_label["tap0"]["dropped_queue_full"] == 1
+        assert by_label["tap1"]["dropped"] == 0
+        assert by_label["tap1"]["capturing"] is True
+
+    def test_failing_interface_does_not_stop_the_others(self) -> None:
+        capture, metrics = _make_capture(
+            {
+                "tap0": [_raw("10.0.0.1", 1.0)],
+                "missing": [_raw("10.0.1.1", 1.0)],
+            },
+            failing=("missing",),
+        )
+        capture.start()
+        try:
+            _wait_processed(capture, 1)
+            assert capture.is_alive()
+        finally:
+            capture.stop()
+
+        assert metrics.snapshot()["packets_per_interface"] == {"tap0": 1}
+        by_label = {s["interface"]: s for s in capture.capture_stats()["interfaces"]}
+        assert by_label["missing"]["capturing"] is False
+        assert not capture.is_alive()
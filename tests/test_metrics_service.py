@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
-from sentinel_dpi.services.metrics_service import MetricsService
+import numpy as np
+import pytest
+
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
 
 
 # --------------------------------------------------------------------------- #
@@ -15,15 +18,16 @@ def _make_features(
     dst_ip: str | None = "10.0.0.2",
     protocol: str = "TCP",
     timestamp: float = 1_000_000.0,
+    packet_length: int = 64,
 ) -> PacketFeatures:
     return PacketFeatures(
         timestamp=timestamp,
-        src_ip=src_ip,
-        dst_ip=dst_ip,
+        src_ip=ip_to_int(src_ip) if src_ip is not None else None,
+        dst_ip=ip_to_int(dst_ip) if dst_ip is not None else None,
         protocol=protocol,
         src_port=12345,
         dst_port=80,
-        packet_length=64,
+        packet_length=packet_length,
     )
 
 
@@ -103,6 +107,208 @@ class TestMetricsServicePPS:
         assert snap["total_packets"] == 5
 
 
+class TestMetricsServiceRates:
+    """O(1) current_pps / current_bytes_per_second reads."""
+
+    def test_rates_match_snapshot(self) -> None:
+        svc = MetricsService(pps_window=10.0)
+        for length in (100, 200, 300):
+            svc.update(_make_features(timestamp=100.0, packet_length=length))
+        snap = svc.snapshot()
+        assert svc.current_pps() == snap["packets_per_second"] == 0.3
+        assert svc.current_bytes_per_second() == snap["bytes_per_second"] == 60.0
+
+    def test_bytes_leave_window_with_packets(self) -> None:
+        svc = MetricsService(pps_window=5.0)
+        svc.update(_make_features(timestamp=100.0, packet_length=1000))
+        svc.update(_make_features(timestamp=106.0, packet_length=50))
+        assert svc.current_pps() == 1 / 5.0
+        assert svc.current_bytes_per_second() == 50 / 5.0
+
+    def test_empty_service_reports_zero(self) -> None:
+        svc = MetricsService()
+        assert svc.current_pps() == 0.0
+        assert svc.current_bytes_per_second() == 0.0
+
+    def test_bytes_survive_out_of_order_merge(self) -> None:
+        svc = MetricsService(pps_window=5.0)
+        early, late = MetricsService(), MetricsService()
+        for ts, length in ((100.0, 10), (102.0, 20)):
+            early.update(_make_features(timestamp=ts, packet_length=length))
+        for ts, length in ((101.0, 40), (106.0, 80)):
+            late.update(_make_features(timestamp=ts, packet_length=length))
+
+        svc.merge(early.take_delta())
+        svc.merge(late.take_delta())
+        # Window (101, 106]: 102 and 106 only.
+        assert svc.current_bytes_per_second() == (20 + 80) / 5.0
+
+    def test_fractional_window_rounds_up(self) -> None:
+        svc = MetricsService(pps_window=2.5)
+        for ts in (100.0, 101.0, 102.0):
+            svc.update(_make_features(timestamp=ts))
+        assert svc.rate_window == 3
+        assert svc.current_pps() == svc.snapshot()["packets_per_second"] == 1.0
+
+    def test_oversized_window_is_capped(self) -> None:
+        svc = MetricsService(pps_window=1e9, series_slots=(60, 60, 24))
+        svc.update(_make_features(timestamp=100.0, packet_length=120))
+        assert svc.rate_window == 60
+        assert svc.current_bytes_per_second() == 2.0
+        assert MergedMetricsView([svc]).snapshot()["bytes_per_second"] == 2.0
+
+    def test_merged_view_sums_shards(self) -> None:
+        shards = [MetricsService(pps_window=10.0) for _ in range(2)]
+        shards[0].update(_make_features(packet_length=100))
+        shards[1].update(_make_features(packet_length=300))
+        view = MergedMetricsView(shards)
+        assert view.current_pps() == view.snapshot()["packets_per_second"] == 0.2
+        assert view.current_bytes_per_second() == view.snapshot()["bytes_per_second"] == 40.0
+
+
+class TestMetricsServiceBoundedHosts:
+    """``host_capacity`` bounds the per-host tables with error bounds."""
+
+    def test_tables_are_bounded(self) -> None:
+        svc = MetricsService(host_capacity=4)
+        for i in range(20):
+            svc.update(_make_features(src_ip=f"10.0.1.{i}", dst_ip=f"10.0.2.{i}"))
+        counters = svc.counters()
+        assert len(counters["per_src_ip"]) == 4
+        assert len(counters["per_dst_ip"]) == 4
+        assert svc.snapshot()["total_packets"] == 20
+
+    def test_top_talkers_report_error(self) -> None:
+        svc = MetricsService(top_talkers_limit=1, host_capacity=2)
+        for _ in range(10):
+            svc.update(_make_features(src_ip="1.1.1.1"))
+        svc.update(_make_features(src_ip="2.2.2.2"))
+        svc.update(_make_features(src_ip="3.3.3.3"))
+        assert svc.get_top_talkers() == [{"ip": "1.1.1.1", "packets": 10, "error": 0}]
+        assert svc.counters()["src_errors"] == {ip_to_int("3.3.3.3"): 1}
+
+    def test_exact_top_talkers_have_no_error(self) -> None:
+        svc = MetricsService()
+        svc.update(_make_features())
+        assert svc.get_top_talkers() == [{"ip": "10.0.0.1", "packets": 1}]
+
+    def test_errors_survive_delta_merge(self) -> None:
+        worker = MetricsService(host_capacity=1)
+        merged = MetricsService(host_capacity=8)
+        worker.update(_make_features(src_ip="1.1.1.1"))
+        worker.update(_make_features(src_ip="2.2.2.2"))
+        delta = worker.take_delta()
+        assert delta["src_errors"] == {ip_to_int("2.2.2.2"): 1}
+        merged.merge(delta)
+        assert merged.get_top_talkers() == [{"ip": "2.2.2.2", "packets": 2, "error": 1}]
+
+    def test_merged_view_reports_error(self) -> None:
+        shards = [MetricsService(host_capacity=4) for _ in range(2)]
+        shards[0].update(_make_features(src_ip="1.1.1.1"))
+        shards[1].update(_make_features(src_ip="2.2.2.2"))
+        view = MergedMetricsView(shards, top_talkers_limit=2)
+        assert all(entry["error"] == 0 for entry in view.get_top_talkers())
+
+
+class TestMetricsServiceSeries:
+    """Per-second history with rollups."""
+
+    def test_series_counts_new_sources(self) -> None:
+        svc = MetricsService()
+        svc.update(_make_features(src_ip="1.1.1.1", timestamp=100.0))
+        svc.update(_make_features(src_ip="1.1.1.1", timestamp=101.0))
+        svc.update(_make_features(src_ip="2.2.2.2", timestamp=101.5, protocol="UDP"))
+        data = svc.series(1, start=100, end=101)
+        assert data["packets"] == [1, 2]
+        assert data["new_sources"] == [1, 1]
+        assert data["protocols"]["UDP"] == [0, 1]
+        assert svc.latest_second == 101
+
+    def test_columns_count_new_sources(self) -> None:
+        from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_TCP
+
+        columns = np.zeros(3, dtype=FEATURE_DTYPE)
+        columns["timestamp"] = [100.0, 100.5, 101.0]
+        columns["src_ip"] = [ip_to_int("1.1.1.1"), ip_to_int("1.1.1.1"), ip_to_int("2.2.2.2")]
+        columns["has_ip"] = True
+        columns["protocol"] = PROTO_TCP
+        columns["packet_length"] = 60
+        svc = MetricsService()
+        svc.update(_make_features(src_ip="2.2.2.2", timestamp=99.0))
+        svc.update_columns(columns)
+        data = svc.series(1, start=100, end=101)
+        assert data["packets"] == [2, 1]
+        assert data["new_sources"] == [1, 0]
+
+    def test_merged_view_aligns_shards(self) -> None:
+        shards = [MetricsService() for _ in range(2)]
+        shards[0].update(_make_features(timestamp=100.0))
+        shards[1].update(_make_features(timestamp=102.0))
+        data = MergedMetricsView(shards).series(1, limit=3)
+        assert data["timestamps"] == [100, 101, 102]
+        assert data["packets"] == [1, 0, 1]
+
+
+class TestMetricsServiceWindowedRankings:
+    """``top_windows`` ranks recent traffic per dimension."""
+
+    def test_disabled_by_default(self) -> None:
+        svc = MetricsService()
+        assert svc.top_windows == ()
+        with pytest.raises(ValueError):
+            svc.top(60.0)
+
+    def test_top_renders_keys(self) -> None:
+        svc = MetricsService(top_windows=(60.0, 300.0))
+        for _ in range(2):
+            svc.update(_make_features(src_ip="1.1.1.1", packet_length=100))
+        svc.update(_make_features(src_ip="2.2.2.2", packet_length=1_000))
+        assert svc.top(60.0, "src_ip") == [
+            {"key": "1.1.1.1", "packets": 2, "bytes": 200},
+            {"key": "2.2.2.2", "packets": 1, "bytes": 1_000},
+        ]
+        assert svc.top(60.0, "src_ip", by="bytes", limit=1)[0]["key"] == "2.2.2.2"
+        assert svc.top(300.0, "dst_port") == [{"key": 80, "packets": 3, "bytes": 1_200}]
+        assert svc.top(300.0, "protocol")[0]["key"] == "TCP"
+
+    def test_old_traffic_leaves_short_window(self) -> None:
+        svc = MetricsService(top_windows=(60.0, 300.0))
+        svc.update(_make_features(src_ip="1.1.1.1", timestamp=1_000.0))
+        svc.update(_make_features(src_ip="2.2.2.2", timestamp=1_100.0))
+        assert [e["key"] for e in svc.top(60.0)] == ["2.2.2.2"]
+        assert {e["key"] for e in svc.top(300.0)} == {"1.1.1.1", "2.2.2.2"}
+
+    def test_merge_carries_windows(self) -> None:
+        worker = MetricsService(top_windows=(60.0,))
+        merged = MetricsService(top_windows=(60.0,))
+        worker.update(_make_features(src_ip="1.1.1.1"))
+        merged.merge(worker.take_delta())
+        assert merged.top(60.0) == [{"key": "1.1.1.1", "packets": 1, "bytes": 64}]
+
+    def test_host_capacity_bounds_rankings(self) -> None:
+        svc = MetricsService(top_windows=(60.0,), host_capacity=3)
+        for i in range(20):
+            svc.update(_make_features(src_ip=f"10.0.1.{i}"))
+        assert len(svc.top(60.0, limit=100)) == 3
+
+    def test_disabled_in_settings_by_default(self) -> None:
+        from sentinel_dpi.config.settings import Settings
+
+        assert Settings().metrics_top_windows == ()
+
+    def test_merged_view_sums_shards(self) -> None:
+        shards = [MetricsService(top_windows=(60.0,)) for _ in range(2)]
+        shards[0].update(_make_features(dst_ip="9.9.9.9"))
+        shards[1].update(_make_features(dst_ip="9.9.9.9"))
+        shards[1].update(_make_features(dst_ip="8.8.8.8"))
+        view = MergedMetricsView(shards)
+        assert view.top_windows == (60.0,)
+        assert view.top(60.0, "dst_ip") == [
+            {"key": "9.9.9.9", "packets": 2, "bytes": 128},
+            {"key": "8.8.8.8", "packets": 1, "bytes": 64},
+        ]
+
+
 class TestMetricsServiceNoneFields:
     """None IP fields are handled gracefully."""
 
@@ -115,3 +321,109 @@ class TestMetricsServiceNoneFields:
         svc = MetricsService()
         svc.update(_make_features(dst_ip=None))
         assert svc.snapshot()["packets_per_destination_ip"] == {"unknown": 1}
+
+
+class TestMetricsServiceDeltas:
+    """take_delta / merge used by worker processes."""
+
+    def test_take_delta_resets(self) -> None:
+        svc = MetricsService()
+        svc.update(_make_features(src_ip="1.1.1.1", timestamp=10.0))
+        svc.update(_make_features(src_ip=None, timestamp=11.0))
+
+        delta = svc.take_delta()
+        assert delta["total_packets"] == 2
+        assert delta["per_protocol"] == {"TCP": 2}
+        assert delta["per_src_ip"][None] == 1
+        # (second, packets, bytes, per-protocol packets, new sources)
+        assert delta["series"] == [(10, 1, 64, [0, 1, 0, 0], 1), (11, 1, 64, [0, 1, 0, 0], 0)]
+        assert svc.snapshot()["total_packets"] == 0
+
+    def test_merge_matches_direct_updates(self) -> None:
+        workers = [MetricsService(pps_window=100.0) for _ in range(2)]
+        direct = MetricsService(pps_window=100.0)
+        merged = MetricsService(pps_window=100.0)
+        for i in range(20):
+            features = _make_features(src_ip=f"10.0.0.{i % 3}", timestamp=1_000.0 + i)
+            workers[i % 2].update(features)
+            direct.update(features)
+
+        for worker in workers:
+            merged.merge(worker.take_delta())
+        assert merged.snapshot() == direct.snapshot()
+
+    def test_new_sources_counted_once_across_deltas(self) -> None:
+        workers = [MetricsService(export_sources=True) for _ in range(2)]
+        merged = MetricsService()
+        for second in range(10):
+            # One host on both workers (flow-hashed), publishing every second.
+            for worker in workers:
+                worker.update(_make_features(src_ip="10.0.0.1", timestamp=1_000.0 + second))
+            for worker in workers:
+                merged.merge(worker.take_delta())
+        data = merged.series(1, start=1_000, end=1_009)
+        assert data["new_sources"] == [1] + [0] * 9
+        assert sum(data["packets"]) == 20
+
+    def test_bounded_new_sources_survive_eviction(self) -> None:
+        svc = MetricsService(host_capacity=2)
+        for i, src in enumerate(("10.0.0.1", "10.0.0.2", "10.0.0.3")):
+            svc.update(_make_features(src_ip=src, timestamp=1_000.0 + i))
+        assert "10.0.0.1" not in svc.snapshot()["packets_per_source_ip"]  # Evicted.
+        svc.update(_make_features(src_ip="10.0.0.1", timestamp=1_003.0))
+        assert svc.series(1, start=1_000, end=1_003)["new_sources"] == [1, 1, 1, 0]
+
+    def test_columns_export_new_sources(self) -> None:
+        from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_TCP
+
+        columns = np.zeros(3, dtype=FEATURE_DTYPE)
+        columns["timestamp"] = [100.0, 100.5, 101.0]
+        columns["src_ip"] = [ip_to_int("1.1.1.1"), ip_to_int("2.2.2.2"), ip_to_int("1.1.1.1")]
+        columns["has_ip"] = True
+        columns["protocol"] = PROTO_TCP
+        worker = MetricsService(export_sources=True)
+        worker.update_columns(columns)
+        delta = worker.take_delta()
+        assert sorted(delta["new_sources"]) == [
+            (100.0, ip_to_int("1.1.1.1")), (100.5, ip_to_int("2.2.2.2")),
+        ]
+        worker.update_columns(columns)
+        assert worker.take_delta()["new_sources"] == []
+
+    def test_merge_keeps_pps_window_sorted(self) -> None:
+        svc = MetricsService(pps_window=5.0)
+        early, late = MetricsService(), MetricsService()
+        for ts in (100.0, 101.0, 102.0):
+            early.update(_make_features(timestamp=ts))
+        for ts in (99.0, 106.0):
+            late.update(_make_features(timestamp=ts))
+
+        svc.merge(early.take_delta())
+        svc.merge(late.take_delta())
+        # Window (101, 106]: 102 and 106 only.
+        assert svc.snapshot()["packets_per_second"] == 2 / 5.0
+
+
+class TestMetricsServicePerInterface:
+    """Packets are counted per capture-interface label."""
+
+    def test_unlabelled_packets_count_as_default(self) -> None:
+        svc = MetricsService()
+        svc.update(_make_features())
+        assert svc.snapshot()["packets_per_interface"] == {"default": 1}
+
+    def test_labels_are_counted_separately(self) -> None:
+        svc = MetricsService()
+        for label in ("tap0", "tap0", "tap1"):
+            features = _make_features()
+            features.interface = label
+            svc.update(features)
+        assert svc.snapshot()["packets_per_interface"] == {"tap0": 2, "tap1": 1}
+
+    def test_labels_survive_delta_merge(self) -> None:
+        worker, merged = MetricsService(), MetricsService()
+        features = _make_features()
+        features.interface = "tap0"
+        worker.update(features)
+        merged.merge(worker.take_delta())
+        assert merged.snapshot()["packets_per_interface"] == {"tap0": 1}
@@ -0,0 +1,113 @@
+"""Unit tests for :class:`sentinel_dpi.core.multiprocess_processor.MultiprocessPacketProcessor`."""
+
+from __future__ import annotations
+
+import time
+
+from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import (
+    MultiprocessPacketProcessor,
+    shard_detector_names,
+    shard_detectors,
+    to_raw_frame,
+)
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.services.alert_manager import AlertManager
+from sentinel_dpi.services.metrics_service import MetricsService
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _packet(src: str, dport: int, timestamp: float):
+    pkt = Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02") / IP(
+        src=src, dst="10.9.9.9",
+    ) / TCP(dport=dport)
+    pkt.time = timestamp
+    return pkt
+
+
+def _wait_for(predicate, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestToRawFrame:
+    """Scapy packet flattening."""
+
+    def test_scapy_packet_becomes_wire_bytes(self) -> None:
+        pkt = _packet("10.0.0.1", 80, 123.5)
+        frame = to_raw_frame(pkt)
+        assert frame == RawFrame(bytes(pkt), 123.5, len(bytes(pkt)))
+
+    def test_raw_frame_passes_through(self) -> None:
+        frame = RawFrame(b"\x00" * 20, 1.0, 20)
+        assert to_raw_frame(frame) is frame
+
+
+class TestShardDetectorNames:
+    """Detector names are derived from the settings alone."""
+
+    def test_names_match_built_detectors(self) -> None:
+        for settings in (
+            Settings(),
+            Settings(
+                scan_detector="sketch", volumetric_detector=True,
+                anomaly_detector=True, beacon_detector=True,
+            ),
+        ):
+            built = [type(d).__name__ for d in shard_detectors(settings)]
+            assert shard_detector_names(settings) == built
+
+
+class TestMultiprocessPacketProcessor:
+    """End-to-end run with two worker processes."""
+
+    def test_workers_merge_metrics_and_alerts(self) -> None:
+        settings = Settings(
+            worker_processes=2,
+            shm_ring_size=1 << 16,
+            worker_publish_interval=0.05,
+            processor_timeout=0.05,
+            port_scan_threshold=10,
+        )
+        pq = PacketQueue()
+        metrics = MetricsService(pps_window=1e9)
+        alerts = AlertManager()
+        processor = MultiprocessPacketProcessor(pq, settings, metrics, alerts)
+
+        for port in range(12):
+            pq.put(to_raw_frame(_packet("10.0.0.66", port, 1_000.0 + port)))
+        for i in range(20):
+            # Scapy packets are flattened by the dispatcher.
+            pq.put(_packet(f"10.0.1.{i}", 443, 1_100.0 + i))
+
+        processor.start()
+        try:
+            _wait_for(lambda: metrics.snapshot()["total_packets"] == 32)
+        finally:
+            processor.stop()
+
+        snap = metrics.snapshot()
+        assert snap["packets_per_source_ip"]["10.0.0.66"] == 12
+        assert snap["packets_per_protocol"] == {"TCP": 32}
+        assert [a["source_ip"] for a in alerts.snapshot()["recent_alerts"]] == ["10.0.0.66"]
+
+        stats = processor.get_shard_stats()
+        assert sum(s["packets_processed"] for s in stats) == 32
+        assert sum(s["packets_dispatched"] for s in stats) == 32
+        assert len(processor.get_traffic_feed()) == 32
+        assert processor.is_alive() is False
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import queue
+import threading
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -74,3 +76,74 @@ class TestPacketQueue:
             pq.put(p)
         for p in packets:
             assert pq.get(block=False) is p
+
+
+class TestPacketQueueBatch:
+    """Batch enqueue / dequeue."""
+
+    def test_put_many_and_get_many_roundtrip(self) -> None:
+        pq = PacketQueue()
+        packets = [_make_fake_packet() for _ in range(5)]
+        assert pq.put_many(packets) == 5
+
+        batch = pq.get_many(10, block=False)
+        assert batch == packets
+        assert pq.empty() is True
+
+    def test_get_many_caps_at_max_items(self) -> None:
+        pq = PacketQueue()
+        pq.put_many([_make_fake_packet() for _ in range(5)])
+        assert len(pq.get_many(3, block=False)) == 3
+        assert pq.qsize() == 2
+
+    def test_get_many_timeout_raises_empty(self) -> None:
+        pq = PacketQueue()
+        with pytest.raises(queue.Empty):
+            pq.get_many(10, block=True, timeout=0.05)
+
+    def test_put_many_nonblocking_partial_when_full(self) -> None:
+        pq = PacketQueue(maxsize=3)
+        packets = [_make_fake_packet() for _ in range(5)]
+        assert pq.put_many(packets) == 3
+        # The first three (FIFO) are kept.
+        assert pq.get_many(10, block=False) == packets[:3]
+
+    def test_put_many_evicting_discards_oldest(self) -> None:
+        pq = PacketQueue(maxsize=3)
+        packets = [_make_fake_packet() for _ in range(5)]
+        pq.put_many(packets[:2])
+        assert pq.put_many_evicting(packets[2:]) == 2
+        assert pq.get_many(10, block=False) == packets[2:]
+        assert pq.stats()["evicted"] == 2
+
+    def test_get_many_wakes_blocked_producer(self) -> None:
+        pq = PacketQueue(maxsize=2)
+        pq.put_many([_make_fake_packet(), _make_fake_packet()])
+        accepted: list[int] = []
+        producer = threading.Thread(
+            target=lambda: accepted.append(
+                pq.put_many([_make_fake_packet()] * 2, block=True, timeout=5.0),
+            ),
+        )
+        producer.start()
+        pq.get_many(2, block=True, timeout=5.0)
+        producer.join(timeout=5.0)
+
+        assert accepted == [2]
+        assert pq.qsize() == 2
+
+    def test_stats(self) -> None:
+        pq = PacketQueue(maxsize=10)
+        pq.put_many([_make_fake_packet() for _ in range(6)])
+        pq.get_many(4, block=False)
+        pq.get_many(4, block=False)
+
+        stats = pq.stats()
+        assert stats["depth"] == 0
+        assert stats["maxsize"] == 10
+        assert stats["high_watermark"] == 6
+        assert stats["enqueued"] == 6
+        assert stats["dequeued"] == 6
+        assert stats["get_batches"] == 2
+        assert stats["avg_get_batch"] == 3.0
+        assert stats["max_get_batch"] == 4
@@ -6,8 +6,10 @@ from unittest.mock import MagicMock, patch, PropertyMock
 
 from scapy.layers.inet import IP, TCP, UDP, ICMP
 from scapy.packet import Packet as ScapyPacket
+from scapy.layers.inet6 import IPv6, ICMPv6EchoRequest
 from scapy.layers.l2 import Ether
 
+from sentinel_dpi.core.raw_frame import RawFrame
 from sentinel_dpi.dpi.feature_schema import PacketFeatures
 from sentinel_dpi.dpi.parser import PacketParser
 
@@ -85,3 +87,40 @@ class TestPacketParserSchema:
 
         expected_keys = set(PacketFeatures.__annotations__.keys())
         assert set(result.keys()) == expected_keys
+
+
+class TestPacketParserRawFrame:
+    """Undissected frames from raw capture backends."""
+
+    def test_parse_raw_frame(self) -> None:
+        pkt = Ether() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1234, dport=443)
+        frame = RawFrame(bytes(pkt)[:54], 1_000_000.25, 1500)
+        result = PacketParser().parse(frame)
+
+        assert result["src_ip"] == "10.0.0.1"
+        assert result["dst_ip"] == "10.0.0.2"
+        assert result["protocol"] == "TCP"
+        assert result["dst_port"] == 443
+        assert result["timestamp"] == 1_000_000.25
+        # Length reflects the wire size, not the truncated capture.
+        assert result["packet_length"] == 1500
+
+
+class TestPacketParserIPv6:
+    """IPv6 address and ICMPv6 extraction."""
+
+    def test_parse_ipv6_udp(self) -> None:
+        pkt = Ether() / IPv6(src="2001:db8::1", dst="2001:db8::2") / UDP(sport=5353, dport=53)
+        result = PacketParser().parse(pkt)
+
+        assert result["src_ip"] == "2001:db8::1"
+        assert result["dst_ip"] == "2001:db8::2"
+        assert result["protocol"] == "UDP"
+        assert result["dst_port"] == 53
+
+    def test_parse_icmpv6(self) -> None:
+        pkt = Ether() / IPv6(src="fe80::1", dst="ff02::1") / ICMPv6EchoRequest()
+        result = PacketParser().parse(pkt)
+
+        assert result["protocol"] == "ICMP"
+        assert result["src_port"] is None
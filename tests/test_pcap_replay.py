@@ -0,0 +1,174 @@
+"""Unit tests for :class:`sentinel_dpi.core.pcap_replay.PcapReplayEngine`."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+from scapy.utils import wrpcap, wrpcapng
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.pcap_replay import PcapReplayEngine
+from sentinel_dpi.core.raw_frame import RawFrame
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _write_capture(
+    path: Path,
+    count: int = 5,
+    interval: float = 0.0,
+    pcapng: bool = False,
+) -> Path:
+    """Write *count* TCP packets spaced *interval* seconds apart."""
+    packets = []
+    for i in range(count):
+        pkt = Ether() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=1000 + i)
+        pkt.time = 1_000_000.0 + i * interval
+        packets.append(pkt)
+    (wrpcapng if pcapng else wrpcap)(str(path), packets)
+    return path
+
+
+def _drain(pq: PacketQueue) -> list:
+    items = []
+    while not pq.empty():
+        items.append(pq.get(block=False))
+    return items
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestPcapReplayMaxSpeed:
+    """As-fast-as-possible replay."""
+
+    def test_replays_all_packets_in_order(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=5)
+        pq = PacketQueue()
+        engine = PcapReplayEngine(pq, Settings(), path=str(path), speed=0)
+        engine.start()
+        assert engine.wait(timeout=5.0)
+
+        packets = _drain(pq)
+        assert [p[TCP].dport for p in packets] == [1000, 1001, 1002, 1003, 1004]
+        # Original capture timestamps are preserved.
+        assert float(packets[0].time) == 1_000_000.0
+
+        stats = engine.stats()
+        assert stats["finished"] is True
+        assert stats["packets_read"] == 5
+        assert stats["packets_enqueued"] == 5
+        assert stats["packets_dropped"] == 0
+        assert stats["achieved_pps"] > 0
+
+    def test_reads_pcapng(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcapng", count=3, pcapng=True)
+        pq = PacketQueue()
+        engine = PcapReplayEngine(pq, Settings(), path=str(path), speed=0)
+        engine.start()
+        assert engine.wait(timeout=5.0)
+        assert pq.qsize() == 3
+
+
+class TestPcapReplayDrops:
+    """Queue overflow handling."""
+
+    def test_full_queue_counts_drops(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=10)
+        pq = PacketQueue(maxsize=4)
+        engine = PcapReplayEngine(pq, Settings(), path=str(path), speed=0)
+        engine.start()
+        assert engine.wait(timeout=5.0)
+
+        stats = engine.stats()
+        assert stats["packets_enqueued"] == 4
+        assert stats["packets_dropped"] == 6
+
+    def test_blocking_mode_is_lossless(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=10)
+        pq = PacketQueue(maxsize=2)
+        engine = PcapReplayEngine(
+            pq, Settings(replay_block=True), path=str(path), speed=0,
+        )
+        engine.start()
+
+        received = []
+        while len(received) < 10:
+            received.append(pq.get(timeout=5.0))
+        assert engine.wait(timeout=5.0)
+        assert engine.stats()["packets_dropped"] == 0
+
+
+class TestPcapReplayTiming:
+    """Timed and scaled replay."""
+
+    def test_original_timing_preserved(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=3, interval=0.1)
+        engine = PcapReplayEngine(PacketQueue(), Settings(), path=str(path), speed=1.0)
+        engine.start()
+        assert engine.wait(timeout=5.0)
+        # 2 gaps × 0.1 s in the original capture.
+        assert engine.stats()["elapsed_seconds"] >= 0.2
+
+    def test_scaled_speed(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=3, interval=0.5)
+        engine = PcapReplayEngine(PacketQueue(), Settings(), path=str(path), speed=10.0)
+        engine.start()
+        assert engine.wait(timeout=5.0)
+        elapsed = engine.stats()["elapsed_seconds"]
+        # 1.0 s of original capture at 10× → ~0.1 s.
+        assert 0.1 <= elapsed < 0.9
+
+    def test_stop_aborts_timed_replay(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=3, interval=30.0)
+        engine = PcapReplayEngine(PacketQueue(), Settings(), path=str(path), speed=1.0)
+        engine.start()
+        engine.stop()
+        assert engine.is_alive() is False
+        assert engine.stats()["packets_read"] < 3
+
+
+class TestPcapReplayLifecycle:
+    """Configuration errors."""
+
+    def test_start_without_file_raises(self) -> None:
+        engine = PcapReplayEngine(PacketQueue(), Settings())
+        with pytest.raises(ValueError):
+            engine.start()
+
+
+class TestPcapReplayRaw:
+    """Raw-frame replay mode."""
+
+    def test_raw_mode_enqueues_raw_frames(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcap", count=3, interval=0.5)
+        pq = PacketQueue()
+        engine = PcapReplayEngine(
+            pq, Settings(replay_raw=True), path=str(path), speed=0,
+        )
+        engine.start()
+        assert engine.wait(timeout=5.0)
+
+        frames = _drain(pq)
+        assert all(isinstance(f, RawFrame) for f in frames)
+        assert [f.timestamp for f in frames] == [1_000_000.0, 1_000_000.5, 1_000_001.0]
+        assert frames[0].wire_length == len(frames[0].data)
+
+    def test_raw_mode_reads_pcapng(self, tmp_path: Path) -> None:
+        path = _write_capture(tmp_path / "cap.pcapng", count=2, interval=0.25, pcapng=True)
+        pq = PacketQueue()
+        engine = PcapReplayEngine(
+            pq, Settings(replay_raw=True), path=str(path), speed=0,
+        )
+        engine.start()
+        assert engine.wait(timeout=5.0)
+
+        frames = _drain(pq)
+        assert [f.timestamp for f in frames] == [1_000_000.0, 1_000_000.25]
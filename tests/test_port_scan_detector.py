@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
-from sentinel_dpi.dpi.feature_schema import PacketFeatures
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
 
 
 # --------------------------------------------------------------------------- #
@@ -18,8 +18,8 @@ def _make_features(
     """Return a ``PacketFeatures`` dict with the given overrides."""
     return PacketFeatures(
         timestamp=timestamp,
-        src_ip=src_ip,
-        dst_ip="10.0.0.2",
+        src_ip=ip_to_int(src_ip) if src_ip is not None else None,
+        dst_ip=ip_to_int("10.0.0.2"),
         protocol="TCP",
         src_port=12345,
         dst_port=dst_port,
@@ -103,6 +103,66 @@ class TestPortScanPruning:
         assert result is None
 
 
+class TestPortScanRefreshedPorts:
+    """A port seen again stays in the window from its latest packet."""
+
+    def test_repeated_port_is_refreshed(self) -> None:
+        detector = PortScanDetector(threshold=3, window_seconds=5.0)
+        detector.analyze(_make_features(dst_port=1, timestamp=100.0))
+        detector.analyze(_make_features(dst_port=2, timestamp=101.0))
+        detector.analyze(_make_features(dst_port=1, timestamp=104.0))
+
+        # t=106: port 2 (101) has expired, port 1 (104) has not.
+        result = detector.analyze(_make_features(dst_port=3, timestamp=106.0))
+        assert result is None
+        result = detector.analyze(_make_features(dst_port=4, timestamp=106.5))
+        assert result is not None
+        assert result[0]["unique_ports"] == 3
+
+    def test_busy_port_holds_one_entry(self) -> None:
+        detector = PortScanDetector(threshold=3, window_seconds=60.0)
+        for i in range(1000):
+            detector.analyze(_make_features(dst_port=443, timestamp=100.0 + i * 0.01))
+        assert detector.tracked_sources == 1
+        assert [len(w.ports) for w in detector._sources.values()] == [1]
+
+
+class TestPortScanEviction:
+    """Per-source state is bounded."""
+
+    def test_idle_sources_evicted(self) -> None:
+        detector = PortScanDetector(threshold=50, window_seconds=5.0)
+        for i in range(100):
+            detector.analyze(_make_features(src_ip=f"10.0.1.{i}", timestamp=100.0))
+        assert detector.tracked_sources == 100
+
+        detector.analyze(_make_features(src_ip="10.0.2.1", timestamp=110.0))
+        assert detector.tracked_sources == 1
+        assert detector.evicted_idle == 100
+
+    def test_lru_cap(self) -> None:
+        detector = PortScanDetector(threshold=3, window_seconds=60.0, max_sources=2)
+        detector.analyze(_make_features(src_ip="10.0.0.1", dst_port=1, timestamp=100.0))
+        detector.analyze(_make_features(src_ip="10.0.0.2", dst_port=1, timestamp=101.0))
+        # Touch .1 so .2 becomes the least recently seen.
+        detector.analyze(_make_features(src_ip="10.0.0.1", dst_port=2, timestamp=102.0))
+        detector.analyze(_make_features(src_ip="10.0.0.3", dst_port=1, timestamp=103.0))
+
+        assert detector.tracked_sources == 2
+        assert detector.evicted_lru == 1
+        # .1 kept its ports: the third one completes a scan.
+        result = detector.analyze(
+            _make_features(src_ip="10.0.0.1", dst_port=3, timestamp=104.0),
+        )
+        assert result is not None
+
+    def test_cooldown_survives_while_tracked(self) -> None:
+        detector = PortScanDetector(threshold=2, window_seconds=10.0)
+        detector.analyze(_make_features(dst_port=1, timestamp=100.0))
+        assert detector.analyze(_make_features(dst_port=2, timestamp=101.0)) is not None
+        assert detector.analyze(_make_features(dst_port=3, timestamp=102.0)) is None
+
+
 class TestPortScanMissingFields:
     """Packets with None src_ip or dst_port must be safely skipped."""
 
@@ -115,3 +175,30 @@ class TestPortScanMissingFields:
         detector = PortScanDetector(threshold=1, window_seconds=10.0)
         result = detector.analyze(_make_features(dst_port=None))
         assert result is None
+
+
+class TestPortScanBatch:
+    """``analyze_batch`` updates state once per batch."""
+
+    def test_batch_matches_per_packet_detection(self) -> None:
+        batch = [_make_features(dst_port=p, timestamp=1_000_000.0 + p) for p in range(8)]
+        batched = PortScanDetector(threshold=5, window_seconds=60.0)
+        alerts = batched.analyze_batch(batch)
+
+        assert alerts is not None and len(alerts) == 1
+        assert alerts[0]["unique_ports"] == 8
+        assert alerts[0]["timestamp"] == 1_000_007.0
+
+    def test_one_alert_per_source_per_batch(self) -> None:
+        detector = PortScanDetector(threshold=3, window_seconds=60.0)
+        batch = [
+            _make_features(src_ip=src, dst_port=p)
+            for src in ("10.0.0.1", "10.0.0.2")
+            for p in range(5)
+        ]
+        alerts = detector.analyze_batch(batch)
+        assert sorted(a["source_ip"] for a in alerts) == ["10.0.0.1", "10.0.0.2"]
+
+    def test_batch_skips_incomplete_features(self) -> None:
+        detector = PortScanDetector(threshold=1)
+        assert detector.analyze_batch([_make_features(dst_port=None)]) is None
@@ -0,0 +1,167 @@
+"""Unit tests for :class:`sentinel_dpi.detection.plugins.scan_sketch_detector.SketchScanDetector`."""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import scan_detector
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.detection.plugins.scan_sketch_detector import (
+    SketchScanDetector,
+    linear_count,
+)
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_features(
+    src_ip: str = "10.0.0.1",
+    dst_ip: str | int = "10.0.0.2",
+    dst_port: int | None = 80,
+    timestamp: float = 1_000_000.0,
+) -> PacketFeatures:
+    return PacketFeatures(
+        timestamp=timestamp,
+        src_ip=ip_to_int(src_ip),
+        dst_ip=dst_ip if isinstance(dst_ip, int) else ip_to_int(dst_ip),
+        protocol="TCP" if dst_port is not None else "ICMP",
+        src_port=40_000 if dst_port is not None else None,
+        dst_port=dst_port,
+        packet_length=60,
+    )
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestLinearCounting:
+    """The estimator stays within its error bound."""
+
+    @pytest.mark.parametrize("distinct", [10, 100, 500, 1000])
+    def test_port_estimate_accuracy(self, distinct: int) -> None:
+        detector = SketchScanDetector(port_threshold=10**6, host_threshold=10**6)
+        for port in range(distinct):
+            detector.analyze(_make_features(dst_port=port))
+        ports, hosts = detector.estimate(ip_to_int("10.0.0.1"))
+        # 3 standard errors at m = 1024 (~2.6 % for n <= m).
+        assert ports == pytest.approx(distinct, rel=0.08, abs=1)
+        assert hosts == pytest.approx(1, abs=0.01)
+
+    def test_empty_bitmap_estimates_zero(self) -> None:
+        assert linear_count(0, 1024) == 0.0
+
+
+class TestSketchPortScan:
+    """PORT_SCAN alerts match the exact detector's shape."""
+
+    def test_alert_shape(self) -> None:
+        detector = SketchScanDetector(port_threshold=5, window_seconds=10.0)
+        alerts = None
+        for port in range(1, 6):
+            alerts = detector.analyze(_make_features(dst_port=port, timestamp=100.0 + port))
+        assert alerts == [{
+            "type": "PORT_SCAN",
+            "source_ip": "10.0.0.1",
+            "unique_ports": 5,
+            "window_seconds": 10.0,
+            "timestamp": 105.0,
+        }]
+
+    def test_repeated_port_does_not_alert(self) -> None:
+        detector = SketchScanDetector(port_threshold=2)
+        for i in range(100):
+            assert detector.analyze(_make_features(dst_port=443, timestamp=100.0 + i * 0.01)) is None
+
+    def test_window_rotates_out(self) -> None:
+        detector = SketchScanDetector(port_threshold=100, window_seconds=4.0, buckets=4)
+        for port in range(50):
+            detector.analyze(_make_features(dst_port=port, timestamp=100.0))
+        detector.analyze(_make_features(dst_port=1000, timestamp=104.5))
+        ports, _ = detector.estimate(ip_to_int("10.0.0.1"))
+        assert ports == pytest.approx(1, abs=0.01)
+
+    def test_ongoing_scan_alerts_again_after_cooldown(self) -> None:
+        detector = SketchScanDetector(port_threshold=5, window_seconds=4.0)
+        types = []
+        for i in range(80):
+            result = detector.analyze(_make_features(dst_port=i % 10, timestamp=100.0 + i * 0.1))
+            types.extend(a["type"] for a in result or ())
+        # 8 seconds of scanning, one alert per 4-second cooldown.
+        assert types == ["PORT_SCAN", "PORT_SCAN"]
+
+    def test_batch_matches_single(self) -> None:
+        batch = [_make_features(dst_port=p, timestamp=100.0) for p in range(30)]
+        alerts = SketchScanDetector(port_threshold=20).analyze_batch(batch)
+        assert [a["type"] for a in alerts] == ["PORT_SCAN"]
+
+
+class TestSketchHostSweep:
+    """Distinct destination hosts are tracked separately from ports."""
+
+    def test_icmp_sweep(self) -> None:
+        detector = SketchScanDetector(port_threshold=5, host_threshold=20)
+        alerts = []
+        for i in range(30):
+            result = detector.analyze(_make_features(dst_ip=f"192.168.1.{i}", dst_port=None))
+            alerts.extend(result or ())
+        assert [a["type"] for a in alerts] == ["HOST_SWEEP"]
+        assert alerts[0]["unique_hosts"] == 20
+        assert alerts[0]["source_ip"] == "10.0.0.1"
+
+    def test_ipv6_destinations(self) -> None:
+        detector = SketchScanDetector(host_threshold=10**6)
+        for i in range(200):
+            detector.analyze(_make_features(dst_ip=f"2001:db8::{i:x}", dst_port=None))
+        _, hosts = detector.estimate(ip_to_int("10.0.0.1"))
+        assert hosts == pytest.approx(200, rel=0.08)
+
+
+class TestSketchMemory:
+    """Per-source state is small and bounded."""
+
+    def test_bytes_per_source(self) -> None:
+        detector = SketchScanDetector(port_threshold=10**6, host_threshold=10**6)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(2000):
+            for port in range(20):
+                detector.analyze(_make_features(
+                    src_ip=f"10.1.{i >> 8}.{i & 0xFF}", dst_ip=f"192.168.0.{port}",
+                    dst_port=port,
+                ))
+        per_source = (tracemalloc.get_traced_memory()[0] - before) / 2000
+        tracemalloc.stop()
+        assert per_source < 2048
+
+    def test_lru_cap_and_idle_eviction(self) -> None:
+        detector = SketchScanDetector(max_sources=10, window_seconds=5.0)
+        for i in range(25):
+            detector.analyze(_make_features(src_ip=f"10.0.1.{i}", timestamp=100.0))
+        assert detector.tracked_sources == 10
+        assert detector.evicted_lru == 15
+
+        detector.analyze(_make_features(src_ip="10.0.2.1", timestamp=110.0))
+        assert detector.tracked_sources == 1
+
+
+class TestScanDetectorSetting:
+    """``settings.scan_detector`` selects the implementation."""
+
+    def test_default_is_exact(self) -> None:
+        assert isinstance(scan_detector(Settings()), PortScanDetector)
+
+    def test_sketch(self) -> None:
+        assert isinstance(scan_detector(Settings(scan_detector="sketch")), SketchScanDetector)
+
+    def test_unknown_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            scan_detector(Settings(scan_detector="bloom"))
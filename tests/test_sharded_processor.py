@@ -0,0 +1,243 @@
+"""Unit tests for :class:`sentinel_dpi.core.sharded_processor.ShardedPacketProcessor`."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from scapy.layers.inet import IP, TCP, UDP
+from scapy.layers.inet6 import IPv6
+from scapy.layers.l2 import ARP, Dot1Q, Ether
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.packet_processor import PacketProcessor
+from sentinel_dpi.core.packet_queue import PacketQueue
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.core.sharded_processor import ShardedPacketProcessor
+from sentinel_dpi.detection.detection_manager import DetectionManager
+from sentinel_dpi.detection.plugins.port_scan_detector import PortScanDetector
+from sentinel_dpi.dpi.fast_parser import FastPacketParser
+from sentinel_dpi.dpi.feature_schema import ip_to_int
+from sentinel_dpi.dpi.flow_hash import addresses, shard_index, shard_key
+from sentinel_dpi.services.alert_manager import AlertManager
+from sentinel_dpi.services.metrics_service import MergedMetricsView, MetricsService
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _eth() -> Ether:
+    return Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")
+
+
+def _raw(pkt, timestamp: float = 1_000_000.0) -> RawFrame:
+    data = bytes(pkt)
+    return RawFrame(data, timestamp, len(data))
+
+
+def _make_sharded(
+    workers: int = 4,
+    alert_manager: AlertManager | None = None,
+    **settings_overrides: object,
+) -> tuple[ShardedPacketProcessor, PacketQueue, MergedMetricsView]:
+    settings = Settings(processor_timeout=0.05, **settings_overrides)
+    services = [MetricsService(pps_window=1e9) for _ in range(workers)]
+    queues = [PacketQueue() for _ in range(workers)]
+    shards = [
+        PacketProcessor(
+            packet_queue=q,
+            settings=settings,
+            parser=FastPacketParser(),
+            detection_manager=DetectionManager([PortScanDetector(threshold=10)]),
+            metrics_service=svc,
+            alert_manager=alert_manager,
+            name=f"PacketProcessor-{i}",
+        )
+        for i, (q, svc) in enumerate(zip(queues, services))
+    ]
+    packet_queue = PacketQueue()
+    sharded = ShardedPacketProcessor(packet_queue, settings, shards, queues)
+    return sharded, packet_queue, MergedMetricsView(services)
+
+
+def _wait_processed(sharded: ShardedPacketProcessor, count: int) -> None:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        if sum(s["packets_processed"] for s in sharded.get_shard_stats()) >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("shards did not process all packets in time")
+
+
+# --------------------------------------------------------------------------- #
+# Routing keys
+# --------------------------------------------------------------------------- #
+
+class TestFlowHash:
+    """Routing-key extraction."""
+
+    def test_raw_and_scapy_addresses_agree(self) -> None:
+        for pkt in (
+            _eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(),
+            _eth() / Dot1Q(vlan=7) / IP(src="10.0.0.3", dst="10.0.0.4") / UDP(),
+            _eth() / IPv6(src="2001:db8::1", dst="2001:db8::2") / TCP(),
+        ):
+            assert addresses(_raw(pkt)) == addresses(Ether(bytes(pkt)))
+
+    def test_source_key_is_source_address(self) -> None:
+        pkt = _raw(_eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP())
+        assert shard_key(pkt, "source") == ip_to_int("10.0.0.1")
+
+    def test_flow_key_is_symmetric(self) -> None:
+        fwd = _raw(_eth() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1, dport=2))
+        rev = _raw(_eth() / IP(src="10.0.0.2", dst="10.0.0.1") / TCP(sport=2, dport=1))
+        assert shard_key(fwd, "flow") == shard_key(rev, "flow")
+        assert shard_key(fwd, "source") != shard_key(rev, "source")
+
+    def test_non_ip_and_truncated_frames_map_to_zero(self) -> None:
+        assert shard_key(_raw(_eth() / ARP())) == 0
+        assert shard_key(RawFrame(b"\x00" * 10, 0.0, 10)) == 0
+
+    def test_shard_index_spreads_sequential_sources(self) -> None:
+        hits = [0] * 4
+        for i in range(1000):
+            hits[shard_index(ip_to_int(f"10.0.{i >> 8}.{i & 0xFF}"), 4)] += 1
+        assert min(hits) > 150
+
+
+# --------------------------------------------------------------------------- #
+# Sharded processing
+# --------------------------------------------------------------------------- #
+
+class TestPacketProcessorTicks:
+    """The processor drives the detection manager's tick scheduler."""
+
+    def test_batch_runs_due_ticks(self) -> None:
+        from sentinel_dpi.detection.plugins.high_traffic_detector import (
+            HighTrafficDetector,
+        )
+
+        metrics = MetricsService(pps_window=1.0)
+        alerts = AlertManager()
+        high_traffic = HighTrafficDetector(metrics, threshold=5.0, window=1)
+        processor = PacketProcessor(
+            packet_queue=PacketQueue(),
+            settings=Settings(),
+            parser=FastPacketParser(),
+            detection_manager=DetectionManager([high_traffic]),
+            metrics_service=metrics,
+            alert_manager=alerts,
+        )
+        frames = [
+            _raw(_eth() / IP(src="10.0.0.1", dst="10.0.0.2") / UDP(), 1e6 + i / 100)
+            for i in range(20)
+        ]
+        processor.process_batch(frames)
+
+        (alert,) = alerts.snapshot()["recent_alerts"]
+        assert alert["type"] == "HIGH_TRAFFIC"
+        (stats,) = processor.get_stats()["detectors"]
+        assert stats["invocations"] == 0 and stats["ticks"] == 1
+
+
+class TestShardedPacketProcessor:
+    """Dispatch, merge-on-read and per-shard statistics."""
+
+    def test_source_stays_on_one_shard(self) -> None:
+        sharded, pq, metrics = _make_sharded()
+        sources = [f"10.0.0.{i}" for i in range(1, 21)]
+        for src in sources:
+            for port in range(3):
+                pq.put(_raw(_eth() / IP(src=src, dst="10.9.9.9") / TCP(dport=port)))
+
+        sharded.start()
+        try:
+            _wait_processed(sharded, 60)
+        finally:
+            sharded.stop()
+
+        for svc in metrics.services:
+            for count in svc.counters()["per_src_ip"].values():
+                assert count == 3
+        assert metrics.snapshot()["packets_per_source_ip"] == {src: 3 for src in sources}
+
+    def test_merged_snapshot_matches_single_service(self) -> None:
+        sharded, pq, metrics = _make_sharded(workers=3)
+        single = MetricsService(pps_window=1e9)
+        parser = FastPacketParser()
+        frames = [
+            _raw(_eth() / IP(src=f"10.0.0.{i % 7}", dst=f"10.1.0.{i % 5}") / UDP(), 1e6 + i)
+            for i in range(50)
+        ] + [_raw(_eth() / ARP(), 1e6 + 50)]
+        for frame in frames:
+            pq.put(frame)
+            single.update(parser.parse(frame))
+
+        sharded.start()
+        try:
+            _wait_processed(sharded, len(frames))
+        finally:
+            sharded.stop()
+
+        merged, expected = metrics.snapshot(), single.snapshot()
+        for snap in (merged, expected):
+            snap["top_talkers"].sort(key=lambda t: (-t["packets"], t["ip"]))
+        assert merged == expected
+
+    def test_port_scan_detected_across_shards(self) -> None:
+        alerts = AlertManager()
+        sharded, pq, _ = _make_sharded(alert_manager=alerts)
+        for port in range(12):
+            pq.put(_raw(_eth() / IP(src="10.0.0.66", dst="10.9.9.9") / TCP(dport=port)))
+            # Unrelated sources interleaved on other shards.
+            pq.put(_raw(_eth() / IP(src=f"10.0.1.{port}", dst="10.9.9.9") / TCP(dport=80)))
+
+        sharded.start()
+        try:
+            _wait_processed(sharded, 24)
+        finally:
+            sharded.stop()
+
+        stored = alerts.snapshot()["recent_alerts"]
+        assert [a["source_ip"] for a in stored] == ["10.0.0.66"]
+
+    def test_shard_stats_and_feed(self) -> None:
+        sharded, pq, _ = _make_sharded(workers=2, traffic_feed_size=5)
+        for i in range(10):
+            pq.put(_raw(_eth() / IP(src=f"10.0.0.{i}", dst="10.9.9.9") / TCP(), 1e6 + i))
+
+        sharded.start()
+        try:
+            _wait_processed(sharded, 10)
+        finally:
+            sharded.stop()
+
+        stats = sharded.get_shard_stats()
+        assert [s["shard"] for s in stats] == [0, 1]
+        assert sum(s["packets_dispatched"] for s in stats) == 10
+        assert all(s["packets_dropped"] == 0 for s in stats)
+        assert all(s["queue_depth"] == 0 for s in stats)
+
+        feed = sharded.get_traffic_feed()
+        assert [e["timestamp"] for e in feed] == [1e6 + i for i in range(5, 10)]
+
+    def test_full_shard_queue_counts_drops(self) -> None:
+        settings = Settings()
+        shard_queue = PacketQueue(maxsize=2)
+        shard = PacketProcessor(shard_queue, settings, parser=FastPacketParser())
+        sharded = ShardedPacketProcessor(PacketQueue(), settings, [shard], [shard_queue])
+
+        sharded._dispatch([_raw(_eth() / IP() / TCP())] * 5)
+
+        stats = sharded.get_shard_stats()[0]
+        assert stats["packets_dispatched"] == 2
+        assert stats["packets_dropped"] == 3
+
+    def test_rejects_unknown_shard_key(self) -> None:
+        shard_queue = PacketQueue()
+        shard = PacketProcessor(shard_queue, Settings(), parser=FastPacketParser())
+        with pytest.raises(ValueError):
+            ShardedPacketProcessor(
+                PacketQueue(), Settings(shard_key="random"), [shard], [shard_queue],
+            )
@@ -0,0 +1,107 @@
+"""Unit tests for :class:`sentinel_dpi.core.shm_ring.ShmRing`."""
+
+from __future__ import annotations
+
+import multiprocessing
+import random
+import time
+
+import pytest
+
+from sentinel_dpi.core.raw_frame import RawFrame
+from sentinel_dpi.core.shm_ring import ShmRing
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+@pytest.fixture
+def ring():
+    ring = ShmRing(256)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _frame(i: int, size: int = 20) -> RawFrame:
+    return RawFrame(bytes([i % 256]) * size, 1_000.0 + i, size + 4)
+
+
+def _produce(name: str, count: int) -> None:
+    ring = ShmRing.attach(name)
+    sent = 0
+    while sent < count:
+        sent += ring.put_many([_frame(i) for i in range(sent, min(count, sent + 7))])
+    ring.close()
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestShmRingBasics:
+    """Single-process behaviour."""
+
+    def test_roundtrip_preserves_fields(self, ring: ShmRing) -> None:
+        frames = [_frame(1), _frame(2, size=0), _frame(3, size=33)]
+        assert ring.put_many(frames) == 3
+        assert ring.depth() == 3
+        assert ring.get_many(10) == frames
+        assert ring.depth() == 0
+        assert ring.bytes_used() == 0
+
+    def test_full_ring_accepts_prefix(self, ring: ShmRing) -> None:
+        # 16-byte header + 40 bytes → 56 per record; 4 fit in 256 bytes.
+        written = ring.put_many([_frame(i, size=40) for i in range(10)])
+        assert written == 4
+        assert ring.get_many(2) == [_frame(0, size=40), _frame(1, size=40)]
+        assert ring.put_many([_frame(9, size=40)]) == 1
+
+    def test_get_many_respects_limit(self, ring: ShmRing) -> None:
+        ring.put_many([_frame(i, size=8) for i in range(5)])
+        assert len(ring.get_many(2)) == 2
+        assert len(ring.get_many(10)) == 3
+
+    def test_wraparound_with_random_sizes(self, ring: ShmRing) -> None:
+        rng = random.Random(7)
+        reader = ShmRing.attach(ring.name)
+        sent: list[RawFrame] = []
+        received: list[RawFrame] = []
+        for i in range(5_000):
+            batch = [_frame(i, size=rng.randrange(0, 70)) for _ in range(rng.randrange(1, 4))]
+            sent.extend(batch[:ring.put_many(batch)])
+            received.extend(reader.get_many(rng.randrange(1, 5)))
+        received.extend(reader.get_many(1_000_000))
+        reader.close()
+        assert received == sent
+
+    def test_attach_reads_capacity_from_header(self, ring: ShmRing) -> None:
+        other = ShmRing.attach(ring.name)
+        assert other.capacity == ring.capacity == 256
+        other.close()
+
+    def test_too_small_capacity_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            ShmRing(8)
+
+
+class TestShmRingCrossProcess:
+    """Producer and consumer in different processes."""
+
+    def test_frames_cross_process_boundary_in_order(self) -> None:
+        ring = ShmRing(4096)
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            producer = ctx.Process(target=_produce, args=(ring.name, 2_000))
+            producer.start()
+
+            received: list[RawFrame] = []
+            deadline = time.monotonic() + 10.0
+            while len(received) < 2_000 and time.monotonic() < deadline:
+                received.extend(ring.get_many(100))
+            producer.join(10.0)
+            assert received == [_frame(i) for i in range(2_000)]
+        finally:
+            ring.close()
+            ring.unlink()
@@ -0,0 +1,138 @@
+"""Unit tests for :mod:`sentinel_dpi.services.time_series`."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sentinel_dpi.dpi.batch_parser import PROTO_TCP, PROTO_UDP
+from sentinel_dpi.services.time_series import TimeSeries
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_series(slots: tuple[int, int, int] = (120, 60, 24), window: float = 10.0) -> TimeSeries:
+    return TimeSeries(slots, window=window)
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestWindowRates:
+    """Running sums over the last *window* seconds."""
+
+    def test_window_sums(self) -> None:
+        series = _make_series(window=5.0)
+        for ts in (100.2, 100.7, 103.0):
+            series.add(ts, 100, "TCP")
+        assert series.window_packets() == 3
+        assert series.window_bytes() == 300
+        series.add(105.5, 50, "TCP")  # Window is now seconds 101..105.
+        assert series.window_packets() == 2
+        assert series.window_bytes() == 150
+
+    def test_late_packet_inside_window(self) -> None:
+        series = _make_series(window=5.0)
+        series.add(110.0, 10, "TCP")
+        series.add(108.0, 20, "TCP")
+        series.add(100.0, 40, "TCP")  # Too old for the window.
+        assert series.window_packets() == 2
+        assert series.window_bytes() == 30
+
+    def test_gap_longer_than_window(self) -> None:
+        series = _make_series(window=5.0)
+        series.add(100.0, 10, "TCP")
+        series.add(500.0, 10, "TCP")
+        assert series.window_packets() == 1
+
+
+class TestRanges:
+    """History at each resolution."""
+
+    def test_seconds(self) -> None:
+        series = _make_series()
+        series.add(100.0, 10, "TCP", new_source=True)
+        series.add(100.5, 20, "UDP")
+        series.add(102.0, 30, "TCP")
+        data = series.range(1, start=99, end=102)
+        assert data["timestamps"] == [99, 100, 101, 102]
+        assert data["packets"] == [0, 2, 0, 1]
+        assert data["bytes"] == [0, 30, 0, 30]
+        assert data["new_sources"] == [0, 1, 0, 0]
+        assert data["protocols"]["UDP"] == [0, 1, 0, 0]
+        assert data["protocols"]["TCP"] == [0, 1, 0, 1]
+
+    def test_rollups(self) -> None:
+        series = _make_series()
+        for second in range(0, 180, 2):
+            series.add(3_600.0 + second, 1, "TCP")
+        minutes = series.range(60, start=3_600, end=3_779)
+        assert minutes["timestamps"] == [3_600, 3_660, 3_720]
+        assert minutes["packets"] == [30, 30, 30]
+        hours = series.range(3600, start=3_600, end=3_600)
+        assert hours["packets"] == [90]
+
+    def test_defaults_cover_retention(self) -> None:
+        series = _make_series(slots=(120, 60, 24))
+        series.add(1_000.0, 1, "TCP")
+        data = series.range(1)
+        assert len(data["timestamps"]) == 120
+        assert data["timestamps"][-1] == 1_000
+        assert data["packets"][-1] == 1
+        assert len(series.range(1, limit=30)["packets"]) == 30
+
+    def test_old_buckets_are_overwritten(self) -> None:
+        series = _make_series(slots=(10, 60, 24))
+        series.add(100.0, 1, "TCP")
+        series.add(110.0, 1, "TCP")  # Same slot as second 100.
+        series.add(111.0, 1, "TCP")
+        assert series.range(1, start=100, end=100)["packets"] == [0]
+        assert series.range(1, start=110, end=111)["packets"] == [1, 1]
+        # Still counted in the coarser ring.
+        assert series.range(60, start=60, end=60)["packets"] == [3]
+
+    def test_span_is_clamped_to_retention(self) -> None:
+        series = _make_series(slots=(120, 60, 24))
+        series.add(1_000.0, 1, "TCP")
+        data = series.range(1, start=-10_000_000, end=1_000)
+        assert len(data["timestamps"]) == 120
+        assert data["timestamps"][-1] == 1_000
+
+    def test_start_after_end(self) -> None:
+        with pytest.raises(ValueError):
+            _make_series().range(1, start=200, end=100)
+
+    def test_unknown_resolution(self) -> None:
+        with pytest.raises(ValueError):
+            _make_series().range(10)
+
+
+class TestBatchesAndMerge:
+    """Columnar batches and shard deltas."""
+
+    def test_batch_matches_records(self) -> None:
+        timestamps = np.array([100.1, 100.9, 101.2, 103.5])
+        lengths = np.array([10, 20, 30, 40], dtype=np.uint32)
+        protocols = np.array([PROTO_TCP, PROTO_UDP, PROTO_TCP, PROTO_TCP], dtype=np.uint8)
+        batched = _make_series()
+        batched.add_batch(timestamps, lengths, protocols, new_source_times=[100.9, 103.5])
+        recorded = _make_series()
+        for ts, length, proto, new in zip(timestamps, lengths, ("TCP", "UDP", "TCP", "TCP"),
+                                          (False, True, False, True)):
+            recorded.add(float(ts), int(length), proto, new)
+        assert batched.range(1, start=100, end=103) == recorded.range(1, start=100, end=103)
+        assert batched.window_bytes() == recorded.window_bytes() == 100
+
+    def test_take_and_merge(self) -> None:
+        worker = _make_series()
+        worker.add(100.0, 10, "TCP")
+        worker.add(101.0, 20, "TCP")
+        merged = _make_series()
+        merged.add(101.5, 5, "UDP")
+        merged.merge(worker.take())
+        assert merged.range(1, start=100, end=101)["bytes"] == [10, 25]
+        assert merged.window_packets() == 3
+        assert worker.take() == []
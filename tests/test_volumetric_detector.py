@@ -0,0 +1,233 @@
+"""Unit tests for :class:`sentinel_dpi.detection.plugins.volumetric_detector.VolumetricDetector`."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from sentinel_dpi.config.settings import Settings
+from sentinel_dpi.core.multiprocess_processor import shard_detectors
+from sentinel_dpi.detection.plugins.volumetric_detector import VolumetricDetector
+from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_ICMP, PROTO_UDP
+from sentinel_dpi.dpi.feature_schema import PacketFeatures, ip_to_int
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_features(
+    src_ip: str | int = "10.0.0.1",
+    dst_ip: str | int = "192.168.1.10",
+    dst_port: int | None = 53,
+    timestamp: float = 1_000.0,
+    packet_length: int = 100,
+) -> PacketFeatures:
+    return PacketFeatures(
+        timestamp=timestamp,
+        src_ip=src_ip if isinstance(src_ip, int) else ip_to_int(src_ip),
+        dst_ip=dst_ip if isinstance(dst_ip, int) else ip_to_int(dst_ip),
+        protocol="UDP" if dst_port is not None else "ICMP",
+        src_port=40_000 if dst_port is not None else None,
+        dst_port=dst_port,
+        packet_length=packet_length,
+    )
+
+
+def _flood(
+    count: int,
+    dst_ip: str = "192.168.1.10",
+    start: float = 1_000.0,
+    rate: float = 1_000.0,
+) -> list[PacketFeatures]:
+    """*count* packets from distinct sources towards *dst_ip* at *rate* pkt/s."""
+    return [
+        _make_features(src_ip=0x0B000000 + i, dst_ip=dst_ip, timestamp=start + i / rate)
+        for i in range(count)
+    ]
+
+
+def _make_detector(**kwargs: object) -> VolumetricDetector:
+    params: dict = {
+        "pps_threshold": 100.0,
+        "bps_threshold": 10**12,
+        "window_seconds": 10.0,
+    }
+    params.update(kwargs)
+    return VolumetricDetector(**params)
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestVolumetricEstimates:
+    """Sketch estimates never undercount and stay close for heavy keys."""
+
+    def test_exact_without_collisions(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_flood(500))
+        assert detector.estimate(ip_to_int("192.168.1.10")) == (500, 50_000)
+
+    def test_heavy_key_among_noise(self) -> None:
+        detector = _make_detector(width=256)
+        rng = np.random.default_rng(7)
+        noise = [
+            _make_features(dst_ip=int(ip), timestamp=1_000.0)
+            for ip in rng.integers(1, 2**32, size=5_000)
+        ]
+        detector.analyze_batch(noise + _flood(1_000))
+        packets, _ = detector.estimate(ip_to_int("192.168.1.10"))
+        # Overestimate bound: e / width of 6 000 packets (~64).
+        assert 1_000 <= packets <= 1_000 + 64
+
+    def test_ipv6_destinations(self) -> None:
+        detector = _make_detector()
+        victim = ip_to_int("2001:db8::10")
+        detector.analyze_batch([_make_features(dst_ip=victim) for _ in range(3)])
+        assert detector.estimate(victim)[0] == 3
+
+
+class TestVolumetricAlerts:
+    """Thresholds are checked on tick, once per victim and window."""
+
+    def test_alert_above_pps_threshold(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_flood(2_000))
+        alerts = detector.on_tick(1_002.0)
+        assert alerts is not None and len(alerts) == 1
+        alert = alerts[0]
+        assert alert["type"] == "VOLUMETRIC"
+        assert alert["target_ip"] == "192.168.1.10"
+        assert alert["packets_per_second"] == pytest.approx(200.0)
+        assert alert["top_ports"] == [53]
+        assert len(alert["top_sources"]) == 5
+
+    def test_alert_above_bps_threshold(self) -> None:
+        detector = _make_detector(pps_threshold=10**9, bps_threshold=1_000.0)
+        detector.analyze_batch([
+            _make_features(packet_length=1_500, timestamp=1_000.0) for _ in range(10)
+        ])
+        alerts = detector.on_tick(1_001.0)
+        assert alerts is not None
+        assert alerts[0]["bytes_per_second"] == pytest.approx(1_500.0)
+
+    def test_no_alert_below_threshold(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_flood(500))
+        assert detector.on_tick(1_001.0) is None
+
+    def test_cooldown_per_victim(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_flood(2_000))
+        assert detector.on_tick(1_002.0) is not None
+        assert detector.on_tick(1_003.0) is None
+        detector.analyze_batch(_flood(2_000, dst_ip="192.168.1.20", start=1_003.0))
+        alerts = detector.on_tick(1_005.0)
+        assert alerts is not None
+        assert [a["target_ip"] for a in alerts] == ["192.168.1.20"]
+
+    def test_sources_attributed_per_victim(self) -> None:
+        detector = _make_detector(top_k=4)
+        batch = [
+            _make_features(
+                src_ip=f"{net}.0.0.{i % 3}", dst_ip=victim, dst_port=port,
+                timestamp=1_000.0 + i / 1_000,
+            )
+            for i in range(1_500)
+            for net, victim, port in (
+                (11, "192.168.1.10", 53), (12, "192.168.1.20", 80), (13, "192.168.1.99", 22),
+            )
+        ]
+        # Background noise: many light sources to a third host.
+        batch += _flood(50, dst_ip="192.168.1.99")
+        detector.analyze_batch(batch)
+        alerts = {a["target_ip"]: a for a in detector.on_tick(1_002.0) or []}
+        first, second = alerts["192.168.1.10"], alerts["192.168.1.20"]
+        assert sorted(first["top_sources"]) == ["11.0.0.0", "11.0.0.1", "11.0.0.2"]
+        assert first["top_ports"] == [53]
+        assert sorted(second["top_sources"]) == ["12.0.0.0", "12.0.0.1", "12.0.0.2"]
+        assert second["top_ports"] == [80]
+
+    def test_window_expires(self) -> None:
+        detector = _make_detector()
+        detector.analyze_batch(_flood(2_000))
+        assert detector.on_tick(1_030.0) is None
+        assert detector.estimate(ip_to_int("192.168.1.10")) == (0, 0)
+        assert detector.heavy_hitters()["destinations"] == []
+
+
+class TestVolumetricHeavyHitters:
+    """The heavy-hitter lists are bounded and ranked."""
+
+    def test_ranked_and_bounded(self) -> None:
+        detector = _make_detector(top_k=3)
+        batch = [
+            _make_features(dst_ip=f"10.1.0.{i}", dst_port=1_000 + i)
+            for i in range(1, 11) for _ in range(i)
+        ]
+        detector.analyze_batch(batch)
+        hitters = detector.heavy_hitters()
+        assert hitters["destinations"] == [
+            {"key": "10.1.0.10", "packets": 10},
+            {"key": "10.1.0.9", "packets": 9},
+            {"key": "10.1.0.8", "packets": 8},
+        ]
+        assert [h["key"] for h in hitters["ports"]] == [1_010, 1_009, 1_008]
+
+    def test_memory_is_fixed(self) -> None:
+        detector = _make_detector()
+        before = detector.memory_bytes
+        detector.analyze_batch(_flood(5_000))
+        assert detector.memory_bytes == before
+
+
+class TestVolumetricColumns:
+    """The columnar entry point counts like the per-packet one."""
+
+    def test_columns_match_records(self) -> None:
+        columns = np.zeros(4, dtype=FEATURE_DTYPE)
+        columns["timestamp"] = 1_000.0
+        columns["src_ip"] = ip_to_int("10.0.0.1")
+        columns["dst_ip"] = ip_to_int("192.168.1.10")
+        columns["has_ip"] = [True, True, True, False]
+        columns["protocol"] = [PROTO_UDP, PROTO_UDP, PROTO_ICMP, PROTO_UDP]
+        columns["dst_port"] = [53, 53, 0, 53]
+        columns["packet_length"] = 100
+
+        detector = _make_detector()
+        detector.analyze_columns(columns)
+        detector.on_tick(1_000.0)
+        assert detector.estimate(ip_to_int("192.168.1.10")) == (3, 300)
+        assert detector.heavy_hitters()["ports"] == [{"key": 53, "packets": 2}]
+
+    def test_columns_attribute_sources(self) -> None:
+        columns = np.zeros(4_000, dtype=FEATURE_DTYPE)
+        columns["timestamp"] = 1_000.0
+        columns["src_ip"][:2_000] = ip_to_int("11.0.0.1")
+        columns["src_ip"][2_000:] = ip_to_int("12.0.0.1")
+        columns["dst_ip"][:2_000] = ip_to_int("192.168.1.10")
+        columns["dst_ip"][2_000:] = ip_to_int("192.168.1.20")
+        columns["has_ip"] = True
+        columns["protocol"] = PROTO_UDP
+        columns["dst_port"] = 53
+        columns["packet_length"] = 100
+
+        detector = _make_detector()
+        detector.analyze_columns(columns)
+        alerts = {a["target_ip"]: a for a in detector.on_tick(1_000.0) or []}
+        assert alerts["192.168.1.10"]["top_sources"] == ["11.0.0.1"]
+        assert alerts["192.168.1.20"]["top_sources"] == ["12.0.0.1"]
+
+
+class TestVolumetricSetting:
+    """``settings.volumetric_detector`` adds the detector to every shard."""
+
+    def test_disabled_by_default(self) -> None:
+        assert not any(
+            isinstance(d, VolumetricDetector) for d in shard_detectors(Settings())
+        )
+
+    def test_enabled(self) -> None:
+        detectors = shard_detectors(Settings(volumetric_detector=True))
+        assert any(isinstance(d, VolumetricDetector) for d in detectors)
@@ -0,0 +1,194 @@
+"""Unit tests for :mod:`sentinel_dpi.services.windowed_rankings`."""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from sentinel_dpi.dpi.batch_parser import FEATURE_DTYPE, PROTO_ICMP, PROTO_TCP
+from sentinel_dpi.services.windowed_rankings import WindowedRankings
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _make_rankings(*windows: float, bucket: float = 10.0) -> WindowedRankings:
+    return WindowedRankings(windows or (60.0, 300.0), bucket_seconds=bucket)
+
+
+def _add(
+    rankings: WindowedRankings,
+    timestamp: float,
+    src: int = 1,
+    dst: int = 2,
+    port: int | None = 80,
+    protocol: str = "TCP",
+    length: int = 100,
+) -> None:
+    rankings.add(timestamp, src, dst, port, protocol, length)
+
+
+def _make_columns(rows: list[tuple[float, int, int, int]]) -> np.ndarray:
+    """``(timestamp, src, dst, length)`` TCP rows to port 80."""
+    columns = np.zeros(len(rows), dtype=FEATURE_DTYPE)
+    for index, (timestamp, src, dst, length) in enumerate(rows):
+        columns[index]["timestamp"] = timestamp
+        columns[index]["src_ip"] = src
+        columns[index]["dst_ip"] = dst
+        columns[index]["packet_length"] = length
+    columns["has_ip"] = True
+    columns["protocol"] = PROTO_TCP
+    columns["dst_port"] = 80
+    return columns
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+
+class TestRanking:
+    """Rankings of one window."""
+
+    def test_rank_by_packets_and_bytes(self) -> None:
+        rankings = _make_rankings()
+        for _ in range(3):
+            _add(rankings, 1_000.0, src=1, length=10)
+        _add(rankings, 1_001.0, src=2, length=1_500)
+        assert rankings.rank(60.0, "src_ip", "packets") == [(1, 3, 30), (2, 1, 1_500)]
+        assert rankings.rank(60.0, "src_ip", "bytes", limit=1) == [(2, 1, 1_500)]
+
+    def test_dimensions(self) -> None:
+        rankings = _make_rankings()
+        _add(rankings, 1_000.0, dst=7, port=443)
+        _add(rankings, 1_000.0, dst=7, port=None, protocol="ICMP")
+        assert rankings.table(60.0, "dst_ip") == {7: (2, 200)}
+        assert rankings.table(60.0, "dst_port") == {443: (1, 100)}
+        assert rankings.table(60.0, "protocol") == {"TCP": (1, 100), "ICMP": (1, 100)}
+
+    def test_unknown_arguments(self) -> None:
+        rankings = _make_rankings()
+        with pytest.raises(ValueError):
+            rankings.rank(90.0, "src_ip")
+        with pytest.raises(ValueError):
+            rankings.rank(60.0, "ttl")
+        with pytest.raises(ValueError):
+            rankings.rank(60.0, "src_ip", by="flows")
+
+    def test_requires_a_window(self) -> None:
+        with pytest.raises(ValueError):
+            WindowedRankings(())
+
+
+class TestSliding:
+    """Traffic leaves each window as packet time moves on."""
+
+    def test_traffic_expires_per_window(self) -> None:
+        rankings = _make_rankings(60.0, 300.0)
+        _add(rankings, 1_000.0, src=1)
+        _add(rankings, 1_030.0, src=2)
+        # Bucket 100 (t=1000) is outside the 60 s window from bucket 106 on.
+        _add(rankings, 1_065.0, src=3)
+        assert set(rankings.table(60.0, "src_ip")) == {2, 3}
+        assert set(rankings.table(300.0, "src_ip")) == {1, 2, 3}
+        _add(rankings, 1_400.0, src=3)
+        assert rankings.table(60.0, "src_ip") == {3: (1, 100)}
+        assert rankings.table(300.0, "src_ip") == {3: (1, 100)}
+
+    def test_matches_rescan(self) -> None:
+        rng = random.Random(4)
+        rankings = _make_rankings(60.0, 300.0, bucket=5.0)
+        packets: list[tuple[float, int]] = []
+        now = 1_000.0
+        for _ in range(5_000):
+            now += rng.expovariate(5.0)
+            src = rng.randrange(40)
+            packets.append((now, src))
+            _add(rankings, now, src=src)
+            if rng.random() < 0.01:
+                for window in (60.0, 300.0):
+                    # Whole buckets: the open one and span - 1 before it.
+                    edge = (now // 5.0 - window // 5.0 + 1) * 5.0
+                    expected = Counter(s for t, s in packets if t >= edge)
+                    table = rankings.table(window, "src_ip")
+                    assert {k: p for k, (p, _) in table.items()} == dict(expected)
+
+
+class TestBoundedHosts:
+    """``host_capacity`` bounds the host tables of each bucket."""
+
+    def test_buckets_keep_heavy_hosts(self) -> None:
+        rankings = WindowedRankings((60.0,), bucket_seconds=10.0, host_capacity=4)
+        for _ in range(50):
+            _add(rankings, 1_000.0, src=1, dst=1)
+        for host in range(100, 200):
+            _add(rankings, 1_001.0, src=host, dst=host)
+        assert len(rankings.table(60.0, "src_ip")) == 4
+        assert rankings.rank(60.0, "src_ip", limit=1) == [(1, 50, 5_000)]
+        _add(rankings, 1_010.0, src=2)  # Closes the bucket.
+        assert len(rankings.table(60.0, "dst_ip")) <= 5
+        assert rankings.rank(60.0, "dst_ip", limit=1)[0][:2] == (1, 50)
+
+    def test_columns_respect_capacity(self) -> None:
+        rows = [(1_000.0, host, host, 60) for host in range(200)]
+        rankings = WindowedRankings((60.0,), host_capacity=8)
+        rankings.add_columns(_make_columns(rows))
+        assert len(rankings.table(60.0, "src_ip")) == 8
+        assert len(rankings.table(60.0, "dst_port")) == 1
+
+
+class TestColumnsAndMerge:
+    """Columnar batches and shard deltas."""
+
+    def test_columns_match_records(self) -> None:
+        rows = [(1_000.0 + i, i % 3, 9, 60 + i) for i in range(40)]
+        columnar = _make_rankings()
+        columnar.add_columns(_make_columns(rows))
+        recorded = _make_rankings()
+        for timestamp, src, dst, length in rows:
+            _add(recorded, timestamp, src=src, dst=dst, length=length)
+        for dimension in ("src_ip", "dst_ip", "dst_port", "protocol"):
+            assert columnar.table(60.0, dimension) == recorded.table(60.0, dimension)
+
+    def test_non_ip_rows(self) -> None:
+        columns = _make_columns([(1_000.0, 1, 2, 100), (1_000.0, 0, 0, 50)])
+        columns[1]["has_ip"] = False
+        columns[1]["protocol"] = PROTO_ICMP
+        rankings = _make_rankings()
+        rankings.add_columns(columns)
+        assert rankings.table(60.0, "src_ip") == {1: (1, 100), None: (1, 50)}
+        assert rankings.table(60.0, "dst_port") == {80: (1, 100)}
+
+    def test_take_and_merge(self) -> None:
+        shard = _make_rankings()
+        _add(shard, 1_000.0, src=1)
+        _add(shard, 1_020.0, src=2)
+        merged = _make_rankings()
+        _add(merged, 1_020.0, src=2)
+        merged.merge(shard.take())
+        assert merged.table(60.0, "src_ip") == {1: (1, 100), 2: (2, 200)}
+        assert shard.table(60.0, "src_ip") == {}
+
+    def test_out_of_order_buckets_expire_in_order(self) -> None:
+        shards = [_make_rankings() for _ in range(3)]
+        for shard, timestamp in zip(shards, (1_050.0, 1_010.0, 1_030.0)):
+            _add(shard, timestamp, src=int(timestamp))
+        merged = _make_rankings()
+        _add(merged, 1_060.0, src=0)
+        for shard in shards:
+            merged.merge(shard.take())
+        assert set(merged.table(60.0, "src_ip")) == {0, 1_010, 1_030, 1_050}
+        _add(merged, 1_085.0, src=0)  # Window is now buckets 103..108.
+        assert set(merged.table(60.0, "src_ip")) == {0, 1_030, 1_050}
+        assert set(merged.table(300.0, "src_ip")) == {0, 1_010, 1_030, 1_050}
+
+    def test_merge_drops_expired(self) -> None:
+        shard = _make_rankings()
+        _add(shard, 1_000.0, src=1)
+        merged = _make_rankings()
+        _add(merged, 2_000.0, src=2)
+        merged.merge(shard.take())
+        assert merged.table(300.0, "src_ip") == {2: (1, 100)}